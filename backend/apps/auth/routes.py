@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
@@ -17,6 +17,7 @@ router = APIRouter(tags=["autenticação"])
 
 # Configurações de segurança
 from core.config import settings
+from core.cache import cache_headers, is_not_modified, not_modified, version_etag
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -373,12 +374,21 @@ async def superadmin_login(form_data: LoginRequest, db: Session = Depends(get_db
     )
 
 @router.get("/me", response_model=dict)
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
+async def get_current_user_info(request: Request, response: Response, current_user: dict = Depends(get_current_user)):
     """Obtém informações do usuário atual"""
     user = current_user["user"]
     tenant = current_user.get("tenant")
     is_super_admin = current_user.get("is_super_admin", False)
     
+    # Configurações e identidade visual da empresa mudam raramente: revalidação via ETag
+    user_modified = user.updated_at or user.created_at
+    tenant_modified = (tenant.updated_at or tenant.created_at) if tenant else None
+    last_modified = max(stamp for stamp in (user_modified, tenant_modified) if stamp is not None)
+    etag = version_etag(user.id, user_modified, tenant.id if tenant else None, tenant_modified, is_super_admin)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified=last_modified)
+    cache_headers(response, etag, last_modified)
+    
     user_data = {
         "id": str(user.id),
         "name": user.name,
@@ -0,0 +1,71 @@
+"""
+Normalização e validação de CPF/CNPJ e email dos clientes.
+
+A normalização segue as mesmas regras das colunas geradas
+``cpf_cnpj_normalized`` e ``email_normalized`` (ver ``core.models.client``):
+é usada para montar buscas e comparar valores antes de chegarem ao banco
+(ex.: deduplicação na importação em lote).
+"""
+import re
+from typing import Optional
+
+# Termo de busca com cara de documento: dígitos e pontuação de CPF/CNPJ
+DOCUMENT_TERM = re.compile(r"^[\d.\-/\s]+$")
+
+
+def only_digits(value: Optional[str]) -> Optional[str]:
+    """CPF/CNPJ só com dígitos (``None`` se não sobrar nenhum)"""
+    if not value:
+        return None
+    return "".join(filter(str.isdigit, value)) or None
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    """Email sem espaços nas pontas e em minúsculas (``None`` se vazio)"""
+    if not value:
+        return None
+    return value.strip().lower() or None
+
+
+def is_document_term(term: str) -> bool:
+    """Termo de busca formado só por dígitos/pontuação de documento"""
+    return bool(DOCUMENT_TERM.match(term)) and only_digits(term) is not None
+
+
+def _check_digit(digits: str, weights) -> str:
+    remainder = sum(int(digit) * weight for digit, weight in zip(digits, weights)) % 11
+    return "0" if remainder < 2 else str(11 - remainder)
+
+
+def is_valid_cpf(digits: str) -> bool:
+    """CPF (11 dígitos, já normalizado) com dígitos verificadores corretos"""
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    first = _check_digit(digits[:9], range(10, 1, -1))
+    second = _check_digit(digits[:9] + first, range(11, 1, -1))
+    return digits[9:] == first + second
+
+
+CNPJ_WEIGHTS = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def is_valid_cnpj(digits: str) -> bool:
+    """CNPJ (14 dígitos, já normalizado) com dígitos verificadores corretos"""
+    if len(digits) != 14 or digits == digits[0] * 14:
+        return False
+    first = _check_digit(digits[:12], CNPJ_WEIGHTS)
+    second = _check_digit(digits[:12] + first, (6,) + CNPJ_WEIGHTS)
+    return digits[12:] == first + second
+
+
+def document_error(digits: str, person_type: Optional[str] = None) -> Optional[str]:
+    """Mensagem de erro do CPF/CNPJ normalizado (``None`` se válido)"""
+    if len(digits) == 11:
+        if person_type == "PJ":
+            return "Pessoa jurídica deve ter CNPJ (14 dígitos)"
+        return None if is_valid_cpf(digits) else "CPF inválido (dígitos verificadores)"
+    if len(digits) == 14:
+        if person_type == "PF":
+            return "Pessoa física deve ter CPF (11 dígitos)"
+        return None if is_valid_cnpj(digits) else "CNPJ inválido (dígitos verificadores)"
+    return "CPF deve ter 11 dígitos ou CNPJ deve ter 14 dígitos"
@@ -0,0 +1,281 @@
+"""
+Importação em lote de clientes (migração da base de um escritório).
+
+Sem consultas por linha:
+
+1. cada linha é validada com ``ClientCreate``, os textos são conferidos contra
+   o tamanho das colunas e os dígitos verificadores do CPF/CNPJ são conferidos;
+2. duplicatas dentro do arquivo (CPF/CNPJ e email normalizados) são
+   rejeitadas, valendo a primeira ocorrência;
+3. uma única consulta (``= ANY`` sobre os índices únicos por tenant) encontra
+   os que já estão cadastrados;
+4. as linhas restantes entram em INSERTs de várias linhas
+   (``CLIENT_IMPORT_BATCH_SIZE`` por comando) com ``ON CONFLICT DO NOTHING``:
+   um cadastro concorrente vira erro da linha, não da importação.
+
+Tudo em uma transação; o relatório traz o erro de cada linha rejeitada. Os
+INSERTs do Core não passam pelos listeners de sessão, então a importação
+soma ``clients_added`` nos agregados diários (um upsert) e invalida o cache
+do dashboard do tenant após o commit.
+"""
+import csv
+import io
+import re
+import unicodedata
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import String, any_, bindparam, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from core.cache import invalidate_tenant_on_commit
+from core.config import settings
+from core.database import AnySession, SessionAdapter
+from core.models.client import Client
+from core.services.metrics_rollup import apply_deltas
+from apps.clients.documents import document_error, normalize_email, only_digits
+from apps.clients.schemas import ClientCreate
+
+# Cabeçalhos usuais em planilhas exportadas -> campos de ClientCreate
+HEADER_ALIASES = {
+    "nome": "name",
+    "e_mail": "email",
+    "telefone": "phone",
+    "celular": "phone",
+    "cpf": "cpf_cnpj",
+    "cnpj": "cpf_cnpj",
+    "documento": "cpf_cnpj",
+    "tipo": "person_type",
+    "tipo_pessoa": "person_type",
+    "data_nascimento": "birth_date",
+    "nascimento": "birth_date",
+    "profissao": "occupation",
+    "razao_social": "company_name",
+    "empresa": "company_name",
+    "cargo": "company_role",
+    "vip": "is_vip",
+    "observacoes": "notes",
+}
+# Endereço (JSON) não vem de colunas de planilha
+CSV_FIELDS = set(ClientCreate.model_fields) - {"address"}
+# Tamanho das colunas VARCHAR: um valor longo demais é erro da linha, não um DataError que desfaz a importação
+COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in Client.__table__.columns
+    if column.name in CSV_FIELDS and isinstance(column.type, String) and column.type.length
+}
+
+BR_DATE = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+YES = {"sim", "s", "yes", "true", "1"}
+NO = {"nao", "não", "n", "no", "false", "0"}
+
+
+def _field_name(header: str) -> str:
+    plain = unicodedata.normalize("NFKD", header).encode("ascii", "ignore").decode()
+    key = re.sub(r"[\s\-/]+", "_", plain.strip().lower())
+    return HEADER_ALIASES.get(key, key)
+
+
+def decode_csv(content: bytes) -> str:
+    """UTF-8 (com ou sem BOM); planilhas salvas pelo Excel costumam vir em cp1252"""
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("cp1252")
+
+
+def read_clients_csv(text: str) -> List[Dict[str, Any]]:
+    """Linhas do CSV (separador ``,`` ``;`` ou tab) como dicts com os campos de ``ClientCreate``"""
+    first_line = text.split("\n", 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(first_line, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    rows = []
+    for raw in csv.DictReader(io.StringIO(text), dialect=dialect):
+        row = {}
+        for header, value in raw.items():
+            if header is None or value is None:  # colunas sobrando/faltando na linha
+                continue
+            field = _field_name(header)
+            if field in CSV_FIELDS and value.strip():
+                row[field] = value.strip()
+        rows.append(row)
+    return rows
+
+
+def _prepare(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte formatos de planilha (data dd/mm/aaaa, sim/não, tipo pelo documento)"""
+    data = dict(row)
+    birth_date = data.get("birth_date")
+    if isinstance(birth_date, str) and BR_DATE.match(birth_date):
+        try:
+            data["birth_date"] = datetime.strptime(birth_date, "%d/%m/%Y")
+        except ValueError:
+            pass  # data inexistente: fica o texto e a validação do schema aponta o erro
+    is_vip = data.get("is_vip")
+    if isinstance(is_vip, str) and is_vip.lower() in YES | NO:
+        data["is_vip"] = is_vip.lower() in YES
+    if isinstance(data.get("person_type"), str):
+        data["person_type"] = data["person_type"].upper()
+    else:
+        digits = only_digits(data.get("cpf_cnpj"))
+        if digits:
+            data["person_type"] = "PJ" if len(digits) == 14 else "PF"
+    return data
+
+
+def _length_errors(values: Dict[str, Any]) -> List[str]:
+    return [
+        f"{field}: deve ter no máximo {length} caracteres"
+        for field, length in COLUMN_LENGTHS.items()
+        if isinstance(values.get(field), str) and len(values[field]) > length
+    ]
+
+
+def _record_bulk_insert(session, tenant_id: str, count: int):
+    """O que os listeners de sessão fariam para ``count`` clientes novos"""
+    apply_deltas(session, [((tenant_id, datetime.now().date(), None, "clients_added", count), 1)])
+    invalidate_tenant_on_commit(session, Client, tenant_id)
+
+
+def _validation_message(error: ValidationError) -> str:
+    messages = []
+    for item in error.errors():
+        field = ".".join(str(part) for part in item["loc"])
+        message = item["msg"].removeprefix("Value error, ")
+        messages.append(f"{field}: {message}" if field else message)
+    return "; ".join(messages)
+
+
+class ClientImportService:
+    def __init__(self, db: AnySession):
+        self.db = SessionAdapter.wrap(db)
+
+    async def import_clients(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        tenant_id: str,
+        created_by: Optional[str] = None,
+        dry_run: bool = False,
+        first_row: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Importa clientes e retorna o relatório (``ClientImportResult``).
+
+        ``first_row`` é o número da primeira linha de dados no arquivo
+        (2 = logo após o cabeçalho), usado nas mensagens de erro.
+        """
+        errors: Dict[int, str] = {}
+        candidates = []  # (linha, valores do INSERT, documento, email)
+        seen_documents: Dict[str, int] = {}
+        seen_emails: Dict[str, int] = {}
+        total = 0
+
+        # 1-2. Validação e deduplicação dentro do arquivo
+        for line, row in enumerate(rows, start=first_row):
+            total += 1
+            try:
+                client = ClientCreate(**_prepare(row))
+            except ValidationError as e:
+                errors[line] = _validation_message(e)
+                continue
+            values = client.model_dump()
+            too_long = _length_errors(values)
+            if too_long:
+                errors[line] = "; ".join(too_long)
+                continue
+
+            document = only_digits(client.cpf_cnpj)
+            email = normalize_email(client.email)
+            if document:
+                problem = document_error(document, client.person_type)
+                if problem:
+                    errors[line] = f"cpf_cnpj: {problem}"
+                    continue
+                if document in seen_documents:
+                    errors[line] = f"CPF/CNPJ '{client.cpf_cnpj}' repetido no arquivo (linha {seen_documents[document]})"
+                    continue
+            if email and email in seen_emails:
+                errors[line] = f"Email '{client.email}' repetido no arquivo (linha {seen_emails[email]})"
+                continue
+            if document:
+                seen_documents[document] = line
+            if email:
+                seen_emails[email] = line
+
+            values.update(
+                id=uuid.uuid4(),
+                tenant_id=tenant_id,
+                is_active=True,
+                representatives=[],
+                tags=[],
+                created_by=created_by
+            )
+            candidates.append((line, values, document, email))
+
+        # 3. Já cadastrados no tenant: uma consulta para o arquivo inteiro
+        existing_documents, existing_emails = await self._existing(tenant_id, seen_documents, seen_emails)
+        to_insert = []
+        for line, values, document, email in candidates:
+            if document and document in existing_documents:
+                errors[line] = f"Já existe um cliente com o CPF/CNPJ '{values['cpf_cnpj']}'"
+            elif email and email in existing_emails:
+                errors[line] = f"Já existe um cliente com o email '{values['email']}'"
+            else:
+                to_insert.append((line, values))
+
+        # 4. INSERT de várias linhas por comando
+        imported = len(to_insert)
+        if not dry_run and to_insert:
+            try:
+                inserted = set()
+                batch_size = settings.CLIENT_IMPORT_BATCH_SIZE
+                for start in range(0, len(to_insert), batch_size):
+                    batch = [values for _, values in to_insert[start:start + batch_size]]
+                    # executemany com RETURNING: o SQLAlchemy agrupa em INSERT ... VALUES (...), (...)
+                    result = await self.db.execute(
+                        insert(Client).on_conflict_do_nothing().returning(Client.id), batch
+                    )
+                    inserted.update(result.scalars().all())
+                if inserted:
+                    await self.db.run(_record_bulk_insert, tenant_id, len(inserted))
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                raise
+
+            for line, values in to_insert:
+                if values["id"] not in inserted:
+                    errors[line] = "Cliente com o mesmo CPF/CNPJ ou email cadastrado durante a importação"
+            imported = len(inserted)
+
+        return {
+            "total": total,
+            "imported": imported,
+            "failed": len(errors),
+            "dry_run": dry_run,
+            "errors": [{"row": line, "message": message} for line, message in sorted(errors.items())]
+        }
+
+    async def _existing(self, tenant_id: str, documents: Iterable[str], emails: Iterable[str]):
+        """CPFs/CNPJs e emails (normalizados) do arquivo que já existem no tenant"""
+        documents, emails = list(documents), list(emails)
+        if not documents and not emails:
+            return set(), set()
+
+        # Um parâmetro (array) por lista: não esbarra no limite de parâmetros com dezenas de milhares de linhas
+        result = await self.db.execute(
+            select(Client.cpf_cnpj_normalized, Client.email_normalized).where(
+                Client.tenant_id == tenant_id,
+                or_(
+                    Client.cpf_cnpj_normalized == any_(bindparam("documents", documents, type_=ARRAY(String))),
+                    Client.email_normalized == any_(bindparam("emails", emails, type_=ARRAY(String)))
+                )
+            )
+        )
+        rows = result.all()
+        return {row.cpf_cnpj_normalized for row in rows}, {row.email_normalized for row in rows}
@@ -1,24 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from core.database import get_db
+from core.database import get_async_db
+from core.replicas import get_async_read_db
 from core.auth.multi_tenant_auth import MultiTenantAuth
 from core.auth.permission_system import require_permission
+from core.config import settings
+from core.serialization import ORJSONResponse, RowSerializer, resolve_fields
 from apps.clients.schemas import (
     ClientCreate, ClientUpdate, ClientResponse, 
-    ClientListResponse, ClientStats
+    ClientListResponse, ClientStats, ClientImportResult, CLIENT_SUMMARY_FIELDS
 )
 from apps.clients.services import ClientService
+from apps.clients.importer import ClientImportService, decode_csv, read_clients_csv
 
 router = APIRouter(prefix="/clients", tags=["Clientes"])
 
 # Instância do sistema de autenticação
 auth = MultiTenantAuth()
 
+# Listagem: linhas do banco direto para JSON (formato de ClientResponse)
+CLIENT_ROWS = RowSerializer(ClientResponse)
+
 @router.post("/", response_model=ClientResponse)
 async def create_client(
     client_data: ClientCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("clients", "create"))
 ):
     """Cria um novo cliente (isolado por empresa)"""
@@ -39,6 +46,36 @@ async def create_client(
             detail=f"Erro ao criar cliente: {str(e)}"
         )
 
+@router.post("/import", response_model=ClientImportResult)
+async def import_clients(
+    file: UploadFile,
+    dry_run: bool = Query(False, description="Apenas valida e retorna o relatório, sem gravar"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user_data: dict = Depends(require_permission("clients", "create"))
+):
+    """Importa clientes de um CSV (validação, deduplicação e INSERT em lote, com relatório por linha)"""
+    tenant_id = current_user_data["tenant"].id
+    user_id = current_user_data["user"].id
+    
+    rows = read_clients_csv(decode_csv(await file.read()))
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo sem linhas de clientes")
+    if len(rows) > settings.CLIENT_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.CLIENT_IMPORT_MAX_ROWS} linhas por arquivo (use scripts/import_clients.py para bases maiores)"
+        )
+    
+    try:
+        return await ClientImportService(db).import_clients(
+            rows, str(tenant_id), created_by=str(user_id), dry_run=dry_run
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao importar clientes: {str(e)}"
+        )
+
 @router.get("/", response_model=ClientListResponse)
 async def list_clients(
     skip: int = Query(0, ge=0),
@@ -48,13 +85,20 @@ async def list_clients(
     is_active: Optional[bool] = Query(None),
     is_vip: Optional[bool] = Query(None),
     order_by: str = Query("name", regex="^(name|created_at|person_type)$"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula (ex.: id,name,email)"),
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: apenas os campos da tabela"),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("clients", "read"))
 ):
     """Lista clientes da empresa (isolado automaticamente)"""
     tenant_id = current_user_data["tenant"].id
     service = ClientService(db)
     
+    try:
+        selected = resolve_fields(ClientResponse, fields, view, CLIENT_SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
         clients = await service.list_clients(
             str(tenant_id),
@@ -64,7 +108,8 @@ async def list_clients(
             person_type=person_type,
             is_active=is_active,
             is_vip=is_vip,
-            order_by=order_by
+            order_by=order_by,
+            fields=selected
         )
         
         # Calcular metadados
@@ -72,13 +117,13 @@ async def list_clients(
         total_pages = (total + limit - 1) // limit
         current_page = (skip // limit) + 1
         
-        return ClientListResponse(
-            clients=[client.to_dict() for client in clients],
-            total=total,
-            page=current_page,
-            per_page=limit,
-            total_pages=total_pages
-        )
+        return ORJSONResponse({
+            "clients": CLIENT_ROWS.only(selected).rows(clients),
+            "total": total,
+            "page": current_page,
+            "per_page": limit,
+            "total_pages": total_pages
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -88,7 +133,7 @@ async def list_clients(
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("clients", "read"))
 ):
     """Obtém cliente específico (isolado por empresa)"""
@@ -105,7 +150,7 @@ async def get_client(
 async def update_client(
     client_id: str,
     client_data: ClientUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("clients", "update"))
 ):
     """Atualiza cliente (isolado por empresa)"""
@@ -132,7 +177,7 @@ async def update_client(
 @router.delete("/{client_id}")
 async def delete_client(
     client_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("clients", "delete"))
 ):
     """Remove cliente (soft delete, isolado por empresa)"""
@@ -159,7 +204,7 @@ async def delete_client(
 @router.post("/{client_id}/activate")
 async def activate_client(
     client_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("clients", "update"))
 ):
     """Reativa um cliente"""
@@ -176,7 +221,7 @@ async def activate_client(
 
 @router.get("/stats/summary", response_model=ClientStats)
 async def get_client_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("clients", "read"))
 ):
     """Retorna estatísticas dos clientes"""
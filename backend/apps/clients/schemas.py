@@ -103,6 +103,11 @@ class ClientResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
+# Campos de view=summary na listagem (tabela de clientes)
+CLIENT_SUMMARY_FIELDS = (
+    "id", "name", "email", "phone", "cpf_cnpj", "person_type", "is_active", "is_vip", "created_at"
+)
+
 class ClientListResponse(BaseModel):
     """Schema para resposta de lista de clientes"""
     clients: List[ClientResponse]
@@ -119,3 +124,16 @@ class ClientStats(BaseModel):
     pf_clients: int
     pj_clients: int
     vip_clients: int
+
+class ClientImportError(BaseModel):
+    """Linha rejeitada na importação em lote"""
+    row: int  # linha do arquivo (cabeçalho = 1)
+    message: str
+
+class ClientImportResult(BaseModel):
+    """Relatório da importação em lote de clientes"""
+    total: int
+    imported: int
+    failed: int
+    dry_run: bool
+    errors: List[ClientImportError]
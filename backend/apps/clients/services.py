@@ -1,40 +1,25 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
-from typing import List, Optional
+from sqlalchemy import and_, or_, desc, asc, func, select
+from sqlalchemy.exc import IntegrityError
+from typing import AbstractSet, List, Optional
+from core.database import AnySession, SessionAdapter
+from core.serialization import column_loader
 from core.models.client import Client
+from apps.clients.documents import is_document_term, only_digits
 from apps.clients.schemas import ClientCreate, ClientUpdate
 import uuid
 
+# Índices únicos parciais por tenant (colunas normalizadas) -> mensagem de duplicidade
+DUPLICATE_MESSAGES = {
+    "ix_clients_tenant_email": "Já existe um cliente com o email '{email}'",
+    "ix_clients_tenant_cpf_cnpj": "Já existe um cliente com o CPF/CNPJ '{cpf_cnpj}'",
+}
+
 class ClientService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: AnySession):
+        self.db = SessionAdapter.wrap(db)
     
     async def create_client(self, client_data: ClientCreate, tenant_id: str) -> Client:
-        """Cria um novo cliente"""
-        # Verificar se já existe um cliente com o mesmo email no tenant
-        if client_data.email:
-            existing = self.db.query(Client).filter(
-                and_(
-                    Client.tenant_id == tenant_id,
-                    Client.email.ilike(client_data.email)
-                )
-            ).first()
-            
-            if existing:
-                raise ValueError(f"Já existe um cliente com o email '{client_data.email}'")
-        
-        # Verificar se já existe um cliente com o mesmo CPF/CNPJ no tenant
-        if client_data.cpf_cnpj:
-            existing = self.db.query(Client).filter(
-                and_(
-                    Client.tenant_id == tenant_id,
-                    Client.cpf_cnpj == client_data.cpf_cnpj
-                )
-            ).first()
-            
-            if existing:
-                raise ValueError(f"Já existe um cliente com o CPF/CNPJ '{client_data.cpf_cnpj}'")
-        
+        """Cria um novo cliente (email e CPF/CNPJ únicos por tenant, garantidos pelos índices)"""
         # Criar novo cliente
         client = Client(
             id=uuid.uuid4(),
@@ -55,19 +40,19 @@ class ClientService:
         )
         
         self.db.add(client)
-        self.db.commit()
-        self.db.refresh(client)
+        await self._commit_unique(email=client_data.email, cpf_cnpj=client_data.cpf_cnpj)
+        await self.db.refresh(client)
         
         return client
     
     async def get_client(self, client_id: str, tenant_id: str) -> Optional[Client]:
         """Obtém um cliente específico"""
-        return self.db.query(Client).filter(
+        return await self.db.scalar(select(Client).where(
             and_(
                 Client.id == client_id,
                 Client.tenant_id == tenant_id
             )
-        ).first()
+        ))
     
     async def list_clients(
         self,
@@ -78,30 +63,13 @@ class ClientService:
         person_type: Optional[str] = None,
         is_active: Optional[bool] = None,
         is_vip: Optional[bool] = None,
-        order_by: str = "name"
+        order_by: str = "name",
+        fields: Optional[AbstractSet[str]] = None
     ) -> List[Client]:
-        """Lista clientes com filtros"""
-        query = self.db.query(Client).filter(Client.tenant_id == tenant_id)
-        
-        # Aplicar filtros
-        if search:
-            query = query.filter(
-                or_(
-                    Client.name.ilike(f"%{search}%"),
-                    Client.email.ilike(f"%{search}%"),
-                    Client.cpf_cnpj.ilike(f"%{search}%"),
-                    Client.company_name.ilike(f"%{search}%")
-                )
-            )
-        
-        if person_type:
-            query = query.filter(Client.person_type == person_type)
-        
-        if is_active is not None:
-            query = query.filter(Client.is_active == is_active)
-        
-        if is_vip is not None:
-            query = query.filter(Client.is_vip == is_vip)
+        """Lista clientes com filtros (``fields``: carrega só essas colunas)"""
+        query = self._filtered(select(Client), tenant_id, search, person_type, is_active, is_vip)
+        if fields is not None:
+            query = query.options(column_loader(Client, fields))
         
         # Aplicar ordenação
         if order_by == "name":
@@ -113,7 +81,7 @@ class ClientService:
         else:
             query = query.order_by(asc(Client.name))
         
-        return query.offset(skip).limit(limit).all()
+        return list(await self.db.scalars(query.offset(skip).limit(limit)))
     
     async def update_client(
         self,
@@ -126,39 +94,13 @@ class ClientService:
         if not client:
             return None
         
-        # Verificar duplicatas se email foi alterado
-        if client_data.email and client_data.email != client.email:
-            existing = self.db.query(Client).filter(
-                and_(
-                    Client.tenant_id == tenant_id,
-                    Client.email.ilike(client_data.email),
-                    Client.id != client_id
-                )
-            ).first()
-            
-            if existing:
-                raise ValueError(f"Já existe um cliente com o email '{client_data.email}'")
-        
-        # Verificar duplicatas se CPF/CNPJ foi alterado
-        if client_data.cpf_cnpj and client_data.cpf_cnpj != client.cpf_cnpj:
-            existing = self.db.query(Client).filter(
-                and_(
-                    Client.tenant_id == tenant_id,
-                    Client.cpf_cnpj == client_data.cpf_cnpj,
-                    Client.id != client_id
-                )
-            ).first()
-            
-            if existing:
-                raise ValueError(f"Já existe um cliente com o CPF/CNPJ '{client_data.cpf_cnpj}'")
-        
         # Atualizar campos
         update_data = client_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(client, field, value)
         
-        self.db.commit()
-        self.db.refresh(client)
+        await self._commit_unique(email=client.email, cpf_cnpj=client.cpf_cnpj)
+        await self.db.refresh(client)
         
         return client
     
@@ -174,7 +116,7 @@ class ClientService:
         
         # Soft delete
         client.is_active = False
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def activate_client(self, client_id: str, tenant_id: str) -> bool:
@@ -184,78 +126,79 @@ class ClientService:
             return False
         
         client.is_active = True
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def get_client_count(self, tenant_id: str, search: str = None, person_type: str = None, 
                               is_active: bool = None, is_vip: bool = None) -> int:
         """Retorna o total de clientes com filtros aplicados"""
-        query = self.db.query(Client).filter(Client.tenant_id == tenant_id)
+        query = self._filtered(select(func.count(Client.id)), tenant_id, search, person_type, is_active, is_vip)
+        return await self.db.scalar(query)
+
+    async def get_client_stats(self, tenant_id: str) -> dict:
+        """Retorna estatísticas dos clientes"""
+        only_active = Client.is_active == True
+        row = (await self.db.execute(
+            select(
+                func.count(Client.id).label("total"),
+                func.count(Client.id).filter(only_active).label("active"),
+                func.count(Client.id).filter(and_(only_active, Client.person_type == "PF")).label("pf"),
+                func.count(Client.id).filter(and_(only_active, Client.person_type == "PJ")).label("pj"),
+                func.count(Client.id).filter(and_(only_active, Client.is_vip == True)).label("vip")
+            ).where(Client.tenant_id == tenant_id)
+        )).one()
         
-        # Aplicar filtros
-        if search:
-            query = query.filter(
-                or_(
-                    Client.name.ilike(f"%{search}%"),
-                    Client.email.ilike(f"%{search}%"),
-                    Client.cpf_cnpj.ilike(f"%{search}%"),
-                    Client.company_name.ilike(f"%{search}%")
-                )
-            )
+        return {
+            "total_clients": row.total,
+            "active_clients": row.active,
+            "inactive_clients": row.total - row.active,
+            "pf_clients": row.pf,
+            "pj_clients": row.pj,
+            "vip_clients": row.vip
+        }
+    
+    async def _commit_unique(self, **values):
+        """Commit convertendo violação dos índices únicos de clientes em ``ValueError``"""
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            for index_name, message in DUPLICATE_MESSAGES.items():
+                if index_name in str(e.orig):
+                    raise ValueError(message.format(**values)) from e
+            raise
+    
+    @staticmethod
+    def _search_condition(search: str):
+        """
+        Busca indexada (pg_trgm): termos só com dígitos/pontuação procuram no
+        CPF/CNPJ normalizado; os demais em nome, razão social e email.
+        """
+        term = search.strip()
+        if is_document_term(term):
+            return Client.cpf_cnpj_normalized.like(f"%{only_digits(term)}%")
+        return or_(
+            Client.name.ilike(f"%{term}%"),
+            Client.company_name.ilike(f"%{term}%"),
+            Client.email_normalized.like(f"%{term.lower()}%")
+        )
+    
+    @staticmethod
+    def _filtered(query, tenant_id: str, search: Optional[str], person_type: Optional[str],
+                  is_active: Optional[bool], is_vip: Optional[bool]):
+        """Aplica o tenant e os filtros da listagem (compartilhado com a contagem)"""
+        query = query.where(Client.tenant_id == tenant_id)
+        
+        if search and search.strip():
+            query = query.where(ClientService._search_condition(search))
         
         if person_type:
-            query = query.filter(Client.person_type == person_type)
+            query = query.where(Client.person_type == person_type)
         
         if is_active is not None:
-            query = query.filter(Client.is_active == is_active)
+            query = query.where(Client.is_active == is_active)
         
         if is_vip is not None:
-            query = query.filter(Client.is_vip == is_vip)
-        
-        return query.count()
-
-    async def get_client_stats(self, tenant_id: str) -> dict:
-        """Retorna estatísticas dos clientes"""
-        total = self.db.query(Client).filter(Client.tenant_id == tenant_id).count()
-        active = self.db.query(Client).filter(
-            and_(
-                Client.tenant_id == tenant_id,
-                Client.is_active == True
-            )
-        ).count()
-        inactive = total - active
-        
-        # Contagem por tipo de pessoa
-        pf_count = self.db.query(Client).filter(
-            and_(
-                Client.tenant_id == tenant_id,
-                Client.person_type == "PF",
-                Client.is_active == True
-            )
-        ).count()
-        
-        pj_count = self.db.query(Client).filter(
-            and_(
-                Client.tenant_id == tenant_id,
-                Client.person_type == "PJ",
-                Client.is_active == True
-            )
-        ).count()
+            query = query.where(Client.is_vip == is_vip)
         
-        # Contagem VIP
-        vip_count = self.db.query(Client).filter(
-            and_(
-                Client.tenant_id == tenant_id,
-                Client.is_vip == True,
-                Client.is_active == True
-            )
-        ).count()
-        
-        return {
-            "total_clients": total,
-            "active_clients": active,
-            "inactive_clients": inactive,
-            "pf_clients": pf_count,
-            "pj_clients": pj_count,
-            "vip_clients": vip_count
-        }
+        return query
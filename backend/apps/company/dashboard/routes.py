@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
-from core.database import get_db
+from core.replicas import get_read_db
 from apps.company.dashboard.services import CompanyDashboardService
 from apps.auth.routes import get_current_user
-from core.services.dashboard_service import DashboardService as LawyerDashboardService
+from core.services.dashboard_service import DashboardService as LawyerDashboardService, server_timing
+from core.services.mobile_sync import MobileSyncService
+from core.cache import compute_etag, etag_matches, not_modified
 
 router = APIRouter(prefix="/dashboard", tags=["Company Dashboard"])
 
@@ -50,7 +52,7 @@ async def test_auth_endpoint(current_user: dict = Depends(get_current_user)):
 
 @router.get("/overview")
 async def get_company_overview(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Visão geral da empresa - métricas principais"""
@@ -59,34 +61,78 @@ async def get_company_overview(
     service = CompanyDashboardService(db)
     return await service.get_company_overview(user_id)
 
+@router.get("/stats")
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Estatísticas principais do dashboard (com ETag para revalidação)"""
+    tenant_id = current_user["tenant"].id if current_user["tenant"] else None
+    
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
+    service = CompanyDashboardService(db)
+    
+    try:
+        stats = await service.get_dashboard_stats(str(tenant_id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter estatísticas: {str(e)}"
+        )
+    
+    etag = compute_etag(stats)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return stats
+
 @router.get("/processes/metrics")
 async def get_processes_metrics(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Métricas de processos da empresa"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
     service = CompanyDashboardService(db)
-    return await service.get_processes_metrics(period, user_id)
+    return await service.get_processes_metrics(period, str(tenant_id))
 
 @router.get("/financial/overview")
 async def get_financial_overview(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Visão financeira da empresa"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
     service = CompanyDashboardService(db)
-    return await service.get_financial_overview(period, user_id)
+    return await service.get_financial_overview(period, str(tenant_id))
 
 @router.get("/team/performance")
 async def get_team_performance(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Performance da equipe"""
@@ -97,7 +143,7 @@ async def get_team_performance(
 
 @router.get("/deadlines/alerts")
 async def get_deadlines_alerts(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Alertas de prazos críticos"""
@@ -109,30 +155,40 @@ async def get_deadlines_alerts(
 @router.get("/clients/analytics")
 async def get_clients_analytics(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Analytics de clientes"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
     service = CompanyDashboardService(db)
-    return await service.get_clients_analytics(period, user_id)
+    return await service.get_clients_analytics(period, str(tenant_id))
 
 @router.get("/documents/statistics")
 async def get_documents_statistics(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Estatísticas de documentos"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
     service = CompanyDashboardService(db)
-    return await service.get_documents_statistics(period, user_id)
+    return await service.get_documents_statistics(period, str(tenant_id))
 
 @router.get("/tasks/overview")
 async def get_tasks_overview(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Visão geral de tarefas"""
@@ -144,31 +200,35 @@ async def get_tasks_overview(
 @router.get("/specialties/performance")
 async def get_specialties_performance(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Performance por especialidade"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
     service = CompanyDashboardService(db)
-    return await service.get_specialties_performance(period, user_id)
+    return await service.get_specialties_performance(period, str(tenant_id))
 
 @router.get("/recent-activities")
 async def get_recent_activities(
     limit: int = 20,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Atividades recentes da empresa"""
     tenant_id = current_user["tenant"].id if current_user["tenant"] else None
-    user_id = current_user["user"].id
     service = CompanyDashboardService(db)
     return await service.get_recent_activities(tenant_id, limit)
 
 @router.get("/upcoming-events")
 async def get_upcoming_events(
     days: int = 7,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Eventos próximos"""
@@ -181,7 +241,7 @@ async def get_upcoming_events(
 async def get_quick_reports(
     report_type: str,  # processes, financial, clients, team
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Relatórios rápidos"""
@@ -192,7 +252,7 @@ async def get_quick_reports(
 
 @router.get("/notifications/summary")
 async def get_notifications_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Resumo de notificações"""
@@ -205,7 +265,8 @@ async def get_notifications_summary(
 
 @router.get("/lawyer")
 async def get_lawyer_dashboard(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Retorna dashboard personalizado para o advogado"""
@@ -222,6 +283,8 @@ async def get_lawyer_dashboard(
     
     try:
         dashboard_data = await service.get_lawyer_dashboard(str(user_id), str(tenant_id))
+        # Tempo de cada seção (visível no DevTools do navegador)
+        response.headers["Server-Timing"] = server_timing(service.timings)
         return dashboard_data
     except Exception as e:
         raise HTTPException(
@@ -231,7 +294,8 @@ async def get_lawyer_dashboard(
 
 @router.get("/mobile")
 async def get_mobile_dashboard(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Retorna dashboard otimizado para mobile"""
@@ -248,9 +312,37 @@ async def get_mobile_dashboard(
     
     try:
         mobile_dashboard = await service.get_mobile_dashboard(str(user_id), str(tenant_id))
+        # Tempo de cada seção (visível no DevTools do navegador)
+        response.headers["Server-Timing"] = server_timing(service.timings)
         return mobile_dashboard
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao obter dashboard mobile: {str(e)}"
         )
+
+@router.get("/mobile/sync")
+async def sync_mobile_dashboard(
+    token: str = Query(None, description="Token recebido na última sincronização"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Sincronização incremental do app mobile (apenas o que mudou desde o token)"""
+    tenant_id = current_user["tenant"].id if current_user["tenant"] else None
+    user_id = current_user["user"].id
+    
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tenant não encontrado"
+        )
+    
+    service = MobileSyncService(db)
+    
+    try:
+        return await service.sync(str(user_id), str(tenant_id), token)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao sincronizar dashboard mobile: {str(e)}"
+        )
@@ -3,7 +3,31 @@ from sqlalchemy import func
 from core.models.client import Client
 from core.models.process import Process
 from core.models.financial import FinancialRecord
-from datetime import datetime, timedelta
+from core.models.metrics import TenantDailyMetrics, TenantSpecialtyDailyMetrics
+from core.models.specialty import Specialty
+from core.cache import TTLCache, invalidate_on_write
+from core.config import settings
+from datetime import date, datetime, timedelta
+
+PERIOD_DAYS = {"7d": 7, "30d": 30, "90d": 90, "12m": 365, "1y": 365}
+
+def period_range(period: str, today: date = None):
+    """Converte o período ("7d", "30d", "90d", "12m", "1y") em [início, fim) e o período anterior"""
+    today = today or datetime.now().date()
+    days = PERIOD_DAYS.get(period, 30)
+    end = today + timedelta(days=1)
+    start = end - timedelta(days=days)
+    return start, end, start - timedelta(days=days)
+
+def growth_rate(current, previous) -> float:
+    """Crescimento percentual em relação ao período anterior"""
+    if not previous:
+        return 100.0 if current else 0.0
+    return round((float(current) - float(previous)) / float(previous) * 100, 2)
+
+# Estatísticas do dashboard por tenant: TTL curto + invalidação ao gravar
+dashboard_stats_cache = TTLCache(ttl_seconds=settings.DASHBOARD_STATS_TTL_SECONDS)
+invalidate_on_write(dashboard_stats_cache, Client, Process, FinancialRecord)
 
 class CompanyDashboardService:
     def __init__(self, db: Session):
@@ -24,46 +48,46 @@ class CompanyDashboardService:
         }
     
     async def get_dashboard_stats(self, tenant_id: str):
-        """Obtém estatísticas do dashboard da empresa"""
-        # Total de clientes
-        total_clients = self.db.query(Client).filter(Client.tenant_id == tenant_id).count()
-        
-        # Clientes ativos
-        active_clients = self.db.query(Client).filter(
-            Client.tenant_id == tenant_id,
-            Client.is_active == True
-        ).count()
+        """Obtém estatísticas do dashboard da empresa (em cache por tenant)"""
+        return dashboard_stats_cache.get_or_set(
+            (str(tenant_id), "stats"),
+            lambda: self._compute_dashboard_stats(tenant_id)
+        )
+    
+    def _compute_dashboard_stats(self, tenant_id: str):
+        """Calcula todas as estatísticas em uma única consulta (COUNT/SUM ... FILTER)"""
+        current_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
-        # Total de processos
-        total_processes = self.db.query(Process).filter(Process.tenant_id == tenant_id).count()
+        clients = self.db.query(
+            func.count(Client.id).label("total_clients"),
+            func.count(Client.id).filter(Client.is_active == True).label("active_clients"),
+            func.count(Client.id).filter(Client.created_at >= current_month).label("new_clients_month")
+        ).filter(Client.tenant_id == tenant_id).subquery()
         
-        # Processos ativos
-        active_processes = self.db.query(Process).filter(
-            Process.tenant_id == tenant_id,
-            Process.status.in_(["active", "pending"])
-        ).count()
+        processes = self.db.query(
+            func.count(Process.id).label("total_processes"),
+            func.count(Process.id).filter(Process.status.in_(["active", "pending"])).label("active_processes")
+        ).filter(Process.tenant_id == tenant_id).subquery()
         
-        # Receita do mês
-        current_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_revenue = self.db.query(func.sum(FinancialRecord.amount)).filter(
-            FinancialRecord.tenant_id == tenant_id,
-            FinancialRecord.record_type == "income",
-            FinancialRecord.paid_date >= current_month
-        ).scalar() or 0
+        revenue = self.db.query(
+            func.coalesce(
+                func.sum(FinancialRecord.amount).filter(
+                    FinancialRecord.record_type == "income",
+                    FinancialRecord.paid_date >= current_month
+                ),
+                0
+            ).label("monthly_revenue")
+        ).filter(FinancialRecord.tenant_id == tenant_id).subquery()
         
-        # Novos clientes no mês
-        new_clients_month = self.db.query(Client).filter(
-            Client.tenant_id == tenant_id,
-            Client.created_at >= current_month
-        ).count()
+        row = self.db.query(clients, processes, revenue).one()
         
         return {
-            "total_clients": total_clients,
-            "active_clients": active_clients,
-            "total_processes": total_processes,
-            "active_processes": active_processes,
-            "monthly_revenue": float(monthly_revenue),
-            "new_clients_month": new_clients_month
+            "total_clients": row.total_clients,
+            "active_clients": row.active_clients,
+            "total_processes": row.total_processes,
+            "active_processes": row.active_processes,
+            "monthly_revenue": float(row.monthly_revenue),
+            "new_clients_month": row.new_clients_month
         }
     
     async def get_recent_activities(self, tenant_id: str, limit: int = 10):
@@ -82,24 +106,86 @@ class CompanyDashboardService:
             "message": "Sistema de receita não implementado"
         }
     
-    # Métodos adicionais para as rotas
-    async def get_processes_metrics(self, period: str, user_id: str):
+    # ==================== MÉTRICAS (AGREGADOS DIÁRIOS) ====================
+    
+    def _period_totals(self, tenant_id: str, start: date, end: date, previous_start: date, *columns):
+        """Soma as colunas dos agregados no período atual e no anterior (uma consulta)"""
+        current = [func.coalesce(func.sum(column).filter(TenantDailyMetrics.day >= start), 0) for column in columns]
+        previous = [func.coalesce(func.sum(column).filter(TenantDailyMetrics.day < start), 0) for column in columns]
+        row = self.db.query(*current, *previous).filter(
+            TenantDailyMetrics.tenant_id == tenant_id,
+            TenantDailyMetrics.day >= previous_start,
+            TenantDailyMetrics.day < end
+        ).one()
+        return row[:len(columns)], row[len(columns):]
+    
+    def _daily_series(self, tenant_id: str, start: date, end: date, *columns):
+        """Série diária do período (dias sem movimento não têm linha)"""
+        rows = self.db.query(TenantDailyMetrics.day, *columns).filter(
+            TenantDailyMetrics.tenant_id == tenant_id,
+            TenantDailyMetrics.day >= start,
+            TenantDailyMetrics.day < end
+        ).order_by(TenantDailyMetrics.day).all()
+        return rows
+    
+    async def get_processes_metrics(self, period: str, tenant_id: str):
         """Métricas de processos"""
+        start, end, previous_start = period_range(period)
+        (opened, closed), (previous_opened, _) = self._period_totals(
+            tenant_id, start, end, previous_start,
+            TenantDailyMetrics.processes_opened, TenantDailyMetrics.processes_closed
+        )
+        
+        # Situação atual: contagem pelo índice de tenant (não depende do período)
+        by_status = dict(self.db.query(Process.status, func.count(Process.id)).filter(
+            Process.tenant_id == tenant_id
+        ).group_by(Process.status).all())
+        
         return {
-            "total": 0,
-            "active": 0,
-            "pending": 0,
-            "completed": 0,
-            "growth_rate": 0.0
+            "total": sum(by_status.values()),
+            "active": by_status.get("active", 0),
+            "pending": by_status.get("pending", 0),
+            "completed": by_status.get("closed", 0),
+            "opened": int(opened),
+            "closed": int(closed),
+            "growth_rate": growth_rate(opened, previous_opened),
+            "daily": [
+                {"day": row.day.isoformat(), "opened": row.processes_opened, "closed": row.processes_closed}
+                for row in self._daily_series(
+                    tenant_id, start, end,
+                    TenantDailyMetrics.processes_opened, TenantDailyMetrics.processes_closed
+                )
+            ]
         }
     
-    async def get_financial_overview(self, period: str, user_id: str):
+    async def get_financial_overview(self, period: str, tenant_id: str):
         """Visão financeira"""
+        start, end, previous_start = period_range(period)
+        (revenue, expenses), (previous_revenue, _) = self._period_totals(
+            tenant_id, start, end, previous_start,
+            TenantDailyMetrics.revenue, TenantDailyMetrics.expenses
+        )
+        
+        pending_payments = self.db.query(func.coalesce(func.sum(FinancialRecord.amount), 0)).filter(
+            FinancialRecord.tenant_id == tenant_id,
+            FinancialRecord.record_type == "income",
+            FinancialRecord.paid_date.is_(None),
+            FinancialRecord.status.in_(["pending", "overdue"])
+        ).scalar()
+        
         return {
-            "total_revenue": 0.0,
-            "total_expenses": 0.0,
-            "net_profit": 0.0,
-            "pending_payments": 0.0
+            "total_revenue": float(revenue),
+            "total_expenses": float(expenses),
+            "net_profit": float(revenue) - float(expenses),
+            "pending_payments": float(pending_payments),
+            "growth_rate": growth_rate(revenue, previous_revenue),
+            "daily": [
+                {"day": row.day.isoformat(), "revenue": float(row.revenue), "expenses": float(row.expenses)}
+                for row in self._daily_series(
+                    tenant_id, start, end,
+                    TenantDailyMetrics.revenue, TenantDailyMetrics.expenses
+                )
+            ]
         }
     
     async def get_team_performance(self, period: str, user_id: str):
@@ -114,19 +200,57 @@ class CompanyDashboardService:
         """Alertas de prazos"""
         return []
     
-    async def get_clients_analytics(self, period: str, user_id: str):
+    async def get_clients_analytics(self, period: str, tenant_id: str):
         """Analytics de clientes"""
+        start, end, previous_start = period_range(period)
+        month_start = datetime.now().date().replace(day=1)
+        
+        # Total atual (exclusões/desativações reduzem): contagem direta; os agregados só somam cadastros
+        total = self.db.query(func.count(Client.id)).filter(
+            Client.tenant_id == tenant_id,
+            Client.is_active == True
+        ).scalar()
+        
+        row = self.db.query(
+            func.coalesce(func.sum(TenantDailyMetrics.clients_added).filter(TenantDailyMetrics.day >= month_start), 0),
+            func.coalesce(func.sum(TenantDailyMetrics.clients_added).filter(
+                TenantDailyMetrics.day >= start, TenantDailyMetrics.day < end
+            ), 0),
+            func.coalesce(func.sum(TenantDailyMetrics.clients_added).filter(
+                TenantDailyMetrics.day >= previous_start, TenantDailyMetrics.day < start
+            ), 0)
+        ).filter(TenantDailyMetrics.tenant_id == tenant_id).one()
+        this_month, added, previous_added = row
+        
         return {
-            "total": 0,
-            "new_this_month": 0,
-            "growth_rate": 0.0
+            "total": int(total),
+            "new_this_month": int(this_month),
+            "new_in_period": int(added),
+            "growth_rate": growth_rate(added, previous_added),
+            "daily": [
+                {"day": day.isoformat(), "added": clients_added}
+                for day, clients_added in self._daily_series(tenant_id, start, end, TenantDailyMetrics.clients_added)
+            ]
         }
     
-    async def get_documents_statistics(self, period: str, user_id: str):
+    async def get_documents_statistics(self, period: str, tenant_id: str):
         """Estatísticas de documentos"""
+        start, end, _ = period_range(period)
+        month_start = datetime.now().date().replace(day=1)
+        
+        row = self.db.query(
+            func.coalesce(func.sum(TenantDailyMetrics.documents_uploaded), 0),
+            func.coalesce(func.sum(TenantDailyMetrics.documents_uploaded).filter(TenantDailyMetrics.day >= month_start), 0),
+            func.coalesce(func.sum(TenantDailyMetrics.documents_uploaded).filter(
+                TenantDailyMetrics.day >= start, TenantDailyMetrics.day < end
+            ), 0)
+        ).filter(TenantDailyMetrics.tenant_id == tenant_id).one()
+        total, this_month, uploaded = row
+        
         return {
-            "total": 0,
-            "this_month": 0,
+            "total": int(total),
+            "this_month": int(this_month),
+            "uploaded_in_period": int(uploaded),
             "pending_review": 0
         }
     
@@ -138,9 +262,35 @@ class CompanyDashboardService:
             "completed": 0
         }
     
-    async def get_specialties_performance(self, period: str, user_id: str):
+    async def get_specialties_performance(self, period: str, tenant_id: str):
         """Performance por especialidade"""
-        return []
+        start, end, _ = period_range(period)
+        rows = self.db.query(
+            TenantSpecialtyDailyMetrics.specialty_id,
+            Specialty.name,
+            func.sum(TenantSpecialtyDailyMetrics.processes_opened).label("opened"),
+            func.sum(TenantSpecialtyDailyMetrics.processes_closed).label("closed"),
+            func.sum(TenantSpecialtyDailyMetrics.revenue).label("revenue")
+        ).outerjoin(
+            Specialty, Specialty.id == TenantSpecialtyDailyMetrics.specialty_id
+        ).filter(
+            TenantSpecialtyDailyMetrics.tenant_id == tenant_id,
+            TenantSpecialtyDailyMetrics.day >= start,
+            TenantSpecialtyDailyMetrics.day < end
+        ).group_by(
+            TenantSpecialtyDailyMetrics.specialty_id, Specialty.name
+        ).order_by(func.sum(TenantSpecialtyDailyMetrics.revenue).desc()).all()
+        
+        return [
+            {
+                "specialty_id": str(row.specialty_id),
+                "name": row.name,
+                "processes_opened": int(row.opened),
+                "processes_closed": int(row.closed),
+                "revenue": float(row.revenue)
+            }
+            for row in rows
+        ]
     
     async def get_upcoming_events(self, days: int, user_id: str):
         """Eventos próximos"""
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from core.database import get_db
+import asyncio
+import json
+from core.config import settings
+from core.database import get_async_db, SessionLocal
+from core.replicas import get_async_read_db
 from core.auth.multi_tenant_auth import MultiTenantAuth
 from apps.notifications.schemas import (
     NotificationResponse, NotificationListResponse, NotificationPreferenceResponse,
@@ -9,12 +14,17 @@ from apps.notifications.schemas import (
     ArchiveNotificationRequest
 )
 from core.services.notification_service import NotificationService
+from core.services.notification_hub import notification_hub
+from core.serialization import ORJSONResponse, RowSerializer
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 # Instância do sistema de autenticação
 auth = MultiTenantAuth()
 
+# Listagem: linhas do banco direto para JSON (formato de NotificationResponse)
+NOTIFICATION_ROWS = RowSerializer(NotificationResponse, aliases={"metadata": "notification_data"})
+
 # ==================== NOTIFICAÇÕES ====================
 
 @router.get("/", response_model=NotificationListResponse)
@@ -22,7 +32,7 @@ async def get_notifications(
     unread_only: bool = Query(False, description="Apenas não lidas"),
     page: int = Query(1, ge=1, description="Página"),
     per_page: int = Query(20, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Lista notificações do usuário"""
@@ -56,14 +66,14 @@ async def get_notifications(
         total = len(all_notifications)
         total_pages = (total + per_page - 1) // per_page
         
-        return NotificationListResponse(
-            notifications=[NotificationResponse(**notification.to_dict()) for notification in notifications],
-            total=total,
-            unread_count=len(unread_notifications),
-            page=page,
-            per_page=per_page,
-            total_pages=total_pages
-        )
+        return ORJSONResponse({
+            "notifications": NOTIFICATION_ROWS.rows(notifications),
+            "total": total,
+            "unread_count": len(unread_notifications),
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,7 +82,7 @@ async def get_notifications(
 
 @router.get("/unread-count")
 async def get_unread_count(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Retorna contagem de notificações não lidas"""
@@ -82,13 +92,9 @@ async def get_unread_count(
     service = NotificationService(db)
     
     try:
-        unread_notifications = await service.get_user_notifications(
-            str(user_id), 
-            str(tenant_id), 
-            unread_only=True
-        )
+        unread_count = await service.count_unread_notifications(str(user_id), str(tenant_id))
         
-        return {"unread_count": len(unread_notifications)}
+        return {"unread_count": unread_count}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -98,7 +104,7 @@ async def get_unread_count(
 @router.post("/mark-read")
 async def mark_notification_as_read(
     request: MarkNotificationReadRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Marca notificação como lida"""
@@ -124,7 +130,7 @@ async def mark_notification_as_read(
 
 @router.post("/mark-all-read")
 async def mark_all_notifications_as_read(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Marca todas as notificações como lidas"""
@@ -146,7 +152,7 @@ async def mark_all_notifications_as_read(
 @router.post("/archive")
 async def archive_notification(
     request: ArchiveNotificationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Arquiva notificação"""
@@ -174,7 +180,7 @@ async def archive_notification(
 
 @router.get("/preferences", response_model=NotificationPreferenceResponse)
 async def get_notification_preferences(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Busca preferências de notificação do usuário"""
@@ -204,7 +210,7 @@ async def get_notification_preferences(
 @router.put("/preferences", response_model=NotificationPreferenceResponse)
 async def update_notification_preferences(
     preferences_data: NotificationPreferenceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Atualiza preferências de notificação"""
@@ -234,7 +240,7 @@ async def update_notification_preferences(
 
 @router.get("/stats", response_model=NotificationStats)
 async def get_notification_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Retorna estatísticas de notificações"""
@@ -289,3 +295,164 @@ async def get_notification_stats(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao buscar estatísticas: {str(e)}"
         )
+
+# ==================== TEMPO REAL (SSE / WEBSOCKET) ====================
+
+def _check_stream_permission(current_user_data: dict):
+    permissions = current_user_data["permissions"] or {}
+    if not (permissions.get("notifications.read", False) or permissions.get("notifications.manage", False)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para visualizar notificações"
+        )
+
+@router.post("/stream/ticket")
+async def create_stream_ticket(
+    db: AsyncSession = Depends(get_async_db),
+    current_user_data: dict = Depends(auth.get_current_user_with_tenant)
+):
+    """Emite o ticket de uso único para conectar em /stream ou /ws (o JWT não vai na URL)"""
+    _check_stream_permission(current_user_data)
+    
+    tenant_id = current_user_data["tenant"].id
+    user_id = current_user_data["user"].id
+    
+    service = NotificationService(db)
+    
+    try:
+        ticket, expires_in = await service.create_stream_ticket(str(user_id), str(tenant_id))
+        
+        return {"ticket": ticket, "expires_in": expires_in}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao emitir ticket: {str(e)}"
+        )
+
+async def _authenticate_stream(ticket: Optional[str], token: Optional[str]) -> dict:
+    """
+    Autentica a conexão de streaming e retorna o snapshot inicial.
+
+    Aceita o ticket de ``POST /stream/ticket`` (query string, navegadores)
+    ou o JWT no header Authorization (demais clientes). Usa uma sessão
+    própria, fechada antes do streaming começar, para não manter uma
+    conexão do pool ocupada enquanto o cliente está conectado.
+    """
+    if not ticket and not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ticket não informado"
+        )
+    
+    db = SessionLocal()
+    try:
+        service = NotificationService(db)
+        
+        if ticket:
+            owner = await service.consume_stream_ticket(ticket)
+            if not owner:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Ticket inválido ou expirado"
+                )
+            tenant_id, user_id = owner
+        else:
+            current_user_data = await auth.get_current_user_with_tenant(token=token, db=db)
+            _check_stream_permission(current_user_data)
+            tenant_id = str(current_user_data["tenant"].id)
+            user_id = str(current_user_data["user"].id)
+        
+        unread_count = await service.count_unread_notifications(user_id, tenant_id)
+        
+        return {"tenant_id": tenant_id, "user_id": user_id, "unread_count": unread_count}
+    finally:
+        db.close()
+
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.startswith("Bearer "):
+        return authorization.split(" ", 1)[1]
+    return None
+
+def _sse_message(payload: dict) -> str:
+    return f"event: {payload.get('type', 'message')}\ndata: {json.dumps(payload, default=str, ensure_ascii=False)}\n\n"
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Ticket de POST /stream/ticket (EventSource não envia headers)")
+):
+    """Stream de notificações em tempo real (Server-Sent Events)"""
+    session = await _authenticate_stream(ticket, _bearer_token(request.headers.get("Authorization")))
+    tenant_id, user_id = session["tenant_id"], session["user_id"]
+    heartbeat = settings.NOTIFICATION_HEARTBEAT_SECONDS
+    
+    queue = notification_hub.subscribe(tenant_id, user_id)
+    
+    async def event_generator():
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse_message({"type": "snapshot", "unread_count": session["unread_count"]})
+            
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                
+                yield _sse_message(payload)
+                if payload.get("type") == "shutdown":
+                    break
+        finally:
+            notification_hub.unsubscribe(tenant_id, user_id, queue)
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.websocket("/ws")
+async def notifications_websocket(websocket: WebSocket, ticket: Optional[str] = Query(None)):
+    """Canal WebSocket de notificações em tempo real"""
+    try:
+        session = await _authenticate_stream(ticket, _bearer_token(websocket.headers.get("Authorization")))
+    except HTTPException as e:
+        await websocket.close(code=4401 if e.status_code == status.HTTP_401_UNAUTHORIZED else 4403)
+        return
+    
+    tenant_id, user_id = session["tenant_id"], session["user_id"]
+    heartbeat = settings.NOTIFICATION_HEARTBEAT_SECONDS
+    
+    await websocket.accept()
+    queue = notification_hub.subscribe(tenant_id, user_id)
+    
+    async def sender():
+        await websocket.send_json({"type": "snapshot", "unread_count": session["unread_count"]})
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                payload = {"type": "ping"}
+            await websocket.send_text(json.dumps(payload, default=str, ensure_ascii=False))
+            if payload.get("type") == "shutdown":
+                await websocket.close()
+                return
+    
+    sender_task = asyncio.create_task(sender())
+    try:
+        while True:
+            message = await websocket.receive_text()
+            if message == "ping":
+                await websocket.send_json({"type": "pong"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sender_task.cancel()
+        notification_hub.unsubscribe(tenant_id, user_id, queue)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, Form, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from core.database import get_db
+from datetime import date
+from core.database import get_async_db
+from core.replicas import get_async_read_db
 from core.auth.permission_system import require_permission, require_module_access, get_current_user_permissions
 from core.auth.multi_tenant_auth import get_current_user
-from apps.processes.schemas import ProcessCreate, ProcessUpdate, ProcessResponse, ProcessLawyerCreate
+from core.serialization import ORJSONResponse, resolve_fields
+from core.cache import cache_headers, is_not_modified, not_modified
+from apps.processes.schemas import ProcessCreate, ProcessUpdate, ProcessResponse, ProcessTimelineResponse, ProcessLawyerCreate, DeadlineCalculationRequest, PROCESS_SUMMARY_FIELDS
 from apps.processes.services import ProcessService
 from core.models.user_roles import UserSpecialty, LegalSpecialty
 
@@ -13,7 +18,7 @@ router = APIRouter(prefix="/processes", tags=["Processos"])
 @router.post("/", response_model=ProcessResponse)
 async def create_process(
     process_data: ProcessCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "create"))
 ):
     """Cria um novo processo"""
@@ -24,10 +29,10 @@ async def create_process(
     if process_data.specialty_id:
         for lawyer in process_data.lawyers:
             # Verifica se advogado tem a especialidade
-            user_specialty = db.query(UserSpecialty).filter(
+            user_specialty = await db.scalar(select(UserSpecialty.id).where(
                 UserSpecialty.user_id == lawyer["lawyer_id"],
                 UserSpecialty.specialty_id == process_data.specialty_id
-            ).first()
+            ).limit(1))
             
             if not user_specialty:
                 # Por enquanto, apenas loga o aviso
@@ -52,19 +57,27 @@ async def list_processes(
     specialty_id: Optional[str] = None,
     priority: Optional[str] = None,
     client_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula (ex.: id,subject,status,client)"),
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: campos da tabela, sem notas e advogados"),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Lista processos com filtros"""
     tenant_id = current_user_data["tenant"].id
     user_id = current_user_data["user"].id
+    
+    try:
+        selected = resolve_fields(ProcessResponse, fields, view, PROCESS_SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     user_permissions = await get_current_user_permissions(current_user_data, db)
     
     service = ProcessService(db, tenant_id)
     
     # Se usuário não pode ver todos os processos, filtra apenas os seus
     if not user_permissions.get("can_view_all_processes", False):
-        processes = await service.get_user_processes(user_id, "lawyer")
+        processes = await service.get_user_processes(user_id, "lawyer", as_rows=True, fields=selected)
     else:
         processes = await service.list_processes(
             skip=skip,
@@ -73,15 +86,19 @@ async def list_processes(
             status=status,
             specialty_id=specialty_id,
             priority=priority,
-            client_id=client_id
+            client_id=client_id,
+            as_rows=True,
+            fields=selected
         )
     
-    return processes
+    return ORJSONResponse(processes)
 
 @router.get("/{process_id}", response_model=ProcessResponse)
 async def get_process(
     process_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém processo específico (verifica se usuário tem acesso)"""
@@ -93,26 +110,32 @@ async def get_process(
     
     # Verifica se usuário tem acesso ao processo
     if not user_permissions.get("can_view_all_processes", False):
-        user_processes = await service.get_user_processes(user_id, "lawyer")
-        process_ids = [p.id for p in user_processes]
-        
-        if process_id not in process_ids:
+        if not await service.is_process_lawyer(process_id, user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Sem acesso a este processo"
             )
     
+    # Validadores antes de carregar e serializar o processo: 304 se nada mudou
+    version = await service.get_process_version(process_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Processo não encontrado")
+    etag, last_modified = version
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified=last_modified)
+    
     process = await service.get_process(process_id)
     if not process:
         raise HTTPException(status_code=404, detail="Processo não encontrado")
     
+    cache_headers(response, etag, last_modified)
     return process
 
 @router.put("/{process_id}", response_model=ProcessResponse)
 async def update_process(
     process_id: str,
     process_data: ProcessUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Atualiza um processo"""
@@ -142,7 +165,7 @@ async def update_process(
 @router.delete("/{process_id}")
 async def delete_process(
     process_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "delete"))
 ):
     """Deleta um processo (soft delete)"""
@@ -171,7 +194,7 @@ async def delete_process(
 
 @router.get("/stats/summary")
 async def get_process_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém estatísticas dos processos"""
@@ -204,10 +227,10 @@ async def get_process_stats(
 
 # ==================== TIMELINE ENDPOINTS ====================
 
-@router.get("/{process_id}/timeline")
+@router.get("/{process_id}/timeline", response_model=List[ProcessTimelineResponse])
 async def get_process_timeline(
     process_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém timeline de andamentos do processo"""
@@ -230,7 +253,7 @@ async def get_process_timeline(
     
     try:
         timeline = await service.get_process_timeline(process_id)
-        return timeline
+        return ORJSONResponse(timeline)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -241,7 +264,7 @@ async def get_process_timeline(
 async def add_timeline_entry(
     process_id: str,
     entry_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Adiciona novo andamento ao processo"""
@@ -276,7 +299,7 @@ async def update_timeline_entry(
     process_id: str,
     entry_id: str,
     entry_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Atualiza andamento do processo"""
@@ -312,7 +335,7 @@ async def update_timeline_entry(
 async def delete_timeline_entry(
     process_id: str,
     entry_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "delete"))
 ):
     """Remove andamento do processo"""
@@ -346,10 +369,44 @@ async def delete_timeline_entry(
 
 # ==================== DEADLINES ENDPOINTS ====================
 
+@router.post("/deadlines/calculate")
+async def calculate_deadlines(
+    request: DeadlineCalculationRequest,
+    current_user_data: dict = Depends(require_permission("processes", "read"))
+):
+    """Calcula vencimentos de prazos em dias úteis (em lote) pelo calendário de cada tribunal"""
+    from core.services.legal_calendar import legal_calendar
+    
+    try:
+        items = [item.dict() for item in request.items]
+        due_dates = legal_calendar.compute_due_dates(items)
+        
+        return {
+            "results": [
+                {
+                    "start_date": (item["start_date"] or date.today()).isoformat(),
+                    "business_days": item["business_days"],
+                    "tribunal": legal_calendar.resolve_alias(item["tribunal"], item["cnj_number"]),
+                    "due_date": due_date.isoformat()
+                }
+                for item, due_date in zip(items, due_dates)
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao calcular prazos: {str(e)}"
+        )
+
 @router.get("/{process_id}/deadlines")
 async def get_process_deadlines(
     process_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém prazos do processo"""
@@ -383,7 +440,7 @@ async def get_process_deadlines(
 async def add_deadline(
     process_id: str,
     deadline_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Adiciona novo prazo ao processo"""
@@ -417,7 +474,7 @@ async def add_deadline(
 async def complete_deadline(
     process_id: str,
     deadline_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Marca prazo como concluído"""
@@ -453,7 +510,7 @@ async def complete_deadline(
 async def delete_deadline(
     process_id: str,
     deadline_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "delete"))
 ):
     """Remove prazo do processo"""
@@ -490,7 +547,7 @@ async def delete_deadline(
 @router.get("/{process_id}/documents")
 async def get_process_documents(
     process_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém documentos do processo"""
@@ -527,7 +584,7 @@ async def upload_document(
     title: str = Form(...),
     description: str = Form(None),
     tags: str = Form("[]"),  # JSON string
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Faz upload de documento para o processo"""
@@ -571,7 +628,7 @@ async def upload_document(
 async def delete_document(
     process_id: str,
     document_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "delete"))
 ):
     """Remove documento do processo"""
@@ -608,7 +665,7 @@ async def delete_document(
 @router.get("/{process_id}/notes")
 async def get_process_notes(
     process_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("processes", "read"))
 ):
     """Obtém anotações do processo"""
@@ -642,7 +699,7 @@ async def get_process_notes(
 async def add_process_note(
     process_id: str,
     note_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "update"))
 ):
     """Adiciona anotação ao processo"""
@@ -676,7 +733,7 @@ async def add_process_note(
 async def delete_process_note(
     process_id: str,
     note_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("processes", "delete"))
 ):
     """Remove anotação do processo"""
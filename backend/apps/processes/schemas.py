@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 
 class ProcessCreate(BaseModel):
     subject: str
@@ -57,6 +57,26 @@ class ProcessResponse(BaseModel):
     specialties: Optional[List[Dict[str, Any]]] = None  # Novas especialidades
     lawyers: Optional[List[Dict[str, Any]]] = None
 
+# Campos de view=summary na listagem (tabela de processos): sem notas nem advogados/especialidades
+PROCESS_SUMMARY_FIELDS = (
+    "id", "subject", "cnj_number", "court", "client_id", "priority", "status",
+    "requires_attention", "created_at", "updated_at", "client"
+)
+
+class ProcessTimelineResponse(BaseModel):
+    id: str
+    process_id: str
+    date: datetime
+    type: str
+    description: str
+    court_decision: Optional[str]
+    ai_classification: Optional[str]
+    ai_confidence: Optional[int]
+    documents: Optional[List[Any]]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    created_by: Optional[str]
+
 class ProcessLawyerCreate(BaseModel):
     lawyer_id: str
     role: str = "lawyer"  # lawyer, assistant, coordinator
@@ -64,3 +84,24 @@ class ProcessLawyerCreate(BaseModel):
     can_sign_documents: bool = True
     can_manage_process: bool = True
     can_view_financial: bool = False
+
+class DeadlineCalculationItem(BaseModel):
+    start_date: Optional[date] = None  # Data da intimação/publicação (padrão: hoje)
+    business_days: int
+    tribunal: Optional[str] = None  # Alias do tribunal (ex.: tjsp, trf3)
+    cnj_number: Optional[str] = None  # Alternativa ao alias
+    
+    @validator('business_days')
+    def validate_business_days(cls, v):
+        if v < 0 or v > 3650:
+            raise ValueError('Quantidade de dias úteis inválida')
+        return v
+
+class DeadlineCalculationRequest(BaseModel):
+    items: List[DeadlineCalculationItem]
+    
+    @validator('items')
+    def validate_items(cls, v):
+        if len(v) > 10000:
+            raise ValueError('Máximo de 10000 prazos por requisição')
+        return v
@@ -1,17 +1,50 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from core.models.process import Process, ProcessLawyer, ProcessSpecialty
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.orm import selectinload, aliased
+from core.cache import row_stamp, version_digest, version_etag
+from core.database import AnySession, SessionAdapter
 from core.models.client import Client
+from core.models.process import Process, ProcessLawyer, ProcessSpecialty
 from core.models.specialty import Specialty
 from core.models.user import User
-from apps.processes.schemas import ProcessCreate, ProcessUpdate, ProcessResponse
+from apps.processes.schemas import ProcessCreate, ProcessUpdate, ProcessResponse, ProcessTimelineResponse
+from core.services.deadline_scheduler import deadline_scheduler
+from core.serialization import RowSerializer, column_loader, dumps
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import AbstractSet, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
+# Relacionamentos usados em _format_process_response, carregados em lote
+PROCESS_RELATIONS = {
+    "client": selectinload(Process.client),
+    "specialty": selectinload(Process.specialty),
+    "specialties": selectinload(Process.specialties).selectinload(ProcessSpecialty.specialty),
+    "lawyers": selectinload(Process.lawyers).selectinload(ProcessLawyer.lawyer),
+}
+PROCESS_RESPONSE_OPTIONS = tuple(PROCESS_RELATIONS.values())
+
+# Nas projeções (fields=/view=), cliente e advogados carregam só as colunas usadas em _process_row
+PROJECTED_RELATIONS = {
+    **PROCESS_RELATIONS,
+    "client": selectinload(Process.client).load_only(Client.id, Client.name, Client.email),
+    "lawyers": selectinload(Process.lawyers).selectinload(ProcessLawyer.lawyer).load_only(User.id, User.name, User.email),
+}
+
+# Colunas de ProcessResponse; os relacionamentos são montados em _process_row
+PROCESS_ROWS = RowSerializer(ProcessResponse, exclude=PROCESS_RELATIONS)
+
+def process_load_options(fields: Optional[AbstractSet[str]] = None) -> tuple:
+    """Colunas e relacionamentos a carregar para os campos pedidos (``None`` = resposta completa)"""
+    if fields is None:
+        return PROCESS_RESPONSE_OPTIONS
+    relations = [loader for name, loader in PROJECTED_RELATIONS.items() if name in fields]
+    return (column_loader(Process, fields), *relations)
+
+# Andamentos: linhas do banco direto para JSON
+TIMELINE_ROWS = RowSerializer(ProcessTimelineResponse)
+
 class ProcessService:
-    def __init__(self, db: Session, tenant_id: str):
-        self.db = db
+    def __init__(self, db: AnySession, tenant_id: str):
+        self.db = SessionAdapter.wrap(db)
         self.tenant_id = tenant_id
     
     async def create_process(self, process_data: dict, lawyers_data: List[Dict[str, Any]], created_by: str) -> ProcessResponse:
@@ -36,7 +69,7 @@ class ProcessService:
         )
         
         self.db.add(process)
-        self.db.flush()  # Para obter o ID do processo
+        await self.db.flush()  # Para obter o ID do processo
         
         # Adiciona as especialidades ao processo
         specialty_ids = process_data.get("specialty_ids", [])
@@ -65,32 +98,77 @@ class ProcessService:
             )
             self.db.add(process_lawyer)
         
-        self.db.commit()
-        self.db.refresh(process)
+        await self.db.commit()
         
-        return await self._format_process_response(process)
+        return self._format_process_response(await self._load_process(process.id))
     
     async def get_process(self, process_id: str) -> Optional[ProcessResponse]:
         """Obtém um processo específico"""
-        process = self.db.query(Process).filter(
-            Process.id == process_id,
-            Process.tenant_id == self.tenant_id
-        ).first()
+        process = await self._load_process(process_id)
         
         if not process:
             return None
         
-        return await self._format_process_response(process)
+        return self._format_process_response(process)
+    
+    async def get_process_version(self, process_id: str) -> Optional[Tuple[str, datetime]]:
+        """
+        ETag e Last-Modified de ``get_process`` em uma consulta, sem carregar os relacionamentos.
+        
+        Cobre tudo o que entra na resposta: o processo, o cliente, a especialidade
+        principal, os advogados (vínculo e usuário) e as especialidades vinculadas.
+        """
+        main_specialty = aliased(Specialty)
+        lawyers = select(ProcessLawyer).join(User, User.id == ProcessLawyer.lawyer_id).where(ProcessLawyer.process_id == Process.id)
+        specialties = select(ProcessSpecialty).join(Specialty, Specialty.id == ProcessSpecialty.specialty_id).where(ProcessSpecialty.process_id == Process.id)
+        
+        row = (await self.db.execute(
+            select(
+                Process.id,
+                row_stamp(Process).label("process"),
+                select(row_stamp(Client)).where(Client.id == Process.client_id).scalar_subquery().label("client"),
+                select(row_stamp(main_specialty)).where(main_specialty.id == Process.specialty_id).scalar_subquery().label("specialty"),
+                lawyers.with_only_columns(
+                    version_digest(ProcessLawyer.id, row_stamp(ProcessLawyer), row_stamp(User), order_by=ProcessLawyer.id)
+                ).scalar_subquery().label("lawyers"),
+                lawyers.with_only_columns(
+                    func.max(func.greatest(row_stamp(ProcessLawyer), row_stamp(User)))
+                ).scalar_subquery().label("lawyers_modified"),
+                specialties.with_only_columns(
+                    version_digest(ProcessSpecialty.id, row_stamp(Specialty), order_by=ProcessSpecialty.id)
+                ).scalar_subquery().label("specialties"),
+                specialties.with_only_columns(
+                    func.max(func.greatest(ProcessSpecialty.created_at, row_stamp(Specialty)))
+                ).scalar_subquery().label("specialties_modified"),
+            ).where(
+                Process.id == process_id,
+                Process.tenant_id == self.tenant_id
+            )
+        )).one_or_none()
+        
+        if not row:
+            return None
+        
+        stamps = [row.process, row.client, row.specialty, row.lawyers_modified, row.specialties_modified]
+        last_modified = max(stamp for stamp in stamps if stamp is not None)
+        etag = version_etag(row.id, row.process, row.client, row.specialty, row.lawyers, row.specialties)
+        return etag, last_modified
     
     async def list_processes(self, skip: int = 0, limit: int = 100, search: str = None, 
                            status: str = None, specialty_id: str = None, 
-                           priority: str = None, client_id: str = None) -> List[ProcessResponse]:
-        """Lista processos com filtros"""
-        query = self.db.query(Process).filter(Process.tenant_id == self.tenant_id)
+                           priority: str = None, client_id: str = None, as_rows: bool = False,
+                           fields: Optional[AbstractSet[str]] = None) -> List[ProcessResponse]:
+        """
+        Lista processos com filtros.
+        
+        ``as_rows``: dicts nativos para serialização direta, restritos a ``fields``
+        (só as colunas e relacionamentos pedidos são carregados).
+        """
+        query = select(Process).where(Process.tenant_id == self.tenant_id)
         
         # Aplicar filtros
         if search:
-            query = query.filter(
+            query = query.where(
                 or_(
                     Process.subject.ilike(f"%{search}%"),
                     Process.cnj_number.ilike(f"%{search}%"),
@@ -99,27 +177,26 @@ class ProcessService:
             )
         
         if status:
-            query = query.filter(Process.status == status)
+            query = query.where(Process.status == status)
         
         if specialty_id:
-            query = query.filter(Process.specialty_id == specialty_id)
+            query = query.where(Process.specialty_id == specialty_id)
         
         if priority:
-            query = query.filter(Process.priority == priority)
+            query = query.where(Process.priority == priority)
         
         if client_id:
-            query = query.filter(Process.client_id == client_id)
+            query = query.where(Process.client_id == client_id)
         
-        processes = query.offset(skip).limit(limit).all()
+        processes = await self.db.scalars(query.options(*process_load_options(fields)).offset(skip).limit(limit))
         
-        return [await self._format_process_response(process) for process in processes]
+        if as_rows:
+            return [self._process_row(process, fields) for process in processes]
+        return [self._format_process_response(process) for process in processes]
     
     async def update_process(self, process_id: str, process_data: ProcessUpdate) -> Optional[ProcessResponse]:
         """Atualiza um processo"""
-        process = self.db.query(Process).filter(
-            Process.id == process_id,
-            Process.tenant_id == self.tenant_id
-        ).first()
+        process = await self._get_owned_process(process_id)
         
         if not process:
             return None
@@ -130,46 +207,55 @@ class ProcessService:
             setattr(process, field, value)
         
         process.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(process)
+        await self.db.commit()
         
-        return await self._format_process_response(process)
+        return self._format_process_response(await self._load_process(process_id))
     
     async def delete_process(self, process_id: str) -> bool:
         """Deleta um processo (soft delete)"""
-        process = self.db.query(Process).filter(
-            Process.id == process_id,
-            Process.tenant_id == self.tenant_id
-        ).first()
+        process = await self._get_owned_process(process_id)
         
         if not process:
             return False
         
         process.status = "closed"
         process.updated_at = datetime.utcnow()
-        self.db.commit()
+        await self.db.commit()
         
         return True
     
-    async def get_user_processes(self, user_id: str, role: str = "lawyer") -> List[ProcessResponse]:
-        """Obtém processos de um usuário específico"""
-        query = self.db.query(Process).join(ProcessLawyer).filter(
+    async def get_user_processes(self, user_id: str, role: str = "lawyer", as_rows: bool = False,
+                                 fields: Optional[AbstractSet[str]] = None) -> List[ProcessResponse]:
+        """Obtém processos de um usuário específico (``as_rows``/``fields``: como em list_processes)"""
+        query = select(Process).join(ProcessLawyer).where(
             Process.tenant_id == self.tenant_id,
             ProcessLawyer.lawyer_id == user_id
         )
         
-        processes = query.all()
-        return [await self._format_process_response(process) for process in processes]
+        processes = await self.db.scalars(query.options(*process_load_options(fields)))
+        if as_rows:
+            return [self._process_row(process, fields) for process in processes]
+        return [self._format_process_response(process) for process in processes]
+    
+    async def is_process_lawyer(self, process_id: str, user_id: str) -> bool:
+        """Verifica se o usuário está vinculado ao processo (EXISTS, sem carregar os processos do usuário)"""
+        return bool(await self.db.scalar(select(
+            select(ProcessLawyer.id).join(Process, Process.id == ProcessLawyer.process_id).where(
+                ProcessLawyer.process_id == process_id,
+                ProcessLawyer.lawyer_id == user_id,
+                Process.tenant_id == self.tenant_id
+            ).exists()
+        )))
     
     async def get_process_timeline(self, process_id: str) -> List[dict]:
         """Obtém timeline de andamentos do processo"""
         from core.models.process import ProcessTimeline
         
-        timeline_entries = self.db.query(ProcessTimeline).filter(
+        timeline_entries = await self.db.scalars(select(ProcessTimeline).where(
             ProcessTimeline.process_id == process_id
-        ).order_by(ProcessTimeline.date.desc()).all()
+        ).order_by(ProcessTimeline.date.desc()))
         
-        return [entry.to_dict() for entry in timeline_entries]
+        return TIMELINE_ROWS.rows(timeline_entries)
     
     async def add_timeline_entry(self, process_id: str, entry_data: dict, user_id: str) -> dict:
         """Adiciona novo andamento ao processo"""
@@ -188,20 +274,20 @@ class ProcessService:
         )
         
         self.db.add(timeline_entry)
-        self.db.commit()
-        self.db.refresh(timeline_entry)
+        await self.db.commit()
+        await self.db.refresh(timeline_entry)
         
-        return timeline_entry.to_dict()
+        return TIMELINE_ROWS.row(timeline_entry)
     
     async def update_timeline_entry(self, process_id: str, entry_id: str, entry_data: dict, user_id: str) -> Optional[dict]:
         """Atualiza andamento do processo"""
         from core.models.process import ProcessTimeline
         from datetime import datetime
         
-        timeline_entry = self.db.query(ProcessTimeline).filter(
+        timeline_entry = await self.db.scalar(select(ProcessTimeline).where(
             ProcessTimeline.id == entry_id,
             ProcessTimeline.process_id == process_id
-        ).first()
+        ))
         
         if not timeline_entry:
             return None
@@ -218,25 +304,25 @@ class ProcessService:
         if "documents" in entry_data:
             timeline_entry.documents = entry_data["documents"]
         
-        self.db.commit()
-        self.db.refresh(timeline_entry)
+        await self.db.commit()
+        await self.db.refresh(timeline_entry)
         
-        return timeline_entry.to_dict()
+        return TIMELINE_ROWS.row(timeline_entry)
     
     async def delete_timeline_entry(self, process_id: str, entry_id: str) -> bool:
         """Remove andamento do processo"""
         from core.models.process import ProcessTimeline
         
-        timeline_entry = self.db.query(ProcessTimeline).filter(
+        timeline_entry = await self.db.scalar(select(ProcessTimeline).where(
             ProcessTimeline.id == entry_id,
             ProcessTimeline.process_id == process_id
-        ).first()
+        ))
         
         if not timeline_entry:
             return False
         
-        self.db.delete(timeline_entry)
-        self.db.commit()
+        await self.db.delete(timeline_entry)
+        await self.db.commit()
         
         return True
 
@@ -245,30 +331,39 @@ class ProcessService:
         from core.models.process import ProcessDeadline
         from datetime import datetime
         
-        deadlines = self.db.query(ProcessDeadline).filter(
+        deadlines = await self.db.scalars(select(ProcessDeadline).where(
             ProcessDeadline.process_id == process_id
-        ).order_by(ProcessDeadline.due_date.asc()).all()
+        ).order_by(ProcessDeadline.due_date.asc()))
         
-        # Calcular status baseado na data
+        # A transição para "overdue" é persistida pelo agendador de prazos;
+        # aqui apenas refletimos o status efetivo sem alterar a sessão
         now = datetime.now()
+        result = []
         for deadline in deadlines:
-            if deadline.status == "pending":
-                if deadline.due_date < now:
-                    deadline.status = "overdue"
+            deadline_dict = deadline.to_dict()
+            if deadline.status == "pending" and deadline.due_date < now:
+                deadline_dict["status"] = "overdue"
+            result.append(deadline_dict)
         
-        return [deadline.to_dict() for deadline in deadlines]
+        return result
     
     async def add_deadline(self, process_id: str, deadline_data: dict, user_id: str) -> dict:
         """Adiciona novo prazo ao processo"""
         from core.models.process import ProcessDeadline
         from datetime import datetime
         
+        if deadline_data.get("business_days") is not None:
+            # Prazo processual em dias úteis, conforme o calendário do tribunal
+            due_date = await self.calculate_due_date(process_id, deadline_data)
+        else:
+            due_date = datetime.fromisoformat(deadline_data.get("due_date", datetime.now().isoformat()))
+        
         deadline = ProcessDeadline(
             id=uuid.uuid4(),
             process_id=process_id,
             title=deadline_data.get("title", ""),
             description=deadline_data.get("description"),
-            due_date=datetime.fromisoformat(deadline_data.get("due_date", datetime.now().isoformat())),
+            due_date=due_date,
             deadline_type=deadline_data.get("deadline_type", "internal"),
             notify_days_before=deadline_data.get("notify_days_before", 3),
             is_critical=deadline_data.get("is_critical", False),
@@ -277,20 +372,44 @@ class ProcessService:
         )
         
         self.db.add(deadline)
-        self.db.commit()
-        self.db.refresh(deadline)
+        await deadline_scheduler.announce_deadline_change(self.db, deadline.id)
+        await self.db.commit()
+        await self.db.refresh(deadline)
+        
+        deadline_scheduler.track_deadline(deadline, self.tenant_id)
         
         return deadline.to_dict()
     
+    async def calculate_due_date(self, process_id: str, deadline_data: dict) -> datetime:
+        """Calcula o vencimento de um prazo em dias úteis (fim do dia do vencimento)"""
+        from core.services.legal_calendar import legal_calendar
+        
+        tribunal = deadline_data.get("tribunal")
+        cnj_number = None
+        if not tribunal:
+            cnj_number = await self.db.scalar(select(Process.cnj_number).where(
+                Process.id == process_id,
+                Process.tenant_id == self.tenant_id
+            ))
+        
+        due = legal_calendar.compute_due_dates([{
+            "start_date": deadline_data.get("start_date"),
+            "business_days": deadline_data["business_days"],
+            "tribunal": tribunal,
+            "cnj_number": cnj_number
+        }])[0]
+        
+        return datetime.combine(due, datetime.max.time()).replace(microsecond=0)
+    
     async def complete_deadline(self, process_id: str, deadline_id: str, user_id: str) -> bool:
         """Marca prazo como concluído"""
         from core.models.process import ProcessDeadline
         from datetime import datetime
         
-        deadline = self.db.query(ProcessDeadline).filter(
+        deadline = await self.db.scalar(select(ProcessDeadline).where(
             ProcessDeadline.id == deadline_id,
             ProcessDeadline.process_id == process_id
-        ).first()
+        ))
         
         if not deadline:
             return False
@@ -299,7 +418,9 @@ class ProcessService:
         deadline.completed_at = datetime.now()
         deadline.completed_by = user_id
         
-        self.db.commit()
+        await deadline_scheduler.announce_deadline_change(self.db, deadline_id)
+        await self.db.commit()
+        deadline_scheduler.untrack_deadline(deadline_id)
         
         return True
     
@@ -307,16 +428,18 @@ class ProcessService:
         """Remove prazo do processo"""
         from core.models.process import ProcessDeadline
         
-        deadline = self.db.query(ProcessDeadline).filter(
+        deadline = await self.db.scalar(select(ProcessDeadline).where(
             ProcessDeadline.id == deadline_id,
             ProcessDeadline.process_id == process_id
-        ).first()
+        ))
         
         if not deadline:
             return False
         
-        self.db.delete(deadline)
-        self.db.commit()
+        await self.db.delete(deadline)
+        await deadline_scheduler.announce_deadline_change(self.db, deadline_id)
+        await self.db.commit()
+        deadline_scheduler.untrack_deadline(deadline_id)
         
         return True
 
@@ -324,9 +447,9 @@ class ProcessService:
         """Obtém documentos do processo"""
         from core.models.document import Document
         
-        documents = self.db.query(Document).filter(
+        documents = await self.db.scalars(select(Document).where(
             Document.process_id == process_id
-        ).order_by(Document.created_at.desc()).all()
+        ).order_by(Document.created_at.desc()))
         
         return [doc.to_dict() for doc in documents]
     
@@ -364,8 +487,8 @@ class ProcessService:
         )
         
         self.db.add(document)
-        self.db.commit()
-        self.db.refresh(document)
+        await self.db.commit()
+        await self.db.refresh(document)
         
         return document.to_dict()
     
@@ -374,10 +497,10 @@ class ProcessService:
         from core.models.document import Document
         import os
         
-        document = self.db.query(Document).filter(
+        document = await self.db.scalar(select(Document).where(
             Document.id == document_id,
             Document.process_id == process_id
-        ).first()
+        ))
         
         if not document:
             return False
@@ -386,8 +509,8 @@ class ProcessService:
         if os.path.exists(document.file_path):
             os.remove(document.file_path)
         
-        self.db.delete(document)
-        self.db.commit()
+        await self.db.delete(document)
+        await self.db.commit()
         
         return True
 
@@ -395,9 +518,9 @@ class ProcessService:
         """Obtém anotações do processo"""
         from core.models.process import ProcessNote
         
-        notes = self.db.query(ProcessNote).filter(
+        notes = await self.db.scalars(select(ProcessNote).where(
             ProcessNote.process_id == process_id
-        ).order_by(ProcessNote.created_at.desc()).all()
+        ).order_by(ProcessNote.created_at.desc()))
         
         return [note.to_dict() for note in notes]
     
@@ -414,8 +537,8 @@ class ProcessService:
         )
         
         self.db.add(note)
-        self.db.commit()
-        self.db.refresh(note)
+        await self.db.commit()
+        await self.db.refresh(note)
         
         return note.to_dict()
     
@@ -423,96 +546,99 @@ class ProcessService:
         """Remove anotação do processo"""
         from core.models.process import ProcessNote
         
-        note = self.db.query(ProcessNote).filter(
+        note = await self.db.scalar(select(ProcessNote).where(
             ProcessNote.id == note_id,
             ProcessNote.process_id == process_id
-        ).first()
+        ))
         
         if not note:
             return False
         
-        self.db.delete(note)
-        self.db.commit()
+        await self.db.delete(note)
+        await self.db.commit()
         
         return True
 
-    async def _format_process_response(self, process: Process) -> ProcessResponse:
-        """Formata a resposta do processo com relacionamentos"""
-        # Busca o cliente
-        client = self.db.query(Client).filter(Client.id == process.client_id).first()
-        client_data = {
-            "id": client.id,
-            "name": client.name,
-            "email": client.email
-        } if client else None
-        
-        # Busca a especialidade (mantido para compatibilidade)
-        specialty = None
-        if process.specialty_id:
-            specialty = self.db.query(Specialty).filter(Specialty.id == process.specialty_id).first()
-        specialty_data = {
-            "id": specialty.id,
-            "name": specialty.name,
-            "description": specialty.description
-        } if specialty else None
-        
-        # Busca as especialidades (novo relacionamento)
-        process_specialties = self.db.query(ProcessSpecialty).filter(ProcessSpecialty.process_id == process.id).all()
-        specialties_data = []
-        for process_specialty in process_specialties:
-            specialty_obj = self.db.query(Specialty).filter(Specialty.id == process_specialty.specialty_id).first()
-            if specialty_obj:
-                specialties_data.append({
-                    "id": str(specialty_obj.id),
-                    "name": specialty_obj.name,
-                    "description": specialty_obj.description,
-                    "code": specialty_obj.code
-                })
-        
-        # Busca os advogados
-        lawyers = self.db.query(ProcessLawyer).filter(ProcessLawyer.process_id == process.id).all()
-        lawyers_data = []
-        for lawyer in lawyers:
-            user = self.db.query(User).filter(User.id == lawyer.lawyer_id).first()
-            lawyers_data.append({
-                "id": str(lawyer.id),
-                "process_id": str(lawyer.process_id),
-                "lawyer_id": str(lawyer.lawyer_id),
-                "role": lawyer.role,
-                "is_primary": lawyer.is_primary,
-                "can_sign_documents": lawyer.can_sign_documents,
-                "can_manage_process": lawyer.can_manage_process,
-                "can_view_financial": lawyer.can_view_financial,
-                "created_at": lawyer.created_at.isoformat() if lawyer.created_at else None,
-                "updated_at": lawyer.updated_at.isoformat() if lawyer.updated_at else None,
-                "assigned_by": str(lawyer.assigned_by) if lawyer.assigned_by else None,
-                "lawyer": {
-                    "id": str(user.id),
-                    "name": user.name,
-                    "email": user.email
-                } if user else None
-            })
-        
-        return ProcessResponse(
-            id=str(process.id),
-            tenant_id=str(process.tenant_id),
-            subject=process.subject,
-            cnj_number=process.cnj_number,
-            court=process.court,
-            jurisdiction=process.jurisdiction,
-            client_id=str(process.client_id),
-            specialty_id=str(process.specialty_id) if process.specialty_id else None,
-            priority=process.priority,
-            estimated_value=process.estimated_value,
-            notes=process.notes,
-            is_confidential=process.is_confidential,
-            requires_attention=process.requires_attention,
-            status=process.status,
-            created_at=process.created_at,
-            updated_at=process.updated_at,
-            created_by=str(process.created_by) if process.created_by else None,
-            client=client_data,
-            specialty=specialty_data,
-            specialties=specialties_data,
-            lawyers=lawyers_data
+    async def _get_owned_process(self, process_id: str) -> Optional[Process]:
+        return await self.db.scalar(select(Process).where(
+            Process.id == process_id,
+            Process.tenant_id == self.tenant_id
+        ))
+    
+    async def _load_process(self, process_id: str) -> Optional[Process]:
+        """Carrega o processo com os relacionamentos da resposta"""
+        return await self.db.scalar(
+            select(Process).where(
+                Process.id == process_id,
+                Process.tenant_id == self.tenant_id
+            ).options(*PROCESS_RESPONSE_OPTIONS).execution_options(populate_existing=True)
         )
+    
+    def _format_process_response(self, process: Process) -> ProcessResponse:
+        """Formata a resposta do processo (relacionamentos carregados via PROCESS_RESPONSE_OPTIONS)"""
+        return ProcessResponse.model_validate_json(dumps(self._process_row(process)))
+    
+    def _process_row(self, process: Process, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+        """
+        Campos de ProcessResponse com os valores nativos (UUID/datetime serializados pelo orjson).
+        
+        Com ``fields``, só os relacionamentos pedidos são montados (os demais nem foram carregados).
+        """
+        row = PROCESS_ROWS.only(fields).row(process)
+        wanted = PROCESS_RELATIONS.keys() if fields is None else PROCESS_RELATIONS.keys() & fields
+        
+        if "client" in wanted:
+            client = process.client
+            row["client"] = {
+                "id": client.id,
+                "name": client.name,
+                "email": client.email
+            } if client else None
+        
+        # Especialidade principal (mantido para compatibilidade)
+        if "specialty" in wanted:
+            specialty = process.specialty
+            row["specialty"] = {
+                "id": specialty.id,
+                "name": specialty.name,
+                "description": specialty.description
+            } if specialty else None
+        
+        # Especialidades (novo relacionamento)
+        if "specialties" in wanted:
+            row["specialties"] = [
+                {
+                    "id": process_specialty.specialty.id,
+                    "name": process_specialty.specialty.name,
+                    "description": process_specialty.specialty.description,
+                    "code": process_specialty.specialty.code
+                }
+                for process_specialty in process.specialties
+                if process_specialty.specialty
+            ]
+        
+        # Advogados
+        if "lawyers" in wanted:
+            row["lawyers"] = [
+                {
+                    "id": lawyer.id,
+                    "process_id": lawyer.process_id,
+                    "lawyer_id": lawyer.lawyer_id,
+                    "role": lawyer.role,
+                    "is_primary": lawyer.is_primary,
+                    "can_sign_documents": lawyer.can_sign_documents,
+                    "can_manage_process": lawyer.can_manage_process,
+                    "can_view_financial": lawyer.can_view_financial,
+                    "created_at": lawyer.created_at,
+                    "updated_at": lawyer.updated_at,
+                    "assigned_by": lawyer.assigned_by,
+                    "lawyer": {
+                        "id": lawyer.lawyer.id,
+                        "name": lawyer.lawyer.name,
+                        "email": lawyer.lawyer.email
+                    } if lawyer.lawyer else None
+                }
+                for lawyer in process.lawyers
+            ]
+        
+        return row
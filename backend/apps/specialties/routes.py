@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from core.database import get_db
+from core.database import get_async_db
+from core.replicas import get_async_read_db
 from core.auth.multi_tenant_auth import MultiTenantAuth
 from core.auth.permission_system import require_permission
+from core.cache import REFERENCE_CACHE_CONTROL, cache_headers, is_not_modified, not_modified, version_etag
 from apps.specialties.schemas import (
     SpecialtyCreate, SpecialtyUpdate, SpecialtyResponse, 
     SpecialtyListResponse, SpecialtyStats
@@ -18,7 +20,7 @@ auth = MultiTenantAuth()
 @router.post("/", response_model=SpecialtyResponse)
 async def create_specialty(
     specialty_data: SpecialtyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("specialties", "create"))
 ):
     """Cria uma nova especialidade para a empresa"""
@@ -41,13 +43,15 @@ async def create_specialty(
 
 @router.get("/", response_model=List[SpecialtyResponse])
 async def list_specialties(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     requires_oab: Optional[bool] = Query(None),
     order_by: str = Query("display_order", regex="^(display_order|name|created_at)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("specialties", "read"))
 ):
     """Lista especialidades da empresa (isolado automaticamente)"""
@@ -55,6 +59,19 @@ async def list_specialties(
     service = SpecialtyService(db)
     
     try:
+        # Validadores antes de carregar a lista: 304 sem consultar nem serializar as linhas
+        etag, last_modified = await service.get_list_version(
+            str(tenant_id),
+            skip=skip,
+            limit=limit,
+            search=search,
+            is_active=is_active,
+            requires_oab=requires_oab,
+            order_by=order_by
+        )
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, REFERENCE_CACHE_CONTROL, last_modified)
+        
         specialties = await service.list_specialties(
             str(tenant_id),
             skip=skip,
@@ -65,6 +82,7 @@ async def list_specialties(
             order_by=order_by
         )
         
+        cache_headers(response, etag, last_modified, REFERENCE_CACHE_CONTROL)
         return [specialty.to_dict() for specialty in specialties]
     except Exception as e:
         raise HTTPException(
@@ -75,7 +93,9 @@ async def list_specialties(
 @router.get("/{specialty_id}", response_model=SpecialtyResponse)
 async def get_specialty(
     specialty_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("specialties", "read"))
 ):
     """Obtém uma especialidade específica"""
@@ -86,13 +106,19 @@ async def get_specialty(
     if not specialty:
         raise HTTPException(status_code=404, detail="Especialidade não encontrada")
     
+    last_modified = specialty.updated_at or specialty.created_at
+    etag = version_etag(specialty.id, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, REFERENCE_CACHE_CONTROL, last_modified)
+    
+    cache_headers(response, etag, last_modified, REFERENCE_CACHE_CONTROL)
     return specialty.to_dict()
 
 @router.put("/{specialty_id}", response_model=SpecialtyResponse)
 async def update_specialty(
     specialty_id: str,
     specialty_data: SpecialtyUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("specialties", "update"))
 ):
     """Atualiza uma especialidade"""
@@ -119,7 +145,7 @@ async def update_specialty(
 @router.delete("/{specialty_id}")
 async def delete_specialty(
     specialty_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("specialties", "delete"))
 ):
     """Remove uma especialidade (soft delete)"""
@@ -146,7 +172,7 @@ async def delete_specialty(
 @router.post("/{specialty_id}/activate")
 async def activate_specialty(
     specialty_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("specialties", "update"))
 ):
     """Reativa uma especialidade"""
@@ -161,7 +187,7 @@ async def activate_specialty(
 
 @router.get("/stats/summary", response_model=SpecialtyStats)
 async def get_specialty_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("specialties", "read"))
 ):
     """Retorna estatísticas das especialidades"""
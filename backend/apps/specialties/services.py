@@ -1,22 +1,24 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
-from typing import List, Optional
+from sqlalchemy import and_, or_, desc, asc, func, select
+from datetime import datetime
+from typing import List, Optional, Tuple
+from core.cache import row_stamp, version_digest, version_etag
+from core.database import AnySession, SessionAdapter
 from core.models.specialty import Specialty
 from apps.specialties.schemas import SpecialtyCreate, SpecialtyUpdate
 
 class SpecialtyService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: AnySession):
+        self.db = SessionAdapter.wrap(db)
     
     async def create_specialty(self, specialty_data: SpecialtyCreate, tenant_id: str) -> Specialty:
         """Cria uma nova especialidade para o tenant"""
         # Verificar se já existe uma especialidade com o mesmo nome no tenant
-        existing = self.db.query(Specialty).filter(
+        existing = await self.db.scalar(select(Specialty.id).where(
             and_(
                 Specialty.tenant_id == tenant_id,
                 Specialty.name.ilike(specialty_data.name)
             )
-        ).first()
+        ).limit(1))
         
         if existing:
             raise ValueError(f"Já existe uma especialidade com o nome '{specialty_data.name}'")
@@ -35,19 +37,19 @@ class SpecialtyService:
         )
         
         self.db.add(specialty)
-        self.db.commit()
-        self.db.refresh(specialty)
+        await self.db.commit()
+        await self.db.refresh(specialty)
         
         return specialty
     
     async def get_specialty(self, specialty_id: str, tenant_id: str) -> Optional[Specialty]:
         """Busca uma especialidade específica do tenant"""
-        return self.db.query(Specialty).filter(
+        return await self.db.scalar(select(Specialty).where(
             and_(
                 Specialty.id == specialty_id,
                 Specialty.tenant_id == tenant_id
             )
-        ).first()
+        ))
     
     async def list_specialties(
         self,
@@ -60,11 +62,11 @@ class SpecialtyService:
         order_by: str = "display_order"
     ) -> List[Specialty]:
         """Lista especialidades do tenant com filtros"""
-        query = self.db.query(Specialty).filter(Specialty.tenant_id == tenant_id)
+        query = select(Specialty).where(Specialty.tenant_id == tenant_id)
         
         # Aplicar filtros
         if search:
-            query = query.filter(
+            query = query.where(
                 or_(
                     Specialty.name.ilike(f"%{search}%"),
                     Specialty.description.ilike(f"%{search}%"),
@@ -73,10 +75,10 @@ class SpecialtyService:
             )
         
         if is_active is not None:
-            query = query.filter(Specialty.is_active == is_active)
+            query = query.where(Specialty.is_active == is_active)
         
         if requires_oab is not None:
-            query = query.filter(Specialty.requires_oab == requires_oab)
+            query = query.where(Specialty.requires_oab == requires_oab)
         
         # Aplicar ordenação
         if order_by == "name":
@@ -86,7 +88,37 @@ class SpecialtyService:
         else:  # display_order (padrão)
             query = query.order_by(asc(Specialty.display_order))
         
-        return query.offset(skip).limit(limit).all()
+        return list(await self.db.scalars(query.offset(skip).limit(limit)))
+    
+    async def get_list_version(
+        self,
+        tenant_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        requires_oab: Optional[bool] = None,
+        order_by: str = "display_order"
+    ) -> Tuple[str, Optional[datetime]]:
+        """
+        ETag e Last-Modified de uma listagem de especialidades (uma consulta agregada, sem carregar as linhas).
+
+        O ETag inclui os parâmetros da listagem (mesmos de ``list_specialties``):
+        páginas e filtros diferentes nunca compartilham o mesmo validador.
+        """
+        row = (await self.db.execute(
+            select(
+                func.count(Specialty.id).label("total"),
+                func.max(row_stamp(Specialty)).label("last_modified"),
+                version_digest(Specialty.id, row_stamp(Specialty), order_by=Specialty.id).label("digest")
+            ).where(Specialty.tenant_id == tenant_id)
+        )).one()
+        # Parâmetros normalizados como list_specialties os aplica: ilike não diferencia
+        # maiúsculas e ordenações desconhecidas caem em display_order
+        if order_by not in ("name", "created_at"):
+            order_by = "display_order"
+        query = (skip, limit, (search or "").lower(), is_active, requires_oab, order_by)
+        return version_etag(tenant_id, row.total, row.digest, *query), row.last_modified
     
     async def update_specialty(
         self,
@@ -101,13 +133,13 @@ class SpecialtyService:
         
         # Verificar se o novo nome já existe (se estiver sendo alterado)
         if specialty_data.name and specialty_data.name != specialty.name:
-            existing = self.db.query(Specialty).filter(
+            existing = await self.db.scalar(select(Specialty.id).where(
                 and_(
                     Specialty.tenant_id == tenant_id,
                     Specialty.name.ilike(specialty_data.name),
                     Specialty.id != specialty_id
                 )
-            ).first()
+            ).limit(1))
             
             if existing:
                 raise ValueError(f"Já existe uma especialidade com o nome '{specialty_data.name}'")
@@ -117,8 +149,8 @@ class SpecialtyService:
         for field, value in update_data.items():
             setattr(specialty, field, value)
         
-        self.db.commit()
-        self.db.refresh(specialty)
+        await self.db.commit()
+        await self.db.refresh(specialty)
         
         return specialty
     
@@ -138,7 +170,7 @@ class SpecialtyService:
         # Soft delete - marcar como inativo
         specialty.is_active = False
         
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def activate_specialty(self, specialty_id: str, tenant_id: str) -> bool:
@@ -148,36 +180,23 @@ class SpecialtyService:
             return False
         
         specialty.is_active = True
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def get_specialty_stats(self, tenant_id: str) -> dict:
         """Retorna estatísticas das especialidades do tenant"""
-        total = self.db.query(Specialty).filter(Specialty.tenant_id == tenant_id).count()
-        active = self.db.query(Specialty).filter(
-            and_(
-                Specialty.tenant_id == tenant_id,
-                Specialty.is_active == True
-            )
-        ).count()
+        only_active = Specialty.is_active == True  # Requisitos contam apenas as ativas
+        row = (await self.db.execute(
+            select(
+                func.count(Specialty.id).label("total"),
+                func.count(Specialty.id).filter(only_active).label("active"),
+                func.count(Specialty.id).filter(and_(only_active, Specialty.requires_oab == True)).label("with_oab"),
+                func.count(Specialty.id).filter(and_(only_active, Specialty.min_experience_years.isnot(None))).label("with_experience")
+            ).where(Specialty.tenant_id == tenant_id)
+        )).one()
+        total, active, with_oab, with_experience = row.total, row.active, row.with_oab, row.with_experience
         inactive = total - active
         
-        with_oab = self.db.query(Specialty).filter(
-            and_(
-                Specialty.tenant_id == tenant_id,
-                Specialty.requires_oab == True,
-                Specialty.is_active == True  # Apenas ativas
-            )
-        ).count()
-        
-        with_experience = self.db.query(Specialty).filter(
-            and_(
-                Specialty.tenant_id == tenant_id,
-                Specialty.min_experience_years.isnot(None),
-                Specialty.is_active == True  # Apenas ativas
-            )
-        ).count()
-        
         return {
             "total_specialties": total,
             "active_specialties": active,
@@ -0,0 +1,147 @@
+"""
+Camada de analytics do painel do super admin.
+
+Todas as métricas saem de consultas agrupadas, sem laços por tenant ou por dia:
+
+- estatísticas por tenant (usuários, processos, clientes, armazenamento e
+  atividade) vêm da view materializada ``superadmin_tenant_stats``, atualizada
+  pelo agendador a cada ``SUPERADMIN_STATS_REFRESH_MINUTES``;
+- totais gerais saem de uma única consulta com ``COUNT ... FILTER``;
+- séries diárias usam ``generate_series`` com soma acumulada.
+
+As leituras ficam em cache por worker (``SUPERADMIN_STATS_TTL_SECONDS``).
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.cache import TTLCache
+from core.config import settings
+from core.models.metrics import TENANT_STATS_VIEW
+
+logger = logging.getLogger(__name__)
+
+superadmin_stats_cache = TTLCache(ttl_seconds=settings.SUPERADMIN_STATS_TTL_SECONDS)
+
+OVERVIEW_SQL = text("""
+    SELECT t.total_tenants, t.active_tenants, t.suspended_tenants, t.new_tenants_30_days,
+           u.total_users, u.active_users
+    FROM (
+        SELECT count(*) AS total_tenants,
+               count(*) FILTER (WHERE is_active) AS active_tenants,
+               count(*) FILTER (WHERE is_suspended) AS suspended_tenants,
+               count(*) FILTER (WHERE created_at >= LOCALTIMESTAMP - interval '30 days') AS new_tenants_30_days
+        FROM tenants
+    ) t
+    CROSS JOIN (
+        SELECT count(*) AS total_users, count(*) FILTER (WHERE is_active) AS active_users
+        FROM users
+    ) u
+""")
+
+# Novos tenants/usuários por dia e totais acumulados (tenants ativos contam para a receita)
+GROWTH_SQL = text("""
+    WITH days AS (
+        SELECT CAST(day AS date) AS day
+        FROM generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS day
+    ),
+    tenants_per_day AS (
+        SELECT CAST(created_at AS date) AS day,
+               count(*) AS new_tenants,
+               count(*) FILTER (WHERE is_active) AS new_active_tenants
+        FROM tenants
+        WHERE created_at >= :start AND created_at < CAST(:end AS date) + 1
+        GROUP BY 1
+    ),
+    users_per_day AS (
+        SELECT CAST(created_at AS date) AS day, count(*) AS new_users
+        FROM tenant_users
+        WHERE created_at >= :start AND created_at < CAST(:end AS date) + 1
+        GROUP BY 1
+    ),
+    base AS (
+        SELECT count(*) AS tenants, count(*) FILTER (WHERE is_active) AS active_tenants
+        FROM tenants
+        WHERE created_at < :start
+    )
+    SELECT d.day,
+           COALESCE(t.new_tenants, 0) AS new_tenants,
+           COALESCE(u.new_users, 0) AS new_users,
+           CAST(base.tenants + sum(COALESCE(t.new_tenants, 0)) OVER (ORDER BY d.day) AS integer) AS total_tenants,
+           CAST(base.active_tenants + sum(COALESCE(t.new_active_tenants, 0)) OVER (ORDER BY d.day) AS integer) AS active_tenants
+    FROM days d
+    CROSS JOIN base
+    LEFT JOIN tenants_per_day t ON t.day = d.day
+    LEFT JOIN users_per_day u ON u.day = d.day
+    ORDER BY d.day
+""")
+
+
+class SuperAdminAnalytics:
+    """Consultas agrupadas (e em cache) do painel do super admin"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def overview(self) -> Dict[str, int]:
+        """Totais de tenants e usuários (uma consulta)"""
+        return superadmin_stats_cache.get_or_set(
+            ("superadmin", "overview"),
+            lambda: dict(self.db.execute(OVERVIEW_SQL).mappings().one())
+        )
+
+    def tenant_stats(self) -> List[Dict[str, Any]]:
+        """Estatísticas de todos os tenants (lidas da view materializada)"""
+        return superadmin_stats_cache.get_or_set(("superadmin", "tenants"), self._load_tenant_stats)
+
+    def growth(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """Série diária de crescimento entre ``start`` e ``end`` (inclusive)"""
+        return superadmin_stats_cache.get_or_set(
+            ("superadmin", "growth", start.isoformat(), end.isoformat()),
+            lambda: [dict(row) for row in self.db.execute(GROWTH_SQL, {"start": start, "end": end}).mappings()]
+        )
+
+    def _load_tenant_stats(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute(text(f"SELECT * FROM {TENANT_STATS_VIEW} ORDER BY name")).mappings()
+        return [
+            {
+                "tenant_id": str(row["tenant_id"]),
+                "tenant_name": row["name"],
+                "tenant_slug": row["slug"],
+                "plan_type": row["plan_type"],
+                "is_active": row["is_active"],
+                "is_suspended": row["is_suspended"],
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                "users": row["users"],
+                "active_users": row["active_users"],
+                "processes": row["processes"],
+                "active_processes": row["active_processes"],
+                "clients": row["clients"],
+                "documents": row["documents"],
+                "storage_bytes": int(row["storage_bytes"]),
+                "activity_30d": row["activity_30d"],
+                "last_activity_at": row["last_activity_at"].isoformat() if row["last_activity_at"] else None,
+                "refreshed_at": row["refreshed_at"].isoformat()
+            }
+            for row in rows
+        ]
+
+
+def refresh_tenant_stats(db: Session):
+    """Atualiza a view materializada sem bloquear leituras (usada pelo agendador)"""
+    started = datetime.now()
+    db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {TENANT_STATS_VIEW}"))
+    db.commit()
+    superadmin_stats_cache.clear()
+    logger.info(f"Estatísticas do super admin atualizadas em {(datetime.now() - started).total_seconds():.2f}s")
+
+
+def period_days(period: str) -> int:
+    return {"7d": 7, "30d": 30, "90d": 90, "1y": 365}.get(period, 30)
+
+
+def period_start(days: int) -> date:
+    return datetime.utcnow().date() - timedelta(days=days - 1)
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
-from core.database import get_db
+from core.replicas import get_read_db
 from core.auth.superadmin_auth import get_current_superadmin
 from apps.superadmin.dashboard.services import SuperAdminDashboardService
 
@@ -9,7 +9,7 @@ router = APIRouter(prefix="/super-admin/dashboard", tags=["Super Admin Dashboard
 
 @router.get("/overview")
 async def get_saas_overview(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Visão geral do SaaS - métricas principais"""
@@ -19,17 +19,36 @@ async def get_saas_overview(
 @router.get("/tenants/metrics")
 async def get_tenants_metrics(
     period: str = "30d",  # 7d, 30d, 90d, 1y
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Métricas de tenants (empresas)"""
     service = SuperAdminDashboardService(db)
     return await service.get_tenants_metrics(period)
 
+@router.get("/tenants/analytics")
+async def get_tenants_analytics(
+    db: Session = Depends(get_read_db),
+    current_admin: dict = Depends(get_current_superadmin)
+):
+    """Estatísticas por tenant (usuários, processos, armazenamento e atividade)"""
+    service = SuperAdminDashboardService(db)
+    return await service.get_tenants_analytics()
+
+@router.get("/tenants/growth")
+async def get_tenant_growth(
+    days: int = Query(30, ge=1, le=366, description="Dias de histórico"),
+    db: Session = Depends(get_read_db),
+    current_admin: dict = Depends(get_current_superadmin)
+):
+    """Crescimento diário de tenants e usuários"""
+    service = SuperAdminDashboardService(db)
+    return await service.get_tenant_growth_data(days)
+
 @router.get("/revenue/analytics")
 async def get_revenue_analytics(
     period: str = "30d",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Analytics de receita do SaaS"""
@@ -38,16 +57,17 @@ async def get_revenue_analytics(
 
 @router.get("/usage/statistics")
 async def get_usage_statistics(
-    db: Session = Depends(get_db),
+    history_minutes: int = Query(5, ge=0, le=60, description="Minutos de histórico de recursos"),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Estatísticas de uso do sistema"""
     service = SuperAdminDashboardService(db)
-    return await service.get_usage_statistics()
+    return await service.get_usage_statistics(history_minutes)
 
 @router.get("/performance/metrics")
 async def get_performance_metrics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Métricas de performance do sistema"""
@@ -56,7 +76,7 @@ async def get_performance_metrics(
 
 @router.get("/security/alerts")
 async def get_security_alerts(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Alertas de segurança"""
@@ -65,9 +85,9 @@ async def get_security_alerts(
 
 @router.get("/top-tenants")
 async def get_top_tenants(
-    metric: str = "active_users",  # active_users, processes, revenue
+    metric: str = "active_users",  # active_users, processes, revenue, storage, activity
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Top tenants por métrica"""
@@ -76,16 +96,17 @@ async def get_top_tenants(
 
 @router.get("/system/health")
 async def get_system_health(
-    db: Session = Depends(get_db),
+    history_minutes: int = Query(5, ge=0, le=60, description="Minutos de histórico de recursos"),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Status de saúde do sistema"""
     service = SuperAdminDashboardService(db)
-    return await service.get_system_health()
+    return await service.get_system_health(history_minutes)
 
 @router.get("/backup/status")
 async def get_backup_status(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Status dos backups"""
@@ -94,7 +115,7 @@ async def get_backup_status(
 
 @router.get("/compliance/report")
 async def get_compliance_report(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: dict = Depends(get_current_superadmin)
 ):
     """Relatório de conformidade (LGPD, etc.)"""
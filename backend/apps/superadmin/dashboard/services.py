@@ -1,39 +1,29 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from core.models.tenant import Tenant
-from core.models.user import User
-from core.models.tenant_user import TenantUser
+from apps.superadmin.dashboard.analytics import SuperAdminAnalytics, period_days, period_start
+from core.config import settings
+from core.monitoring import HEALTHY, WARNING, resource_sampler, overall_status, service_statuses
 from datetime import datetime, timedelta
+import asyncio
 import random
 
+MONTHLY_PRICE_PER_TENANT = 299.90  # R$ 299,90 por tenant
+
 class SuperAdminDashboardService:
     def __init__(self, db: Session):
         self.db = db
+        self.analytics = SuperAdminAnalytics(db)
     
     async def get_saas_overview(self):
         """Obtém visão geral do SaaS - métricas principais"""
-        # Total de tenants
-        total_tenants = self.db.query(Tenant).count()
-        
-        # Tenants ativos
-        active_tenants = self.db.query(Tenant).filter(Tenant.is_active == True).count()
-        
-        # Tenants suspensos
-        suspended_tenants = self.db.query(Tenant).filter(Tenant.is_suspended == True).count()
-        
-        # Total de usuários
-        total_users = self.db.query(User).count()
-        
-        # Usuários ativos
-        active_users = self.db.query(User).filter(User.is_active == True).count()
-        
-        # Tenants criados nos últimos 30 dias
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        new_tenants = self.db.query(Tenant).filter(Tenant.created_at >= thirty_days_ago).count()
+        overview = self.analytics.overview()
+        active_tenants = overview["active_tenants"]
+        active_users = overview["active_users"]
         
         # Receita mensal (baseada em tenants ativos)
         # TODO: Implementar sistema de pagamentos real
-        revenue_month = active_tenants * 299.90  # R$ 299,90 por tenant
+        revenue_month = active_tenants * MONTHLY_PRICE_PER_TENANT
         
         # Saúde do sistema
         system_health = "healthy" if active_tenants > 0 else "warning"
@@ -42,18 +32,17 @@ class SuperAdminDashboardService:
         # TODO: Implementar sistema de sessões real
         active_sessions = active_users
         
-        # Armazenamento (estimativa baseada em dados reais)
-        # TODO: Implementar sistema de armazenamento real
-        storage_used = total_users * 50 * 1024 * 1024  # 50MB por usuário
+        # Armazenamento (soma dos documentos de todos os tenants)
+        storage_used = sum(tenant["storage_bytes"] for tenant in self.analytics.tenant_stats())
         storage_total = 100 * 1024 * 1024 * 1024 * 1024  # 100 GB
         
         return {
-            "total_tenants": total_tenants,
+            "total_tenants": overview["total_tenants"],
             "active_tenants": active_tenants,
-            "suspended_tenants": suspended_tenants,
-            "total_users": total_users,
+            "suspended_tenants": overview["suspended_tenants"],
+            "total_users": overview["total_users"],
             "active_users": active_users,
-            "new_tenants_30_days": new_tenants,
+            "new_tenants_30_days": overview["new_tenants_30_days"],
             "revenue_month": revenue_month,
             "system_health": system_health,
             "active_sessions": active_sessions,
@@ -64,40 +53,20 @@ class SuperAdminDashboardService:
     async def get_tenants_metrics(self, period: str = "30d"):
         """Métricas de tenants (empresas)"""
         # Calcular período
-        if period == "7d":
-            days = 7
-        elif period == "30d":
-            days = 30
-        elif period == "90d":
-            days = 90
-        elif period == "1y":
-            days = 365
-        else:
-            days = 30
-        
+        days = period_days(period)
         start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Novos tenants no período
-        new_tenants = self.db.query(Tenant).filter(Tenant.created_at >= start_date).count()
-        
-        # Tenants ativados no período
-        activated_tenants = self.db.query(Tenant).filter(
-            Tenant.is_active == True,
-            Tenant.created_at >= start_date
-        ).count()
-        
-        # Tenants suspensos no período
-        suspended_tenants = self.db.query(Tenant).filter(
-            Tenant.is_suspended == True,
-            Tenant.created_at >= start_date
-        ).count()
-        
-        # Crescimento percentual
         previous_period_start = start_date - timedelta(days=days)
-        previous_period_tenants = self.db.query(Tenant).filter(
-            Tenant.created_at >= previous_period_start,
-            Tenant.created_at < start_date
-        ).count()
+        
+        # Todas as contagens do período e do anterior em uma consulta
+        in_period = Tenant.created_at >= start_date
+        row = self.db.query(
+            func.count(Tenant.id).filter(in_period),
+            func.count(Tenant.id).filter(in_period, Tenant.is_active == True),
+            func.count(Tenant.id).filter(in_period, Tenant.is_suspended == True),
+            func.count(Tenant.id).filter(Tenant.created_at >= previous_period_start, Tenant.created_at < start_date),
+            func.count(Tenant.id).filter(Tenant.is_active == True)
+        ).one()
+        new_tenants, activated_tenants, suspended_tenants, previous_period_tenants, total_active = row
         
         growth_percentage = 0
         if previous_period_tenants > 0:
@@ -109,49 +78,29 @@ class SuperAdminDashboardService:
             "activated_tenants": activated_tenants,
             "suspended_tenants": suspended_tenants,
             "growth_percentage": growth_percentage,
-            "total_active": self.db.query(Tenant).filter(Tenant.is_active == True).count()
+            "total_active": total_active
         }
     
     async def get_revenue_analytics(self, period: str = "30d"):
         """Analytics de receita do SaaS"""
         # TODO: Implementar sistema de pagamentos real
-        # Por enquanto, calcula baseado em tenants ativos
-        
-        if period == "30d":
-            days = 30
-        elif period == "90d":
-            days = 90
-        elif period == "1y":
-            days = 365
-        else:
-            days = 30
+        # Por enquanto, estima a receita diária pelos tenants ativos existentes em cada dia
         
-        # Calcular receita baseada em tenants ativos
-        active_tenants = self.db.query(Tenant).filter(Tenant.is_active == True).count()
-        monthly_revenue_per_tenant = 299.90  # R$ 299,90 por tenant
+        days = period_days(period)
+        start = period_start(days)
+        series = self.analytics.growth(start - timedelta(days=days), datetime.utcnow().date())
+        previous, current = series[:days], series[days:]
+        daily_price = MONTHLY_PRICE_PER_TENANT / 30
         
-        # Gerar dados de receita baseados em tenants
-        revenue_data = []
-        total_revenue = 0
-        
-        for i in range(days):
-            date = datetime.utcnow() - timedelta(days=days - i - 1)
-            # Simular variação diária baseada em tenants ativos
-            daily_revenue = active_tenants * (monthly_revenue_per_tenant / 30) * (0.8 + random.uniform(0, 0.4))
-            revenue_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "revenue": round(daily_revenue, 2)
-            })
-            total_revenue += daily_revenue
+        revenue_data = [
+            {"date": day["day"].strftime("%Y-%m-%d"), "revenue": round(day["active_tenants"] * daily_price, 2)}
+            for day in current
+        ]
+        total_revenue = sum(day["revenue"] for day in revenue_data)
         
         # Calcular crescimento baseado em novos tenants
-        start_date = datetime.utcnow() - timedelta(days=days)
-        new_tenants = self.db.query(Tenant).filter(Tenant.created_at >= start_date).count()
-        previous_period_start = start_date - timedelta(days=days)
-        previous_tenants = self.db.query(Tenant).filter(
-            Tenant.created_at >= previous_period_start,
-            Tenant.created_at < start_date
-        ).count()
+        new_tenants = sum(day["new_tenants"] for day in current)
+        previous_tenants = sum(day["new_tenants"] for day in previous)
         
         growth_rate = 0
         if previous_tenants > 0:
@@ -164,35 +113,23 @@ class SuperAdminDashboardService:
             "revenue_data": revenue_data,
             "growth_rate": round(growth_rate, 2),
             "projected_revenue": round(total_revenue * (1 + growth_rate/100), 2),
-            "active_tenants": active_tenants,
+            "active_tenants": self.analytics.overview()["active_tenants"],
             "new_tenants_period": new_tenants
         }
     
-    async def get_usage_statistics(self):
+    async def get_usage_statistics(self, history_minutes: int = 5):
         """Estatísticas de uso do sistema"""
         # Total de usuários por tenant
-        tenant_users = self.db.query(
-            Tenant.id,
-            Tenant.name,
-            func.count(TenantUser.user_id).label('user_count')
-        ).join(TenantUser, Tenant.id == TenantUser.tenant_id, isouter=True)\
-         .group_by(Tenant.id, Tenant.name)\
-         .all()
+        tenant_stats = self.analytics.tenant_stats()
         
         # Média de usuários por tenant
-        total_tenants = self.db.query(Tenant).count()
-        total_users = self.db.query(User).count()
+        overview = self.analytics.overview()
+        total_tenants = overview["total_tenants"]
+        total_users = overview["total_users"]
         avg_users_per_tenant = total_users / total_tenants if total_tenants > 0 else 0
         
-        # Uso de recursos (estimativa baseada em dados reais)
-        # TODO: Implementar monitoramento real de recursos
-        total_tenants = self.db.query(Tenant).count()
-        total_users = self.db.query(User).count()
-        
-        # Estimativa baseada no número de tenants e usuários
-        cpu_usage = min(90, 20 + (total_tenants * 2) + (total_users * 0.5))
-        memory_usage = min(85, 30 + (total_tenants * 3) + (total_users * 1))
-        disk_usage = min(80, 15 + (total_tenants * 2) + (total_users * 0.8))
+        # Uso de recursos medido pelo amostrador deste worker
+        sample = await asyncio.to_thread(resource_sampler.current)
         
         return {
             "total_tenants": total_tenants,
@@ -200,17 +137,29 @@ class SuperAdminDashboardService:
             "avg_users_per_tenant": avg_users_per_tenant,
             "tenant_users": [
                 {
-                    "tenant_id": str(tu.id),
-                    "tenant_name": tu.name,
-                    "user_count": tu.user_count or 0
+                    "tenant_id": tenant["tenant_id"],
+                    "tenant_name": tenant["tenant_name"],
+                    "user_count": tenant["users"]
                 }
-                for tu in tenant_users
+                for tenant in tenant_stats
             ],
             "resource_usage": {
-                "cpu_percentage": cpu_usage,
-                "memory_percentage": memory_usage,
-                "disk_percentage": disk_usage
-            }
+                "cpu_percentage": sample.host_cpu_percent,
+                "memory_percentage": sample.host_memory_percent,
+                "disk_percentage": sample.disk_percent,
+                "process_cpu_percentage": sample.process_cpu_percent,
+                "process_memory_bytes": sample.process_rss_bytes,
+                "open_file_descriptors": sample.open_fds,
+                "event_loop_lag_ms": sample.event_loop_lag_ms,
+                "db_pool": {
+                    "size": sample.db_pool_size,
+                    "checked_out": sample.db_pool_checked_out,
+                    "overflow": sample.db_pool_overflow
+                },
+                "db_ping_ms": sample.db_ping_ms,
+                "sampled_at": sample.timestamp
+            },
+            "history": resource_sampler.history(limit=history_samples(history_minutes))
         }
     
     async def get_performance_metrics(self):
@@ -218,8 +167,9 @@ class SuperAdminDashboardService:
         # TODO: Implementar monitoramento real de performance
         # Por enquanto, estimativa baseada em dados reais
         
-        total_tenants = self.db.query(Tenant).count()
-        total_users = self.db.query(User).count()
+        overview = self.analytics.overview()
+        total_tenants = overview["total_tenants"]
+        total_users = overview["total_users"]
         
         # Estimativa baseada na carga do sistema
         base_response_time = 80
@@ -251,9 +201,10 @@ class SuperAdminDashboardService:
         # Por enquanto, retorna alertas baseados em dados reais
         
         alerts = []
+        overview = self.analytics.overview()
         
         # Verificar tenants suspensos
-        suspended_tenants = self.db.query(Tenant).filter(Tenant.is_suspended == True).count()
+        suspended_tenants = overview["suspended_tenants"]
         if suspended_tenants > 0:
             alerts.append({
                 "id": "suspended-tenants",
@@ -265,7 +216,7 @@ class SuperAdminDashboardService:
             })
         
         # Verificar usuários inativos
-        inactive_users = self.db.query(User).filter(User.is_active == False).count()
+        inactive_users = overview["total_users"] - overview["active_users"]
         if inactive_users > 0:
             alerts.append({
                 "id": "inactive-users",
@@ -283,111 +234,67 @@ class SuperAdminDashboardService:
         }
     
     async def get_top_tenants(self, metric: str = "active_users", limit: int = 10):
-        """Top tenants por métrica"""
-        if metric == "active_users":
-            # Top tenants por número de usuários ativos
-            top_tenants = self.db.query(
-                Tenant.id,
-                Tenant.name,
-                Tenant.slug,
-                func.count(TenantUser.user_id).label('user_count')
-            ).join(TenantUser, Tenant.id == TenantUser.tenant_id, isouter=True)\
-             .group_by(Tenant.id, Tenant.name, Tenant.slug)\
-             .order_by(func.count(TenantUser.user_id).desc())\
-             .limit(limit)\
-             .all()
-            
-            return [
-                {
-                    "tenant_id": str(tt.id),
-                    "tenant_name": tt.name,
-                    "tenant_slug": tt.slug,
-                    "metric_value": tt.user_count or 0,
-                    "metric_name": "Usuários Ativos"
-                }
-                for tt in top_tenants
-            ]
+        """Top tenants por métrica (ordenados a partir das estatísticas agrupadas)"""
+        tenants = self.analytics.tenant_stats()
         
-        elif metric == "revenue":
+        if metric == "revenue":
             # TODO: Implementar sistema real de receita
             # Por enquanto, estimativa baseada em usuários ativos
-            tenants = self.db.query(Tenant).limit(limit).all()
-            result = []
-            
-            for t in tenants:
-                user_count = self.db.query(TenantUser).filter(
-                    TenantUser.tenant_id == t.id,
-                    TenantUser.is_active == True
-                ).count()
-                
-                # Estimativa de receita baseada em usuários
-                estimated_revenue = user_count * 299.90  # R$ 299,90 por usuário
-                
-                result.append({
-                    "tenant_id": str(t.id),
-                    "tenant_name": t.name,
-                    "tenant_slug": t.slug,
-                    "metric_value": round(estimated_revenue, 2),
-                    "metric_name": "Receita Estimada (R$)"
-                })
-            
-            return result
-        
-        else:  # processes
-            # TODO: Implementar contagem real de processos
-            # Por enquanto, estimativa baseada em usuários
-            tenants = self.db.query(Tenant).limit(limit).all()
-            result = []
-            
-            for t in tenants:
-                user_count = self.db.query(TenantUser).filter(
-                    TenantUser.tenant_id == t.id,
-                    TenantUser.is_active == True
-                ).count()
-                
-                # Estimativa de processos baseada em usuários
-                estimated_processes = user_count * 5  # 5 processos por usuário
-                
-                result.append({
-                    "tenant_id": str(t.id),
-                    "tenant_name": t.name,
-                    "tenant_slug": t.slug,
-                    "metric_value": estimated_processes,
-                    "metric_name": "Processos Estimados"
-                })
-            
-            return result
+            metric_name = "Receita Estimada (R$)"
+            value = lambda tenant: round(tenant["active_users"] * MONTHLY_PRICE_PER_TENANT, 2)
+        elif metric == "processes":
+            metric_name = "Processos"
+            value = lambda tenant: tenant["processes"]
+        elif metric == "storage":
+            metric_name = "Armazenamento (bytes)"
+            value = lambda tenant: tenant["storage_bytes"]
+        elif metric == "activity":
+            metric_name = "Atividade (30 dias)"
+            value = lambda tenant: tenant["activity_30d"]
+        else:  # active_users
+            metric_name = "Usuários Ativos"
+            value = lambda tenant: tenant["active_users"]
+        
+        ranked = sorted(tenants, key=value, reverse=True)[:limit]
+        return [
+            {
+                "tenant_id": tenant["tenant_id"],
+                "tenant_name": tenant["tenant_name"],
+                "tenant_slug": tenant["tenant_slug"],
+                "metric_value": value(tenant),
+                "metric_name": metric_name
+            }
+            for tenant in ranked
+        ]
     
-    async def get_system_health(self):
-        """Status de saúde do sistema"""
-        # Verificar saúde do banco de dados
-        try:
-            self.db.execute("SELECT 1")
-            database_status = "healthy"
-        except Exception:
-            database_status = "critical"
-        
-        # TODO: Implementar verificação real de serviços
-        # Por enquanto, verifica apenas o banco de dados
-        services = {
-            "database": database_status,
-            "redis": "unknown",  # TODO: Implementar verificação
-            "elasticsearch": "unknown",  # TODO: Implementar verificação
-            "file_storage": "unknown",  # TODO: Implementar verificação
-            "email_service": "healthy" if random.random() > 0.15 else "warning"
+    async def get_tenants_analytics(self):
+        """Estatísticas de todos os tenants (usuários, processos, armazenamento e atividade)"""
+        tenants = self.analytics.tenant_stats()
+        return {
+            "refreshed_at": tenants[0]["refreshed_at"] if tenants else None,
+            "tenants": tenants
         }
-        
-        overall_health = "healthy"
-        if any(status == "critical" for status in services.values()):
-            overall_health = "critical"
-        elif any(status == "warning" for status in services.values()):
-            overall_health = "warning"
+    
+    async def get_system_health(self, history_minutes: int = 5):
+        """Status de saúde do sistema"""
+        # Banco (latência do ping e pool), event loop e entrega de notificações
+        sample = await asyncio.to_thread(resource_sampler.current)
+        services = service_statuses(sample)
+        services["email_service"] = HEALTHY if settings.DELIVERY_ENABLED else WARNING
         
         return {
-            "overall_status": overall_health,
+            "overall_status": overall_status(services),
             "services": services,
-            "last_check": datetime.utcnow().isoformat(),
-            "uptime_percentage": 99.9  # TODO: Implementar cálculo real de uptime
+            "last_check": sample.timestamp,
+            "uptime_seconds": resource_sampler.uptime_seconds(),
+            "database": {
+                "ping_ms": sample.db_ping_ms,
+                "error": sample.db_error,
+                "pool_size": sample.db_pool_size,
+                "pool_checked_out": sample.db_pool_checked_out,
+                "pool_overflow": sample.db_pool_overflow
+            },
+            "history": resource_sampler.history(limit=history_samples(history_minutes))
         }
     
     async def get_backup_status(self):
@@ -442,33 +349,7 @@ class SuperAdminDashboardService:
     
     async def get_dashboard_stats(self):
         """Obtém estatísticas do dashboard"""
-        # Total de tenants
-        total_tenants = self.db.query(Tenant).count()
-        
-        # Tenants ativos
-        active_tenants = self.db.query(Tenant).filter(Tenant.is_active == True).count()
-        
-        # Tenants suspensos
-        suspended_tenants = self.db.query(Tenant).filter(Tenant.is_suspended == True).count()
-        
-        # Total de usuários
-        total_users = self.db.query(User).count()
-        
-        # Usuários ativos
-        active_users = self.db.query(User).filter(User.is_active == True).count()
-        
-        # Tenants criados nos últimos 30 dias
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        new_tenants = self.db.query(Tenant).filter(Tenant.created_at >= thirty_days_ago).count()
-        
-        return {
-            "total_tenants": total_tenants,
-            "active_tenants": active_tenants,
-            "suspended_tenants": suspended_tenants,
-            "total_users": total_users,
-            "active_users": active_users,
-            "new_tenants_30_days": new_tenants
-        }
+        return dict(self.analytics.overview())
     
     async def get_recent_activities(self, limit: int = 10):
         """Obtém atividades recentes"""
@@ -477,11 +358,16 @@ class SuperAdminDashboardService:
         return []
     
     async def get_tenant_growth_data(self, days: int = 30):
-        """Obtém dados de crescimento de tenants"""
-        # TODO: Implementar dados reais de crescimento
-        # Por enquanto retorna dados vazios
+        """Obtém dados de crescimento de tenants (série diária em uma consulta)"""
+        series = self.analytics.growth(period_start(days), datetime.utcnow().date())
         return {
-            "labels": [],
-            "data": [],
-            "message": "Dados de crescimento não implementados"
+            "labels": [day["day"].strftime("%Y-%m-%d") for day in series],
+            "data": [day["total_tenants"] for day in series],
+            "new_tenants": [day["new_tenants"] for day in series],
+            "new_users": [day["new_users"] for day in series]
         }
+
+
+def history_samples(minutes: int) -> int:
+    """Quantidade de amostras que cobre ``minutes`` minutos de histórico"""
+    return max(int(minutes * 60 / settings.MONITORING_INTERVAL_SECONDS), 0)
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from core.database import get_db
+from core.database import get_async_db
+from core.replicas import get_async_read_db
 from core.auth.multi_tenant_auth import MultiTenantAuth
 from core.auth.permission_system import require_permission
+from core.serialization import ORJSONResponse, RowSerializer, resolve_fields
 from apps.users.schemas import (
     UserCreate, UserUpdate, UserResponse, UserListResponse, 
     TenantUserCreate, TenantUserUpdate, TenantUserResponse,
-    UserPasswordUpdate, UserFilters
+    UserPasswordUpdate, UserFilters, USER_SUMMARY_FIELDS
 )
 from apps.users.services import UserService
 from apps.users.schemas import UserRole
@@ -17,10 +19,13 @@ router = APIRouter(prefix="/users", tags=["Usuários"])
 # Instância do sistema de autenticação
 auth = MultiTenantAuth()
 
+# Listagem: linhas do banco direto para JSON (formato de UserResponse, com papel no tenant)
+USER_ROWS = RowSerializer(UserResponse)
+
 @router.post("/", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "create"))
 ):
     """Cria um novo usuário (isolado por empresa)"""
@@ -50,13 +55,20 @@ async def list_users(
     department: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     has_oab: Optional[bool] = Query(None),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula (ex.: id,name,role)"),
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: apenas os campos da tabela"),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("users", "read"))
 ):
     """Lista usuários da empresa (isolado automaticamente)"""
     tenant_id = current_user_data["tenant"].id
     service = UserService(db)
     
+    try:
+        selected = resolve_fields(UserResponse, fields, view, USER_SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
         users = await service.list_users(
             str(tenant_id),
@@ -66,7 +78,8 @@ async def list_users(
             role=role,
             department=department,
             is_active=is_active,
-            has_oab=has_oab
+            has_oab=has_oab,
+            fields=selected
         )
         
         # Calcular metadados
@@ -74,13 +87,13 @@ async def list_users(
         total_pages = (total + limit - 1) // limit
         current_page = (skip // limit) + 1
         
-        return UserListResponse(
-            users=[user.to_dict() for user in users],
-            total=total,
-            page=current_page,
-            per_page=limit,
-            total_pages=total_pages
-        )
+        return ORJSONResponse({
+            "users": USER_ROWS.only(selected).rows(users),
+            "total": total,
+            "page": current_page,
+            "per_page": limit,
+            "total_pages": total_pages
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -90,7 +103,7 @@ async def list_users(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("users", "read"))
 ):
     """Obtém usuário específico (isolado por empresa)"""
@@ -107,7 +120,7 @@ async def get_user(
 async def update_user(
     user_id: str,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "update"))
 ):
     """Atualiza usuário (isolado por empresa)"""
@@ -135,7 +148,7 @@ async def update_user(
 async def update_user_role(
     user_id: str,
     role: UserRole,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "manage"))
 ):
     """Atualiza role do usuário"""
@@ -157,7 +170,7 @@ async def update_user_role(
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "delete"))
 ):
     """Remove usuário (soft delete, isolado por empresa)"""
@@ -173,7 +186,7 @@ async def delete_user(
 @router.post("/{user_id}/activate")
 async def activate_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "update"))
 ):
     """Reativa um usuário"""
@@ -190,7 +203,7 @@ async def activate_user(
 async def change_password(
     user_id: str,
     password_data: UserPasswordUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Altera senha do usuário"""
@@ -229,7 +242,7 @@ async def change_password(
 
 @router.get("/stats/summary")
 async def get_user_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("users", "read"))
 ):
     """Obtém estatísticas dos usuários"""
@@ -247,7 +260,7 @@ async def get_user_stats(
 
 @router.get("/departments/list")
 async def get_departments(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("users", "read"))
 ):
     """Obtém lista de departamentos"""
@@ -269,7 +282,7 @@ async def get_departments(
 async def add_user_specialty(
     user_id: str,
     specialty_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "update"))
 ):
     """Adiciona especialidade a um usuário"""
@@ -302,7 +315,7 @@ async def add_user_specialty(
 @router.get("/{user_id}/specialties")
 async def get_user_specialties(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user_data: dict = Depends(require_permission("users", "read"))
 ):
     """Lista especialidades de um usuário"""
@@ -322,7 +335,7 @@ async def get_user_specialties(
 async def remove_user_specialty(
     user_id: str,
     specialty_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(require_permission("users", "update"))
 ):
     """Remove especialidade de um usuário"""
@@ -344,7 +357,7 @@ async def remove_user_specialty(
 # Endpoints de teste
 @router.get("/test")
 async def test_users_endpoint(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_data: dict = Depends(auth.get_current_user_with_tenant)
 ):
     """Endpoint de teste para users"""
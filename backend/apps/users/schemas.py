@@ -167,6 +167,12 @@ class TenantUserResponse(BaseModel):
     updated_at: Optional[datetime]
     user: UserResponse
 
+# Campos de view=summary na listagem (tabela de usuários)
+USER_SUMMARY_FIELDS = (
+    "id", "name", "email", "phone", "oab_number", "oab_state", "position", "department",
+    "is_active", "role", "last_login"
+)
+
 class UserListResponse(BaseModel):
     users: list[UserResponse]
     total: int
@@ -1,20 +1,22 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.orm import selectinload, load_only
+from core.database import AnySession, SessionAdapter
+from core.serialization import column_loader
 from core.models.user import User
 from core.models.tenant_user import TenantUser
 from apps.users.schemas import UserCreate, UserUpdate, TenantUserCreate, TenantUserUpdate
 from core.models.user_roles import DEFAULT_ROLE_PERMISSIONS
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import AbstractSet, List, Optional, Dict, Any
 
 class UserService:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: AnySession):
+        self.db = SessionAdapter.wrap(db)
     
     async def create_user(self, user_data: UserCreate, tenant_id: str) -> User:
         """Cria um novo usuário e associa ao tenant"""
         # Verificar se email já existe
-        existing_user = self.db.query(User).filter(User.email == user_data.email).first()
+        existing_user = await self.db.scalar(select(User.id).where(User.email == user_data.email).limit(1))
         if existing_user:
             raise ValueError("Email já está em uso")
         
@@ -40,8 +42,8 @@ class UserService:
         user.set_password(user_data.password)
         
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         
         # Associar ao tenant
         await self._create_tenant_user(user.id, tenant_id, user_data.role)
@@ -63,35 +65,28 @@ class UserService:
         )
         
         self.db.add(tenant_user)
-        self.db.commit()
-        self.db.refresh(tenant_user)
+        await self.db.commit()
+        await self.db.refresh(tenant_user)
         
         return tenant_user
     
     async def get_user(self, user_id: str, tenant_id: str) -> Optional[User]:
         """Obtém um usuário específico do tenant"""
-        user = self.db.query(User).join(TenantUser).filter(
-            and_(
-                User.id == user_id,
-                TenantUser.tenant_id == tenant_id,
-                TenantUser.is_active == True
-            )
-        ).first()
-        
-        if user:
-            # Adicionar informações do tenant
-            tenant_user = self.db.query(TenantUser).filter(
+        row = (await self.db.execute(
+            select(User, TenantUser).join(TenantUser).where(
                 and_(
-                    TenantUser.user_id == user_id,
-                    TenantUser.tenant_id == tenant_id
+                    User.id == user_id,
+                    TenantUser.tenant_id == tenant_id,
+                    TenantUser.is_active == True
                 )
-            ).first()
-            
-            if tenant_user:
-                user.role = tenant_user.role
-                user.tenant_permissions = tenant_user.permissions
+            ).limit(1)
+        )).first()
         
-        return user
+        if not row:
+            return None
+        
+        # Adicionar informações do tenant
+        return self._with_tenant_info(*row)
     
     async def list_users(
         self, 
@@ -102,57 +97,22 @@ class UserService:
         role: Optional[str] = None,
         department: Optional[str] = None,
         is_active: Optional[bool] = None,
-        has_oab: Optional[bool] = None
+        has_oab: Optional[bool] = None,
+        fields: Optional[AbstractSet[str]] = None
     ) -> List[User]:
-        """Lista usuários do tenant com filtros"""
-        query = self.db.query(User).join(TenantUser).filter(
-            and_(
-                TenantUser.tenant_id == tenant_id,
-                TenantUser.is_active == True
-            )
+        """Lista usuários do tenant com filtros (``fields``: carrega só essas colunas)"""
+        query = self._filtered(
+            select(User, TenantUser), tenant_id, search, role, department, is_active, has_oab
         )
-        
-        # Aplicar filtros
-        if search:
-            search_filter = or_(
-                User.name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.cpf.ilike(f"%{search}%"),
-                User.oab_number.ilike(f"%{search}%")
+        if fields is not None:
+            query = query.options(
+                column_loader(User, fields),
+                load_only(TenantUser.role, TenantUser.permissions)
             )
-            query = query.filter(search_filter)
+        rows = await self.db.execute(query.offset(skip).limit(limit))
         
-        if role:
-            query = query.filter(TenantUser.role == role)
-        
-        if department:
-            query = query.filter(User.department == department)
-        
-        if is_active is not None:
-            query = query.filter(User.is_active == is_active)
-        
-        if has_oab is not None:
-            if has_oab:
-                query = query.filter(User.oab_number.isnot(None))
-            else:
-                query = query.filter(User.oab_number.is_(None))
-        
-        users = query.offset(skip).limit(limit).all()
-        
-        # Adicionar informações do tenant para cada usuário
-        for user in users:
-            tenant_user = self.db.query(TenantUser).filter(
-                and_(
-                    TenantUser.user_id == user.id,
-                    TenantUser.tenant_id == tenant_id
-                )
-            ).first()
-            
-            if tenant_user:
-                user.role = tenant_user.role
-                user.tenant_permissions = tenant_user.permissions
-        
-        return users
+        # Informações do tenant já vêm na mesma consulta
+        return [self._with_tenant_info(user, tenant_user) for user, tenant_user in rows]
     
     async def update_user(self, user_id: str, user_data: UserUpdate, tenant_id: str) -> Optional[User]:
         """Atualiza um usuário"""
@@ -162,12 +122,12 @@ class UserService:
         
         # Verificar se email já existe (se foi alterado)
         if user_data.email and user_data.email != user.email:
-            existing_user = self.db.query(User).filter(
+            existing_user = await self.db.scalar(select(User.id).where(
                 and_(
                     User.email == user_data.email,
                     User.id != user_id
                 )
-            ).first()
+            ).limit(1))
             if existing_user:
                 raise ValueError("Email já está em uso")
         
@@ -176,31 +136,19 @@ class UserService:
         for field, value in update_data.items():
             setattr(user, field, value)
         
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         
         # Adicionar informações do tenant
-        tenant_user = self.db.query(TenantUser).filter(
-            and_(
-                TenantUser.user_id == user_id,
-                TenantUser.tenant_id == tenant_id
-            )
-        ).first()
-        
+        tenant_user = await self._get_tenant_user(user_id, tenant_id)
         if tenant_user:
-            user.role = tenant_user.role
-            user.tenant_permissions = tenant_user.permissions
+            self._with_tenant_info(user, tenant_user)
         
         return user
     
     async def update_user_role(self, user_id: str, tenant_id: str, role: str) -> Optional[User]:
         """Atualiza o role do usuário no tenant"""
-        tenant_user = self.db.query(TenantUser).filter(
-            and_(
-                TenantUser.user_id == user_id,
-                TenantUser.tenant_id == tenant_id
-            )
-        ).first()
+        tenant_user = await self._get_tenant_user(user_id, tenant_id)
         
         if not tenant_user:
             return None
@@ -209,19 +157,14 @@ class UserService:
         tenant_user.role = role
         tenant_user.permissions = DEFAULT_ROLE_PERMISSIONS.get(role, {})
         
-        self.db.commit()
-        self.db.refresh(tenant_user)
+        await self.db.commit()
+        await self.db.refresh(tenant_user)
         
         return await self.get_user(user_id, tenant_id)
     
     async def delete_user(self, user_id: str, tenant_id: str) -> bool:
         """Remove usuário do tenant (soft delete)"""
-        tenant_user = self.db.query(TenantUser).filter(
-            and_(
-                TenantUser.user_id == user_id,
-                TenantUser.tenant_id == tenant_id
-            )
-        ).first()
+        tenant_user = await self._get_tenant_user(user_id, tenant_id)
         
         if not tenant_user:
             return False
@@ -229,29 +172,24 @@ class UserService:
         # Soft delete - marcar como inativo
         tenant_user.is_active = False
         
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def activate_user(self, user_id: str, tenant_id: str) -> bool:
         """Reativa um usuário no tenant"""
-        tenant_user = self.db.query(TenantUser).filter(
-            and_(
-                TenantUser.user_id == user_id,
-                TenantUser.tenant_id == tenant_id
-            )
-        ).first()
+        tenant_user = await self._get_tenant_user(user_id, tenant_id)
         
         if not tenant_user:
             return False
         
         tenant_user.is_active = True
         
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def change_password(self, user_id: str, current_password: str, new_password: str) -> bool:
         """Altera senha do usuário"""
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.db.get(User, user_id)
         if not user:
             return False
         
@@ -262,47 +200,31 @@ class UserService:
         # Definir nova senha
         user.set_password(new_password)
         
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def get_user_stats(self, tenant_id: str) -> Dict[str, Any]:
         """Obtém estatísticas dos usuários do tenant"""
-        total_users = self.db.query(TenantUser).filter(
-            and_(
-                TenantUser.tenant_id == tenant_id,
-                TenantUser.is_active == True
-            )
-        ).count()
-        
-        active_users = self.db.query(TenantUser).join(User).filter(
-            and_(
-                TenantUser.tenant_id == tenant_id,
-                TenantUser.is_active == True,
-                User.is_active == True
-            )
-        ).count()
-        
-        # Contar por role
-        role_counts = {}
-        for role in ["admin", "lawyer", "assistant", "secretary", "receptionist", "user"]:
-            count = self.db.query(TenantUser).filter(
+        roles = ["admin", "lawyer", "assistant", "secretary", "receptionist", "user"]
+        row = (await self.db.execute(
+            select(
+                func.count(TenantUser.id).label("total_users"),
+                func.count(TenantUser.id).filter(User.is_active == True).label("active_users"),
+                func.count(TenantUser.id).filter(
+                    and_(TenantUser.role == "lawyer", User.oab_number.isnot(None))
+                ).label("lawyers_with_oab"),
+                *[func.count(TenantUser.id).filter(TenantUser.role == role).label(role) for role in roles]
+            ).join(User, User.id == TenantUser.user_id).where(
                 and_(
                     TenantUser.tenant_id == tenant_id,
-                    TenantUser.role == role,
                     TenantUser.is_active == True
                 )
-            ).count()
-            role_counts[role] = count
-        
-        # Contar advogados com OAB
-        lawyers_with_oab = self.db.query(TenantUser).join(User).filter(
-            and_(
-                TenantUser.tenant_id == tenant_id,
-                TenantUser.role == "lawyer",
-                TenantUser.is_active == True,
-                User.oab_number.isnot(None)
             )
-        ).count()
+        )).one()
+        total_users, active_users, lawyers_with_oab = row.total_users, row.active_users, row.lawyers_with_oab
+        
+        # Contar por role
+        role_counts = {role: row._mapping[role] for role in roles}
         
         return {
             "total_users": total_users,
@@ -314,15 +236,15 @@ class UserService:
     
     async def get_departments(self, tenant_id: str) -> List[str]:
         """Obtém lista de departamentos do tenant"""
-        departments = self.db.query(User.department).join(TenantUser).filter(
+        departments = await self.db.scalars(select(User.department).join(TenantUser).where(
             and_(
                 TenantUser.tenant_id == tenant_id,
                 TenantUser.is_active == True,
                 User.department.isnot(None)
             )
-        ).distinct().all()
+        ).distinct())
         
-        return [dept[0] for dept in departments if dept[0]]
+        return [dept for dept in departments if dept]
 
     # ==================== ESPECIALIDADES DOS USUÁRIOS ====================
     
@@ -340,28 +262,22 @@ class UserService:
         
         # Verificar se o usuário existe e pertence ao tenant
         if tenant_id:
-            tenant_user = self.db.query(TenantUser).filter(
-                and_(
-                    TenantUser.user_id == user_id,
-                    TenantUser.tenant_id == tenant_id,
-                    TenantUser.is_active == True
-                )
-            ).first()
+            tenant_user = await self._get_tenant_user(user_id, tenant_id, active_only=True)
             if not tenant_user:
                 return False
         
         # Verificar se a especialidade existe
-        specialty = self.db.query(Specialty).filter(Specialty.id == specialty_id).first()
+        specialty = await self.db.get(Specialty, specialty_id)
         if not specialty:
             return False
         
         # Verificar se já existe a associação
-        existing = self.db.query(UserSpecialty).filter(
+        existing = await self.db.scalar(select(UserSpecialty.id).where(
             and_(
                 UserSpecialty.user_id == user_id,
                 UserSpecialty.specialty_id == specialty_id
             )
-        ).first()
+        ).limit(1))
         
         if existing:
             raise ValueError("Usuário já possui esta especialidade")
@@ -375,7 +291,7 @@ class UserService:
         )
         
         self.db.add(user_specialty)
-        self.db.commit()
+        await self.db.commit()
         return True
     
     async def get_user_specialties(self, user_id: str, tenant_id: str = None) -> List[Dict]:
@@ -385,20 +301,16 @@ class UserService:
         
         # Verificar se o usuário pertence ao tenant
         if tenant_id:
-            tenant_user = self.db.query(TenantUser).filter(
-                and_(
-                    TenantUser.user_id == user_id,
-                    TenantUser.tenant_id == tenant_id,
-                    TenantUser.is_active == True
-                )
-            ).first()
+            tenant_user = await self._get_tenant_user(user_id, tenant_id, active_only=True)
             if not tenant_user:
                 return []
         
         # Buscar especialidades do usuário
-        user_specialties = self.db.query(UserSpecialty).join(Specialty).filter(
-            UserSpecialty.user_id == user_id
-        ).all()
+        user_specialties = await self.db.scalars(
+            select(UserSpecialty).join(Specialty).where(
+                UserSpecialty.user_id == user_id
+            ).options(selectinload(UserSpecialty.specialty))
+        )
         
         return [
             {
@@ -419,29 +331,23 @@ class UserService:
         
         # Verificar se o usuário pertence ao tenant
         if tenant_id:
-            tenant_user = self.db.query(TenantUser).filter(
-                and_(
-                    TenantUser.user_id == user_id,
-                    TenantUser.tenant_id == tenant_id,
-                    TenantUser.is_active == True
-                )
-            ).first()
+            tenant_user = await self._get_tenant_user(user_id, tenant_id, active_only=True)
             if not tenant_user:
                 return False
         
         # Buscar e remover a associação
-        user_specialty = self.db.query(UserSpecialty).filter(
+        user_specialty = await self.db.scalar(select(UserSpecialty).where(
             and_(
                 UserSpecialty.user_id == user_id,
                 UserSpecialty.specialty_id == specialty_id
             )
-        ).first()
+        ))
         
         if not user_specialty:
             return False
         
-        self.db.delete(user_specialty)
-        self.db.commit()
+        await self.db.delete(user_specialty)
+        await self.db.commit()
         return True
     
     async def get_user_count(
@@ -454,7 +360,41 @@ class UserService:
         has_oab: Optional[bool] = None
     ) -> int:
         """Conta usuários do tenant com filtros"""
-        query = self.db.query(User).join(TenantUser).filter(
+        query = self._filtered(
+            select(func.count(User.id)), tenant_id, search, role, department, is_active, has_oab
+        )
+        return await self.db.scalar(query)
+    
+    async def _get_tenant_user(self, user_id: str, tenant_id: str, active_only: bool = False) -> Optional[TenantUser]:
+        """Associação do usuário com o tenant"""
+        query = select(TenantUser).where(
+            and_(
+                TenantUser.user_id == user_id,
+                TenantUser.tenant_id == tenant_id
+            )
+        )
+        if active_only:
+            query = query.where(TenantUser.is_active == True)
+        return await self.db.scalar(query.limit(1))
+    
+    @staticmethod
+    def _with_tenant_info(user: User, tenant_user: TenantUser) -> User:
+        user.role = tenant_user.role
+        user.tenant_permissions = tenant_user.permissions
+        return user
+    
+    @staticmethod
+    def _filtered(
+        query,
+        tenant_id: str,
+        search: Optional[str],
+        role: Optional[str],
+        department: Optional[str],
+        is_active: Optional[bool],
+        has_oab: Optional[bool]
+    ):
+        """Aplica o tenant e os filtros da listagem (compartilhado com a contagem)"""
+        query = query.select_from(User).join(TenantUser, TenantUser.user_id == User.id).where(
             and_(
                 TenantUser.tenant_id == tenant_id,
                 TenantUser.is_active == True
@@ -469,21 +409,21 @@ class UserService:
                 User.cpf.ilike(f"%{search}%"),
                 User.oab_number.ilike(f"%{search}%")
             )
-            query = query.filter(search_filter)
+            query = query.where(search_filter)
         
         if role:
-            query = query.filter(TenantUser.role == role)
+            query = query.where(TenantUser.role == role)
         
         if department:
-            query = query.filter(User.department == department)
+            query = query.where(User.department == department)
         
         if is_active is not None:
-            query = query.filter(User.is_active == is_active)
+            query = query.where(User.is_active == is_active)
         
         if has_oab is not None:
             if has_oab:
-                query = query.filter(User.oab_number.isnot(None))
+                query = query.where(User.oab_number.isnot(None))
             else:
-                query = query.filter(User.oab_number.is_(None))
+                query = query.where(User.oab_number.is_(None))
         
-        return query.count()
\ No newline at end of file
+        return query
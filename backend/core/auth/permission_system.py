@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional, Any
-from core.database import get_db
+from core.database import SessionAdapter, get_db
 from core.models.user_roles import Role, UserRole, DEFAULT_ROLE_PERMISSIONS
 from core.models.tenant_user import TenantUser
 from core.auth.multi_tenant_auth import get_current_user
@@ -178,11 +178,12 @@ async def get_current_user_permissions(
     current_user_data: Dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
-    """Obtém permissões do usuário atual"""
-    permission_system = PermissionSystem(db)
-    return permission_system.get_user_permissions(
-        current_user_data["user"].id,
-        current_user_data["tenant"].id
+    """Obtém permissões do usuário atual (aceita também a AsyncSession das rotas)"""
+    return await SessionAdapter.wrap(db).run(
+        lambda session: PermissionSystem(session).get_user_permissions(
+            current_user_data["user"].id,
+            current_user_data["tenant"].id
+        )
     )
 
 # Exemplo de uso em rotas
@@ -7,7 +7,6 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from core.database import get_db
 from core.models.tenant import Tenant
-import boto3
 import os
 
 class BackupService:
@@ -15,10 +14,18 @@ class BackupService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.s3_client = boto3.client('s3')
+        self._s3_client = None
         self.backup_bucket = os.getenv('BACKUP_BUCKET', 'saas-juridico-backups')
         self.retention_days = 90
     
+    @property
+    def s3_client(self):
+        """Cliente S3 criado no primeiro uso (boto3 é importado só aqui)"""
+        if self._s3_client is None:
+            import boto3
+            self._s3_client = boto3.client('s3')
+        return self._s3_client
+    
     async def create_tenant_backup(self, tenant_id: str, backup_type: str = "daily") -> Dict[str, Any]:
         """Cria backup completo de um tenant específico"""
         try:
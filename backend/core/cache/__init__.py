@@ -0,0 +1,30 @@
+from .ttl_cache import TTLCache
+from .invalidation import invalidate_on_write, invalidate_tenant_on_commit
+from .http import (
+    ENTITY_CACHE_CONTROL,
+    REFERENCE_CACHE_CONTROL,
+    compute_etag,
+    version_etag,
+    version_digest,
+    row_stamp,
+    etag_matches,
+    is_not_modified,
+    cache_headers,
+    not_modified,
+)
+
+__all__ = [
+    'TTLCache',
+    'invalidate_on_write',
+    'invalidate_tenant_on_commit',
+    'ENTITY_CACHE_CONTROL',
+    'REFERENCE_CACHE_CONTROL',
+    'compute_etag',
+    'version_etag',
+    'version_digest',
+    'row_stamp',
+    'etag_matches',
+    'is_not_modified',
+    'cache_headers',
+    'not_modified',
+]
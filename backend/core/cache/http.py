@@ -0,0 +1,123 @@
+"""
+Validadores HTTP (ETag/Last-Modified) e políticas de Cache-Control.
+
+- ``compute_etag``: ETag do conteúdo já calculado (respostas em cache);
+- ``version_etag``/``version_digest``: ETag a partir das versões das linhas
+  (id, ``updated_at``, contagens), obtido com uma consulta leve antes de
+  carregar e serializar a resposta: com ``If-None-Match`` (ou
+  ``If-Modified-Since``) válido a rota responde ``304`` sem montar o corpo.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from core.config import settings
+
+# Entidades: o cliente sempre revalida (304 quando nada mudou)
+ENTITY_CACHE_CONTROL = "private, no-cache"
+# Dados de referência (especialidades): reutilizados por alguns segundos sem revalidar
+REFERENCE_CACHE_CONTROL = f"private, max-age={settings.REFERENCE_CACHE_MAX_AGE_SECONDS}"
+# Respostas dependem do usuário autenticado
+VARY = "Authorization"
+
+
+def compute_etag(payload: Any) -> str:
+    """ETag fraco derivado do conteúdo serializado"""
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+
+def version_etag(*parts: Any) -> str:
+    """ETag fraco derivado de identificadores e versões (sem serializar a resposta)"""
+    raw = "|".join("" if part is None else str(part) for part in parts).encode("utf-8")
+    return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+
+def row_stamp(model):
+    """Versão de uma linha: ``updated_at`` ou, se nunca alterada, ``created_at``"""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def version_digest(*columns, order_by):
+    """
+    Agregado SQL (md5) das versões de um conjunto de linhas.
+
+    Muda com inclusão, remoção ou alteração de qualquer linha, mesmo quando o
+    ``updated_at`` gravado é mais antigo que o máximo já visto (transações
+    concorrentes).
+    """
+    return func.md5(func.string_agg(func.concat_ws(":", *columns), aggregate_order_by(literal_column("','"), order_by)))
+
+
+def http_date(value: datetime) -> str:
+    """Data no formato HTTP (datas sem fuso são tratadas como UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Compara com If-None-Match (comparação fraca, aceita lista e '*')"""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    if "*" in candidates:
+        return True
+    strip = lambda value: value[2:] if value.startswith("W/") else value
+    return strip(etag) in {strip(value) for value in candidates}
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Pedido condicional atendido com 304.
+
+    If-None-Match tem precedência; If-Modified-Since só é considerado quando
+    o cliente não enviou ETag (RFC 9110).
+    """
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+    since = request.headers.get("if-modified-since")
+    if not since or last_modified is None:
+        return False
+    try:
+        since_date = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    if since_date.tzinfo is None:
+        since_date = since_date.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Last-Modified tem resolução de segundos
+    return last_modified.replace(microsecond=0) <= since_date
+
+
+def _validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": VARY}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def cache_headers(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = ENTITY_CACHE_CONTROL,
+) -> None:
+    """Validadores e política de cache na resposta 200"""
+    response.headers.update(_validator_headers(etag, cache_control, last_modified))
+
+
+def not_modified(
+    etag: str,
+    cache_control: str = ENTITY_CACHE_CONTROL,
+    last_modified: Optional[datetime] = None,
+) -> Response:
+    return Response(status_code=304, headers=_validator_headers(etag, cache_control, last_modified))
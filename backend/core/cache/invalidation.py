@@ -0,0 +1,66 @@
+"""
+Invalidação de caches dirigida por escrita.
+
+``invalidate_on_write(cache, Model, ...)`` registra eventos de sessão: no
+``after_flush`` coleta o ``tenant_id`` das instâncias novas, alteradas ou
+removidas dos modelos informados e, somente após o commit, invalida as
+entradas desses tenants (rollback descarta a coleta). Gravações em massa
+(``insert()``/``update()`` do Core) não passam pelo flush: quem as executa
+chama ``invalidate_tenant_on_commit``.
+"""
+from typing import Any, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.cache.ttl_cache import TTLCache
+
+_SESSION_KEY = "cache_invalidation_tenants"
+
+# (cache, modelos observados)
+_registrations: List[Tuple[TTLCache, Tuple[type, ...]]] = []
+
+
+def invalidate_on_write(cache: TTLCache, *models: type):
+    """Invalida o cache por tenant quando qualquer um dos modelos for gravado"""
+    _registrations.append((cache, tuple(models)))
+
+
+def _pending(session: Session) -> Set[Tuple[int, Any]]:
+    return session.info.setdefault(_SESSION_KEY, set())
+
+
+def invalidate_tenant_on_commit(session: Session, model: type, tenant_id: Any):
+    """Agenda, para o próximo commit, a invalidação dos caches que observam ``model``"""
+    pending = _pending(session)
+    for index, (_, models) in enumerate(_registrations):
+        if issubclass(model, models):
+            pending.add((index, str(tenant_id)))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tenants(session: Session, flush_context):
+    if not _registrations:
+        return
+    pending = _pending(session)
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        tenant_id = getattr(instance, "tenant_id", None)
+        if tenant_id is None:
+            continue
+        for index, (_, models) in enumerate(_registrations):
+            if isinstance(instance, models):
+                pending.add((index, str(tenant_id)))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate(session: Session):
+    pending = session.info.pop(_SESSION_KEY, None)
+    if not pending:
+        return
+    for index, tenant_id in pending:
+        _registrations[index][0].invalidate_tenant(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    session.info.pop(_SESSION_KEY, None)
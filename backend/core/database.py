@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, DDL
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, TypeVar, Union
 import os
 
 from core.config import settings
@@ -8,23 +11,91 @@ from core.config import settings
 # Configuração do banco de dados
 DATABASE_URL = settings.DATABASE_URL
 
-# Criar engine do SQLAlchemy
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # Log das queries SQL (remover em produção)
+# Engines por worker: síncrona e assíncrona (cada uma com seu pool)
+ENGINES_PER_WORKER = 2
+
+def pool_sizes(budget: int, workers: int, reserved_per_worker: int = 0):
+    """
+    (pool_size, max_overflow) de cada engine de um worker.
+
+    O orçamento global de conexões é dividido entre os workers e, em cada
+    worker, entre as engines; 2/3 ficam abertas no pool e o restante é
+    overflow (aberto sob demanda e fechado ao devolver).
+    """
+    per_worker = budget // max(workers, 1) - reserved_per_worker
+    per_engine = max(per_worker // ENGINES_PER_WORKER, 2)
+    pool_size = max(per_engine * 2 // 3, 1)
+    return pool_size, per_engine - pool_size
+
+POOL_SIZE, MAX_OVERFLOW = pool_sizes(
+    settings.DB_CONNECTION_BUDGET, settings.WEB_CONCURRENCY, settings.DB_RESERVED_CONNECTIONS_PER_WORKER
+)
+
+# Opções de pool compartilhadas pelo primário e pelas réplicas
+POOL_OPTIONS = dict(
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=20,  # Aumentar pool size
-    max_overflow=30,  # Aumentar overflow
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
     pool_timeout=60,  # Aumentar timeout
 )
 
+# Criar engine do SQLAlchemy
+engine = create_engine(
+    DATABASE_URL,
+    echo=settings.SQL_ECHO,  # Log de todas as queries (contagem por request: core.monitoring.sql)
+    **POOL_OPTIONS
+)
+
 # Criar sessão
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def to_async_url(url):
+    """URL equivalente com o driver asyncpg"""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+# Engine assíncrona (asyncpg) usada pela camada de serviços nas rotas
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=engine.echo, **POOL_OPTIONS)
+
+# expire_on_commit=False: objetos retornados pelos serviços continuam legíveis
+# após o commit sem recarregar (lazy load não é permitido fora do greenlet)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def dispose_inherited_pools():
+    """
+    Descarta, no processo filho, as conexões herdadas do mestre após o fork.
+
+    ``close=False``: os sockets pertencem ao processo pai e não podem ser
+    encerrados pelo filho; o worker abre as suas sob demanda.
+    """
+    from core.replicas import replica_router
+
+    engines = [engine, async_engine.sync_engine]
+    for replica in replica_router.replicas:
+        engines += [replica.engine, replica.async_engine.sync_engine]
+    for target in engines:
+        target.dispose(close=False)
+
 # Base para os modelos
 Base = declarative_base()
 
+# Tabelas particionadas por mês (RANGE em created_at)
+def partition_by_month(table):
+    """
+    Cria a partição DEFAULT junto com a tabela (create_all/testes).
+
+    As partições mensais são criadas e removidas pelo PartitionManager;
+    a DEFAULT apenas garante que nenhuma inserção falhe antes disso.
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT").execute_if(dialect="postgresql")
+    )
+    return table
+
 # Dependency para injeção de dependência
 def get_db():
     db = SessionLocal()
@@ -32,3 +103,77 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+T = TypeVar("T")
+
+# Tipo aceito pelos serviços (ver SessionAdapter)
+AnySession = Union[Session, AsyncSession, "SessionAdapter"]
+
+class SessionAdapter:
+    """
+    Interface assíncrona única sobre ``AsyncSession`` ou ``Session`` (legado).
+
+    Os serviços usam apenas esta interface (``await db.scalar(...)``,
+    ``await db.commit()``...). Nas rotas recebem uma ``AsyncSession`` e o I/O
+    não bloqueia o event loop; o agendador, scripts e testes continuam
+    passando uma ``Session`` síncrona, executada diretamente como antes.
+
+    Código síncrono existente (``db.query``, helpers que recebem ``Session``)
+    roda via ``run``: com ``AsyncSession`` usa ``run_sync``, em que o mesmo
+    código emite o I/O pelo asyncpg sem bloquear.
+    """
+
+    def __init__(self, session: Union[Session, AsyncSession]):
+        self.session = session
+        self.is_async = isinstance(session, AsyncSession)
+
+    @classmethod
+    def wrap(cls, session: AnySession) -> "SessionAdapter":
+        return session if isinstance(session, cls) else cls(session)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Executa ``fn(session_sincrona, *args, **kwargs)``"""
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return fn(self.session, *args, **kwargs)
+
+    def add(self, instance: Any):
+        self.session.add(instance)
+
+    def add_all(self, instances):
+        self.session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await self._call("execute", statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await self._call("scalar", statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await self._call("scalars", statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._call("get", entity, ident, **kwargs)
+
+    async def delete(self, instance: Any):
+        return await self._call("delete", instance)
+
+    async def refresh(self, instance: Any, attribute_names=None):
+        return await self._call("refresh", instance, attribute_names)
+
+    async def flush(self):
+        return await self._call("flush")
+
+    async def commit(self):
+        return await self._call("commit")
+
+    async def rollback(self):
+        return await self._call("rollback")
+
+    async def _call(self, name: str, *args, **kwargs):
+        result = getattr(self.session, name)(*args, **kwargs)
+        return await result if self.is_async else result
@@ -0,0 +1,55 @@
+from starlette.datastructures import Headers
+
+from core.config import settings
+
+# Respostas que não podem ser comprimidas: o compressor acumula os eventos e o cliente não recebe nada
+STREAMING_CONTENT_TYPES = ("text/event-stream",)
+
+_OUTER_SEND = "compression.outer_send"
+
+
+def _compressor(app, minimum_size: int):
+    """brotli (com fallback para gzip) quando ``brotli_asgi`` está instalado; senão gzip"""
+    try:
+        from brotli_asgi import BrotliMiddleware
+        return BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+    except ImportError:
+        from starlette.middleware.gzip import GZipMiddleware
+        return GZipMiddleware(app, minimum_size=minimum_size)
+
+
+class CompressionMiddleware:
+    """
+    Comprime as respostas, exceto streams SSE (``text/event-stream``).
+
+    Nem o ``BrotliMiddleware`` nem o ``GZipMiddleware`` de versões antigas do
+    Starlette ignoram SSE. A decisão é tomada pelo ``Content-Type`` de cada
+    resposta: as mensagens de um stream vão direto para o servidor e o
+    compressor não recebe nenhuma delas.
+    """
+
+    def __init__(self, app, minimum_size: int = None):
+        self.app = app
+        self.compressed = _compressor(
+            self._route,
+            minimum_size if minimum_size is not None else settings.GZIP_MINIMUM_SIZE
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.compressed({**scope, _OUTER_SEND: send}, receive, send)
+
+    async def _route(self, scope, receive, compressed_send):
+        outer_send = scope.pop(_OUTER_SEND)
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message.get("headers", [])).get("content-type", "")
+                streaming = content_type.startswith(STREAMING_CONTENT_TYPES)
+            await (outer_send if streaming else compressed_send)(message)
+
+        await self.app(scope, receive, send_wrapper)
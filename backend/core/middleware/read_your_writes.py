@@ -0,0 +1,61 @@
+import time
+
+from core.config import settings
+from core.replicas import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, token_identity, write_windows
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+class ReadYourWritesMiddleware:
+    """
+    Mantém as leituras de um cliente no primário logo após as escritas dele.
+
+    Respostas de sucesso a POST/PUT/PATCH/DELETE abrem a janela (agora +
+    ``READ_YOUR_WRITES_SECONDS``) consultada por ``get_read_db``; assim a
+    listagem logo depois de criar um registro não cai numa réplica atrasada.
+    A janela é registrada para o usuário/tenant do token Bearer (neste worker),
+    no cookie ``rw_until`` e no header ``X-Read-Your-Writes-Until``, que
+    clientes sem cookies podem reenviar nas leituras seguintes.
+    Toda resposta informa em ``X-DB-Target`` onde a leitura foi feita.
+    """
+
+    def __init__(self, app, window_seconds: int = None):
+        self.app = app
+        self.window_seconds = window_seconds if window_seconds is not None else settings.READ_YOUR_WRITES_SECONDS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_write = scope["method"] in WRITE_METHODS
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if is_write and message["status"] < 400 and self.window_seconds > 0:
+                    until = time.time() + self.window_seconds
+                    self._remember(scope, until)
+                    headers.append((b"set-cookie", self._cookie(until).encode("latin-1")))
+                    headers.append((READ_YOUR_WRITES_HEADER.lower().encode("latin-1"), f"{until:.3f}".encode("latin-1")))
+                target = scope.get("state", {}).get("db_target")
+                if target:
+                    headers.append((b"x-db-target", target.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _remember(scope, until: float):
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                identity = token_identity(value.decode("latin-1"))
+                if identity is not None:
+                    write_windows.mark(identity, until)
+                return
+
+    def _cookie(self, until: float) -> str:
+        return (
+            f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; Max-Age={self.window_seconds}; "
+            f"Path=/; HttpOnly; SameSite=Lax"
+        )
@@ -0,0 +1,46 @@
+import logging
+
+from core.config import settings
+from core.monitoring.sql import start_request_stats, stop_request_stats
+
+logger = logging.getLogger(__name__)
+
+class SQLInstrumentationMiddleware:
+    """
+    Conta as consultas SQL de cada request (ver ``core.monitoring.sql``).
+
+    Padrões N+1 (mesmo formato de consulta mais de ``SQL_N_PLUS_ONE_THRESHOLD``
+    vezes) vão para o log com a rota; com ``SQL_SERVER_TIMING`` a resposta
+    inclui ``Server-Timing: db;dur=...`` com o total de consultas e tempo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                self._report(scope, stats)
+                if settings.SQL_SERVER_TIMING and stats.count:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing(self.threshold).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop_request_stats(token)
+
+    def _report(self, scope, stats):
+        route = f"{scope['method']} {scope['path']}"
+        for shape, count in stats.repeated(self.threshold):
+            logger.warning(f"Possível N+1 em {route}: {count}x {shape[:200]}")
+        logger.debug(f"{route}: {stats.count} consultas, {stats.total_ms:.1f} ms no banco")
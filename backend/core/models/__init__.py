@@ -6,12 +6,14 @@ from .client import Client
 from .process import Process
 from .document import DocumentTemplate
 from .financial import FinancialRecord, FeeStructure
-from .notification import ProcessNotification, NotificationPreference
+from .notification import ProcessNotification, NotificationPreference, NotificationDedupKey, NotificationOutbox, NotificationStreamTicket
 from .audit import AuditLog, DataAccessLog, SecurityEvent
 from .superadmin import SuperAdmin
 from .user_roles import UserSpecialty, LegalSpecialty
 from .specialty import Specialty
 from .temporary_permissions import TemporaryPermission
+from .metrics import TenantDailyMetrics, TenantSpecialtyDailyMetrics
+from .sync import SyncTombstone
 
 __all__ = [
     'Tenant',
@@ -24,6 +26,9 @@ __all__ = [
     'FeeStructure',
     'ProcessNotification',
     'NotificationPreference',
+    'NotificationDedupKey',
+    'NotificationOutbox',
+    'NotificationStreamTicket',
     'AuditLog',
     'DataAccessLog',
     'SecurityEvent',
@@ -31,5 +36,8 @@ __all__ = [
     'UserSpecialty',
     'LegalSpecialty',
     'Specialty',
-    'TemporaryPermission'
+    'TemporaryPermission',
+    'TenantDailyMetrics',
+    'TenantSpecialtyDailyMetrics',
+    'SyncTombstone'
 ]
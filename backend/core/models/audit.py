@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, partition_by_month
 import uuid
 
 class AuditLog(Base):
@@ -35,12 +35,18 @@ class AuditLog(Base):
     success = Column(Boolean, default=True)
     error_message = Column(Text, nullable=True)
     
-    # Auditoria
-    created_at = Column(DateTime, server_default=func.now())
+    # Auditoria (created_at é a chave de partição e faz parte da PK)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now())
     
     # Relacionamento
     user = relationship("User")
     
+    __table_args__ = (
+        Index("ix_audit_logs_tenant_created", "tenant_id", "created_at"),
+        Index("ix_audit_logs_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -62,6 +68,8 @@ class AuditLog(Base):
             "created_at": self.created_at.isoformat()
         }
 
+partition_by_month(AuditLog.__table__)
+
 class DataAccessLog(Base):
     """Log de acesso a dados sensíveis (LGPD)"""
     __tablename__ = "data_access_logs"
@@ -89,12 +97,18 @@ class DataAccessLog(Base):
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     
-    # Auditoria
-    created_at = Column(DateTime, server_default=func.now())
+    # Auditoria (created_at é a chave de partição e faz parte da PK)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now())
     
     # Relacionamento
     user = relationship("User")
     
+    __table_args__ = (
+        Index("ix_data_access_logs_tenant_created", "tenant_id", "created_at"),
+        Index("ix_data_access_logs_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -113,6 +127,8 @@ class DataAccessLog(Base):
             "created_at": self.created_at.isoformat()
         }
 
+partition_by_month(DataAccessLog.__table__)
+
 class SecurityEvent(Base):
     """Eventos de segurança do sistema"""
     __tablename__ = "security_events"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Index, Computed, DDL, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -18,6 +18,10 @@ class Client(Base):
     phone = Column(String(20), nullable=True)
     cpf_cnpj = Column(String(18), nullable=True)  # CPF ou CNPJ
     
+    # Normalizados pelo banco (colunas geradas): unicidade por tenant e busca indexada
+    cpf_cnpj_normalized = Column(String(18), Computed("NULLIF(regexp_replace(cpf_cnpj, '[^0-9]', '', 'g'), '')", persisted=True))  # só dígitos
+    email_normalized = Column(String(255), Computed("NULLIF(lower(btrim(email)), '')", persisted=True))
+    
     # Tipo de pessoa
     person_type = Column(String(10), nullable=False)  # PF (Pessoa Física) ou PJ (Pessoa Jurídica)
     
@@ -52,6 +56,21 @@ class Client(Base):
     financial_records = relationship("FinancialRecord", back_populates="client")
     # communications = relationship("Communication", back_populates="client")  # Temporariamente comentado
     
+    __table_args__ = (
+        Index("ix_clients_tenant_active", "tenant_id", "is_active"),
+        Index("ix_clients_tenant_name", "tenant_id", "name"),
+        Index("ix_clients_tenant_created", "tenant_id", created_at.desc()),
+        Index("ix_clients_tenant_cpf_cnpj", "tenant_id", "cpf_cnpj_normalized", unique=True,
+              postgresql_where=cpf_cnpj_normalized.isnot(None)),
+        Index("ix_clients_tenant_email", "tenant_id", "email_normalized", unique=True,
+              postgresql_where=email_normalized.isnot(None)),
+        # Busca por trecho (ilike '%termo%') via pg_trgm
+        Index("ix_clients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_clients_company_name_trgm", "company_name", postgresql_using="gin", postgresql_ops={"company_name": "gin_trgm_ops"}),
+        Index("ix_clients_email_trgm", "email_normalized", postgresql_using="gin", postgresql_ops={"email_normalized": "gin_trgm_ops"}),
+        Index("ix_clients_cpf_cnpj_trgm", "cpf_cnpj_normalized", postgresql_using="gin", postgresql_ops={"cpf_cnpj_normalized": "gin_trgm_ops"}),
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -75,3 +94,10 @@ class Client(Base):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+# Índices de trigramas (gin_trgm_ops) dependem da extensão pg_trgm (create_all/testes)
+event.listen(
+    Client.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
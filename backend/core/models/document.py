@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -59,6 +59,10 @@ class Document(Base):
     parent_document = relationship("Document", remote_side=[id])
     versions = relationship("Document", back_populates="parent_document")
     
+    __table_args__ = (
+        Index("ix_documents_process_tenant", "process_id", "tenant_id"),
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
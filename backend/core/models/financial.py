@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Numeric
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -48,6 +48,10 @@ class FinancialRecord(Base):
     client = relationship("Client", back_populates="financial_records")
     lawyer = relationship("User")
     
+    __table_args__ = (
+        Index("ix_financial_records_tenant_status_due", "tenant_id", "status", "due_date"),
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -0,0 +1,112 @@
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, DDL, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from core.database import Base
+
+class TenantDailyMetrics(Base):
+    """Agregados diários por tenant (alimentados por eventos de escrita + reconciliação noturna)"""
+    __tablename__ = "tenant_daily_metrics"
+    
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    # Processos
+    processes_opened = Column(Integer, nullable=False, default=0, server_default="0")
+    processes_closed = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Clientes e documentos
+    clients_added = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_uploaded = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Financeiro (pelo dia do pagamento)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    expenses = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    
+    # Auditoria
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def to_dict(self) -> dict:
+        """Converte para dicionário"""
+        return {
+            "tenant_id": str(self.tenant_id),
+            "day": self.day.isoformat(),
+            "processes_opened": self.processes_opened,
+            "processes_closed": self.processes_closed,
+            "clients_added": self.clients_added,
+            "documents_uploaded": self.documents_uploaded,
+            "revenue": float(self.revenue or 0),
+            "expenses": float(self.expenses or 0)
+        }
+
+class TenantSpecialtyDailyMetrics(Base):
+    """Agregados diários por tenant e especialidade do processo"""
+    __tablename__ = "tenant_specialty_daily_metrics"
+    
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    specialty_id = Column(UUID(as_uuid=True), primary_key=True)
+    
+    processes_opened = Column(Integer, nullable=False, default=0, server_default="0")
+    processes_closed = Column(Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    
+    # Auditoria
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+# Estatísticas por tenant para o painel do super admin (view materializada,
+# atualizada periodicamente pelo agendador com REFRESH ... CONCURRENTLY)
+TENANT_STATS_VIEW = "superadmin_tenant_stats"
+
+TENANT_STATS_SQL = """
+    SELECT t.id AS tenant_id, t.name, t.slug, t.plan_type, t.is_active, t.is_suspended, t.created_at,
+           COALESCE(u.users, 0) AS users,
+           COALESCE(u.active_users, 0) AS active_users,
+           COALESCE(p.processes, 0) AS processes,
+           COALESCE(p.active_processes, 0) AS active_processes,
+           COALESCE(c.clients, 0) AS clients,
+           COALESCE(d.documents, 0) AS documents,
+           COALESCE(d.storage_bytes, 0) AS storage_bytes,
+           COALESCE(a.activity_30d, 0) AS activity_30d,
+           a.last_activity_at,
+           LOCALTIMESTAMP AS refreshed_at
+    FROM tenants t
+    LEFT JOIN (
+        SELECT tenant_id, count(*) AS users, count(*) FILTER (WHERE is_active) AS active_users
+        FROM tenant_users GROUP BY tenant_id
+    ) u ON u.tenant_id = t.id
+    LEFT JOIN (
+        SELECT tenant_id, count(*) AS processes,
+               count(*) FILTER (WHERE status IN ('active', 'pending')) AS active_processes
+        FROM processes GROUP BY tenant_id
+    ) p ON p.tenant_id = t.id
+    LEFT JOIN (
+        SELECT tenant_id, count(*) AS clients FROM clients GROUP BY tenant_id
+    ) c ON c.tenant_id = t.id
+    LEFT JOIN (
+        SELECT tenant_id, count(*) AS documents, sum(file_size) AS storage_bytes
+        FROM documents GROUP BY tenant_id
+    ) d ON d.tenant_id = t.id
+    LEFT JOIN (
+        SELECT tenant_id, count(*) AS activity_30d, max(created_at) AS last_activity_at
+        FROM audit_logs
+        WHERE tenant_id IS NOT NULL AND created_at >= LOCALTIMESTAMP - interval '30 days'
+        GROUP BY tenant_id
+    ) a ON a.tenant_id = t.id
+"""
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {TENANT_STATS_VIEW} AS {TENANT_STATS_SQL}").execute_if(dialect="postgresql")
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    # Índice único: exigido pelo REFRESH ... CONCURRENTLY
+    DDL(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{TENANT_STATS_VIEW}_tenant ON {TENANT_STATS_VIEW} (tenant_id)").execute_if(dialect="postgresql")
+)
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL(f"DROP MATERIALIZED VIEW IF EXISTS {TENANT_STATS_VIEW}").execute_if(dialect="postgresql")
+)
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Text, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, partition_by_month
 import uuid
 
 class ProcessNotification(Base):
@@ -32,8 +32,8 @@ class ProcessNotification(Base):
     # Dados específicos da notificação
     notification_data = Column(JSON, default=dict)  # Dados adicionais como URLs, IDs, etc.
     
-    # Auditoria
-    created_at = Column(DateTime, server_default=func.now())
+    # Auditoria (created_at é a chave de partição e faz parte da PK)
+    created_at = Column(DateTime, primary_key=True, server_default=func.now())
     read_at = Column(DateTime, nullable=True)
     archived_at = Column(DateTime, nullable=True)
     
@@ -42,6 +42,13 @@ class ProcessNotification(Base):
     process = relationship("Process")
     user = relationship("User")
     
+    __table_args__ = (
+        Index("ix_process_notifications_user_created", "user_id", "created_at"),
+        Index("ix_process_notifications_tenant_created", "tenant_id", "created_at"),
+        Index("ix_process_notifications_user_tenant_read", "user_id", "tenant_id", "is_read"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -64,6 +71,8 @@ class ProcessNotification(Base):
             "archived_at": self.archived_at.isoformat() if self.archived_at else None
         }
 
+partition_by_month(ProcessNotification.__table__)
+
 class NotificationTemplate(Base):
     """Templates de notificações"""
     __tablename__ = "notification_templates"
@@ -82,11 +91,19 @@ class NotificationTemplate(Base):
     channels = Column(JSON, default=list)
     variables = Column(JSON, default=list)  # Variáveis disponíveis
     
+    # Versão (incrementada a cada alteração; invalida o cache de templates compilados)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # Auditoria
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     created_by = Column(UUID(as_uuid=True), nullable=True)
     
+    __mapper_args__ = {"version_id_col": version}
+    __table_args__ = (
+        Index("ix_notification_templates_tenant_type", "tenant_id", "notification_type"),
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -99,6 +116,7 @@ class NotificationTemplate(Base):
             "is_active": self.is_active,
             "channels": self.channels,
             "variables": self.variables,
+            "version": self.version,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
@@ -136,6 +154,10 @@ class NotificationPreference(Base):
     tenant = relationship("Tenant")
     user = relationship("User")
     
+    __table_args__ = (
+        Index("ix_notification_preferences_user_tenant", "user_id", "tenant_id"),
+    )
+    
     def to_dict(self) -> dict:
         """Converte para dicionário"""
         return {
@@ -156,3 +178,77 @@ class NotificationPreference(Base):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+class NotificationDedupKey(Base):
+    """Chaves de deduplicação de notificações geradas automaticamente"""
+    __tablename__ = "notification_dedup_keys"
+    
+    # Ex.: deadline:<deadline_id>:<user_id>:<dias_restantes>
+    dedup_key = Column(String(255), primary_key=True)
+    notification_type = Column(String(50), nullable=False)
+    
+    # Auditoria
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+
+class NotificationStreamTicket(Base):
+    """Tickets de uso único para abrir o stream de notificações (SSE/WebSocket)"""
+    __tablename__ = "notification_stream_tickets"
+    
+    # SHA-256 do ticket: o valor em si só é devolvido ao cliente
+    ticket_hash = Column(String(64), primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class NotificationOutbox(Base):
+    """Outbox transacional de entregas (email, push, SMS) das notificações"""
+    __tablename__ = "notification_outbox"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    # Sem FK: process_notifications pode ser particionada
+    notification_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    
+    # Entrega
+    channel = Column(String(20), nullable=False)  # email, push, sms
+    recipient = Column(String(255), nullable=False)  # e-mail, telefone ou id do usuário (push)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    
+    # Status: pending, sending, retry, sent, dead
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    # Auditoria
+    created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        # Fila de cada canal: somente itens ainda não finalizados
+        Index(
+            "ix_notification_outbox_queue",
+            "channel", "next_attempt_at",
+            postgresql_where=status.in_(["pending", "retry", "sending"])
+        ),
+    )
+    
+    def to_dict(self) -> dict:
+        """Converte para dicionário"""
+        return {
+            "id": str(self.id),
+            "tenant_id": str(self.tenant_id),
+            "notification_id": str(self.notification_id),
+            "user_id": str(self.user_id),
+            "channel": self.channel,
+            "recipient": self.recipient,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -18,6 +18,7 @@ class Process(Base):
     jurisdiction = Column(String(255), nullable=True)  # Comarca
     subject = Column(Text, nullable=False)  # Assunto do processo
     status = Column(String(50), default="active")  # active, closed, suspended
+    closed_at = Column(DateTime, nullable=True)  # Preenchido quando o status passa para closed
     
     # Relacionamentos
     client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
@@ -47,6 +48,12 @@ class Process(Base):
     documents = relationship("Document", back_populates="process")
     # tasks = relationship("Task", back_populates="process")  # Temporariamente comentado
     financial_records = relationship("FinancialRecord", back_populates="process")
+    
+    __table_args__ = (
+        Index("ix_processes_tenant_status", "tenant_id", "status"),
+        Index("ix_processes_tenant_updated", "tenant_id", updated_at.desc()),
+        Index("ix_processes_client", "client_id"),
+    )
 
 class ProcessLawyer(Base):
     """Relacionamento processo-advogado"""
@@ -77,6 +84,11 @@ class ProcessLawyer(Base):
     # __table_args__ = (
     #     UniqueConstraint('process_id', 'lawyer_id', name='unique_process_lawyer'),
     # )
+    
+    __table_args__ = (
+        Index("ix_process_lawyers_lawyer_process", "lawyer_id", "process_id"),
+        Index("ix_process_lawyers_process", "process_id"),
+    )
 
 class ProcessTimeline(Base):
     """Timeline de andamentos do processo"""
@@ -100,10 +112,15 @@ class ProcessTimeline(Base):
     
     # Auditoria
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
     created_by = Column(UUID(as_uuid=True), nullable=True)
     
     # Relacionamento
     process = relationship("Process")
+    
+    __table_args__ = (
+        Index("ix_process_timeline_process_date", "process_id", date.desc()),
+    )
 
 class ProcessDeadline(Base):
     """Prazos críticos do processo"""
@@ -134,6 +151,31 @@ class ProcessDeadline(Base):
     
     # Relacionamento
     process = relationship("Process")
+    
+    __table_args__ = (
+        Index("ix_process_deadlines_process_due", "process_id", "due_date"),
+        # Prazos pendentes por data (agendador, digest e dashboards)
+        Index("ix_process_deadlines_pending_due", "due_date", postgresql_where=status == "pending"),
+    )
+    
+    def to_dict(self) -> dict:
+        """Converte para dicionário"""
+        return {
+            "id": str(self.id),
+            "process_id": str(self.process_id),
+            "title": self.title,
+            "description": self.description,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "deadline_type": self.deadline_type,
+            "status": self.status,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "completed_by": str(self.completed_by) if self.completed_by else None,
+            "notify_days_before": self.notify_days_before,
+            "is_critical": self.is_critical,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_by": str(self.created_by) if self.created_by else None
+        }
 
 
 class ProcessSpecialty(Base):
@@ -150,4 +192,9 @@ class ProcessSpecialty(Base):
     
     # Relacionamentos
     process = relationship("Process", back_populates="specialties")
-    specialty = relationship("Specialty")
\ No newline at end of file
+    specialty = relationship("Specialty")
+    
+    __table_args__ = (
+        Index("ix_process_specialties_process", "process_id"),
+        Index("ix_process_specialties_specialty", "specialty_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -38,6 +38,10 @@ class Specialty(Base):
     # Relacionamentos
     tenant = relationship("Tenant", back_populates="specialties")
     
+    __table_args__ = (
+        Index("ix_specialties_tenant_active", "tenant_id", "is_active"),
+    )
+    
     def to_dict(self):
         """Converte o modelo para dicionário"""
         return {
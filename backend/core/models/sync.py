@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from core.database import Base
+import uuid
+
+class SyncTombstone(Base):
+    """Registro de exclusões para a sincronização incremental do app mobile"""
+    __tablename__ = "sync_tombstones"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=True)  # Preenchido quando a exclusão vale só para um usuário
+    
+    entity = Column(String(20), nullable=False)  # process, deadline, timeline, notification
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_sync_tombstones_tenant_deleted", "tenant_id", "deleted_at"),
+    )
@@ -209,7 +209,7 @@ class TemporaryPermissionService:
         
         return True
     
-    async def cleanup_expired_permissions(self):
+    def cleanup_expired_permissions(self):
         """Remove permissões temporárias expiradas"""
         expired_permissions = self.db.query(TemporaryPermission).filter(
             TemporaryPermission.is_active == True,
@@ -30,7 +30,7 @@ class Tenant(Base):
     subscription_ends_at = Column(DateTime, nullable=True)
     
     # Auditoria
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     updated_at = Column(DateTime, onupdate=func.now())
     created_by = Column(UUID(as_uuid=True), nullable=True)  # super admin que criou
     
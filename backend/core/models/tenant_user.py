@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -26,7 +26,7 @@ class TenantUser(Base):
     is_primary_admin = Column(Boolean, default=False)
     
     # Auditoria
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     updated_at = Column(DateTime, onupdate=func.now())
     
     # Relacionamentos
@@ -35,4 +35,5 @@ class TenantUser(Base):
     
     __table_args__ = (
         UniqueConstraint('tenant_id', 'user_id', name='unique_tenant_user'),
+        Index("ix_tenant_users_user", "user_id"),
     )
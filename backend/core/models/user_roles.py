@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Integer, Text, UniqueConstraint, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -105,6 +105,7 @@ class UserSpecialty(Base):
     
     __table_args__ = (
         UniqueConstraint('user_id', 'specialty_id', name='unique_user_specialty'),
+        Index("ix_user_specialties_specialty", "specialty_id"),
     )
 
 # Permissões padrão por role
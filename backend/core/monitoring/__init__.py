@@ -0,0 +1,25 @@
+from .sampler import ResourceSample, ResourceSampler
+from .health import HEALTHY, WARNING, CRITICAL, overall_status, service_statuses
+from .sql import QueryStats, current_stats, install_sql_instrumentation
+
+from core.config import settings
+
+# Instância única por worker (iniciada no lifespan da aplicação)
+resource_sampler = ResourceSampler(
+    interval_seconds=settings.MONITORING_INTERVAL_SECONDS,
+    history_size=settings.MONITORING_HISTORY_SIZE,
+)
+
+__all__ = [
+    'ResourceSample',
+    'ResourceSampler',
+    'resource_sampler',
+    'HEALTHY',
+    'WARNING',
+    'CRITICAL',
+    'overall_status',
+    'service_statuses',
+    'QueryStats',
+    'current_stats',
+    'install_sql_instrumentation',
+]
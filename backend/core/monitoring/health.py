@@ -0,0 +1,51 @@
+"""
+Classificação de saúde a partir da última amostra de recursos.
+"""
+from typing import Any, Dict
+
+from core.config import settings
+from core.monitoring.sampler import ResourceSample
+
+HEALTHY = "healthy"
+WARNING = "warning"
+CRITICAL = "critical"
+
+
+def database_status(sample: ResourceSample) -> str:
+    if sample.db_ping_ms is None:
+        return CRITICAL
+    if sample.db_ping_ms > settings.MONITORING_DB_PING_WARNING_MS:
+        return WARNING
+    return HEALTHY
+
+
+def pool_status(sample: ResourceSample) -> str:
+    if sample.db_pool_size is None or sample.db_pool_checked_out is None:
+        return HEALTHY
+    # Overflow em uso indica pool saturado; se crescer, requests esperam por conexão
+    if sample.db_pool_overflow:
+        return WARNING
+    return HEALTHY
+
+
+def event_loop_status(sample: ResourceSample) -> str:
+    if sample.event_loop_lag_ms is not None and sample.event_loop_lag_ms > settings.MONITORING_LOOP_LAG_WARNING_MS:
+        return WARNING
+    return HEALTHY
+
+
+def overall_status(statuses: Dict[str, str]) -> str:
+    values = statuses.values()
+    if CRITICAL in values:
+        return CRITICAL
+    if WARNING in values:
+        return WARNING
+    return HEALTHY
+
+
+def service_statuses(sample: ResourceSample) -> Dict[str, Any]:
+    return {
+        "database": database_status(sample),
+        "db_pool": pool_status(sample),
+        "event_loop": event_loop_status(sample),
+    }
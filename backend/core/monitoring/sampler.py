@@ -0,0 +1,238 @@
+"""
+Amostragem periódica de recursos do processo, do host e do banco.
+
+Cada worker roda o próprio amostrador (tarefa asyncio) e guarda as últimas
+``MONITORING_HISTORY_SIZE`` amostras em memória (buffer circular). Métricas:
+
+- CPU do processo (tempo de CPU / tempo decorrido) e do host (``/proc/stat``);
+- memória residente (RSS) do processo e memória usada do host;
+- descritores de arquivo abertos e uso do disco;
+- atraso do event loop (quanto o ``sleep`` do amostrador acordou atrasado);
+- pool de conexões (em uso, overflow) e latência de ``SELECT 1``.
+
+As leituras de host usam ``/proc`` (Linux); em outros sistemas esses campos
+ficam ``None``.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.database import engine
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class ResourceSample:
+    timestamp: str
+    process_cpu_percent: Optional[float]
+    host_cpu_percent: Optional[float]
+    process_rss_bytes: Optional[int]
+    host_memory_percent: Optional[float]
+    disk_percent: Optional[float]
+    open_fds: Optional[int]
+    event_loop_lag_ms: Optional[float]
+    db_pool_size: Optional[int]
+    db_pool_checked_out: Optional[int]
+    db_pool_overflow: Optional[int]
+    db_ping_ms: Optional[float]
+    db_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ==================== LEITURAS ====================
+
+def _read_host_cpu_times() -> Optional[Tuple[int, int]]:
+    """(tempo ocioso, tempo total) acumulados do host, em ticks"""
+    try:
+        with open("/proc/stat") as stat:
+            values = [int(value) for value in stat.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    return idle, sum(values)
+
+
+def _read_process_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _read_host_memory_percent() -> Optional[float]:
+    try:
+        with open("/proc/meminfo") as meminfo:
+            values = {line.split(":")[0]: int(line.split()[1]) for line in meminfo}
+        return round((1 - values["MemAvailable"] / values["MemTotal"]) * 100, 1)
+    except (OSError, ValueError, KeyError, ZeroDivisionError):
+        return None
+
+
+def _count_open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _disk_percent(path: str = "/") -> Optional[float]:
+    try:
+        usage = shutil.disk_usage(path)
+        return round(usage.used / usage.total * 100, 1)
+    except OSError:
+        return None
+
+
+def _pool_status() -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    pool = engine.pool
+    try:
+        return pool.size(), pool.checkedout(), max(pool.overflow(), 0)
+    except AttributeError:
+        # Pools sem tamanho fixo (ex.: NullPool)
+        return None, None, None
+
+
+def _ping_database() -> Tuple[Optional[float], Optional[str]]:
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return None, str(e)[:200]
+    return round((time.perf_counter() - started) * 1000, 2), None
+
+
+# ==================== AMOSTRADOR ====================
+
+class ResourceSampler:
+    """Coleta uma amostra a cada ``interval_seconds`` em um buffer circular"""
+
+    def __init__(self, interval_seconds: float = 5, history_size: int = 720):
+        self.interval_seconds = interval_seconds
+        self.started_at = time.time()
+        self._history: Deque[ResourceSample] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_process_cpu: Optional[Tuple[float, float]] = None
+        self._last_host_cpu: Optional[Tuple[int, int]] = None
+        self._last_sampled_at: Optional[float] = None  # time.monotonic() da última amostra
+
+    # ==================== CICLO DE VIDA ====================
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Amostrador de recursos iniciado (a cada {self.interval_seconds}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(loop.time() - expected, 0) * 1000
+            try:
+                # O ping bloqueia: roda em thread para não distorcer o próprio event loop
+                await asyncio.to_thread(self.sample_once, lag_ms)
+            except Exception as e:
+                logger.warning(f"Falha ao coletar amostra de recursos: {e}")
+
+    # ==================== COLETA ====================
+
+    def sample_once(self, event_loop_lag_ms: Optional[float] = None) -> ResourceSample:
+        """Coleta e registra uma amostra (também usada fora do event loop)"""
+        # O loop e current() podem coletar ao mesmo tempo: os deltas de CPU usam a referência sob o lock
+        with self._lock:
+            wall, cpu = time.monotonic(), time.process_time()
+            process_cpu = None
+            if self._last_process_cpu is not None:
+                elapsed = wall - self._last_process_cpu[0]
+                if elapsed > 0:
+                    process_cpu = round((cpu - self._last_process_cpu[1]) / elapsed * 100, 1)
+            self._last_process_cpu = (wall, cpu)
+
+            host_cpu = None
+            host_times = _read_host_cpu_times()
+            if host_times is not None and self._last_host_cpu is not None:
+                idle = host_times[0] - self._last_host_cpu[0]
+                total = host_times[1] - self._last_host_cpu[1]
+                if total > 0:
+                    host_cpu = round((1 - idle / total) * 100, 1)
+            self._last_host_cpu = host_times
+
+        pool_size, checked_out, overflow = _pool_status()
+        ping_ms, db_error = _ping_database()
+
+        sample = ResourceSample(
+            timestamp=datetime.utcnow().isoformat() + "Z",
+            process_cpu_percent=process_cpu,
+            host_cpu_percent=host_cpu,
+            process_rss_bytes=_read_process_rss(),
+            host_memory_percent=_read_host_memory_percent(),
+            disk_percent=_disk_percent(),
+            open_fds=_count_open_fds(),
+            event_loop_lag_ms=round(event_loop_lag_ms, 2) if event_loop_lag_ms is not None else None,
+            db_pool_size=pool_size,
+            db_pool_checked_out=checked_out,
+            db_pool_overflow=overflow,
+            db_ping_ms=ping_ms,
+            db_error=db_error,
+        )
+        with self._lock:
+            self._history.append(sample)
+            self._last_sampled_at = time.monotonic()
+        return sample
+
+    # ==================== LEITURA ====================
+
+    def latest(self) -> Optional[ResourceSample]:
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def current(self) -> ResourceSample:
+        """
+        Última amostra, se recente; senão coleta uma na hora.
+
+        Coleta quando o loop não está rodando (monitoramento desligado ou
+        parado) ou quando a última amostra tem mais de dois intervalos.
+        """
+        with self._lock:
+            sample = self._history[-1] if self._history else None
+            sampled_at = self._last_sampled_at
+        running = self._task is not None and not self._task.done()
+        if sample is None or not running or time.monotonic() - sampled_at > 2 * self.interval_seconds:
+            return self.sample_once()
+        return sample
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            samples = list(self._history)
+        if limit is not None:
+            samples = samples[-limit:] if limit > 0 else []
+        return [sample.to_dict() for sample in samples]
+
+    def uptime_seconds(self) -> int:
+        return int(time.time() - self.started_at)
@@ -0,0 +1,178 @@
+"""
+Instrumentação das consultas SQL por request.
+
+Listeners em ``Engine`` (valem para o primário, as réplicas e as engines
+assíncronas) medem cada execução e acumulam no ``QueryStats`` do request
+atual (``ContextVar``; copiado para ``asyncio.to_thread`` e ``run_sync``):
+
+- quantidade de consultas e tempo total no banco;
+- repetições do mesmo formato de SQL (listas de parâmetros ``IN`` colapsadas):
+  acima de ``SQL_N_PLUS_ONE_THRESHOLD`` o padrão é tratado como N+1;
+- consultas lentas (``SQL_SLOW_QUERY_MS``), registradas no log com o plano
+  (``EXPLAIN``) para uma amostra de ``SQL_EXPLAIN_SAMPLE_RATE``.
+
+Consultas fora de um request (agendador, scripts) só passam pelo log de lentas.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STATEMENT_PREVIEW = 200
+
+# Listas de parâmetros (IN (...), VALUES (...)) e espaços extras não mudam o formato da consulta
+_PARAM = r"(?:%\(\w+\)s|%s|\$\d+|\?|:\w+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Formato da consulta: mesma estrutura, independentemente dos valores"""
+    return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    duration_ms: float
+    plan: Optional[str] = None
+
+
+@dataclass
+class QueryStats:
+    """Consultas executadas durante um request"""
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    slow: List[SlowQuery] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, duration_ms: float, slow: Optional[SlowQuery] = None):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.shapes[shape] += 1
+            if slow is not None:
+                self.slow.append(slow)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Formatos executados mais de ``threshold`` vezes (N+1), do mais repetido ao menos"""
+        with self._lock:
+            return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self, threshold: int) -> str:
+        """Entradas do cabeçalho Server-Timing (apenas ASCII)"""
+        entries = [f'db;dur={self.total_ms:.1f};desc="{self.count} queries"']
+        repeated = self.repeated(threshold)
+        if repeated:
+            entries.append(f'db-n-plus-one;desc="{len(repeated)} padroes, max {repeated[0][1]}x"')
+        if self.slow:
+            entries.append(f'db-slow;dur={max(query.duration_ms for query in self.slow):.1f};desc="{len(self.slow)} lentas"')
+        return ", ".join(entries)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def start_request_stats() -> Tuple[QueryStats, Any]:
+    """Inicia a contagem do request atual; devolve (stats, token para ``reset``)"""
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token: Any):
+    _current_stats.reset(token)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# ==================== LISTENERS ====================
+
+EXPLAIN_SAVEPOINT = "sql_monitoring_explain"
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    Plano estimado (sem executar) na mesma conexão da consulta.
+
+    Roda dentro de um SAVEPOINT: no PostgreSQL um EXPLAIN com erro abortaria
+    a transação do request e as consultas seguintes dele falhariam.
+    """
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(str(row[0]) for row in cursor.fetchall())
+            except Exception:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                raise
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return plan
+        finally:
+            cursor.close()
+    except Exception as e:
+        logger.debug(f"EXPLAIN indisponível para consulta lenta: {e}")
+        return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    slow = None
+    if duration_ms >= settings.SQL_SLOW_QUERY_MS:
+        plan = None
+        is_select = statement.lstrip()[:6].upper() in ("SELECT", "WITH")
+        if is_select and not executemany and random.random() < settings.SQL_EXPLAIN_SAMPLE_RATE:
+            plan = _explain(conn, statement, parameters)
+        slow = SlowQuery(statement=statement, duration_ms=duration_ms, plan=plan)
+        logger.warning(
+            f"Consulta lenta ({duration_ms:.1f} ms): {statement_shape(statement)[:_STATEMENT_PREVIEW]}"
+            + (f"\n{plan}" if plan else "")
+        )
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms, slow)
+
+
+def _handle_error(exception_context):
+    # A consulta falhou: descarta o início registrado para não desalinhar a pilha
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+_installed = False
+
+
+def install_sql_instrumentation():
+    """Registra os listeners em todas as engines (uma vez por processo)"""
+    global _installed
+    if _installed or not settings.SQL_INSTRUMENTATION_ENABLED:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
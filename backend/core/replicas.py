@@ -0,0 +1,269 @@
+"""
+Roteamento de leituras para réplicas do PostgreSQL.
+
+Rotas somente leitura (listagens, detalhes e dashboards) recebem a sessão por
+``get_read_db`` / ``get_async_read_db``; escritas continuam em ``get_db`` /
+``get_async_db`` (primário). Regras de escolha:
+
+- sem réplicas configuradas (``DATABASE_REPLICA_URLS`` vazio) tudo vai ao primário;
+- cada worker mede o atraso de replicação a cada ``REPLICA_LAG_CHECK_SECONDS``;
+  réplicas com atraso acima de ``REPLICA_MAX_LAG_SECONDS``, com erro ou sem
+  medição recente ficam fora do rodízio até se recuperarem;
+- read-your-writes: depois de uma escrita bem-sucedida (``ReadYourWritesMiddleware``)
+  as leituras do cliente também vão ao primário até o fim da janela, que vale
+  para o usuário/tenant do token Bearer (mapa por worker), para o cookie
+  ``rw_until`` (navegador) e para o header ``X-Read-Your-Writes-Until``, que
+  clientes sem cookies (app mobile, integrações) podem reenviar para que a
+  janela valha também em outros workers.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import POOL_OPTIONS, AsyncSessionLocal, SessionLocal, engine, to_async_url
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_COOKIE = "rw_until"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes-Until"
+PRIMARY = "primary"
+
+# Atraso em segundos; 0 quando a réplica já aplicou tudo o que recebeu de um
+# primário conectado (sem escritas novas o timestamp do último replay envelhece
+# sem que haja atraso real). Em um servidor primário também retorna 0.
+REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE COALESCE(
+            CAST(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS double precision),
+            CAST('Infinity' AS double precision)
+        )
+    END
+""")
+
+
+# ==================== READ-YOUR-WRITES ====================
+
+def token_identity(authorization: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(usuário, tenant) de um header ``Authorization: Bearer`` com token válido"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=["HS256"])
+    except jwt.PyJWTError:
+        return None
+    if not payload.get("sub"):
+        return None
+    return str(payload["sub"]), str(payload.get("tenant_id") or "")
+
+
+class WriteWindows:
+    """Fim da janela read-your-writes por (usuário, tenant), em memória do worker"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._until: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, identity: Tuple[str, str], until: float):
+        with self._lock:
+            if len(self._until) >= self.max_size:
+                now = time.time()
+                self._until = {key: value for key, value in self._until.items() if value > now}
+            self._until[identity] = max(until, self._until.get(identity, 0))
+
+    def until(self, identity: Tuple[str, str]) -> float:
+        return self._until.get(identity, 0)
+
+    def __bool__(self) -> bool:
+        return bool(self._until)
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+
+write_windows = WriteWindows()
+
+
+def _parse_until(value: Optional[str]) -> float:
+    try:
+        return float(value or 0)
+    except ValueError:
+        return 0
+
+
+def recently_wrote(request: Request, now: Optional[float] = None) -> bool:
+    """O cliente (cookie, header reenviado ou usuário do token) escreveu há menos de ``READ_YOUR_WRITES_SECONDS``"""
+    now = now if now is not None else time.time()
+    # Valores enviados pelo cliente nunca prendem as leituras no primário além de uma janela
+    limit = now + settings.READ_YOUR_WRITES_SECONDS
+    for value in (request.cookies.get(READ_YOUR_WRITES_COOKIE), request.headers.get(READ_YOUR_WRITES_HEADER)):
+        if now < _parse_until(value) <= limit:
+            return True
+    if write_windows:
+        identity = token_identity(request.headers.get("authorization"))
+        if identity is not None and write_windows.until(identity) > now:
+            return True
+    return False
+
+
+class Replica:
+    """Engines (síncrona e asyncpg) de uma réplica e o último atraso medido"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, echo=engine.echo, **POOL_OPTIONS)
+        self.async_engine = create_async_engine(to_async_url(url), echo=engine.echo, **POOL_OPTIONS)
+        self.lag_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    def check_lag(self) -> Optional[float]:
+        try:
+            with self.engine.connect() as connection:
+                self.lag_seconds = float(connection.execute(REPLICATION_LAG_SQL).scalar())
+            self.error = None
+        except Exception as e:
+            self.lag_seconds, self.error = None, str(e)[:200]
+        self.checked_at = time.monotonic()
+        return self.lag_seconds
+
+    def is_healthy(self, max_lag_seconds: float, max_age_seconds: float) -> bool:
+        if self.lag_seconds is None or self.checked_at is None:
+            return False
+        # Medição antiga (verificação travada) não garante nada sobre o atraso atual
+        if time.monotonic() - self.checked_at > max_age_seconds:
+            return False
+        return self.lag_seconds <= max_lag_seconds
+
+
+class ReplicaRouter:
+    """Escolhe entre as réplicas saudáveis (rodízio) ou o primário"""
+
+    def __init__(self, urls: List[str], max_lag_seconds: float = 5, check_interval_seconds: float = 5):
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls, 1)]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._round_robin = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    async def start(self):
+        if self.replicas and self._task is None:
+            await asyncio.to_thread(self.check_all)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Roteamento de leitura iniciado com {len(self.replicas)} réplica(s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            try:
+                await asyncio.to_thread(self.check_all)
+            except Exception as e:
+                logger.warning(f"Falha ao medir atraso das réplicas: {e}")
+
+    def check_all(self):
+        for replica in self.replicas:
+            was_healthy = replica.is_healthy(self.max_lag_seconds, self._max_check_age)
+            replica.check_lag()
+            if was_healthy and not replica.is_healthy(self.max_lag_seconds, self._max_check_age):
+                logger.warning(
+                    f"Réplica {replica.name} fora do rodízio "
+                    f"(atraso={replica.lag_seconds}, erro={replica.error})"
+                )
+
+    @property
+    def _max_check_age(self) -> float:
+        return self.check_interval_seconds * 3
+
+    # ==================== ESCOLHA ====================
+
+    def choose(self, request: Optional[Request] = None) -> Optional[Replica]:
+        """Réplica para a leitura, ou ``None`` quando ela deve ir ao primário"""
+        if request is not None and recently_wrote(request):
+            return None
+        healthy = [
+            replica for replica in self.replicas
+            if replica.is_healthy(self.max_lag_seconds, self._max_check_age)
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def session(self, request: Optional[Request] = None) -> Session:
+        replica = self._choose_for(request)
+        return SessionLocal(bind=replica.engine) if replica else SessionLocal()
+
+    def async_session(self, request: Optional[Request] = None) -> AsyncSession:
+        replica = self._choose_for(request)
+        return AsyncSessionLocal(bind=replica.async_engine) if replica else AsyncSessionLocal()
+
+    def _choose_for(self, request: Optional[Request]) -> Optional[Replica]:
+        replica = self.choose(request)
+        if request is not None:
+            request.state.db_target = replica.name if replica else PRIMARY
+        return replica
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.is_healthy(self.max_lag_seconds, self._max_check_age),
+                "lag_seconds": (
+                    round(replica.lag_seconds, 3)
+                    if replica.lag_seconds is not None and math.isfinite(replica.lag_seconds) else None
+                ),
+                "error": replica.error
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+
+# ==================== DEPENDÊNCIAS ====================
+
+def get_read_db(request: Request):
+    """Sessão síncrona para rotas somente leitura (réplica ou primário)"""
+    db = replica_router.session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """``AsyncSession`` para rotas somente leitura (réplica ou primário)"""
+    async with replica_router.async_session(request) as db:
+        yield db
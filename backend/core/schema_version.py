@@ -0,0 +1,98 @@
+"""
+Verificação da revisão do schema na inicialização (substitui ``create_all``).
+
+O schema é responsabilidade das migrações (``alembic upgrade head``, executado
+no deploy, antes de subir os workers). No boot, cada worker só compara a
+revisão gravada em ``alembic_version`` com as heads de ``migrations/versions``:
+uma consulta, sem DDL nem locks.
+
+As heads são lidas com ``ast`` (sem importar o alembic nem executar os
+arquivos de migração), o que mantém o boot rápido.
+"""
+import ast
+import logging
+import os
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations", "versions")
+
+
+class SchemaVersionError(RuntimeError):
+    """Banco em revisão diferente das heads das migrações"""
+
+
+def _as_set(value) -> Set[str]:
+    if value is None:
+        return set()
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def _revision_identifiers(path: str):
+    """(revision, down_revision) declarados no topo do arquivo de migração"""
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename=path)
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            name, value = node.target.id, node.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name, value = node.targets[0].id, node.value
+        else:
+            continue
+        if name in ("revision", "down_revision") and value is not None:
+            values[name] = ast.literal_eval(value)
+    return values.get("revision"), values.get("down_revision")
+
+
+def migration_heads(versions_dir: str = VERSIONS_DIR) -> Set[str]:
+    """Revisões que nenhuma outra migração tem como ``down_revision``"""
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for filename in os.listdir(versions_dir):
+        if not filename.endswith(".py"):
+            continue
+        revision, down_revision = _revision_identifiers(os.path.join(versions_dir, filename))
+        if revision:
+            revisions.add(revision)
+            parents |= _as_set(down_revision)
+    return revisions - parents
+
+
+def database_revisions(engine: Engine) -> Set[str]:
+    with engine.connect() as connection:
+        exists = connection.execute(text("SELECT to_regclass('alembic_version')")).scalar()
+        if not exists:
+            return set()
+        return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+
+def check_schema_version(engine: Engine, strict: Optional[bool] = None, heads: Optional[Iterable[str]] = None) -> bool:
+    """
+    Confere se o banco está nas heads das migrações.
+
+    Retorna ``True`` quando está; caso contrário registra o erro e, em modo
+    estrito (``SCHEMA_CHECK_STRICT``), levanta ``SchemaVersionError``.
+    """
+    strict = settings.SCHEMA_CHECK_STRICT if strict is None else strict
+    expected = set(heads) if heads is not None else migration_heads()
+    current = database_revisions(engine)
+    if current == expected:
+        return True
+
+    message = (
+        f"Schema do banco na revisão {sorted(current) or 'nenhuma'}, esperado {sorted(expected)}: "
+        f"execute 'alembic upgrade head'"
+    )
+    if strict:
+        raise SchemaVersionError(message)
+    logger.error(message)
+    return False
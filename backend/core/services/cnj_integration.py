@@ -1,6 +1,5 @@
 import re
 import json
-import requests
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
@@ -84,6 +83,13 @@ class CNJIntegrationService:
     
     def extrair_tribunal(self, numero_processo: str) -> tuple[str, str]:
         """Extrai informações do tribunal a partir do número do processo"""
+        alias = self.resolver_alias_tribunal(numero_processo)
+        url = f"{self.base_url}/api_publica_{alias}/_search"
+        return alias, url
+    
+    @classmethod
+    def resolver_alias_tribunal(cls, numero_processo: str) -> str:
+        """Resolve o alias do tribunal (ex.: 'tjsp') a partir do número CNJ"""
         numero_limpo = re.sub(r'\D', '', numero_processo)
         
         if len(numero_limpo) != 20:
@@ -104,14 +110,13 @@ class CNJIntegrationService:
         if justica == '4' and tribunal == '01':
             chave = '5.01'
 
-        alias = self.TRIBUNAIS_MAPA.get(chave)
+        alias = cls.TRIBUNAIS_MAPA.get(chave)
         if not alias:
-            alias = self.TRIBUNAIS_MAPA.get(justica)
+            alias = cls.TRIBUNAIS_MAPA.get(justica)
         if not alias:
             raise ValueError(f"Tribunal não encontrado para o código '{chave}'.")
 
-        url = f"{self.base_url}/api_publica_{alias}/_search"
-        return alias, url
+        return alias
     
     def consultar_processo(self, numero_processo: str) -> Dict[str, Any]:
         """Consulta o processo na API DataJud e retorna os dados"""
@@ -132,6 +137,9 @@ class CNJIntegrationService:
                 'Content-Type': 'application/json'
             }
 
+            # Importado no primeiro uso: fora do caminho de inicialização dos workers
+            import requests
+
             response = requests.post(url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
@@ -271,6 +279,16 @@ class CNJIntegrationService:
             nome = parte_principal.get('nome', 'Cliente Importado do CNJ')
             documento = parte_principal.get('documento')
             
+            # CPF/CNPJ é único por tenant: reutiliza o cliente já cadastrado
+            digitos = re.sub(r'\D', '', documento or '')
+            if digitos:
+                existente = self.db.query(Client).filter(
+                    Client.tenant_id == tenant_id,
+                    Client.cpf_cnpj_normalized == digitos
+                ).first()
+                if existente:
+                    return existente
+            
             cliente = Client(
                 id=uuid.uuid4(),
                 tenant_id=tenant_id,
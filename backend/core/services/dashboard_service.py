@@ -1,65 +1,89 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc, asc, func
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
+from core.config import settings
 from core.models.process import Process, ProcessDeadline, ProcessTimeline, ProcessLawyer
 from core.models.client import Client
 from core.models.user import User
 from core.models.notification import ProcessNotification
+from core.services.notification_service import recent_notifications_filter
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# (nome da seção, função que recebe a sessão da seção)
+Section = Tuple[str, Callable[[Session], Any]]
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Formata os tempos por seção (ms) para o cabeçalho Server-Timing"""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
+
 class DashboardService:
     """Serviço de dashboard inteligente para advogados"""
     
     def __init__(self, db: Session):
         self.db = db
+        # Tempo (ms) de cada seção da última montagem, para o cabeçalho Server-Timing
+        self.timings: Dict[str, float] = {}
+    
+    # ==================== EXECUÇÃO CONCORRENTE ====================
+    
+    async def _run_sections(self, sections: List[Section]) -> Dict[str, Any]:
+        """
+        Executa as seções em paralelo, cada uma em uma thread com sessão própria.
+        
+        As seções são independentes entre si; cada sessão usa uma conexão do
+        mesmo pool do request e é fechada ao fim da seção. No máximo
+        DASHBOARD_SECTION_CONCURRENCY seções rodam ao mesmo tempo, para que um
+        request não ocupe uma conexão por seção.
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, settings.DASHBOARD_SECTION_CONCURRENCY))
+        
+        async def run(name: str, load: Callable[[Session], Any]) -> Tuple[str, Any, float]:
+            async with semaphore:
+                return await asyncio.to_thread(self._run_section, name, load)
+        
+        results = await asyncio.gather(*[run(name, load) for name, load in sections])
+        self.timings = {name: duration for name, _, duration in results}
+        self.timings["total"] = (time.perf_counter() - started) * 1000
+        return {name: value for name, value, _ in results}
+    
+    def _run_section(self, name: str, load: Callable[[Session], Any]) -> Tuple[str, Any, float]:
+        started = time.perf_counter()
+        db = Session(bind=self.db.get_bind())
+        try:
+            return name, load(db), (time.perf_counter() - started) * 1000
+        finally:
+            db.close()
     
     # ==================== DASHBOARD GERAL ====================
     
     async def get_lawyer_dashboard(self, user_id: str, tenant_id: str) -> Dict[str, Any]:
         """Retorna dashboard completo para o advogado"""
         
-        today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-        
-        # Processos urgentes
-        urgent_processes = await self._get_urgent_processes(user_id, tenant_id)
-        
-        # Prazos críticos
-        critical_deadlines = await self._get_critical_deadlines(user_id, tenant_id)
-        
-        # Atualizações recentes
-        recent_updates = await self._get_recent_updates(user_id, tenant_id)
-        
-        # Estatísticas gerais
-        stats = await self._get_process_stats(user_id, tenant_id)
-        
-        # Notificações não lidas
-        unread_notifications = await self._get_unread_notifications(user_id, tenant_id)
-        
-        # Próximas audiências
-        upcoming_hearings = await self._get_upcoming_hearings(user_id, tenant_id)
-        
-        return {
-            "urgent_processes": urgent_processes,
-            "critical_deadlines": critical_deadlines,
-            "recent_updates": recent_updates,
-            "stats": stats,
-            "unread_notifications": unread_notifications,
-            "upcoming_hearings": upcoming_hearings,
-            "last_updated": datetime.now().isoformat()
-        }
+        dashboard = await self._run_sections([
+            ("urgent_processes", lambda db: self._get_urgent_processes(db, user_id, tenant_id)),
+            ("critical_deadlines", lambda db: self._get_critical_deadlines(db, user_id, tenant_id)),
+            ("recent_updates", lambda db: self._get_recent_updates(db, user_id, tenant_id)),
+            ("stats", lambda db: self._get_process_stats(db, user_id, tenant_id)),
+            ("unread_notifications", lambda db: self._get_unread_notifications(db, user_id, tenant_id)),
+            ("upcoming_hearings", lambda db: self._get_upcoming_hearings(db, user_id, tenant_id)),
+        ])
+        dashboard["last_updated"] = datetime.now().isoformat()
+        return dashboard
     
     # ==================== PROCESSOS URGENTES ====================
     
-    async def _get_urgent_processes(self, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    def _get_urgent_processes(self, db: Session, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
         """Busca processos urgentes do advogado"""
         
-        urgent_processes = self.db.query(Process).join(ProcessLawyer).filter(
+        urgent_processes = db.query(Process).join(ProcessLawyer).options(
+            joinedload(Process.client)
+        ).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessLawyer.lawyer_id == user_id,
@@ -71,17 +95,23 @@ class DashboardService:
             )
         ).order_by(desc(Process.updated_at)).limit(10).all()
         
-        return [self._format_process_summary(process) for process in urgent_processes]
+        deadline_counts, update_counts = self._prefetch_process_counts(db, [process.id for process in urgent_processes])
+        return [
+            self._format_process_summary(process, deadline_counts.get(process.id, 0), update_counts.get(process.id, 0))
+            for process in urgent_processes
+        ]
     
     # ==================== PRAZOS CRÍTICOS ====================
     
-    async def _get_critical_deadlines(self, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    def _get_critical_deadlines(self, db: Session, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
         """Busca prazos críticos do advogado"""
         
         today = datetime.now().date()
         next_week = today + timedelta(days=7)
         
-        critical_deadlines = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
+        critical_deadlines = db.query(ProcessDeadline).join(Process).join(ProcessLawyer).options(
+            joinedload(ProcessDeadline.process)
+        ).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessLawyer.lawyer_id == user_id,
@@ -95,12 +125,14 @@ class DashboardService:
     
     # ==================== ATUALIZAÇÕES RECENTES ====================
     
-    async def _get_recent_updates(self, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    def _get_recent_updates(self, db: Session, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
         """Busca atualizações recentes dos processos do advogado"""
         
         week_ago = datetime.now() - timedelta(days=7)
         
-        recent_updates = self.db.query(ProcessTimeline).join(Process).join(ProcessLawyer).filter(
+        recent_updates = db.query(ProcessTimeline).join(Process).join(ProcessLawyer).options(
+            joinedload(ProcessTimeline.process)
+        ).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessLawyer.lawyer_id == user_id,
@@ -112,60 +144,46 @@ class DashboardService:
     
     # ==================== ESTATÍSTICAS ====================
     
-    async def _get_process_stats(self, user_id: str, tenant_id: str) -> Dict[str, Any]:
-        """Calcula estatísticas dos processos do advogado"""
-        
-        # Total de processos ativos
-        total_active = self.db.query(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id,
-                Process.status == "active"
-            )
-        ).count()
-        
-        # Processos urgentes
-        urgent_count = self.db.query(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id,
-                Process.requires_attention == True,
-                Process.status == "active"
-            )
-        ).count()
-        
-        # Prazos vencendo hoje
-        today = datetime.now().date()
-        deadlines_today = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id,
-                ProcessDeadline.due_date == today,
-                ProcessDeadline.status == "pending"
-            )
-        ).count()
+    def _get_process_stats(self, db: Session, user_id: str, tenant_id: str) -> Dict[str, Any]:
+        """Calcula estatísticas dos processos do advogado (uma consulta por tabela)"""
         
-        # Prazos vencendo esta semana
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow = today + timedelta(days=1)
         next_week = today + timedelta(days=7)
-        deadlines_week = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id,
-                ProcessDeadline.due_date >= today,
-                ProcessDeadline.due_date <= next_week,
-                ProcessDeadline.status == "pending"
-            )
-        ).count()
+        week_ago = datetime.now() - timedelta(days=7)
+        
+        # Processos ativos e urgentes
+        processes = db.query(
+            func.count(Process.id).filter(Process.status == "active"),
+            func.count(Process.id).filter(Process.status == "active", Process.requires_attention == True)
+        ).join(ProcessLawyer).filter(
+            Process.tenant_id == tenant_id,
+            ProcessLawyer.lawyer_id == user_id
+        ).one()
+        
+        # Prazos de hoje, da semana e taxa de conclusão
+        pending = ProcessDeadline.status == "pending"
+        deadlines = db.query(
+            func.count(ProcessDeadline.id).filter(pending, ProcessDeadline.due_date >= today, ProcessDeadline.due_date < tomorrow),
+            func.count(ProcessDeadline.id).filter(pending, ProcessDeadline.due_date >= today, ProcessDeadline.due_date <= next_week),
+            func.count(ProcessDeadline.id).filter(ProcessDeadline.status == "completed"),
+            func.count(ProcessDeadline.id)
+        ).join(Process).join(ProcessLawyer).filter(
+            Process.tenant_id == tenant_id,
+            ProcessLawyer.lawyer_id == user_id
+        ).one()
         
         # Novos andamentos esta semana
-        week_ago = datetime.now() - timedelta(days=7)
-        new_updates = self.db.query(ProcessTimeline).join(Process).join(ProcessLawyer).filter(
+        new_updates = db.query(func.count(ProcessTimeline.id)).join(Process).join(ProcessLawyer).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessLawyer.lawyer_id == user_id,
                 ProcessTimeline.created_at >= week_ago
             )
-        ).count()
+        ).scalar()
+        
+        total_active, urgent_count = processes
+        deadlines_today, deadlines_week, completed_deadlines, total_deadlines = deadlines
         
         return {
             "total_active_processes": total_active,
@@ -173,34 +191,49 @@ class DashboardService:
             "deadlines_today": deadlines_today,
             "deadlines_this_week": deadlines_week,
             "new_updates_this_week": new_updates,
-            "completion_rate": self._calculate_completion_rate(user_id, tenant_id)
+            "completion_rate": self._calculate_completion_rate(completed_deadlines, total_deadlines)
         }
     
     # ==================== NOTIFICAÇÕES ====================
     
-    async def _get_unread_notifications(self, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    def _get_unread_notifications(self, db: Session, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
         """Busca notificações não lidas"""
         
-        unread_notifications = self.db.query(ProcessNotification).filter(
+        unread_notifications = db.query(ProcessNotification).filter(
             and_(
                 ProcessNotification.user_id == user_id,
                 ProcessNotification.tenant_id == tenant_id,
                 ProcessNotification.is_read == False,
-                ProcessNotification.is_archived == False
+                ProcessNotification.is_archived == False,
+                recent_notifications_filter()
             )
         ).order_by(desc(ProcessNotification.created_at)).limit(10).all()
         
         return [notification.to_dict() for notification in unread_notifications]
     
+    def _count_unread_notifications(self, db: Session, user_id: str, tenant_id: str) -> int:
+        """Conta todas as notificações não lidas (sem o limite e sem a janela recente da listagem)"""
+        
+        return db.query(func.count(ProcessNotification.id)).filter(
+            and_(
+                ProcessNotification.user_id == user_id,
+                ProcessNotification.tenant_id == tenant_id,
+                ProcessNotification.is_read == False,
+                ProcessNotification.is_archived == False
+            )
+        ).scalar() or 0
+    
     # ==================== AUDIÊNCIAS ====================
     
-    async def _get_upcoming_hearings(self, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    def _get_upcoming_hearings(self, db: Session, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
         """Busca próximas audiências"""
         
         today = datetime.now()
         next_month = today + timedelta(days=30)
         
-        upcoming_hearings = self.db.query(ProcessTimeline).join(Process).join(ProcessLawyer).filter(
+        upcoming_hearings = db.query(ProcessTimeline).join(Process).join(ProcessLawyer).options(
+            joinedload(ProcessTimeline.process)
+        ).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessLawyer.lawyer_id == user_id,
@@ -214,8 +247,24 @@ class DashboardService:
     
     # ==================== FUNÇÕES AUXILIARES ====================
     
-    def _format_process_summary(self, process: Process) -> Dict[str, Any]:
-        """Formata resumo do processo"""
+    def _prefetch_process_counts(self, db: Session, process_ids: List[Any]) -> Tuple[Dict[Any, int], Dict[Any, int]]:
+        """Prazos pendentes e andamentos recentes de vários processos (duas consultas agrupadas)"""
+        if not process_ids:
+            return {}, {}
+        
+        week_ago = datetime.now() - timedelta(days=7)
+        deadline_counts = dict(db.query(ProcessDeadline.process_id, func.count(ProcessDeadline.id)).filter(
+            ProcessDeadline.process_id.in_(process_ids),
+            ProcessDeadline.status == "pending"
+        ).group_by(ProcessDeadline.process_id).all())
+        update_counts = dict(db.query(ProcessTimeline.process_id, func.count(ProcessTimeline.id)).filter(
+            ProcessTimeline.process_id.in_(process_ids),
+            ProcessTimeline.created_at >= week_ago
+        ).group_by(ProcessTimeline.process_id).all())
+        return deadline_counts, update_counts
+    
+    def _format_process_summary(self, process: Process, deadlines_count: int, recent_updates_count: int) -> Dict[str, Any]:
+        """Formata resumo do processo (contagens pré-carregadas)"""
         return {
             "id": str(process.id),
             "cnj_number": process.cnj_number,
@@ -225,13 +274,13 @@ class DashboardService:
             "status": process.status,
             "client_name": process.client.name if process.client else None,
             "last_updated": process.updated_at.isoformat() if process.updated_at else None,
-            "deadlines_count": self._count_process_deadlines(process.id),
-            "recent_updates_count": self._count_recent_updates(process.id)
+            "deadlines_count": deadlines_count,
+            "recent_updates_count": recent_updates_count
         }
     
     def _format_deadline_summary(self, deadline: ProcessDeadline) -> Dict[str, Any]:
         """Formata resumo do prazo"""
-        days_until = (deadline.due_date - datetime.now().date()).days
+        days_until = (deadline.due_date.date() - datetime.now().date()).days
         
         return {
             "id": str(deadline.id),
@@ -272,45 +321,8 @@ class DashboardService:
             "jurisdiction": hearing.process.jurisdiction
         }
     
-    def _count_process_deadlines(self, process_id: str) -> int:
-        """Conta prazos pendentes do processo"""
-        return self.db.query(ProcessDeadline).filter(
-            and_(
-                ProcessDeadline.process_id == process_id,
-                ProcessDeadline.status == "pending"
-            )
-        ).count()
-    
-    def _count_recent_updates(self, process_id: str) -> int:
-        """Conta atualizações recentes do processo"""
-        week_ago = datetime.now() - timedelta(days=7)
-        return self.db.query(ProcessTimeline).filter(
-            and_(
-                ProcessTimeline.process_id == process_id,
-                ProcessTimeline.created_at >= week_ago
-            )
-        ).count()
-    
-    def _calculate_completion_rate(self, user_id: str, tenant_id: str) -> float:
+    def _calculate_completion_rate(self, completed_deadlines: int, total_deadlines: int) -> float:
         """Calcula taxa de conclusão de prazos"""
-        
-        # Total de prazos completados
-        completed_deadlines = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id,
-                ProcessDeadline.status == "completed"
-            )
-        ).count()
-        
-        # Total de prazos
-        total_deadlines = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessLawyer.lawyer_id == user_id
-            )
-        ).count()
-        
         if total_deadlines == 0:
             return 100.0
         
@@ -322,17 +334,20 @@ class DashboardService:
         """Retorna dashboard otimizado para mobile"""
         
         # Dados essenciais para mobile
-        urgent_processes = await self._get_urgent_processes(user_id, tenant_id)
-        critical_deadlines = await self._get_critical_deadlines(user_id, tenant_id)
-        unread_count = len(await self._get_unread_notifications(user_id, tenant_id))
+        sections = await self._run_sections([
+            ("urgent_processes", lambda db: self._get_urgent_processes(db, user_id, tenant_id)),
+            ("critical_deadlines", lambda db: self._get_critical_deadlines(db, user_id, tenant_id)),
+            ("unread_notifications_count", lambda db: self._count_unread_notifications(db, user_id, tenant_id)),
+            ("stats", lambda db: self._get_process_stats(db, user_id, tenant_id)),
+        ])
         
         # Estatísticas simplificadas
-        stats = await self._get_process_stats(user_id, tenant_id)
+        stats = sections["stats"]
         
         return {
-            "urgent_processes_count": len(urgent_processes),
-            "critical_deadlines_count": len(critical_deadlines),
-            "unread_notifications_count": unread_count,
+            "urgent_processes_count": len(sections["urgent_processes"]),
+            "critical_deadlines_count": len(sections["critical_deadlines"]),
+            "unread_notifications_count": sections["unread_notifications_count"],
             "stats": {
                 "active_processes": stats["total_active_processes"],
                 "deadlines_today": stats["deadlines_today"],
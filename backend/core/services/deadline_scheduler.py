@@ -0,0 +1,616 @@
+"""
+Agendador de prazos em processo.
+
+Mantém uma fila de prioridade (heap) com os próximos eventos conhecidos:
+lembretes de prazo, transição de prazos para ``overdue``, expiração de
+permissões temporárias, resumos e manutenção das partições. Os eventos são recarregados do banco na partida e
+periodicamente (janela ``SCHEDULER_HORIZON_HOURS``), e apenas um worker
+agenda por vez, eleito via ``pg_try_advisory_lock``.
+
+Prazos alterados em outro worker chegam ao líder por uma mensagem de
+controle no canal do hub de notificações (``announce_deadline_change``), que
+antecipa a recarga da janela.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal, engine
+from core.services.notification_hub import notification_hub
+
+logger = logging.getLogger(__name__)
+
+# (fire_at, kind, key, payload)
+JobSpec = Tuple[datetime, str, str, Dict[str, Any]]
+JobHandler = Callable[[Session, List["ScheduledJob"]], None]
+JobLoader = Callable[[Session, datetime, datetime], Iterable[JobSpec]]
+
+_RETRY_DELAY = timedelta(seconds=60)
+_PARTITION_MAINTENANCE_TIME = time(hour=0, minute=30)
+_METRICS_RECONCILE_TIME = time(hour=2)
+DEADLINES_CHANGED = "deadlines.changed"
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """Evento agendado; a ordenação do heap usa apenas (fire_at, seq)"""
+    fire_at: datetime
+    seq: int
+    kind: str = field(compare=False)
+    key: str = field(compare=False)
+    payload: Dict[str, Any] = field(compare=False, default_factory=dict)
+
+
+class DeadlineScheduler:
+    """Agendador baseado em heap com cancelamento preguiçoso e eleição de líder"""
+
+    def __init__(
+        self,
+        horizon_hours: int = 48,
+        refresh_seconds: int = 60,
+        reminder_hour: int = 8,
+        digest_hour: int = 7,
+        weekly_digest_weekday: int = 0,
+        lock_key: int = 727401,
+        session_factory=SessionLocal,
+    ):
+        self.horizon = timedelta(hours=horizon_hours)
+        self.refresh_seconds = refresh_seconds
+        self.reminder_hour = reminder_hour
+        self.digest_hour = digest_hour
+        self.weekly_digest_weekday = weekly_digest_weekday
+        self.lock_key = lock_key
+        self.session_factory = session_factory
+
+        self._heap: List[ScheduledJob] = []
+        self._entries: Dict[str, ScheduledJob] = {}
+        self._fired: Dict[str, datetime] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._loaders: List[JobLoader] = []
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._is_leader = False
+        self._lock_connection = None
+        self._next_refresh: Optional[datetime] = None
+
+        self.register_handler("overdue", _handle_overdue)
+        self.register_handler("reminder", _handle_reminders)
+        self.register_handler("permissions", _handle_permission_expiry)
+        self.register_handler("digest", _handle_digests)
+        self.register_handler("partitions", _handle_partitions)
+        self.register_handler("metrics", _handle_metrics)
+        self.register_handler("superadmin_stats", _handle_superadmin_stats)
+        self.register_loader(_load_overdue_jobs)
+        self.register_loader(self._load_reminder_jobs)
+        self.register_loader(_load_permission_jobs)
+        self.register_loader(self._load_digest_jobs)
+        self.register_loader(_load_partition_jobs)
+        self.register_loader(_load_metrics_jobs)
+        self.register_loader(_load_superadmin_stats_jobs)
+
+    # ==================== EXTENSÃO ====================
+
+    def register_handler(self, kind: str, handler: JobHandler):
+        """Registra o executor de um tipo de evento (recebe todos os eventos vencidos do tipo)"""
+        self._handlers[kind] = handler
+
+    def register_loader(self, loader: JobLoader):
+        """Registra uma função que recarrega eventos do banco dentro da janela"""
+        self._loaders.append(loader)
+
+    # ==================== CICLO DE VIDA ====================
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    async def start(self):
+        """Inicia o loop do agendador"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        notification_hub.register_control(DEADLINES_CHANGED, self._on_deadlines_changed)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra o loop e libera a liderança"""
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._release_leadership)
+
+    # ==================== AGENDAMENTO ====================
+
+    def schedule(self, fire_at: datetime, kind: str, key: str, payload: Optional[Dict[str, Any]] = None):
+        """Agenda (ou reagenda) um evento; a chave identifica o evento de forma única"""
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.fire_at == fire_at:
+                return
+            job = ScheduledJob(fire_at, next(self._seq), kind, key, payload or {})
+            self._entries[key] = job
+            heapq.heappush(self._heap, job)
+        self._notify()
+
+    def cancel(self, key: str):
+        """Cancela um evento (a entrada no heap é descartada quando chegar ao topo)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pending_jobs(self) -> int:
+        return len(self._entries)
+
+    def track_deadline(self, deadline, tenant_id: Any):
+        """Agenda vencimento e lembrete de um prazo recém-criado/alterado"""
+        if not self._is_leader or deadline.status != "pending":
+            return
+
+        now = datetime.now()
+        if deadline.due_date <= now + self.horizon:
+            self.schedule(deadline.due_date, "overdue", f"overdue:{deadline.id}", {"deadline_id": str(deadline.id)})
+
+        window = deadline.notify_days_before if deadline.notify_days_before is not None else 3
+        if now.date() <= deadline.due_date.date() <= now.date() + timedelta(days=window):
+            self.schedule(now, "reminder", f"reminder:{tenant_id}:{now.date().isoformat()}", {"tenant_id": str(tenant_id)})
+
+    def untrack_deadline(self, deadline_id: Any):
+        """Remove eventos de um prazo concluído/removido"""
+        self.cancel(f"overdue:{deadline_id}")
+
+    async def announce_deadline_change(self, db, deadline_id: Any):
+        """
+        Avisa o líder de que um prazo mudou (chamar antes do commit, na mesma sessão).
+
+        No líder ``track_deadline``/``untrack_deadline`` bastam; nos demais
+        workers o aviso (pg_notify, entregue no commit) faz o líder recarregar
+        a janela na hora, sem esperar ``SCHEDULER_REFRESH_SECONDS``.
+        """
+        if self._is_leader or not notification_hub.cluster_enabled:
+            return
+        statement, params = notification_hub.control_notify(DEADLINES_CHANGED, {"deadline_id": str(deadline_id)})
+        await db.execute(statement, params)
+
+    def _on_deadlines_changed(self, data: Dict[str, Any]):
+        """Mensagem de controle de outro worker: antecipa a recarga da janela"""
+        if not self._is_leader:
+            return
+        # Concluído/removido: sai da fila; se ainda pendente, a recarga agenda de novo
+        if data.get("deadline_id"):
+            self.untrack_deadline(data["deadline_id"])
+        self._next_refresh = None
+        self._notify()
+
+    def _notify(self):
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _pop_due(self, now: datetime) -> List[ScheduledJob]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0].fire_at <= now:
+                job = heapq.heappop(self._heap)
+                if self._entries.get(job.key) is job:
+                    del self._entries[job.key]
+                    self._fired[job.key] = job.fire_at
+                    due.append(job)
+        return due
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        candidates = []
+        with self._lock:
+            # Descarta entradas canceladas no topo para não acordar à toa
+            while self._heap and self._entries.get(self._heap[0].key) is not self._heap[0]:
+                heapq.heappop(self._heap)
+            if self._heap:
+                candidates.append(self._heap[0].fire_at)
+        if self._next_refresh:
+            candidates.append(self._next_refresh)
+        if not candidates:
+            return float(self.refresh_seconds)
+        return max(0.0, (min(candidates) - now).total_seconds())
+
+    def _clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._entries.clear()
+            self._fired.clear()
+
+    # ==================== LOOP PRINCIPAL ====================
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                if not self._is_leader:
+                    self._is_leader = await asyncio.to_thread(self._try_acquire_leadership)
+                    if not self._is_leader:
+                        await self._sleep(self.refresh_seconds)
+                        continue
+                    logger.info("Agendador de prazos: este worker assumiu a liderança")
+                    self._next_refresh = None
+
+                now = datetime.now()
+                if self._next_refresh is None or now >= self._next_refresh:
+                    if not await asyncio.to_thread(self._check_leadership):
+                        logger.warning("Agendador de prazos: liderança perdida")
+                        self._is_leader = False
+                        self._clear()
+                        continue
+                    await asyncio.to_thread(self._rehydrate, now)
+                    self._next_refresh = now + timedelta(seconds=self.refresh_seconds)
+
+                due = self._pop_due(datetime.now())
+                if due:
+                    await self._execute(due)
+
+                await self._sleep(self._seconds_until_next(datetime.now()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Erro no agendador de prazos: {e}")
+                await self._sleep(5)
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def _rehydrate(self, now: datetime):
+        """Recarrega do banco os eventos que vencem dentro da janela"""
+        until = now + self.horizon
+        db = self.session_factory()
+        try:
+            for loader in self._loaders:
+                for fire_at, kind, key, payload in loader(db, now, until):
+                    # Evento já disparado com o mesmo horário: não repetir
+                    if self._fired.get(key) == fire_at:
+                        continue
+                    self.schedule(fire_at, kind, key, payload)
+        finally:
+            db.close()
+
+        with self._lock:
+            expired = now - self.horizon - timedelta(days=1)
+            for key in [key for key, fired_at in self._fired.items() if fired_at < expired]:
+                del self._fired[key]
+
+    async def _execute(self, jobs: List[ScheduledJob]):
+        by_kind: Dict[str, List[ScheduledJob]] = defaultdict(list)
+        for job in jobs:
+            by_kind[job.kind].append(job)
+
+        for kind, kind_jobs in by_kind.items():
+            handler = self._handlers.get(kind)
+            if handler is None:
+                logger.warning(f"Agendador de prazos: sem executor para '{kind}'")
+                continue
+            try:
+                await asyncio.to_thread(self._run_handler, handler, kind_jobs)
+            except Exception as e:
+                logger.exception(f"Falha ao executar eventos '{kind}': {e}")
+                retry_at = datetime.now() + _RETRY_DELAY
+                for job in kind_jobs:
+                    self.schedule(retry_at, job.kind, job.key, job.payload)
+
+    def _run_handler(self, handler: JobHandler, jobs: List[ScheduledJob]):
+        db = self.session_factory()
+        try:
+            handler(db, jobs)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ==================== LIDERANÇA ====================
+
+    def _try_acquire_leadership(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            # Sem advisory locks (ex.: SQLite em desenvolvimento): worker único
+            return True
+
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+
+        if acquired:
+            self._lock_connection = connection
+            return True
+
+        connection.close()
+        return False
+
+    def _check_leadership(self) -> bool:
+        if self._lock_connection is None:
+            return engine.dialect.name != "postgresql"
+        try:
+            self._lock_connection.execute(text("SELECT 1"))
+            self._lock_connection.commit()
+            return True
+        except Exception:
+            self._release_leadership()
+            return False
+
+    def _release_leadership(self):
+        self._is_leader = False
+        connection, self._lock_connection = self._lock_connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            connection.commit()
+        except Exception:
+            pass
+        finally:
+            connection.close()
+
+    # ==================== CARGA DE LEMBRETES ====================
+
+    def _load_reminder_jobs(self, db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+        """Um evento por (tenant, dia) em que algum prazo entra na janela de lembrete"""
+        from core.models.notification import NotificationPreference
+        from core.models.process import Process, ProcessDeadline
+
+        tenant_windows = dict(
+            db.query(NotificationPreference.tenant_id, func.max(NotificationPreference.deadline_reminder_days))
+            .group_by(NotificationPreference.tenant_id)
+            .all()
+        )
+        max_window = max([3] + [w for w in tenant_windows.values() if w is not None])
+
+        today = now.date()
+        rows = (
+            db.query(Process.tenant_id, ProcessDeadline.due_date, ProcessDeadline.notify_days_before)
+            .join(Process, Process.id == ProcessDeadline.process_id)
+            .filter(
+                ProcessDeadline.status == "pending",
+                ProcessDeadline.due_date >= today,
+                ProcessDeadline.due_date < until + timedelta(days=max_window + 1),
+            )
+            .all()
+        )
+
+        reminder_days = set()
+        for tenant_id, due_date, notify_days_before in rows:
+            window = max(
+                notify_days_before if notify_days_before is not None else 3,
+                tenant_windows.get(tenant_id) or 0,
+            )
+            first_day = max(today, due_date.date() - timedelta(days=window))
+            last_day = min(due_date.date(), until.date())
+            day = first_day
+            while day <= last_day:
+                reminder_days.add((tenant_id, day))
+                day += timedelta(days=1)
+
+        for tenant_id, day in reminder_days:
+            # Horários já passados (ex.: após reinício) disparam imediatamente
+            fire_at = datetime.combine(day, time(hour=self.reminder_hour))
+            if fire_at <= until:
+                yield fire_at, "reminder", f"reminder:{tenant_id}:{day.isoformat()}", {"tenant_id": str(tenant_id)}
+
+    # ==================== CARGA DE RESUMOS ====================
+
+    def _load_digest_jobs(self, db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+        """Resumo diário (e semanal, no dia configurado) de cada tenant ativo"""
+        from core.models.tenant import Tenant
+
+        tenant_ids = [row[0] for row in db.query(Tenant.id).filter(Tenant.is_active == True).all()]
+
+        day = now.date()
+        while day <= until.date():
+            fire_at = datetime.combine(day, time(hour=self.digest_hour))
+            # Resumos de dias anteriores não são reenviados após um reinício
+            if day == now.date() or fire_at >= now:
+                periods = ["daily"]
+                if day.weekday() == self.weekly_digest_weekday:
+                    periods.append("weekly")
+                for tenant_id in tenant_ids:
+                    for period in periods:
+                        yield fire_at, "digest", f"digest:{period}:{tenant_id}:{day.isoformat()}", {
+                            "tenant_id": str(tenant_id),
+                            "period": period,
+                            "date": day.isoformat()
+                        }
+            day += timedelta(days=1)
+
+
+# ==================== CARGAS E EXECUTORES PADRÃO ====================
+
+def _load_overdue_jobs(db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+    """
+    Prazos pendentes que vencem na janela (os recém-vencidos disparam imediatamente).
+
+    A carga olha para trás apenas o tamanho da janela; prazos pendentes mais
+    antigos são marcados por uma varredura diária em um único UPDATE, sem
+    serem carregados a cada recarga.
+    """
+    from core.models.process import ProcessDeadline
+
+    since = now - (until - now)
+    rows = db.query(ProcessDeadline.id, ProcessDeadline.due_date).filter(
+        ProcessDeadline.status == "pending",
+        ProcessDeadline.due_date >= since,
+        ProcessDeadline.due_date <= until,
+    ).all()
+
+    for deadline_id, due_date in rows:
+        yield due_date, "overdue", f"overdue:{deadline_id}", {"deadline_id": str(deadline_id)}
+
+    # Mesmo horário o dia todo: dispara uma vez por dia (e logo após um reinício)
+    yield datetime.combine(now.date(), time()), "overdue", f"overdue:sweep:{now.date().isoformat()}", {
+        "before": since.isoformat()
+    }
+
+
+def _load_permission_jobs(db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+    """Próxima expiração de permissão/papel temporário (gravados em UTC)"""
+    from core.models.temporary_permissions import TemporaryPermission, TemporaryRoleAssignment
+
+    next_expiry = [
+        db.query(func.min(TemporaryPermission.expires_at)).filter(TemporaryPermission.is_active == True).scalar(),
+        db.query(func.min(TemporaryRoleAssignment.expires_at)).filter(TemporaryRoleAssignment.is_active == True).scalar(),
+    ]
+    next_expiry = [value for value in next_expiry if value is not None]
+    if not next_expiry:
+        return
+
+    # UTC -> horário local do agendador pelas regras do fuso no próprio instante (correto também no horário de verão)
+    fire_at = min(next_expiry).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    if fire_at <= until:
+        yield fire_at, "permissions", f"permissions:expire:{fire_at.isoformat()}", {}
+
+
+def _load_partition_jobs(db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+    """Manutenção diária das partições (após um reinício, roda logo na partida)"""
+    day = now.date()
+    while day <= until.date():
+        yield datetime.combine(day, _PARTITION_MAINTENANCE_TIME), "partitions", f"partitions:{day.isoformat()}", {}
+        day += timedelta(days=1)
+
+
+def _load_metrics_jobs(db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+    """Reconciliação diária dos agregados por tenant"""
+    day = now.date()
+    while day <= until.date():
+        yield datetime.combine(day, _METRICS_RECONCILE_TIME), "metrics", f"metrics:{day.isoformat()}", {}
+        day += timedelta(days=1)
+
+
+def _load_superadmin_stats_jobs(db: Session, now: datetime, until: datetime) -> Iterable[JobSpec]:
+    """Atualização periódica das estatísticas por tenant do painel do super admin"""
+    interval = timedelta(minutes=settings.SUPERADMIN_STATS_REFRESH_MINUTES)
+    slot = datetime.combine(now.date(), time())
+    while slot <= until:
+        if slot + interval > now:
+            yield slot, "superadmin_stats", f"superadmin_stats:{slot.isoformat()}", {}
+        slot += interval
+
+
+def _handle_overdue(db: Session, jobs: List[ScheduledJob]):
+    """Persiste a transição pending -> overdue dos prazos vencidos"""
+    from core.models.process import ProcessDeadline
+
+    now = datetime.now()
+    deadline_ids = [job.payload["deadline_id"] for job in jobs if "deadline_id" in job.payload]
+    updated = 0
+    if deadline_ids:
+        updated += db.query(ProcessDeadline).filter(
+            ProcessDeadline.id.in_(deadline_ids),
+            ProcessDeadline.status == "pending",
+            ProcessDeadline.due_date <= now,
+        ).update({"status": "overdue", "updated_at": now}, synchronize_session=False)
+
+    # Varredura: pendentes anteriores à janela de carga
+    sweep_before = [datetime.fromisoformat(job.payload["before"]) for job in jobs if "before" in job.payload]
+    if sweep_before:
+        updated += db.query(ProcessDeadline).filter(
+            ProcessDeadline.status == "pending",
+            ProcessDeadline.due_date < max(sweep_before),
+        ).update({"status": "overdue", "updated_at": now}, synchronize_session=False)
+    db.commit()
+
+    if updated:
+        logger.info(f"Agendador de prazos: {updated} prazos marcados como vencidos")
+
+
+def _handle_reminders(db: Session, jobs: List[ScheduledJob]):
+    """Executa a geração de lembretes (idempotente) para cada tenant"""
+    from core.services.notification_service import NotificationService
+
+    service = NotificationService(db)
+    for tenant_id in sorted({job.payload["tenant_id"] for job in jobs}):
+        created = service.create_deadline_notifications(db, tenant_id)
+        if created:
+            logger.info(f"Agendador de prazos: {len(created)} lembretes criados para o tenant {tenant_id}")
+
+
+def _handle_digests(db: Session, jobs: List[ScheduledJob]):
+    """Gera os resumos diários/semanais em lote (um conjunto de consultas por tenant)"""
+    from core.services.digest_service import DigestService
+
+    service = DigestService(db)
+    for job in jobs:
+        day = datetime.fromisoformat(job.payload["date"]).date()
+        if job.payload["period"] == "weekly":
+            service.build_weekly_digests(job.payload["tenant_id"], day)
+        else:
+            service.build_daily_digests(job.payload["tenant_id"], day)
+
+
+def _handle_permission_expiry(db: Session, jobs: List[ScheduledJob]):
+    """Desativa permissões e papéis temporários expirados"""
+    from core.models.temporary_permissions import TemporaryPermissionService
+
+    TemporaryPermissionService(db).cleanup_expired_permissions()
+
+
+def _handle_partitions(db: Session, jobs: List[ScheduledJob]):
+    """Cria as partições dos próximos meses e aplica a retenção"""
+    from core.services.partition_manager import run_partition_maintenance
+
+    summary = run_partition_maintenance(db)
+    if any(summary.values()):
+        logger.info(f"Agendador de prazos: manutenção de partições {summary}")
+
+
+def _handle_metrics(db: Session, jobs: List[ScheduledJob]):
+    """Recalcula os agregados diários recentes (corrige atualizações em massa)"""
+    from core.services.metrics_rollup import MetricsRollupService
+
+    rows = MetricsRollupService(db).reconcile_recent(settings.METRICS_RECONCILE_DAYS)
+    logger.info(f"Agendador de prazos: {rows} agregados diários reconciliados")
+
+
+def _handle_superadmin_stats(db: Session, jobs: List[ScheduledJob]):
+    """Atualiza a view materializada de estatísticas por tenant (uma vez por lote)"""
+    from apps.superadmin.dashboard.analytics import refresh_tenant_stats
+
+    refresh_tenant_stats(db)
+
+
+# Instância única por worker (apenas o líder executa eventos)
+deadline_scheduler = DeadlineScheduler(
+    horizon_hours=settings.SCHEDULER_HORIZON_HOURS,
+    refresh_seconds=settings.SCHEDULER_REFRESH_SECONDS,
+    reminder_hour=settings.SCHEDULER_REMINDER_HOUR,
+    digest_hour=settings.SCHEDULER_DIGEST_HOUR,
+    weekly_digest_weekday=settings.SCHEDULER_WEEKLY_DIGEST_WEEKDAY,
+    lock_key=settings.SCHEDULER_LOCK_KEY,
+)
@@ -0,0 +1,265 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, distinct
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, timedelta
+from core.models.notification import ProcessNotification, NotificationPreference, NotificationDedupKey
+from core.models.process import Process, ProcessLawyer, ProcessDeadline, ProcessTimeline
+from core.models.tenant_user import TenantUser
+from core.services.notification_hub import notification_hub, notification_event
+from core.services.notification_delivery import enqueue_deliveries
+from core.services.notification_templates import notification_templates
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+DAILY = "daily"
+WEEKLY = "weekly"
+
+class DigestService:
+    """Geração em lote dos resumos diários e semanais de um tenant"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ==================== API PÚBLICA ====================
+
+    def build_daily_digests(self, tenant_id: str, today: Optional[date] = None) -> int:
+        """Cria o resumo diário de todos os usuários do tenant (retorna quantos foram criados)"""
+        today = today or datetime.now().date()
+        return self._build(tenant_id, DAILY, today, today, today + timedelta(days=1))
+
+    def build_weekly_digests(self, tenant_id: str, today: Optional[date] = None) -> int:
+        """Cria o resumo semanal: prazos dos próximos 7 dias e andamentos dos últimos 7"""
+        today = today or datetime.now().date()
+        return self._build(tenant_id, WEEKLY, today, today - timedelta(days=6), today + timedelta(days=7))
+
+    # ==================== CONSTRUÇÃO ====================
+
+    def _build(self, tenant_id: str, period: str, today: date, updates_since: date, deadlines_until: date) -> int:
+        tenant_id = uuid.UUID(str(tenant_id))
+        recipients = self._get_recipients(tenant_id, period)
+        if not recipients:
+            return 0
+
+        tomorrow = today + timedelta(days=1)
+        per_lawyer = self._lawyer_stats(tenant_id, today, deadlines_until, updates_since, tomorrow)
+        tenant_totals = self._tenant_stats(tenant_id, today, deadlines_until, updates_since, tomorrow)
+
+        # Reserva as chaves de deduplicação em um único comando
+        keys = {self._dedup_key(period, tenant_id, recipient["user_id"], today): recipient for recipient in recipients}
+        claimed = self._claim_keys(list(keys), period)
+        if not claimed:
+            return 0
+
+        # Textos renderizados em lote pelo template do tenant
+        template_key = "resumo_semanal" if period == WEEKLY else "resumo"
+        selected = []
+        for key in claimed:
+            recipient = keys[key]
+            stats = tenant_totals if recipient["sees_all"] else per_lawyer.get(recipient["user_id"], (0, 0, 0))
+            selected.append((recipient, stats))
+        rendered = notification_templates.render_many(self.db, tenant_id, [
+            (template_key, self._template_context(today, deadlines_until, stats)) for _, stats in selected
+        ])
+
+        rows = []
+        events: List[Tuple[Any, Any, Dict[str, Any]]] = []
+        for (recipient, stats), (title, message) in zip(selected, rendered):
+            row = self._digest_row(tenant_id, recipient, period, today, stats, title, message)
+            rows.append(row)
+            events.append((tenant_id, recipient["user_id"], notification_event(ProcessNotification(**row))))
+
+        self.db.execute(insert(ProcessNotification), rows)
+        enqueue_deliveries(self.db, [row["id"] for row in rows])
+        notification_hub.publish_many(self.db, events)
+        self.db.commit()
+
+        logger.info(f"Resumos '{period}' criados para o tenant {tenant_id}: {len(rows)}")
+        return len(rows)
+
+    def _get_recipients(self, tenant_id: str, period: str) -> List[Dict[str, Any]]:
+        """Usuários ativos do tenant que aceitam o resumo (sem preferências = aceita)"""
+
+        enabled_column = NotificationPreference.daily_summary if period == DAILY else NotificationPreference.weekly_summary
+
+        rows = self.db.query(
+            TenantUser.user_id,
+            TenantUser.role,
+            TenantUser.is_primary_admin,
+            NotificationPreference.email_enabled,
+            NotificationPreference.push_enabled,
+            NotificationPreference.sms_enabled
+        ).outerjoin(
+            NotificationPreference,
+            and_(
+                NotificationPreference.user_id == TenantUser.user_id,
+                NotificationPreference.tenant_id == TenantUser.tenant_id
+            )
+        ).filter(
+            TenantUser.tenant_id == tenant_id,
+            TenantUser.is_active == True,
+            func.coalesce(enabled_column, True) == True
+        ).all()
+
+        return [
+            {
+                "user_id": row.user_id,
+                # Administradores recebem os números do escritório inteiro
+                "sees_all": bool(row.is_primary_admin) or row.role == "admin",
+                "should_email": True if row.email_enabled is None else row.email_enabled,
+                "should_push": True if row.push_enabled is None else row.push_enabled,
+                "should_sms": False if row.sms_enabled is None else row.sms_enabled
+            }
+            for row in rows
+        ]
+
+    def _lawyer_stats(
+        self, tenant_id: str, today: date, deadlines_until: date, updates_since: date, updates_until: date
+    ) -> Dict[Any, Tuple[int, int, int]]:
+        """(prazos, andamentos, urgentes) por advogado, com uma consulta agrupada por métrica"""
+
+        deadlines = dict(
+            self.db.query(ProcessLawyer.lawyer_id, func.count(distinct(ProcessDeadline.id)))
+            .join(Process, Process.id == ProcessLawyer.process_id)
+            .join(ProcessDeadline, ProcessDeadline.process_id == Process.id)
+            .filter(
+                Process.tenant_id == tenant_id,
+                ProcessDeadline.status == "pending",
+                ProcessDeadline.due_date >= today,
+                ProcessDeadline.due_date < deadlines_until
+            )
+            .group_by(ProcessLawyer.lawyer_id)
+            .all()
+        )
+
+        updates = dict(
+            self.db.query(ProcessLawyer.lawyer_id, func.count(distinct(ProcessTimeline.id)))
+            .join(Process, Process.id == ProcessLawyer.process_id)
+            .join(ProcessTimeline, ProcessTimeline.process_id == Process.id)
+            .filter(
+                Process.tenant_id == tenant_id,
+                ProcessTimeline.created_at >= updates_since,
+                ProcessTimeline.created_at < updates_until
+            )
+            .group_by(ProcessLawyer.lawyer_id)
+            .all()
+        )
+
+        urgent = dict(
+            self.db.query(ProcessLawyer.lawyer_id, func.count(distinct(Process.id)))
+            .join(Process, Process.id == ProcessLawyer.process_id)
+            .filter(
+                Process.tenant_id == tenant_id,
+                Process.requires_attention == True,
+                Process.status == "active"
+            )
+            .group_by(ProcessLawyer.lawyer_id)
+            .all()
+        )
+
+        lawyer_ids = set(deadlines) | set(updates) | set(urgent)
+        return {
+            lawyer_id: (deadlines.get(lawyer_id, 0), updates.get(lawyer_id, 0), urgent.get(lawyer_id, 0))
+            for lawyer_id in lawyer_ids
+        }
+
+    def _tenant_stats(
+        self, tenant_id: str, today: date, deadlines_until: date, updates_since: date, updates_until: date
+    ) -> Tuple[int, int, int]:
+        """Totais do escritório (mesmas métricas do resumo diário original)"""
+
+        deadlines_query = self.db.query(func.count(ProcessDeadline.id)).join(
+            Process, Process.id == ProcessDeadline.process_id
+        ).filter(
+            Process.tenant_id == tenant_id,
+            ProcessDeadline.status == "pending",
+            ProcessDeadline.due_date >= today,
+            ProcessDeadline.due_date < deadlines_until
+        ).scalar_subquery()
+
+        updates_query = self.db.query(func.count(ProcessTimeline.id)).join(
+            Process, Process.id == ProcessTimeline.process_id
+        ).filter(
+            Process.tenant_id == tenant_id,
+            ProcessTimeline.created_at >= updates_since,
+            ProcessTimeline.created_at < updates_until
+        ).scalar_subquery()
+
+        urgent_query = self.db.query(func.count(Process.id)).filter(
+            Process.tenant_id == tenant_id,
+            Process.requires_attention == True,
+            Process.status == "active"
+        ).scalar_subquery()
+
+        row = self.db.query(deadlines_query, updates_query, urgent_query).one()
+        return tuple(value or 0 for value in row)
+
+    def _claim_keys(self, keys: List[str], period: str) -> List[str]:
+        """Reserva chaves ainda não usadas (ON CONFLICT DO NOTHING) e retorna as reservadas"""
+
+        statement = pg_insert(NotificationDedupKey).values([
+            {"dedup_key": key, "notification_type": f"resumo_{period}"} for key in keys
+        ]).on_conflict_do_nothing(index_elements=["dedup_key"]).returning(NotificationDedupKey.dedup_key)
+
+        return [row[0] for row in self.db.execute(statement)]
+
+    @staticmethod
+    def _dedup_key(period: str, tenant_id: Any, user_id: Any, today: date) -> str:
+        if period == WEEKLY:
+            year, week, _ = today.isocalendar()
+            return f"digest:{WEEKLY}:{tenant_id}:{user_id}:{year}-W{week:02d}"
+        return f"digest:{DAILY}:{tenant_id}:{user_id}:{today.isoformat()}"
+
+    @staticmethod
+    def _template_context(today: date, deadlines_until: date, stats: Tuple[int, int, int]) -> Dict[str, Any]:
+        deadlines_count, updates_count, urgent_count = stats
+        return {
+            "date": today,
+            "week_end": deadlines_until - timedelta(days=1),
+            "deadlines_count": deadlines_count,
+            "updates_count": updates_count,
+            "urgent_count": urgent_count
+        }
+
+    @staticmethod
+    def _digest_row(
+        tenant_id: str, recipient: Dict[str, Any], period: str, today: date, stats: Tuple[int, int, int],
+        title: str, message: str
+    ) -> Dict[str, Any]:
+        deadlines_count, updates_count, urgent_count = stats
+
+        if period == WEEKLY:
+            notification_type = "resumo_semanal"
+            data = {
+                "deadlines_next_7_days": deadlines_count,
+                "updates_last_7_days": updates_count,
+                "urgent_processes": urgent_count,
+                "week_start": today.isoformat()
+            }
+        else:
+            notification_type = "resumo"
+            data = {
+                "deadlines_today": deadlines_count,
+                "new_updates": updates_count,
+                "urgent_processes": urgent_count,
+                "date": today.isoformat()
+            }
+
+        return {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant_id,
+            "process_id": None,
+            "user_id": recipient["user_id"],
+            "notification_type": notification_type,
+            "priority": "normal",
+            "title": title,
+            "message": message,
+            "is_read": False,
+            "is_archived": False,
+            "should_email": recipient["should_email"],
+            "should_push": recipient["should_push"],
+            "should_sms": recipient["should_sms"],
+            "notification_data": data
+        }
@@ -0,0 +1,147 @@
+"""
+Diagnóstico de índices a partir das estatísticas do PostgreSQL.
+
+- índices não usados: ``pg_stat_user_indexes`` com ``idx_scan = 0`` (exceto
+  chaves primárias, únicos e os que sustentam restrições), ordenados por tamanho;
+- índices inválidos: sobras de um ``CREATE INDEX CONCURRENTLY`` interrompido;
+- chaves estrangeiras sem índice que comece pelas mesmas colunas;
+- tabelas com muitas leituras sequenciais (``pg_stat_user_tables``);
+- consultas mais caras de ``pg_stat_statements`` (quando a extensão está
+  instalada), com as tabelas lidas sequencialmente que aparecem nelas.
+
+As estatísticas são acumuladas desde o último reset (``stats_reset``): em um
+banco recém-iniciado tudo parece "não usado".
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+UNUSED_INDEXES_SQL = text("""
+    SELECT s.relname AS table_name, s.indexrelname AS index_name, s.idx_scan,
+           pg_relation_size(s.indexrelid) AS size_bytes,
+           pg_get_indexdef(s.indexrelid) AS definition
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.idx_scan = 0
+      AND NOT i.indisprimary
+      AND NOT i.indisunique
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = s.indexrelid)
+      AND pg_relation_size(s.indexrelid) >= :min_size_bytes
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+""")
+
+INVALID_INDEXES_SQL = text("""
+    SELECT t.relname AS table_name, c.relname AS index_name
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE NOT i.indisvalid AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    ORDER BY 1, 2
+""")
+
+# Chave estrangeira sem índice cujas primeiras colunas sejam as da chave
+UNINDEXED_FOREIGN_KEYS_SQL = text("""
+    SELECT t.relname AS table_name, c.conname AS constraint_name,
+           array_agg(a.attname ORDER BY k.ord) AS columns
+    FROM pg_constraint c
+    JOIN pg_class t ON t.oid = c.conrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.contype = 'f'
+      AND n.nspname = current_schema()
+      AND NOT t.relispartition
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid
+            AND (i.indkey::int2[])[0:array_length(c.conkey, 1) - 1] @> c.conkey
+            AND (i.indkey::int2[])[0:array_length(c.conkey, 1) - 1] <@ c.conkey
+      )
+    GROUP BY t.relname, c.conname
+    ORDER BY 1, 2
+""")
+
+SEQ_SCAN_TABLES_SQL = text("""
+    SELECT relname AS table_name, seq_scan, seq_tup_read, COALESCE(idx_scan, 0) AS idx_scan,
+           n_live_tup AS live_rows,
+           seq_tup_read / GREATEST(seq_scan, 1) AS rows_per_seq_scan
+    FROM pg_stat_user_tables
+    WHERE seq_scan > 0 AND n_live_tup >= :min_rows
+      AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+    LIMIT :limit
+""")
+
+TOP_STATEMENTS_SQL = text("""
+    SELECT query, calls, total_exec_time AS total_ms, mean_exec_time AS mean_ms, rows
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query NOT ILIKE '%pg_stat%'
+    ORDER BY total_exec_time DESC
+    LIMIT :limit
+""")
+
+
+class IndexAdvisor:
+    """Relatório de índices ausentes, não usados e inválidos"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def has_pg_stat_statements(self) -> bool:
+        return bool(self.db.execute(text(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"
+        )).scalar())
+
+    def stats_reset(self) -> Optional[str]:
+        value = self.db.execute(text(
+            "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+        )).scalar()
+        return value.isoformat() if value else None
+
+    def unused_indexes(self, min_size_bytes: int = 0) -> List[Dict[str, Any]]:
+        return self._rows(UNUSED_INDEXES_SQL, {"min_size_bytes": min_size_bytes})
+
+    def invalid_indexes(self) -> List[Dict[str, Any]]:
+        return self._rows(INVALID_INDEXES_SQL)
+
+    def unindexed_foreign_keys(self) -> List[Dict[str, Any]]:
+        return [
+            {**row, "columns": list(row["columns"])}
+            for row in self._rows(UNINDEXED_FOREIGN_KEYS_SQL)
+        ]
+
+    def seq_scan_tables(self, min_rows: int = 1000, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._rows(SEQ_SCAN_TABLES_SQL, {"min_rows": min_rows, "limit": limit})
+
+    def top_statements(self, limit: int = 20, seq_scan_tables: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Consultas mais caras; ``tables`` lista as tabelas lidas sequencialmente citadas nelas"""
+        if not self.has_pg_stat_statements():
+            return []
+        statements = self._rows(TOP_STATEMENTS_SQL, {"limit": limit})
+        for statement in statements:
+            statement["total_ms"] = round(statement["total_ms"], 2)
+            statement["mean_ms"] = round(statement["mean_ms"], 2)
+            statement["seq_scan_tables"] = [
+                table for table in seq_scan_tables or []
+                if re.search(rf"\b{re.escape(table)}\b", statement["query"])
+            ]
+        return statements
+
+    def report(self, min_rows: int = 1000, min_index_size_bytes: int = 0, limit: int = 20) -> Dict[str, Any]:
+        seq_scans = self.seq_scan_tables(min_rows=min_rows, limit=limit)
+        return {
+            "stats_reset": self.stats_reset(),
+            "pg_stat_statements": self.has_pg_stat_statements(),
+            "invalid_indexes": self.invalid_indexes(),
+            "unindexed_foreign_keys": self.unindexed_foreign_keys(),
+            "seq_scan_tables": seq_scans,
+            "top_statements": self.top_statements(limit, [row["table_name"] for row in seq_scans]),
+            "unused_indexes": self.unused_indexes(min_index_size_bytes),
+        }
+
+    def _rows(self, statement, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.db.execute(statement, params or {}).mappings()]
@@ -0,0 +1,305 @@
+"""
+Calendário forense e cálculo de prazos processuais em dias úteis.
+
+Os prazos do CPC (art. 219) contam apenas dias úteis, excluindo o dia do
+começo e incluindo o do vencimento (art. 224), e ficam suspensos no recesso
+de 20/12 a 20/01 (art. 220). Cada tribunal (alias de
+``CNJIntegrationService.TRIBUNAIS_MAPA``) tem um ``numpy.busdaycalendar``
+pré-computado com feriados nacionais, forenses, estaduais e da sede, o que
+permite calcular milhares de vencimentos em uma única chamada vetorizada.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+NATIONAL = "nacional"
+
+# Anos aceitos nos cálculos (datas fora da faixa são rejeitadas com ValueError)
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+# Feriados nacionais fixos (mês, dia)
+_NATIONAL_FIXED = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 7),    # Independência
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+]
+
+# Feriados estaduais fixos por UF
+_STATE_FIXED = {
+    "AC": [(1, 23), (6, 15), (9, 5), (11, 17)],
+    "AL": [(6, 24), (6, 29), (9, 16)],
+    "AM": [(9, 5)],
+    "AP": [(3, 19), (10, 5)],
+    "BA": [(7, 2)],
+    "CE": [(3, 19), (3, 25)],
+    "DF": [(11, 30)],
+    "ES": [],
+    "GO": [],
+    "MA": [(7, 28)],
+    "MG": [],
+    "MS": [(10, 11)],
+    "MT": [],
+    "PA": [(8, 15)],
+    "PB": [(8, 5)],
+    "PE": [(3, 6)],
+    "PI": [(10, 19)],
+    "PR": [(12, 19)],
+    "RJ": [(4, 23)],
+    "RN": [(10, 3)],
+    "RO": [(1, 4), (6, 18)],
+    "RR": [(10, 5)],
+    "RS": [(9, 20)],
+    "SC": [],
+    "SE": [(7, 8)],
+    "SP": [(7, 9)],
+    "TO": [(3, 18), (9, 8), (10, 5)],
+}
+
+# UF de cada TJ
+_STATE_COURTS = {
+    "tjac": "AC", "tjal": "AL", "tjam": "AM", "tjap": "AP", "tjba": "BA", "tjce": "CE",
+    "tjdft": "DF", "tjes": "ES", "tjgo": "GO", "tjma": "MA", "tjmg": "MG", "tjms": "MS",
+    "tjmt": "MT", "tjpa": "PA", "tjpb": "PB", "tjpr": "PR", "tjpe": "PE", "tjpi": "PI",
+    "tjrj": "RJ", "tjrn": "RN", "tjro": "RO", "tjrr": "RR", "tjrs": "RS", "tjsc": "SC",
+    "tjse": "SE", "tjsp": "SP", "tjto": "TO",
+}
+
+# Tribunais da União (Lei 5.010/66, art. 62) e UF da sede
+_UNION_COURTS = {
+    "trf1": "DF", "trf2": "RJ", "trf3": "SP", "trf4": "RS", "trf5": "PE", "trf6": "MG",
+    "tre-al": "AL", "tre-ba": "BA", "tre-sp": "SP",
+    "trt21": "RN",
+    "stj": "DF", "tst": "DF", "tse": "DF", "stm": "DF",
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _fixed(year: int, days: Iterable[Tuple[int, int]]) -> Set[date]:
+    return {date(year, month, day) for month, day in days}
+
+
+def _national_holidays(year: int) -> Set[date]:
+    easter = easter_sunday(year)
+    holidays = _fixed(year, _NATIONAL_FIXED)
+    holidays.add(easter - timedelta(days=2))  # Sexta-feira Santa
+    if year >= 2024:
+        holidays.add(date(year, 11, 20))  # Consciência Negra (Lei 14.759/2023)
+    return holidays
+
+
+def _forensic_holidays(year: int) -> Set[date]:
+    """Dias sem expediente forense comuns a todos os tribunais"""
+    easter = easter_sunday(year)
+    return {
+        easter - timedelta(days=48),  # Segunda de Carnaval
+        easter - timedelta(days=47),  # Terça de Carnaval
+        easter + timedelta(days=60),  # Corpus Christi
+    }
+
+
+def _union_holidays(year: int) -> Set[date]:
+    """Feriados da Justiça da União (Lei 5.010/66, art. 62)"""
+    easter = easter_sunday(year)
+    holidays = {easter - timedelta(days=offset) for offset in (4, 3)}  # Quarta e Quinta-feira Santa
+    holidays |= _fixed(year, [(8, 11), (11, 1), (12, 8)])
+    return holidays
+
+
+def _recess(year: int) -> Set[date]:
+    """Recesso forense (CPC art. 220): 20/12 a 20/01, inclusive"""
+    start = date(year - 1, 12, 20)
+    return {start + timedelta(days=offset) for offset in range((date(year, 1, 20) - start).days + 1)}
+
+
+def holidays_for(alias: str, year: int) -> Set[date]:
+    """Conjunto de dias não úteis (exceto fins de semana) de um tribunal em um ano"""
+    alias = (alias or NATIONAL).lower()
+    holidays = _national_holidays(year) | _forensic_holidays(year) | _recess(year) | _recess(year + 1)
+
+    uf = _STATE_COURTS.get(alias)
+    if alias in _UNION_COURTS:
+        uf = _UNION_COURTS[alias]
+        holidays |= _union_holidays(year)
+    if uf:
+        holidays |= _fixed(year, _STATE_FIXED.get(uf, []))
+
+    # _recess(year + 1) cobre 20-31/12; mantém apenas o ano solicitado
+    return {day for day in holidays if day.year == year}
+
+
+DateLike = Union[date, datetime, str]
+
+
+def _as_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value).date()
+
+
+class LegalCalendar:
+    """Calendários de dias úteis por tribunal, pré-computados e mantidos em cache"""
+
+    def __init__(self, years_before: int = 1, years_after: int = 5):
+        today = date.today()
+        self.first_year = today.year - years_before
+        self.last_year = today.year + years_after
+
+        self._calendars: Dict[str, np.busdaycalendar] = {}
+        self._extra_holidays: Dict[str, Set[date]] = {}
+        self._lock = threading.Lock()
+
+    # ==================== CALENDÁRIOS ====================
+
+    def known_courts(self) -> List[str]:
+        """Aliases de tribunais com calendário próprio"""
+        return [NATIONAL] + sorted(set(_STATE_COURTS) | set(_UNION_COURTS))
+
+    def calendar_for(self, alias: Optional[str]) -> np.busdaycalendar:
+        """Retorna (e cacheia) o busdaycalendar do tribunal"""
+        alias = (alias or NATIONAL).lower()
+        calendar = self._calendars.get(alias)
+        if calendar is None:
+            with self._lock:
+                calendar = self._calendars.get(alias)
+                if calendar is None:
+                    calendar = self._build(alias)
+                    self._calendars[alias] = calendar
+        return calendar
+
+    def register_holidays(self, alias: str, days: Iterable[DateLike]):
+        """Adiciona suspensões de expediente específicas de um tribunal"""
+        alias = alias.lower()
+        with self._lock:
+            self._extra_holidays.setdefault(alias, set()).update(_as_date(day) for day in days)
+            self._calendars.pop(alias, None)
+
+    def resolve_alias(self, tribunal: Optional[str] = None, cnj_number: Optional[str] = None) -> str:
+        """Alias do tribunal a partir do alias informado ou do número CNJ"""
+        if tribunal:
+            return tribunal.lower()
+        if cnj_number:
+            from core.services.cnj_integration import CNJIntegrationService
+            try:
+                return CNJIntegrationService.resolver_alias_tribunal(cnj_number)
+            except ValueError:
+                pass
+        return NATIONAL
+
+    def _build(self, alias: str) -> np.busdaycalendar:
+        holidays: Set[date] = set(self._extra_holidays.get(alias, set()))
+        for year in range(self.first_year, self.last_year + 1):
+            holidays |= holidays_for(alias, year)
+        return np.busdaycalendar(
+            weekmask="1111100",
+            holidays=np.array(sorted(holidays), dtype="datetime64[D]"),
+        )
+
+    def _ensure_range(self, days: np.ndarray) -> bool:
+        """Estende os calendários se alguma data cair fora dos anos pré-computados"""
+        if days.size == 0:
+            return False
+        first = int(days.min().astype("datetime64[Y]").astype(int)) + 1970
+        last = int(days.max().astype("datetime64[Y]").astype(int)) + 1970 + 1
+        # Valida antes de alterar a faixa: uma data inválida não pode afetar os próximos cálculos
+        if first < MIN_YEAR or last - 1 > MAX_YEAR:
+            raise ValueError(f"Data fora do intervalo suportado ({MIN_YEAR}-{MAX_YEAR})")
+        if first >= self.first_year and last <= self.last_year:
+            return False
+        with self._lock:
+            self.first_year = min(self.first_year, first)
+            self.last_year = max(self.last_year, last)
+            self._calendars.clear()
+        return True
+
+    # ==================== CÁLCULO ====================
+
+    def add_business_days(self, start: DateLike, business_days: int, tribunal: Optional[str] = None) -> date:
+        """Vencimento de um prazo de N dias úteis contado a partir da intimação"""
+        return self.add_business_days_batch([start], [business_days], tribunal)[0]
+
+    def add_business_days_batch(
+        self,
+        starts: Sequence[DateLike],
+        business_days: Union[int, Sequence[int]],
+        tribunal: Optional[str] = None,
+    ) -> List[date]:
+        """
+        Calcula vencimentos em lote (uma chamada numpy por tribunal).
+
+        A contagem exclui o dia do começo (CPC art. 224): intimações em dia
+        não útil são consideradas feitas no primeiro dia útil seguinte.
+        """
+        start_days = np.array([_as_date(value) for value in starts], dtype="datetime64[D]")
+        offsets = np.broadcast_to(np.asarray(business_days, dtype=np.int64), start_days.shape)
+        self._ensure_range(start_days)
+
+        due = np.busday_offset(start_days, offsets, roll="forward", busdaycal=self.calendar_for(tribunal))
+        if self._ensure_range(due):
+            # Vencimento além dos anos pré-computados: recalcula com a faixa estendida
+            due = np.busday_offset(start_days, offsets, roll="forward", busdaycal=self.calendar_for(tribunal))
+
+        return due.astype(object).tolist()
+
+    def compute_due_dates(self, items: Sequence[dict]) -> List[date]:
+        """
+        Calcula vencimentos de itens heterogêneos.
+
+        Cada item: ``start_date``, ``business_days`` e ``tribunal`` ou
+        ``cnj_number``. Os itens são agrupados por tribunal e cada grupo é
+        resolvido com uma única chamada vetorizada.
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            alias = self.resolve_alias(item.get("tribunal"), item.get("cnj_number"))
+            groups.setdefault(alias, []).append(index)
+
+        results: List[Optional[date]] = [None] * len(items)
+        for alias, indexes in groups.items():
+            due_dates = self.add_business_days_batch(
+                [items[i].get("start_date") or date.today() for i in indexes],
+                [int(items[i]["business_days"]) for i in indexes],
+                alias,
+            )
+            for i, due in zip(indexes, due_dates):
+                results[i] = due
+        return results
+
+    def is_business_day(self, day: DateLike, tribunal: Optional[str] = None) -> bool:
+        """Indica se o dia é útil no tribunal"""
+        days = np.array([_as_date(day)], dtype="datetime64[D]")
+        self._ensure_range(days)
+        return bool(np.is_busday(days, busdaycal=self.calendar_for(tribunal))[0])
+
+    def business_days_between(self, start: DateLike, end: DateLike, tribunal: Optional[str] = None) -> int:
+        """Dias úteis entre duas datas (início exclusivo, fim inclusivo)"""
+        days = np.array([_as_date(start), _as_date(end)], dtype="datetime64[D]")
+        self._ensure_range(days)
+        return int(np.busday_count(days[0] + 1, days[1] + 1, busdaycal=self.calendar_for(tribunal)))
+
+
+# Instância única (calendários são construídos sob demanda)
+legal_calendar = LegalCalendar()
@@ -0,0 +1,317 @@
+"""
+Agregados diários por tenant (tenant_daily_metrics / tenant_specialty_daily_metrics).
+
+Atualização incremental: um listener de sessão calcula, a cada flush, a
+contribuição de cada Process, Client, Document e FinancialRecord gravado
+(antes x depois da alteração) e aplica as diferenças com
+``INSERT ... ON CONFLICT DO UPDATE SET x = x + EXCLUDED.x`` na mesma
+transação. Operações em massa (``query.update``/SQL direto) não passam pelo
+listener; a reconciliação noturna recalcula os últimos dias a partir das
+tabelas de origem e corrige qualquer divergência.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from core.models.client import Client
+from core.models.document import Document
+from core.models.financial import FinancialRecord
+from core.models.metrics import TenantDailyMetrics, TenantSpecialtyDailyMetrics
+from core.models.process import Process
+
+logger = logging.getLogger(__name__)
+
+TENANT_FIELDS = ("processes_opened", "processes_closed", "clients_added", "documents_uploaded", "revenue", "expenses")
+SPECIALTY_FIELDS = ("processes_opened", "processes_closed", "revenue")
+
+REVENUE_TYPES = ("income",)
+EXPENSE_TYPES = ("expense", "cost")
+
+# (tenant_id, dia, specialty_id ou None, campo, valor)
+Contribution = Tuple[Any, date, Optional[Any], str, Any]
+
+
+# ==================== CONTRIBUIÇÕES ====================
+
+def _day(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.now().date()
+
+
+def _process_contributions(values: Dict[str, Any]) -> List[Contribution]:
+    tenant_id, specialty_id = values["tenant_id"], values["specialty_id"]
+    result = [(tenant_id, _day(values["created_at"]), specialty_id, "processes_opened", 1)]
+    if values["status"] == "closed":
+        result.append((tenant_id, _day(values["closed_at"]), specialty_id, "processes_closed", 1))
+    return result
+
+
+def _client_contributions(values: Dict[str, Any]) -> List[Contribution]:
+    return [(values["tenant_id"], _day(values["created_at"]), None, "clients_added", 1)]
+
+
+def _document_contributions(values: Dict[str, Any]) -> List[Contribution]:
+    return [(values["tenant_id"], _day(values["created_at"]), None, "documents_uploaded", 1)]
+
+
+def _financial_contributions(values: Dict[str, Any]) -> List[Contribution]:
+    if values["paid_date"] is None or values["amount"] is None:
+        return []
+    if values["record_type"] in REVENUE_TYPES:
+        field = "revenue"
+    elif values["record_type"] in EXPENSE_TYPES:
+        field = "expenses"
+    else:
+        return []
+    # A especialidade (via processo) é resolvida em lote no flush
+    return [(values["tenant_id"], _day(values["paid_date"]), ("process", values["process_id"]), field, Decimal(values["amount"]))]
+
+
+TRACKED = {
+    Process: (("tenant_id", "specialty_id", "created_at", "status", "closed_at"), _process_contributions),
+    Client: (("tenant_id", "created_at"), _client_contributions),
+    Document: (("tenant_id", "created_at"), _document_contributions),
+    FinancialRecord: (("tenant_id", "process_id", "paid_date", "amount", "record_type"), _financial_contributions),
+}
+
+
+def _snapshot(instance: Any, attributes: Iterable[str], previous: bool, load_missing: bool = False) -> Dict[str, Any]:
+    """Valores atuais ou anteriores ao flush (pelo histórico de atributos)"""
+    state = inspect(instance)
+    if load_missing:
+        # Atributos expirados de objetos já existentes (ex.: created_at após um commit)
+        for name in attributes:
+            if name not in state.dict:
+                getattr(instance, name)
+    values = {}
+    for name in attributes:
+        history = state.attrs[name].history
+        if previous and history.deleted:
+            values[name] = history.deleted[0]
+        elif history.added:
+            values[name] = history.added[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            # Atributo não carregado (ex.: created_at gerado pelo banco)
+            values[name] = state.dict.get(name)
+    return values
+
+
+# ==================== LISTENERS ====================
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history: o valor anterior é carregado mesmo com o atributo expirado
+# (ex.: após um commit), garantindo o "antes" correto no histórico do flush
+for _model, (_attributes, _) in TRACKED.items():
+    for _name in _attributes:
+        event.listen(getattr(_model, _name), "set", _keep_previous_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_closed_at(session: Session, flush_context, instances):
+    """Registra a data de encerramento quando o status muda para/de closed"""
+    for instance in list(session.new) + list(session.dirty):
+        if not isinstance(instance, Process):
+            continue
+        history = inspect(instance).attrs.status.history
+        if instance in session.new or history.has_changes():
+            if instance.status == "closed" and instance.closed_at is None:
+                instance.closed_at = datetime.now()
+            elif instance.status != "closed" and instance.closed_at is not None:
+                instance.closed_at = None
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_deltas(session: Session, flush_context):
+    deltas: List[Tuple[Contribution, int]] = []
+
+    for instance in session.new:
+        tracked = TRACKED.get(type(instance))
+        if tracked:
+            attributes, contribute = tracked
+            deltas += [(item, 1) for item in contribute(_snapshot(instance, attributes, previous=False))]
+
+    for instance in session.dirty:
+        tracked = TRACKED.get(type(instance))
+        if not tracked or not session.is_modified(instance, include_collections=False):
+            continue
+        attributes, contribute = tracked
+        before = contribute(_snapshot(instance, attributes, previous=True, load_missing=True))
+        after = contribute(_snapshot(instance, attributes, previous=False))
+        if before != after:
+            deltas += [(item, -1) for item in before] + [(item, 1) for item in after]
+
+    for instance in session.deleted:
+        tracked = TRACKED.get(type(instance))
+        if tracked:
+            attributes, contribute = tracked
+            deltas += [(item, -1) for item in contribute(_snapshot(instance, attributes, previous=True, load_missing=True))]
+
+    if deltas:
+        apply_deltas(session, deltas)
+
+
+def apply_deltas(session: Session, deltas: List[Tuple[Contribution, int]]):
+    """Agrupa as diferenças por (tenant, dia[, especialidade]) e aplica com upsert"""
+    connection = session.connection()
+
+    # Especialidade dos lançamentos financeiros: uma consulta para todos os processos
+    process_ids = {specialty[1] for (_, _, specialty, _, _), _ in deltas
+                   if isinstance(specialty, tuple) and specialty[1] is not None}
+    process_specialty = {}
+    if process_ids:
+        process_specialty = dict(connection.execute(
+            select(Process.id, Process.specialty_id).where(Process.id.in_(process_ids))
+        ).all())
+
+    tenant_rows: Dict[Tuple[Any, date], Dict[str, Any]] = defaultdict(lambda: defaultdict(int))
+    specialty_rows: Dict[Tuple[Any, date, Any], Dict[str, Any]] = defaultdict(lambda: defaultdict(int))
+    for (tenant_id, day, specialty, field, value), sign in deltas:
+        if tenant_id is None:
+            continue
+        tenant_rows[(tenant_id, day)][field] += sign * value
+        if isinstance(specialty, tuple):
+            specialty = process_specialty.get(specialty[1])
+        if specialty is not None and field in SPECIALTY_FIELDS:
+            specialty_rows[(tenant_id, day, specialty)][field] += sign * value
+
+    _upsert(connection, TenantDailyMetrics.__table__, TENANT_FIELDS, [
+        {"tenant_id": tenant_id, "day": day, **_fill(fields, TENANT_FIELDS)}
+        for (tenant_id, day), fields in tenant_rows.items() if any(fields.values())
+    ], ["tenant_id", "day"])
+    _upsert(connection, TenantSpecialtyDailyMetrics.__table__, SPECIALTY_FIELDS, [
+        {"tenant_id": tenant_id, "day": day, "specialty_id": specialty_id, **_fill(fields, SPECIALTY_FIELDS)}
+        for (tenant_id, day, specialty_id), fields in specialty_rows.items() if any(fields.values())
+    ], ["tenant_id", "day", "specialty_id"])
+
+
+def _fill(fields: Dict[str, Any], names: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: fields.get(name, 0) for name in names}
+
+
+def _upsert(connection, table, fields: Tuple[str, ...], rows: List[Dict[str, Any]], keys: List[str]):
+    if not rows:
+        return
+    statement = pg_insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            **{name: table.c[name] + statement.excluded[name] for name in fields},
+            "updated_at": datetime.now()
+        }
+    )
+    connection.execute(statement)
+
+
+# ==================== RECONCILIAÇÃO ====================
+
+RECONCILE_TENANT_SQL = text("""
+    INSERT INTO tenant_daily_metrics (
+        tenant_id, day, processes_opened, processes_closed, clients_added,
+        documents_uploaded, revenue, expenses, updated_at
+    )
+    SELECT tenant_id, day,
+           SUM(processes_opened), SUM(processes_closed), SUM(clients_added),
+           SUM(documents_uploaded), SUM(revenue), SUM(expenses), now()
+    FROM (
+        SELECT tenant_id, CAST(created_at AS date) AS day,
+               1 AS processes_opened, 0 AS processes_closed, 0 AS clients_added,
+               0 AS documents_uploaded, 0 AS revenue, 0 AS expenses
+        FROM processes
+        WHERE created_at >= :start AND created_at < :end
+        UNION ALL
+        SELECT tenant_id, CAST(closed_at AS date), 0, 1, 0, 0, 0, 0
+        FROM processes
+        WHERE status = 'closed' AND closed_at >= :start AND closed_at < :end
+        UNION ALL
+        SELECT tenant_id, CAST(created_at AS date), 0, 0, 1, 0, 0, 0
+        FROM clients
+        WHERE created_at >= :start AND created_at < :end
+        UNION ALL
+        SELECT tenant_id, CAST(created_at AS date), 0, 0, 0, 1, 0, 0
+        FROM documents
+        WHERE created_at >= :start AND created_at < :end
+        UNION ALL
+        SELECT tenant_id, CAST(paid_date AS date), 0, 0, 0, 0,
+               CASE WHEN record_type IN ('income') THEN amount ELSE 0 END,
+               CASE WHEN record_type IN ('expense', 'cost') THEN amount ELSE 0 END
+        FROM financial_records
+        WHERE paid_date >= :start AND paid_date < :end
+    ) AS events
+    WHERE CAST(:tenant_id AS uuid) IS NULL OR tenant_id = CAST(:tenant_id AS uuid)
+    GROUP BY tenant_id, day
+""")
+
+RECONCILE_SPECIALTY_SQL = text("""
+    INSERT INTO tenant_specialty_daily_metrics (
+        tenant_id, day, specialty_id, processes_opened, processes_closed, revenue, updated_at
+    )
+    SELECT tenant_id, day, specialty_id,
+           SUM(processes_opened), SUM(processes_closed), SUM(revenue), now()
+    FROM (
+        SELECT tenant_id, CAST(created_at AS date) AS day, specialty_id,
+               1 AS processes_opened, 0 AS processes_closed, 0 AS revenue
+        FROM processes
+        WHERE specialty_id IS NOT NULL AND created_at >= :start AND created_at < :end
+        UNION ALL
+        SELECT tenant_id, CAST(closed_at AS date), specialty_id, 0, 1, 0
+        FROM processes
+        WHERE specialty_id IS NOT NULL AND status = 'closed'
+          AND closed_at >= :start AND closed_at < :end
+        UNION ALL
+        SELECT fr.tenant_id, CAST(fr.paid_date AS date), p.specialty_id, 0, 0, fr.amount
+        FROM financial_records fr
+        JOIN processes p ON p.id = fr.process_id
+        WHERE p.specialty_id IS NOT NULL AND fr.record_type IN ('income')
+          AND fr.paid_date >= :start AND fr.paid_date < :end
+    ) AS events
+    WHERE CAST(:tenant_id AS uuid) IS NULL OR tenant_id = CAST(:tenant_id AS uuid)
+    GROUP BY tenant_id, day, specialty_id
+""")
+
+
+class MetricsRollupService:
+    """Recalcula os agregados diários a partir das tabelas de origem"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reconcile(self, start: date, end: date, tenant_id: Optional[str] = None) -> int:
+        """
+        Substitui os agregados de [start, end) pelos valores recalculados.
+
+        Tudo na mesma transação: leitores nunca veem o intervalo vazio.
+        """
+        params = {
+            "start": start,
+            "end": end,
+            "tenant_id": str(tenant_id) if tenant_id else None
+        }
+        for table in (TenantDailyMetrics, TenantSpecialtyDailyMetrics):
+            query = self.db.query(table).filter(table.day >= start, table.day < end)
+            if tenant_id:
+                query = query.filter(table.tenant_id == tenant_id)
+            query.delete(synchronize_session=False)
+
+        inserted = self.db.execute(RECONCILE_TENANT_SQL, params).rowcount or 0
+        self.db.execute(RECONCILE_SPECIALTY_SQL, params)
+        self.db.commit()
+        return inserted
+
+    def reconcile_recent(self, days: int, today: Optional[date] = None) -> int:
+        """Recalcula os últimos ``days`` dias de todos os tenants"""
+        today = today or datetime.now().date()
+        return self.reconcile(today - timedelta(days=days - 1), today + timedelta(days=1))
@@ -0,0 +1,307 @@
+"""
+Sincronização incremental do dashboard mobile.
+
+O app envia o token recebido na última sincronização e recebe apenas o que
+mudou desde então: processos, prazos, andamentos e notificações alterados,
+mais as exclusões (``x``). Sem token (ou com token inválido/expirado) a
+resposta é completa (``f = 1``) e o app substitui o estado local.
+
+O token carrega o instante da sincronização segundo o relógio do banco; a
+consulta seguinte volta ``SYNC_OVERLAP_SECONDS`` para não perder transações
+que gravaram antes desse instante mas confirmaram depois. Itens repetidos são
+inofensivos: o app faz upsert pelo id.
+
+Exclusões vêm de duas fontes:
+- itens que saíram do escopo (processo encerrado, prazo concluído,
+  notificação arquivada), detectados pela própria alteração;
+- exclusões físicas, registradas em ``sync_tombstones`` por um listener de
+  sessão. A remoção de um advogado do processo gera uma exclusão do processo
+  apenas para aquele usuário; o app remove junto prazos e andamentos do
+  processo.
+
+Para reduzir o tamanho da resposta, os campos usam nomes curtos (ver
+``*_FIELDS``) e datas em segundos desde a época; valores nulos são omitidos.
+"""
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, insert, or_, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from core.config import settings
+from core.models.notification import ProcessNotification
+from core.models.process import Process, ProcessDeadline, ProcessLawyer, ProcessTimeline
+from core.models.sync import SyncTombstone
+from core.services.notification_service import recent_notifications_filter
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = "1"
+TIMELINE_DAYS = 30
+FULL_SYNC_NOTIFICATIONS = 100
+
+OPEN_DEADLINE_STATUSES = ("pending", "overdue")
+
+# Nome curto -> atributo (a ordem define a ordem no JSON)
+PROCESS_FIELDS = {
+    "i": "id", "n": "cnj_number", "s": "subject", "st": "status",
+    "p": "priority", "a": "requires_attention", "u": "updated_at",
+}
+DEADLINE_FIELDS = {
+    "i": "id", "pi": "process_id", "t": "title", "d": "due_date",
+    "ty": "deadline_type", "st": "status", "c": "is_critical",
+}
+TIMELINE_FIELDS = {
+    "i": "id", "pi": "process_id", "d": "date", "ty": "type",
+    "ds": "description", "ai": "ai_classification",
+}
+NOTIFICATION_FIELDS = {
+    "i": "id", "pi": "process_id", "ty": "notification_type", "p": "priority",
+    "t": "title", "m": "message", "r": "is_read", "c": "created_at",
+}
+
+
+# ==================== TOKEN ====================
+
+def encode_sync_token(watermark: datetime, user_id: str) -> str:
+    raw = f"{TOKEN_VERSION}:{int(watermark.timestamp() * 1000)}:{user_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: Optional[str], user_id: str, now: datetime) -> Optional[datetime]:
+    """Instante da última sincronização, ou None quando é preciso sincronizar tudo"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        version, millis, token_user = raw.split(":", 2)
+        watermark = datetime.fromtimestamp(int(millis) / 1000)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    if version != TOKEN_VERSION or token_user != str(user_id):
+        return None
+    # Exclusões mais antigas que a retenção já foram removidas
+    if watermark < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS) or watermark > now:
+        return None
+    return watermark
+
+
+# ==================== COMPACTAÇÃO ====================
+
+def _compact_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, bool) or value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def compact(instance: Any, fields: Dict[str, str], **extra: Any) -> Dict[str, Any]:
+    """Serializa com nomes curtos, omitindo valores nulos"""
+    result = {}
+    for key, attribute in fields.items():
+        value = _compact_value(getattr(instance, attribute))
+        if value is not None:
+            result[key] = value
+    for key, value in extra.items():
+        if value is not None:
+            result[key] = _compact_value(value)
+    return result
+
+
+# ==================== EXCLUSÕES ====================
+
+@event.listens_for(Session, "after_flush")
+def _record_tombstones(session: Session, flush_context):
+    """Registra exclusões físicas para a próxima sincronização dos apps"""
+    deleted = [instance for instance in session.deleted
+               if isinstance(instance, (Process, ProcessDeadline, ProcessTimeline, ProcessLawyer, ProcessNotification))]
+    if not deleted:
+        return
+
+    # Tenant de prazos/andamentos/vínculos vem do processo (uma consulta para todos)
+    process_tenants = {instance.id: instance.tenant_id for instance in deleted if isinstance(instance, Process)}
+    missing = {instance.process_id for instance in deleted
+               if isinstance(instance, (ProcessDeadline, ProcessTimeline, ProcessLawyer))
+               and instance.process_id not in process_tenants}
+    if missing:
+        process_tenants.update(session.connection().execute(
+            select(Process.id, Process.tenant_id).where(Process.id.in_(missing))
+        ).all())
+
+    rows = []
+    for instance in deleted:
+        if isinstance(instance, Process):
+            rows.append({"tenant_id": instance.tenant_id, "user_id": None, "entity": "process", "entity_id": instance.id})
+        elif isinstance(instance, ProcessNotification):
+            rows.append({"tenant_id": instance.tenant_id, "user_id": instance.user_id, "entity": "notification", "entity_id": instance.id})
+        elif isinstance(instance, ProcessLawyer):
+            rows.append({"tenant_id": process_tenants.get(instance.process_id), "user_id": instance.lawyer_id,
+                         "entity": "process", "entity_id": instance.process_id})
+        else:
+            entity = "deadline" if isinstance(instance, ProcessDeadline) else "timeline"
+            rows.append({"tenant_id": process_tenants.get(instance.process_id), "user_id": None,
+                         "entity": entity, "entity_id": instance.id})
+
+    rows = [row for row in rows if row["tenant_id"] is not None]
+    if rows:
+        session.connection().execute(insert(SyncTombstone), rows)
+
+
+# ==================== SINCRONIZAÇÃO ====================
+
+class MobileSyncService:
+    """Monta a resposta de sincronização (completa ou incremental) do app mobile"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def sync(self, user_id: str, tenant_id: str, token: Optional[str] = None) -> Dict[str, Any]:
+        now = self.db.execute(text("SELECT LOCALTIMESTAMP")).scalar()
+        watermark = decode_sync_token(token, user_id, now)
+        since = watermark - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS) if watermark else None
+
+        processes, removed_processes = self._processes(user_id, tenant_id, since)
+        deadlines, removed_deadlines = self._deadlines(user_id, tenant_id, since)
+        timeline = self._timeline(user_id, tenant_id, since, now)
+        notifications, removed_notifications = self._notifications(user_id, tenant_id, since)
+
+        removed = {"p": removed_processes, "d": removed_deadlines, "tl": [], "n": removed_notifications}
+        if since is not None:
+            for entity, key in (("process", "p"), ("deadline", "d"), ("timeline", "tl"), ("notification", "n")):
+                removed[key] += self._tombstones(user_id, tenant_id, since, entity)
+
+        return {
+            "t": encode_sync_token(now, user_id),
+            "f": 1 if since is None else 0,
+            "p": processes,
+            "d": deadlines,
+            "tl": timeline,
+            "n": notifications,
+            "x": {key: ids for key, ids in removed.items() if ids},
+            "s": self._summary(user_id, tenant_id, now),
+        }
+
+    # ==================== ENTIDADES ====================
+
+    def _assigned(self, user_id: str, tenant_id: str):
+        return and_(Process.tenant_id == tenant_id, ProcessLawyer.lawyer_id == user_id)
+
+    @staticmethod
+    def _changed(model, since: datetime):
+        """Criado/alterado desde ``since`` ou processo atribuído ao usuário desde então"""
+        return or_(func.coalesce(model.updated_at, model.created_at) >= since, ProcessLawyer.created_at >= since)
+
+    def _processes(self, user_id: str, tenant_id: str, since: Optional[datetime]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        query = self.db.query(Process).join(ProcessLawyer).options(
+            joinedload(Process.client)
+        ).filter(self._assigned(user_id, tenant_id))
+        if since is None:
+            query = query.filter(Process.status != "closed")
+        else:
+            query = query.filter(self._changed(Process, since))
+
+        changed, removed = [], []
+        for process in query.all():
+            if process.status == "closed":
+                removed.append(str(process.id))
+            else:
+                changed.append(compact(process, PROCESS_FIELDS, c=process.client.name if process.client else None))
+        return changed, removed
+
+    def _deadlines(self, user_id: str, tenant_id: str, since: Optional[datetime]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        query = self.db.query(ProcessDeadline).join(Process).join(ProcessLawyer).filter(
+            self._assigned(user_id, tenant_id)
+        )
+        if since is None:
+            query = query.filter(Process.status != "closed", ProcessDeadline.status.in_(OPEN_DEADLINE_STATUSES))
+        else:
+            query = query.filter(self._changed(ProcessDeadline, since))
+
+        changed, removed = [], []
+        for deadline in query.order_by(ProcessDeadline.due_date).all():
+            if deadline.status in OPEN_DEADLINE_STATUSES:
+                changed.append(compact(deadline, DEADLINE_FIELDS))
+            else:
+                removed.append(str(deadline.id))
+        return changed, removed
+
+    def _timeline(self, user_id: str, tenant_id: str, since: Optional[datetime], now: datetime) -> List[Dict[str, Any]]:
+        query = self.db.query(ProcessTimeline).join(Process).join(ProcessLawyer).filter(
+            self._assigned(user_id, tenant_id),
+            ProcessTimeline.date >= now - timedelta(days=TIMELINE_DAYS)
+        )
+        if since is None:
+            query = query.filter(Process.status != "closed")
+        else:
+            query = query.filter(self._changed(ProcessTimeline, since))
+
+        entries = []
+        for entry in query.order_by(ProcessTimeline.date.desc()).all():
+            item = compact(entry, TIMELINE_FIELDS)
+            if len(item.get("ds", "")) > 100:
+                item["ds"] = item["ds"][:100] + "..."
+            entries.append(item)
+        return entries
+
+    def _notifications(self, user_id: str, tenant_id: str, since: Optional[datetime]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        query = self.db.query(ProcessNotification).filter(
+            ProcessNotification.user_id == user_id,
+            ProcessNotification.tenant_id == tenant_id,
+            recent_notifications_filter()
+        )
+        if since is None:
+            query = query.filter(ProcessNotification.is_archived == False).order_by(
+                ProcessNotification.created_at.desc()
+            ).limit(FULL_SYNC_NOTIFICATIONS)
+        else:
+            query = query.filter(or_(
+                ProcessNotification.created_at >= since,
+                ProcessNotification.read_at >= since,
+                ProcessNotification.archived_at >= since
+            )).order_by(ProcessNotification.created_at.desc())
+
+        changed, removed = [], []
+        for notification in query.all():
+            if notification.is_archived:
+                removed.append(str(notification.id))
+            else:
+                changed.append(compact(notification, NOTIFICATION_FIELDS))
+        return changed, removed
+
+    def _tombstones(self, user_id: str, tenant_id: str, since: datetime, entity: str) -> List[str]:
+        rows = self.db.query(SyncTombstone.entity_id).filter(
+            SyncTombstone.tenant_id == tenant_id,
+            SyncTombstone.deleted_at >= since,
+            SyncTombstone.entity == entity,
+            or_(SyncTombstone.user_id.is_(None), SyncTombstone.user_id == user_id)
+        ).distinct().all()
+        return [str(row.entity_id) for row in rows]
+
+    # ==================== RESUMO ====================
+
+    def _summary(self, user_id: str, tenant_id: str, now: datetime) -> Dict[str, Any]:
+        """Contadores do topo da tela (sempre enviados, são poucos bytes)"""
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        active = self.db.query(func.count(Process.id)).join(ProcessLawyer).filter(
+            self._assigned(user_id, tenant_id),
+            Process.status == "active"
+        ).scalar()
+        deadlines_today = self.db.query(func.count(ProcessDeadline.id)).join(Process).join(ProcessLawyer).filter(
+            self._assigned(user_id, tenant_id),
+            ProcessDeadline.status == "pending",
+            ProcessDeadline.due_date >= today,
+            ProcessDeadline.due_date < today + timedelta(days=1)
+        ).scalar()
+        unread = self.db.query(func.count(ProcessNotification.id)).filter(
+            ProcessNotification.user_id == user_id,
+            ProcessNotification.tenant_id == tenant_id,
+            ProcessNotification.is_read == False,
+            ProcessNotification.is_archived == False
+        ).scalar()
+
+        return {"a": active, "dt": deadlines_today, "u": unread}
@@ -0,0 +1,489 @@
+"""
+Entrega de notificações por email, push e SMS via outbox transacional.
+
+As notificações gravam, na mesma transação, uma linha por canal em
+``notification_outbox``. Cada canal tem um worker que reserva lotes com
+``FOR UPDATE SKIP LOCKED`` (vários processos podem rodar em paralelo), envia o
+lote inteiro de uma vez (uma conexão SMTP para vários emails, um POST para
+vários push/SMS), respeita o limite de envio do canal e grava o resultado de
+volta: ``sent``, ``retry`` (com backoff exponencial) ou ``dead``.
+
+Para testes, ``DELIVERY_SINK_DIR`` substitui os transportes reais por arquivos
+JSONL (um por canal) e ``SMTP_HOST``/``SMTP_PORT`` podem apontar para um
+servidor SMTP de depuração (ex.: MailHog do docker-compose).
+
+O limite de envio é por processo: com vários workers de API, prefira
+``DELIVERY_ENABLED=false`` na API e rode ``scripts/run_notification_delivery.py``.
+O enfileiramento depende só das preferências do usuário, não dos transportes
+configurados no processo que grava a notificação: itens de um canal sem
+transporte ficam ``pending`` até um worker com esse canal rodar.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import smtplib
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+EMAIL = "email"
+PUSH = "push"
+SMS = "sms"
+CHANNELS = (EMAIL, PUSH, SMS)
+
+# Uma linha por canal habilitado nas preferências; o destinatário vem do cadastro do usuário
+ENQUEUE_SQL = text("""
+INSERT INTO notification_outbox (
+    id, tenant_id, notification_id, user_id, channel, recipient,
+    subject, body, status, attempts, next_attempt_at, created_at
+)
+SELECT
+    gen_random_uuid(), pn.tenant_id, pn.id, pn.user_id, ch.channel,
+    CASE ch.channel
+        WHEN 'email' THEN u.email
+        WHEN 'sms' THEN u.phone
+        ELSE CAST(u.id AS text)
+    END,
+    LEFT(pn.title, 255), pn.message, 'pending', 0, now(), now()
+FROM process_notifications pn
+JOIN users u ON u.id = pn.user_id AND u.is_active = true
+LEFT JOIN notification_preferences np
+       ON np.user_id = pn.user_id AND np.tenant_id = pn.tenant_id
+CROSS JOIN LATERAL (VALUES
+    ('email', COALESCE(pn.should_email, true) AND COALESCE(np.email_enabled, true)),
+    ('push', COALESCE(pn.should_push, true) AND COALESCE(np.push_enabled, true)),
+    ('sms', COALESCE(pn.should_sms, false) AND COALESCE(np.sms_enabled, false) AND u.phone IS NOT NULL)
+) AS ch(channel, enabled)
+WHERE pn.id = ANY(CAST(:notification_ids AS uuid[]))
+  AND ch.enabled
+  AND NOT EXISTS (
+      SELECT 1 FROM notification_outbox o
+      WHERE o.notification_id = pn.id AND o.channel = ch.channel
+  )
+""")
+
+# Itens travados por um worker que morreu e sem tentativas restantes: não voltam à fila
+EXPIRE_STALE_SQL = text("""
+UPDATE notification_outbox
+SET status = 'dead', locked_at = NULL,
+    last_error = COALESCE(last_error, 'Worker interrompido durante o envio (tentativas esgotadas)')
+WHERE channel = :channel
+  AND status = 'sending'
+  AND locked_at < now() - make_interval(secs => :lock_timeout)
+  AND attempts >= :max_attempts
+""")
+
+# Reserva um lote do canal (inclui itens travados por um worker que morreu, se ainda houver tentativas)
+CLAIM_SQL = text("""
+UPDATE notification_outbox
+SET status = 'sending', locked_at = now(), attempts = attempts + 1
+WHERE id IN (
+    SELECT id FROM notification_outbox
+    WHERE channel = :channel
+      AND (
+          (status IN ('pending', 'retry') AND next_attempt_at <= now())
+          OR (status = 'sending' AND locked_at < now() - make_interval(secs => :lock_timeout)
+              AND attempts < :max_attempts)
+      )
+    ORDER BY next_attempt_at
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, tenant_id, notification_id, user_id, recipient, subject, body, attempts
+""")
+
+MARK_SENT_SQL = text("""
+UPDATE notification_outbox
+SET status = 'sent', sent_at = now(), locked_at = NULL, last_error = NULL
+WHERE id = ANY(CAST(:ids AS uuid[]))
+""")
+
+MARK_FAILED_SQL = text("""
+UPDATE notification_outbox AS o
+SET status = CASE WHEN o.attempts >= :max_attempts THEN 'dead' ELSE 'retry' END,
+    next_attempt_at = now() + make_interval(secs => f.delay),
+    locked_at = NULL,
+    last_error = f.error
+FROM unnest(
+    CAST(:ids AS uuid[]), CAST(:errors AS text[]), CAST(:delays AS float8[])
+) AS f(id, error, delay)
+WHERE o.id = f.id
+""")
+
+
+def configured_channels() -> List[str]:
+    """Canais com transporte configurado, independentemente de ``DELIVERY_ENABLED``"""
+    if settings.DELIVERY_SINK_DIR:
+        return list(CHANNELS)
+
+    channels = []
+    if settings.SMTP_HOST:
+        channels.append(EMAIL)
+    if settings.PUSH_ENDPOINT_URL:
+        channels.append(PUSH)
+    if settings.SMS_ENDPOINT_URL:
+        channels.append(SMS)
+    return channels
+
+
+def enqueue_deliveries(db: Session, notification_ids: Iterable[Any]) -> int:
+    """
+    Enfileira as entregas das notificações informadas na transação corrente.
+
+    Deve ser chamado antes do commit que grava as notificações, para que
+    notificação e entregas sejam confirmadas (ou descartadas) juntas.
+    Independe de ``DELIVERY_ENABLED``: quem entrega é o worker de cada canal.
+    """
+    ids = [str(notification_id) for notification_id in notification_ids]
+    if not ids:
+        return 0
+    result = db.execute(ENQUEUE_SQL, {"notification_ids": ids})
+    return result.rowcount or 0
+
+
+# ==================== TRANSPORTES ====================
+
+@dataclass
+class OutboxMessage:
+    """Item reservado do outbox"""
+    id: Any
+    tenant_id: Any
+    notification_id: Any
+    user_id: Any
+    recipient: str
+    subject: str
+    body: str
+    attempts: int
+
+
+class ChannelSender(ABC):
+    """Envia um lote; retorna {id: erro} apenas para os itens que falharam"""
+
+    @abstractmethod
+    def send_batch(self, messages: List[OutboxMessage]) -> Dict[Any, str]:
+        ...
+
+
+class SmtpEmailSender(ChannelSender):
+    """Uma conexão SMTP por lote"""
+
+    def __init__(self, host: str, port: int, user: str = "", password: str = "",
+                 use_tls: bool = False, from_address: str = "", timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.from_address = from_address
+        self.timeout = timeout
+
+    def send_batch(self, messages: List[OutboxMessage]) -> Dict[Any, str]:
+        failures: Dict[Any, str] = {}
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+
+            for message in messages:
+                email = EmailMessage()
+                email["From"] = self.from_address
+                email["To"] = message.recipient
+                email["Subject"] = message.subject
+                email["Message-ID"] = f"<{message.notification_id}.{message.id}@saasjuridico>"
+                email.set_content(message.body)
+                try:
+                    smtp.send_message(email)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    # Erro do destinatário: os demais seguem na mesma conexão
+                    failures[message.id] = str(e)
+        return failures
+
+
+class HttpBatchSender(ChannelSender):
+    """
+    POST de um lote em JSON para o provedor (push ou SMS).
+
+    O provedor pode responder ``{"results": [{"id": ..., "error": ...}]}``
+    para indicar falhas individuais; qualquer resposta 2xx sem ``results``
+    confirma o lote inteiro.
+    """
+
+    def __init__(self, url: str, api_key: str = "", timeout: float = 30):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def send_batch(self, messages: List[OutboxMessage]) -> Dict[Any, str]:
+        payload = json.dumps({
+            "messages": [
+                {
+                    "id": str(message.id),
+                    "to": message.recipient,
+                    "title": message.subject,
+                    "body": message.body,
+                    "data": {"notification_id": str(message.notification_id)}
+                }
+                for message in messages
+            ]
+        }).encode("utf-8")
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        request = urllib.request.Request(self.url, data=payload, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            raw = response.read()
+
+        try:
+            results = json.loads(raw or b"{}").get("results") or []
+        except (ValueError, AttributeError):
+            results = []
+
+        by_id = {str(message.id): message.id for message in messages}
+        return {
+            by_id[item["id"]]: str(item["error"])
+            for item in results
+            if item.get("error") and item.get("id") in by_id
+        }
+
+
+class FileSinkSender(ChannelSender):
+    """Grava o lote em um arquivo JSONL (substituto local para testes)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[OutboxMessage]) -> Dict[Any, str]:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lines = [
+            json.dumps({
+                "id": str(message.id),
+                "notification_id": str(message.notification_id),
+                "user_id": str(message.user_id),
+                "to": message.recipient,
+                "subject": message.subject,
+                "body": message.body,
+                "attempt": message.attempts,
+                "sent_at": datetime.now().isoformat()
+            }, ensure_ascii=False)
+            for message in messages
+        ]
+        with self._lock, open(self.path, "a", encoding="utf-8") as sink:
+            sink.write("\n".join(lines) + "\n")
+        return {}
+
+
+def build_sender(channel: str) -> Optional[ChannelSender]:
+    """Transporte do canal conforme a configuração"""
+    if settings.DELIVERY_SINK_DIR:
+        return FileSinkSender(os.path.join(settings.DELIVERY_SINK_DIR, f"{channel}.jsonl"))
+    if channel == EMAIL and settings.SMTP_HOST:
+        return SmtpEmailSender(
+            settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD,
+            settings.SMTP_USE_TLS, settings.SMTP_FROM
+        )
+    if channel == PUSH and settings.PUSH_ENDPOINT_URL:
+        return HttpBatchSender(settings.PUSH_ENDPOINT_URL, settings.PUSH_API_KEY)
+    if channel == SMS and settings.SMS_ENDPOINT_URL:
+        return HttpBatchSender(settings.SMS_ENDPOINT_URL, settings.SMS_API_KEY)
+    return None
+
+
+# ==================== LIMITE DE ENVIO ====================
+
+class TokenBucket:
+    """Limite de envio por canal (mensagens por segundo, com rajada)"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = max(rate, 0.001)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, wanted: int) -> int:
+        """Retira até ``wanted`` fichas disponíveis e retorna quantas foram retiradas"""
+        self._refill()
+        granted = min(wanted, int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+    def give_back(self, count: int):
+        self.tokens = min(self.capacity, self.tokens + count)
+
+    def wait_time(self) -> float:
+        """Segundos até haver pelo menos uma ficha"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+# ==================== WORKERS ====================
+
+class ChannelWorker:
+    """Reserva, envia e confirma lotes de um canal"""
+
+    def __init__(self, channel: str, sender: ChannelSender, rate: float, batch_size: int,
+                 max_attempts: int, retry_base_seconds: int, lock_timeout_seconds: int,
+                 session_factory=SessionLocal):
+        self.channel = channel
+        self.sender = sender
+        self.bucket = TokenBucket(rate, burst=max(batch_size, int(rate)))
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.session_factory = session_factory
+
+    def run_once(self) -> bool:
+        """Processa um lote; retorna True se provavelmente ainda há fila"""
+        allowed = self.bucket.take(self.batch_size)
+        if not allowed:
+            return True  # limite de envio atingido
+
+        db = self.session_factory()
+        try:
+            messages = self._claim(db, allowed)
+            self.bucket.give_back(allowed - len(messages))
+            if not messages:
+                return False
+
+            try:
+                failures = self.sender.send_batch(messages)
+            except Exception as e:
+                # Falha de conexão/transporte: o lote inteiro volta para a fila
+                logger.warning(f"Entrega '{self.channel}': lote de {len(messages)} falhou: {e}")
+                failures = {message.id: f"{type(e).__name__}: {e}" for message in messages}
+
+            self._write_back(db, messages, failures)
+            return len(messages) == allowed
+        finally:
+            db.close()
+
+    def _claim(self, db: Session, limit: int) -> List[OutboxMessage]:
+        params = {
+            "channel": self.channel,
+            "lock_timeout": self.lock_timeout_seconds,
+            "max_attempts": self.max_attempts
+        }
+        db.execute(EXPIRE_STALE_SQL, params)
+        rows = db.execute(CLAIM_SQL, {**params, "limit": limit}).all()
+        db.commit()
+        return [OutboxMessage(*row) for row in rows]
+
+    def _write_back(self, db: Session, messages: List[OutboxMessage], failures: Dict[Any, str]):
+        sent = [str(message.id) for message in messages if message.id not in failures]
+        failed = [message for message in messages if message.id in failures]
+
+        if sent:
+            db.execute(MARK_SENT_SQL, {"ids": sent})
+        if failed:
+            db.execute(MARK_FAILED_SQL, {
+                "ids": [str(message.id) for message in failed],
+                "errors": [failures[message.id][:1000] for message in failed],
+                "delays": [self._backoff(message.attempts) for message in failed],
+                "max_attempts": self.max_attempts
+            })
+        db.commit()
+
+        if failed:
+            logger.info(f"Entrega '{self.channel}': {len(sent)} enviadas, {len(failed)} para nova tentativa")
+
+    def _backoff(self, attempts: int) -> float:
+        """Backoff exponencial com jitter, limitado a 6 horas"""
+        delay = min(self.retry_base_seconds * (2 ** max(attempts - 1, 0)), 6 * 3600)
+        return delay * random.uniform(0.5, 1.0)
+
+
+class NotificationDeliveryService:
+    """
+    Executa um worker por canal configurado.
+
+    ``enabled`` sobrepõe ``DELIVERY_ENABLED`` para esta instância (o worker
+    dedicado entrega mesmo com a entrega desligada na API).
+    """
+
+    def __init__(self, poll_seconds: float = 2, session_factory=SessionLocal, enabled: Optional[bool] = None):
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.workers: List[ChannelWorker] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def build_workers(self) -> List[ChannelWorker]:
+        rates = {
+            EMAIL: settings.DELIVERY_EMAIL_RATE,
+            PUSH: settings.DELIVERY_PUSH_RATE,
+            SMS: settings.DELIVERY_SMS_RATE
+        }
+        enabled = settings.DELIVERY_ENABLED if self.enabled is None else self.enabled
+        workers = []
+        for channel in (configured_channels() if enabled else []):
+            sender = build_sender(channel)
+            if sender is None:
+                continue
+            workers.append(ChannelWorker(
+                channel, sender, rates[channel], settings.DELIVERY_BATCH_SIZE,
+                settings.DELIVERY_MAX_ATTEMPTS, settings.DELIVERY_RETRY_BASE_SECONDS,
+                settings.DELIVERY_LOCK_TIMEOUT_SECONDS, self.session_factory
+            ))
+        return workers
+
+    async def start(self):
+        """Inicia um loop por canal"""
+        self._stopping = False
+        self.workers = self.build_workers()
+        self._tasks = [asyncio.create_task(self._run(worker)) for worker in self.workers]
+        if self.workers:
+            logger.info(f"Entrega de notificações: canais {', '.join(w.channel for w in self.workers)}")
+        idle = [channel for channel in CHANNELS if channel not in {w.channel for w in self.workers}]
+        if idle:
+            logger.info(f"Entrega de notificações: sem transporte para {', '.join(idle)} (itens ficam pendentes no outbox)")
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _run(self, worker: ChannelWorker):
+        while not self._stopping:
+            try:
+                has_more = await asyncio.to_thread(worker.run_once)
+                # Com fila: espera só o limite de envio; sem fila: intervalo de polling
+                await asyncio.sleep(worker.bucket.wait_time() if has_more else self.poll_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Erro no worker de entrega '{worker.channel}': {e}")
+                await asyncio.sleep(max(self.poll_seconds, 5))
+
+
+notification_delivery = NotificationDeliveryService(poll_seconds=settings.DELIVERY_POLL_SECONDS)
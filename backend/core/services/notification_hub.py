@@ -0,0 +1,295 @@
+"""
+Hub de notificações em tempo real.
+
+Mantém, em cada processo (worker), um fan-out em memória por usuário para as
+conexões SSE/WebSocket abertas. Com PostgreSQL, a publicação é feita via
+``pg_notify`` dentro da transação que cria/atualiza a notificação: o evento só
+é entregue após o commit e chega a todos os workers que estão escutando o
+canal (LISTEN), sem necessidade de broker externo.
+
+O mesmo canal transporta mensagens de controle entre workers
+(``{"control": tipo, "data": {...}}``), entregues aos handlers registrados
+com ``register_control`` (ex.: avisar o líder do agendador de prazos).
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Limite de payload do NOTIFY no PostgreSQL é 8000 bytes
+_PG_NOTIFY_MAX_BYTES = 7900
+_MESSAGE_PREVIEW_CHARS = 280
+
+
+def _subscriber_key(tenant_id: Any, user_id: Any) -> str:
+    return f"{tenant_id}:{user_id}"
+
+
+def notification_event(notification, event_type: str = "notification.created", unread_delta: int = 1) -> Dict[str, Any]:
+    """Monta o evento compacto enviado aos clientes conectados"""
+    message = notification.message or ""
+    if len(message) > _MESSAGE_PREVIEW_CHARS:
+        message = message[:_MESSAGE_PREVIEW_CHARS] + "..."
+
+    return {
+        "type": event_type,
+        "unread_delta": unread_delta,
+        "notification": {
+            "id": str(notification.id),
+            "process_id": str(notification.process_id) if notification.process_id else None,
+            "notification_type": notification.notification_type,
+            "priority": notification.priority,
+            "title": notification.title,
+            "message": message,
+        },
+    }
+
+
+class NotificationHub:
+    """Fan-out de eventos de notificação por usuário, com LISTEN/NOTIFY entre workers"""
+
+    def __init__(self, channel: str, mode: str = "auto", queue_size: int = 100):
+        self.channel = channel
+        self.mode = mode
+        self.queue_size = queue_size
+
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._listener_connected = False
+        self._stopping = False
+        self._control_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+    # ==================== CICLO DE VIDA ====================
+
+    @property
+    def cluster_enabled(self) -> bool:
+        """Indica se a publicação deve passar pelo PostgreSQL"""
+        if self.mode == "local":
+            return False
+        return settings.DATABASE_URL.startswith("postgresql")
+
+    async def start(self):
+        """Inicia o hub (e o listener do PostgreSQL, se aplicável)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping = False
+
+        if self.cluster_enabled:
+            self._listener_task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        """Encerra o listener e avisa as conexões abertas"""
+        self._stopping = True
+
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        for queues in list(self._subscribers.values()):
+            for queue in list(queues):
+                self._put(queue, {"type": "shutdown"})
+
+    # ==================== ASSINATURAS ====================
+
+    def subscribe(self, tenant_id: Any, user_id: Any) -> asyncio.Queue:
+        """Registra uma conexão do usuário e retorna sua fila de eventos"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[_subscriber_key(tenant_id, user_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, tenant_id: Any, user_id: Any, queue: asyncio.Queue):
+        """Remove uma conexão do usuário"""
+        key = _subscriber_key(tenant_id, user_id)
+        queues = self._subscribers.get(key)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[key]
+
+    def connection_count(self) -> int:
+        """Total de conexões abertas neste worker"""
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    # ==================== PUBLICAÇÃO ====================
+
+    def publish(self, db: Session, tenant_id: Any, user_id: Any, payload: Dict[str, Any]):
+        """
+        Publica um evento vinculado à transação corrente da sessão.
+
+        Em PostgreSQL usa ``pg_notify`` (entregue somente no commit, para todos
+        os workers). Nos demais casos, despacha localmente após o commit.
+        """
+        message = {"tenant_id": str(tenant_id), "user_id": str(user_id), "event": payload}
+
+        if self.cluster_enabled and db.get_bind().dialect.name == "postgresql":
+            raw = json.dumps(message, default=str, ensure_ascii=False)
+            if len(raw.encode("utf-8")) > _PG_NOTIFY_MAX_BYTES:
+                # Evento grande demais: o cliente recarrega pela API
+                message["event"] = {"type": "resync"}
+                raw = json.dumps(message)
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": raw})
+            return
+
+        def _after_commit(session):
+            self.dispatch(message["tenant_id"], message["user_id"], payload)
+
+        event.listen(db, "after_commit", _after_commit, once=True)
+
+    def publish_many(self, db: Session, messages: List[Tuple[Any, Any, Dict[str, Any]]]):
+        """Publica vários eventos (tenant_id, user_id, evento) com um único comando"""
+        if not messages:
+            return
+
+        if self.cluster_enabled and db.get_bind().dialect.name == "postgresql":
+            payloads = []
+            for tenant_id, user_id, payload in messages:
+                raw = json.dumps(
+                    {"tenant_id": str(tenant_id), "user_id": str(user_id), "event": payload},
+                    default=str, ensure_ascii=False
+                )
+                if len(raw.encode("utf-8")) > _PG_NOTIFY_MAX_BYTES:
+                    raw = json.dumps({"tenant_id": str(tenant_id), "user_id": str(user_id), "event": {"type": "resync"}})
+                payloads.append(raw)
+
+            db.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": self.channel, "payloads": payloads}
+            )
+            return
+
+        def _after_commit(session):
+            for tenant_id, user_id, payload in messages:
+                self.dispatch(tenant_id, user_id, payload)
+
+        event.listen(db, "after_commit", _after_commit, once=True)
+
+    def register_control(self, kind: str, handler: Callable[[Dict[str, Any]], None]):
+        """Registra o handler de um tipo de mensagem de controle (executado no event loop)"""
+        self._control_handlers[kind] = handler
+
+    def control_notify(self, kind: str, data: Optional[Dict[str, Any]] = None):
+        """
+        Comando ``pg_notify`` de uma mensagem de controle: ``(sql, parâmetros)``.
+
+        Executado na sessão que faz a alteração (antes do commit), a mensagem
+        só chega aos workers se a transação for confirmada.
+        """
+        raw = json.dumps({"control": kind, "data": data or {}}, default=str)
+        return text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": raw}
+
+    def dispatch(self, tenant_id: Any, user_id: Any, payload: Dict[str, Any]):
+        """Entrega um evento às conexões locais do usuário (thread-safe)"""
+        if self._loop is None:
+            return
+
+        if threading.get_ident() != self._loop_thread_id:
+            self._loop.call_soon_threadsafe(self._dispatch_local, str(tenant_id), str(user_id), payload)
+        else:
+            self._dispatch_local(str(tenant_id), str(user_id), payload)
+
+    def _dispatch_local(self, tenant_id: str, user_id: str, payload: Dict[str, Any]):
+        for queue in list(self._subscribers.get(_subscriber_key(tenant_id, user_id), ())):
+            self._put(queue, payload)
+
+    def _broadcast_local(self, payload: Dict[str, Any]):
+        for queues in list(self._subscribers.values()):
+            for queue in list(queues):
+                self._put(queue, payload)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, payload: Dict[str, Any]):
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Consumidor lento: descarta o acúmulo e pede ressincronização
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+
+    # ==================== LISTENER POSTGRESQL ====================
+
+    def _on_pg_notification(self, connection, pid, channel, raw_payload):
+        try:
+            message = json.loads(raw_payload)
+            if "control" in message:
+                handler = self._control_handlers.get(message["control"])
+                if handler is not None:
+                    handler(message.get("data") or {})
+                return
+            self._dispatch_local(message["tenant_id"], message["user_id"], message["event"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Payload de notificação inválido: {e}")
+
+    async def _listen_forever(self):
+        """Mantém uma conexão dedicada com LISTEN, reconectando em caso de falha"""
+        try:
+            import asyncpg
+        except ImportError:
+            logger.warning("asyncpg não instalado; hub de notificações restrito ao worker local")
+            self.mode = "local"
+            return
+
+        dsn = _asyncpg_dsn(settings.DATABASE_URL)
+        backoff = 1
+
+        while not self._stopping:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda conn: lost.set())
+                await connection.add_listener(self.channel, self._on_pg_notification)
+
+                if not self._listener_connected:
+                    self._listener_connected = True
+                    if backoff > 1:
+                        # Eventos podem ter sido perdidos durante a queda
+                        self._broadcast_local({"type": "resync"})
+                backoff = 1
+
+                await lost.wait()
+                logger.warning("Conexão LISTEN de notificações perdida")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Falha no LISTEN de notificações: {e}")
+            finally:
+                self._listener_connected = False
+                if connection is not None and not connection.is_closed():
+                    try:
+                        await connection.close()
+                    except Exception:
+                        pass
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """Converte URL do SQLAlchemy (postgresql+driver://) para DSN do asyncpg"""
+    scheme, _, rest = database_url.partition("://")
+    return f"{scheme.split('+')[0]}://{rest}"
+
+
+# Instância única por worker
+notification_hub = NotificationHub(
+    channel=settings.NOTIFICATION_CHANNEL,
+    mode=settings.NOTIFICATION_HUB_MODE,
+    queue_size=settings.NOTIFICATION_QUEUE_SIZE,
+)
@@ -1,43 +1,101 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from core.models.notification import ProcessNotification, NotificationPreference
-from core.models.process import Process, ProcessDeadline, ProcessTimeline
+from sqlalchemy import and_, or_, desc, asc, func, text, insert, select, update, delete
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, timedelta
+from core.models.notification import ProcessNotification, NotificationPreference, NotificationStreamTicket
+from core.models.process import Process, ProcessDeadline, ProcessLawyer, ProcessTimeline
 from core.models.user import User
+from core.config import settings
+from core.database import AnySession, SessionAdapter
+from core.services.notification_hub import notification_hub, notification_event
+from core.services.notification_delivery import enqueue_deliveries
+from core.services.notification_templates import notification_templates, deadline_template_key
+import hashlib
+import secrets
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Prazos que precisam de notificação, já com a chave de deduplicação reservada
+# (ver check_and_create_deadline_notifications)
+DEADLINE_NOTIFICATIONS_SQL = text("""
+    WITH candidates AS (
+        SELECT DISTINCT
+            pd.id AS deadline_id,
+            pd.process_id,
+            p.tenant_id,
+            pl.lawyer_id AS user_id,
+            pd.title AS deadline_title,
+            pd.due_date,
+            pd.deadline_type,
+            CAST(pd.due_date AS date) - CAST(:today AS date) AS days_until,
+            COALESCE(np.email_enabled, true) AS should_email,
+            COALESCE(np.push_enabled, true) AS should_push,
+            COALESCE(np.sms_enabled, false) AS should_sms
+        FROM process_deadlines pd
+        JOIN processes p ON p.id = pd.process_id
+        JOIN process_lawyers pl ON pl.process_id = pd.process_id
+        LEFT JOIN notification_preferences np
+            ON np.user_id = pl.lawyer_id AND np.tenant_id = p.tenant_id
+        WHERE p.tenant_id = CAST(:tenant_id AS uuid)
+          AND pd.status = 'pending'
+          AND pd.due_date >= CAST(:today AS date)
+          AND CAST(pd.due_date AS date) - CAST(:today AS date)
+              <= COALESCE(np.deadline_reminder_days, pd.notify_days_before, 3)
+          AND COALESCE(np.deadline_notifications, true)
+    ),
+    keyed AS (
+        SELECT c.*,
+               'deadline:' || c.deadline_id || ':' || c.user_id || ':' || c.days_until AS dedup_key
+        FROM candidates c
+    ),
+    claimed AS (
+        INSERT INTO notification_dedup_keys (dedup_key, notification_type, created_at)
+        SELECT dedup_key, 'deadline', now() FROM keyed
+        ON CONFLICT (dedup_key) DO NOTHING
+        RETURNING dedup_key
+    )
+    SELECT k.*
+    FROM keyed k
+    JOIN claimed USING (dedup_key)
+""")
+
+def recent_notifications_filter():
+    """
+    Restringe a consulta à janela recente (NOTIFICATION_RECENT_DAYS).
+    
+    process_notifications é particionada por mês em created_at; com este
+    filtro o planejador acessa apenas as partições dos últimos meses.
+    Use apenas em listagens paginadas: contadores de não lidas e "marcar
+    todas como lidas" precisam alcançar notificações antigas ainda não lidas
+    (o índice por usuário/tenant/is_read de cada partição atende essas consultas).
+    """
+    return ProcessNotification.created_at >= datetime.now() - timedelta(days=settings.NOTIFICATION_RECENT_DAYS)
+
 class NotificationService:
     """Serviço inteligente de notificações para advogados"""
     
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: AnySession):
+        self.db = SessionAdapter.wrap(db)
     
     # ==================== NOTIFICAÇÕES DE PRAZOS ====================
     
     async def create_deadline_notification(self, deadline: ProcessDeadline, user_id: str) -> ProcessNotification:
         """Cria notificação de prazo"""
+        return await self.db.run(self._create_deadline_notification, deadline, user_id)
+    
+    def _create_deadline_notification(self, db: Session, deadline: ProcessDeadline, user_id: str) -> ProcessNotification:
         days_until_deadline = (deadline.due_date - datetime.now()).days
-        
-        if days_until_deadline <= 0:
-            priority = "critical"
-            title = f"⚠️ PRAZO VENCIDO: {deadline.title}"
-            message = f"O prazo '{deadline.title}' do processo venceu hoje!"
-        elif days_until_deadline == 1:
-            priority = "high"
-            title = f"🚨 PRAZO AMANHÃ: {deadline.title}"
-            message = f"O prazo '{deadline.title}' vence amanhã!"
-        elif days_until_deadline <= 3:
-            priority = "high"
-            title = f"⏰ PRAZO PRÓXIMO: {deadline.title}"
-            message = f"O prazo '{deadline.title}' vence em {days_until_deadline} dias"
-        else:
-            priority = "normal"
-            title = f"📅 PRAZO: {deadline.title}"
-            message = f"Lembrete: prazo '{deadline.title}' vence em {days_until_deadline} dias"
+        priority = self._deadline_priority(days_until_deadline)
+        title, message = notification_templates.render(
+            db, deadline.process.tenant_id, deadline_template_key(days_until_deadline), {
+                "deadline_title": deadline.title,
+                "days_until": days_until_deadline,
+                "due_date": deadline.due_date,
+                "deadline_type": deadline.deadline_type
+            }
+        )
         
         notification = ProcessNotification(
             id=uuid.uuid4(),
@@ -56,38 +114,43 @@ class NotificationService:
             }
         )
         
-        self.db.add(notification)
-        self.db.commit()
+        db.add(notification)
+        db.flush()
+        enqueue_deliveries(db, [notification.id])
+        notification_hub.publish(db, notification.tenant_id, user_id, notification_event(notification))
+        db.commit()
         return notification
     
     # ==================== NOTIFICAÇÕES DE ANDAMENTOS ====================
     
     async def create_court_update_notification(self, timeline_entry: ProcessTimeline, user_id: str) -> ProcessNotification:
         """Cria notificação de atualização do tribunal"""
+        return await self.db.run(self._create_court_update_notification, timeline_entry, user_id)
+    
+    def _create_court_update_notification(self, db: Session, timeline_entry: ProcessTimeline, user_id: str) -> ProcessNotification:
         
         # Classificar tipo de andamento
-        if "sentença" in timeline_entry.type.lower() or "julgamento" in timeline_entry.type.lower():
+        andamento_type = timeline_entry.type.lower()
+        if "sentença" in andamento_type or "julgamento" in andamento_type:
             notification_type = "sentença"
             priority = "high"
-            emoji = "⚖️"
-            title = f"⚖️ SENTENÇA: {timeline_entry.process.subject}"
-        elif "audiência" in timeline_entry.type.lower():
+        elif "audiência" in andamento_type:
             notification_type = "audiência"
             priority = "high"
-            emoji = "🏛️"
-            title = f"🏛️ AUDIÊNCIA: {timeline_entry.process.subject}"
-        elif "prazo" in timeline_entry.type.lower():
+        elif "prazo" in andamento_type:
             notification_type = "prazo"
             priority = "normal"
-            emoji = "⏰"
-            title = f"⏰ PRAZO: {timeline_entry.process.subject}"
         else:
             notification_type = "andamento"
             priority = "normal"
-            emoji = "📋"
-            title = f"📋 ANDAMENTO: {timeline_entry.process.subject}"
         
-        message = f"{emoji} {timeline_entry.description[:100]}..."
+        title, message = notification_templates.render(
+            db, timeline_entry.process.tenant_id, notification_type, {
+                "process_subject": timeline_entry.process.subject,
+                "description": timeline_entry.description[:100],
+                "andamento_type": timeline_entry.type
+            }
+        )
         
         notification = ProcessNotification(
             id=uuid.uuid4(),
@@ -105,14 +168,25 @@ class NotificationService:
             }
         )
         
-        self.db.add(notification)
-        self.db.commit()
+        db.add(notification)
+        db.flush()
+        enqueue_deliveries(db, [notification.id])
+        notification_hub.publish(db, notification.tenant_id, user_id, notification_event(notification))
+        db.commit()
         return notification
     
     # ==================== NOTIFICAÇÕES DE PROCESSOS URGENTES ====================
     
     async def create_urgent_process_notification(self, process: Process, user_id: str) -> ProcessNotification:
         """Cria notificação de processo urgente"""
+        return await self.db.run(self._create_urgent_process_notification, process, user_id)
+    
+    def _create_urgent_process_notification(self, db: Session, process: Process, user_id: str) -> ProcessNotification:
+        
+        title, message = notification_templates.render(db, process.tenant_id, "urgente", {
+            "process_subject": process.subject,
+            "process_number": process.cnj_number
+        })
         
         notification = ProcessNotification(
             id=uuid.uuid4(),
@@ -121,8 +195,8 @@ class NotificationService:
             user_id=user_id,
             notification_type="urgente",
             priority="critical",
-            title=f"🚨 PROCESSO URGENTE: {process.subject}",
-            message=f"O processo {process.cnj_number} foi marcado como urgente e requer atenção imediata!",
+            title=title,
+            message=message,
             notification_data={
                 "process_number": process.cnj_number,
                 "priority": process.priority,
@@ -130,21 +204,27 @@ class NotificationService:
             }
         )
         
-        self.db.add(notification)
-        self.db.commit()
+        db.add(notification)
+        db.flush()
+        enqueue_deliveries(db, [notification.id])
+        notification_hub.publish(db, notification.tenant_id, user_id, notification_event(notification))
+        db.commit()
         return notification
     
     # ==================== NOTIFICAÇÕES DE RESUMO ====================
     
     async def create_daily_summary_notification(self, user_id: str, tenant_id: str) -> ProcessNotification:
         """Cria notificação de resumo diário"""
+        return await self.db.run(self._create_daily_summary_notification, user_id, tenant_id)
+    
+    def _create_daily_summary_notification(self, db: Session, user_id: str, tenant_id: str) -> ProcessNotification:
         
         # Buscar estatísticas do dia
         today = datetime.now().date()
         tomorrow = today + timedelta(days=1)
         
         # Prazos vencendo hoje
-        deadlines_today = self.db.query(ProcessDeadline).join(Process).filter(
+        deadlines_today = db.query(ProcessDeadline).join(Process).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessDeadline.due_date >= today,
@@ -154,7 +234,7 @@ class NotificationService:
         ).count()
         
         # Novos andamentos
-        new_updates = self.db.query(ProcessTimeline).join(Process).filter(
+        new_updates = db.query(ProcessTimeline).join(Process).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 ProcessTimeline.created_at >= today,
@@ -163,7 +243,7 @@ class NotificationService:
         ).count()
         
         # Processos urgentes
-        urgent_processes = self.db.query(Process).filter(
+        urgent_processes = db.query(Process).filter(
             and_(
                 Process.tenant_id == tenant_id,
                 Process.requires_attention == True,
@@ -171,8 +251,12 @@ class NotificationService:
             )
         ).count()
         
-        title = f"📊 RESUMO DIÁRIO - {today.strftime('%d/%m/%Y')}"
-        message = f"📅 {deadlines_today} prazos vencendo hoje | 📋 {new_updates} novos andamentos | 🚨 {urgent_processes} processos urgentes"
+        title, message = notification_templates.render(db, tenant_id, "resumo", {
+            "date": today,
+            "deadlines_count": deadlines_today,
+            "updates_count": new_updates,
+            "urgent_count": urgent_processes
+        })
         
         notification = ProcessNotification(
             id=uuid.uuid4(),
@@ -191,8 +275,11 @@ class NotificationService:
             }
         )
         
-        self.db.add(notification)
-        self.db.commit()
+        db.add(notification)
+        db.flush()
+        enqueue_deliveries(db, [notification.id])
+        notification_hub.publish(db, notification.tenant_id, user_id, notification_event(notification))
+        db.commit()
         return notification
     
     # ==================== GESTÃO DE NOTIFICAÇÕES ====================
@@ -206,33 +293,52 @@ class NotificationService:
     ) -> List[ProcessNotification]:
         """Busca notificações do usuário"""
         
-        query = self.db.query(ProcessNotification).filter(
+        query = select(ProcessNotification).where(
             and_(
                 ProcessNotification.user_id == user_id,
                 ProcessNotification.tenant_id == tenant_id,
-                ProcessNotification.is_archived == False
+                ProcessNotification.is_archived == False,
+                recent_notifications_filter()
             )
         )
         
         if unread_only:
-            query = query.filter(ProcessNotification.is_read == False)
+            query = query.where(ProcessNotification.is_read == False)
         
-        return query.order_by(desc(ProcessNotification.created_at)).limit(limit).all()
+        return list(await self.db.scalars(query.order_by(desc(ProcessNotification.created_at)).limit(limit)))
+    
+    async def count_unread_notifications(self, user_id: str, tenant_id: str) -> int:
+        """Conta notificações não lidas (e não arquivadas) do usuário"""
+        
+        return await self.db.scalar(select(func.count(ProcessNotification.id)).where(
+            and_(
+                ProcessNotification.user_id == user_id,
+                ProcessNotification.tenant_id == tenant_id,
+                ProcessNotification.is_archived == False,
+                ProcessNotification.is_read == False
+            )
+        )) or 0
     
     async def mark_notification_as_read(self, notification_id: str, user_id: str) -> bool:
         """Marca notificação como lida"""
         
-        notification = self.db.query(ProcessNotification).filter(
+        notification = await self.db.scalar(select(ProcessNotification).where(
             and_(
                 ProcessNotification.id == notification_id,
                 ProcessNotification.user_id == user_id
             )
-        ).first()
+        ))
         
         if notification:
+            if not notification.is_read:
+                await self.db.run(notification_hub.publish, notification.tenant_id, user_id, {
+                    "type": "notification.read",
+                    "notification_id": str(notification.id),
+                    "unread_delta": 0 if notification.is_archived else -1
+                })
             notification.is_read = True
             notification.read_at = datetime.now()
-            self.db.commit()
+            await self.db.commit()
             return True
         
         return False
@@ -240,49 +346,93 @@ class NotificationService:
     async def mark_all_notifications_as_read(self, user_id: str, tenant_id: str) -> int:
         """Marca todas as notificações como lidas"""
         
-        result = self.db.query(ProcessNotification).filter(
-            and_(
-                ProcessNotification.user_id == user_id,
-                ProcessNotification.tenant_id == tenant_id,
-                ProcessNotification.is_read == False
-            )
-        ).update({
-            "is_read": True,
-            "read_at": datetime.now()
-        })
-        
-        self.db.commit()
+        result = (await self.db.execute(
+            update(ProcessNotification).where(
+                and_(
+                    ProcessNotification.user_id == user_id,
+                    ProcessNotification.tenant_id == tenant_id,
+                    ProcessNotification.is_read == False
+                )
+            ).values(is_read=True, read_at=datetime.now())
+        )).rowcount
+        
+        if result:
+            await self.db.run(notification_hub.publish, tenant_id, user_id, {"type": "notification.read_all", "unread_count": 0})
+        await self.db.commit()
         return result
     
     async def archive_notification(self, notification_id: str, user_id: str) -> bool:
         """Arquiva notificação"""
         
-        notification = self.db.query(ProcessNotification).filter(
+        notification = await self.db.scalar(select(ProcessNotification).where(
             and_(
                 ProcessNotification.id == notification_id,
                 ProcessNotification.user_id == user_id
             )
-        ).first()
+        ))
         
         if notification:
+            if not notification.is_archived:
+                await self.db.run(notification_hub.publish, notification.tenant_id, user_id, {
+                    "type": "notification.archived",
+                    "notification_id": str(notification.id),
+                    "unread_delta": 0 if notification.is_read else -1
+                })
             notification.is_archived = True
             notification.archived_at = datetime.now()
-            self.db.commit()
+            await self.db.commit()
             return True
         
         return False
     
+    # ==================== TICKETS DO STREAM ====================
+    
+    async def create_stream_ticket(self, user_id: str, tenant_id: str) -> Tuple[str, int]:
+        """
+        Emite um ticket curto e de uso único para abrir o stream SSE/WebSocket.
+        
+        EventSource e WebSocket não enviam headers: o ticket vai na URL no
+        lugar do JWT, que assim não aparece em logs de acesso nem no histórico.
+        """
+        ticket = secrets.token_urlsafe(32)
+        now = datetime.now()
+        expires_in = settings.NOTIFICATION_STREAM_TICKET_SECONDS
+        
+        # Limpeza dos tickets vencidos e não usados
+        await self.db.execute(delete(NotificationStreamTicket).where(NotificationStreamTicket.expires_at < now))
+        self.db.add(NotificationStreamTicket(
+            ticket_hash=hashlib.sha256(ticket.encode()).hexdigest(),
+            tenant_id=tenant_id,
+            user_id=user_id,
+            expires_at=now + timedelta(seconds=expires_in)
+        ))
+        await self.db.commit()
+        return ticket, expires_in
+    
+    async def consume_stream_ticket(self, ticket: str) -> Optional[Tuple[str, str]]:
+        """Resgata o ticket (DELETE ... RETURNING: vale uma vez, em qualquer worker) e retorna (tenant_id, user_id)"""
+        row = (await self.db.execute(
+            delete(NotificationStreamTicket).where(
+                NotificationStreamTicket.ticket_hash == hashlib.sha256(ticket.encode()).hexdigest()
+            ).returning(NotificationStreamTicket.tenant_id, NotificationStreamTicket.user_id, NotificationStreamTicket.expires_at)
+        )).first()
+        await self.db.commit()
+        
+        if not row or row.expires_at < datetime.now():
+            return None
+        return str(row.tenant_id), str(row.user_id)
+    
     # ==================== PREFERÊNCIAS DE NOTIFICAÇÃO ====================
     
     async def get_user_preferences(self, user_id: str, tenant_id: str) -> Optional[NotificationPreference]:
         """Busca preferências de notificação do usuário"""
         
-        return self.db.query(NotificationPreference).filter(
+        return await self.db.scalar(select(NotificationPreference).where(
             and_(
                 NotificationPreference.user_id == user_id,
                 NotificationPreference.tenant_id == tenant_id
             )
-        ).first()
+        ))
     
     async def create_or_update_preferences(
         self, 
@@ -307,54 +457,97 @@ class NotificationService:
             if hasattr(preferences, field):
                 setattr(preferences, field, value)
         
-        self.db.commit()
+        await self.db.commit()
+        await self.db.refresh(preferences)
         return preferences
     
     # ==================== NOTIFICAÇÕES AUTOMÁTICAS ====================
     
-    async def check_and_create_deadline_notifications(self, tenant_id: str) -> List[ProcessNotification]:
-        """Verifica e cria notificações de prazos automaticamente"""
-        
-        notifications_created = []
-        today = datetime.now().date()
-        
-        # Buscar prazos próximos
-        upcoming_deadlines = self.db.query(ProcessDeadline).join(Process).filter(
-            and_(
-                Process.tenant_id == tenant_id,
-                ProcessDeadline.status == "pending",
-                ProcessDeadline.due_date >= today,
-                ProcessDeadline.due_date <= today + timedelta(days=7)
-            )
-        ).all()
-        
-        for deadline in upcoming_deadlines:
-            # Buscar advogados responsáveis pelo processo
-            lawyers = self.db.query(User).join(Process.lawyers).filter(
-                Process.id == deadline.process_id
-            ).all()
-            
-            for lawyer in lawyers:
-                # Verificar se já existe notificação recente
-                existing_notification = self.db.query(ProcessNotification).filter(
-                    and_(
-                        ProcessNotification.user_id == lawyer.id,
-                        ProcessNotification.process_id == deadline.process_id,
-                        ProcessNotification.notification_type == "deadline",
-                        ProcessNotification.notification_data.contains({"deadline_id": str(deadline.id)}),
-                        ProcessNotification.created_at >= today
-                    )
-                ).first()
-                
-                if not existing_notification:
-                    # Verificar preferências do usuário
-                    preferences = await self.get_user_preferences(lawyer.id, tenant_id)
-                    
-                    if not preferences or preferences.deadline_notifications:
-                        notification = await self.create_deadline_notification(deadline, lawyer.id)
-                        notifications_created.append(notification)
-        
-        return notifications_created
+    async def check_and_create_deadline_notifications(self, tenant_id: str, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Verifica e cria notificações de prazos automaticamente.
+        
+        Uma consulta seleciona prazos pendentes x advogados do processo dentro
+        da janela de lembrete das preferências e já reserva a chave (prazo,
+        usuário, dias restantes) em notification_dedup_keys com ON CONFLICT DO
+        NOTHING, então execuções repetidas não duplicam. Os textos são
+        renderizados em lote pelos templates do tenant e as notificações são
+        gravadas com um único INSERT.
+        """
+        return await self.db.run(self.create_deadline_notifications, tenant_id, today)
+    
+    def create_deadline_notifications(self, db: Session, tenant_id: str, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Versão síncrona de ``check_and_create_deadline_notifications`` (usada pelo agendador)"""
+        today = today or datetime.now().date()
+        
+        candidates = db.execute(DEADLINE_NOTIFICATIONS_SQL, {
+            "tenant_id": str(tenant_id),
+            "today": today
+        }).all()
+        if not candidates:
+            db.commit()
+            return []
+        
+        contexts = [
+            (deadline_template_key(row.days_until), {
+                "deadline_title": row.deadline_title,
+                "days_until": row.days_until,
+                "due_date": row.due_date,
+                "deadline_type": row.deadline_type
+            })
+            for row in candidates
+        ]
+        rendered = notification_templates.render_many(db, tenant_id, contexts)
+        
+        rows = []
+        for row, (title, message) in zip(candidates, rendered):
+            rows.append({
+                "id": uuid.uuid4(),
+                "tenant_id": row.tenant_id,
+                "process_id": row.process_id,
+                "user_id": row.user_id,
+                "notification_type": "deadline",
+                "priority": self._deadline_priority(row.days_until),
+                "title": title,
+                "message": message,
+                "is_read": False,
+                "is_archived": False,
+                "should_email": row.should_email,
+                "should_push": row.should_push,
+                "should_sms": row.should_sms,
+                "notification_data": {
+                    "deadline_id": str(row.deadline_id),
+                    "due_date": row.due_date.isoformat(),
+                    "days_until": row.days_until,
+                    "deadline_type": row.deadline_type
+                }
+            })
+        
+        db.execute(insert(ProcessNotification), rows)
+        enqueue_deliveries(db, [row["id"] for row in rows])
+        notification_hub.publish_many(db, [
+            (row["tenant_id"], row["user_id"], notification_event(ProcessNotification(**row))) for row in rows
+        ])
+        db.commit()
+        
+        return [
+            {
+                "id": str(row["id"]),
+                "user_id": str(row["user_id"]),
+                "process_id": str(row["process_id"]),
+                "priority": row["priority"],
+                "title": row["title"]
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _deadline_priority(days_until: int) -> str:
+        if days_until <= 0:
+            return "critical"
+        if days_until <= 3:
+            return "high"
+        return "normal"
     
     async def create_court_update_notifications_for_process(
         self, 
@@ -366,13 +559,16 @@ class NotificationService:
         notifications_created = []
         
         # Buscar advogados responsáveis pelo processo
-        lawyers = self.db.query(User).join(Process.lawyers).filter(
-            Process.id == process_id
-        ).all()
+        tenant_id = await self.db.scalar(select(Process.tenant_id).where(Process.id == process_id))
+        lawyers = await self.db.scalars(
+            select(User).join(ProcessLawyer, ProcessLawyer.lawyer_id == User.id).where(
+                ProcessLawyer.process_id == process_id
+            )
+        )
         
         for lawyer in lawyers:
             # Verificar preferências do usuário
-            preferences = await self.get_user_preferences(lawyer.id, timeline_entry.process.tenant_id)
+            preferences = await self.get_user_preferences(lawyer.id, tenant_id)
             
             if not preferences or preferences.court_updates:
                 notification = await self.create_court_update_notification(timeline_entry, lawyer.id)
@@ -0,0 +1,235 @@
+"""
+Renderização de notificações a partir de ``NotificationTemplate``.
+
+Os templates usam a sintaxe de ``str.format`` (``{deadline_title}``,
+``{due_date:%d/%m/%Y}``), sem acesso a atributos ou índices. Cada template é
+compilado uma única vez e fica em cache pela chave (tenant, tipo, versão); a
+versão é incrementada pelo ORM a cada alteração (``version_id_col``), então
+editar um template invalida o cache naturalmente, inclusive em outros workers.
+
+Quando o tenant não tem template ativo para o tipo (ou o template é inválido),
+usa-se o padrão de ``DEFAULT_TEMPLATES``, que reproduz os textos originais.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.models.notification import NotificationTemplate
+
+logger = logging.getLogger(__name__)
+
+TITLE_MAX_LENGTH = 255
+
+# Tipo do template -> (título, mensagem)
+DEFAULT_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    # Prazos (variáveis: deadline_title, days_until, due_date, deadline_type)
+    "deadline.overdue": ("⚠️ PRAZO VENCIDO: {deadline_title}", "O prazo '{deadline_title}' do processo venceu hoje!"),
+    "deadline.tomorrow": ("🚨 PRAZO AMANHÃ: {deadline_title}", "O prazo '{deadline_title}' vence amanhã!"),
+    "deadline.soon": ("⏰ PRAZO PRÓXIMO: {deadline_title}", "O prazo '{deadline_title}' vence em {days_until} dias"),
+    "deadline": ("📅 PRAZO: {deadline_title}", "Lembrete: prazo '{deadline_title}' vence em {days_until} dias"),
+    # Andamentos (variáveis: process_subject, description, andamento_type)
+    "sentença": ("⚖️ SENTENÇA: {process_subject}", "⚖️ {description}..."),
+    "audiência": ("🏛️ AUDIÊNCIA: {process_subject}", "🏛️ {description}..."),
+    "prazo": ("⏰ PRAZO: {process_subject}", "⏰ {description}..."),
+    "andamento": ("📋 ANDAMENTO: {process_subject}", "📋 {description}..."),
+    # Processos urgentes (variáveis: process_subject, process_number)
+    "urgente": (
+        "🚨 PROCESSO URGENTE: {process_subject}",
+        "O processo {process_number} foi marcado como urgente e requer atenção imediata!"
+    ),
+    # Resumos (variáveis: date, deadlines_count, updates_count, urgent_count, week_end)
+    "resumo": (
+        "📊 RESUMO DIÁRIO - {date:%d/%m/%Y}",
+        "📅 {deadlines_count} prazos vencendo hoje | 📋 {updates_count} novos andamentos | 🚨 {urgent_count} processos urgentes"
+    ),
+    "resumo_semanal": (
+        "📊 RESUMO SEMANAL - {date:%d/%m} a {week_end:%d/%m/%Y}",
+        "📅 {deadlines_count} prazos nos próximos 7 dias | 📋 {updates_count} andamentos na semana | 🚨 {urgent_count} processos urgentes"
+    ),
+}
+
+
+def deadline_template_key(days_until: int) -> str:
+    """Tipo de template de prazo conforme os dias restantes"""
+    if days_until <= 0:
+        return "deadline.overdue"
+    if days_until == 1:
+        return "deadline.tomorrow"
+    if days_until <= 3:
+        return "deadline.soon"
+    return "deadline"
+
+
+class CompiledTemplate:
+    """Template já analisado: sequência de literais e campos"""
+
+    __slots__ = ("source", "parts")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if field is not None:
+                if not field.isidentifier():
+                    raise ValueError(f"Variável inválida no template: {{{field}}}")
+                if spec and "{" in spec:
+                    raise ValueError(f"Formato aninhado não suportado: {{{field}:{spec}}}")
+            self.parts.append((literal, field, spec or "", conversion))
+
+    def render(self, context: Dict[str, Any]) -> str:
+        chunks = []
+        for literal, field, spec, conversion in self.parts:
+            chunks.append(literal)
+            if field is None:
+                continue
+            if field not in context:
+                # Variável desconhecida fica visível para quem editou o template
+                chunks.append("{" + field + "}")
+                continue
+            value = context[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            try:
+                chunks.append(format(value, spec) if spec else str(value))
+            except (ValueError, TypeError):
+                chunks.append(str(value))
+        return "".join(chunks)
+
+
+TemplatePair = Tuple[CompiledTemplate, CompiledTemplate]
+
+
+class NotificationTemplateCache:
+    """
+    Cache LRU de templates compilados por (tenant, template, versão).
+
+    A chave usa o id do template, não o tipo: dois templates ativos do mesmo
+    tipo (ou um template recriado) podem ter o mesmo número de versão.
+    """
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        self._compiled: "OrderedDict[Tuple[str, Any, int], TemplatePair]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._defaults: Dict[str, TemplatePair] = {
+            key: (CompiledTemplate(title), CompiledTemplate(message))
+            for key, (title, message) in DEFAULT_TEMPLATES.items()
+        }
+
+    # ==================== API PÚBLICA ====================
+
+    def render(self, db: Session, tenant_id: Any, template_key: str, context: Dict[str, Any]) -> Tuple[str, str]:
+        """Renderiza (título, mensagem) de uma notificação"""
+        return self.render_many(db, tenant_id, [(template_key, context)])[0]
+
+    def render_many(
+        self, db: Session, tenant_id: Any, items: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> List[Tuple[str, str]]:
+        """
+        Renderiza várias notificações do mesmo tenant.
+
+        Faz no máximo duas consultas (versões ativas e, se faltar no cache,
+        o texto dos templates), independentemente da quantidade de itens.
+        """
+        if not items:
+            return []
+        templates = self.resolve(db, tenant_id, {key for key, _ in items})
+
+        rendered = []
+        for key, context in items:
+            title, message = templates[key]
+            rendered.append((title.render(context)[:TITLE_MAX_LENGTH], message.render(context)))
+        return rendered
+
+    def resolve(self, db: Session, tenant_id: Any, template_keys: Iterable[str]) -> Dict[str, TemplatePair]:
+        """Templates compilados vigentes para os tipos informados"""
+        template_keys = set(template_keys)
+        unknown = template_keys - set(self._defaults)
+        if unknown:
+            raise KeyError(f"Tipo de template desconhecido: {', '.join(sorted(unknown))}")
+
+        tenant = str(tenant_id)
+        active = self._active_versions(db, tenant, template_keys)
+
+        resolved: Dict[str, TemplatePair] = {}
+        missing: Dict[str, Tuple[Any, int]] = {}
+        with self._lock:
+            for key in template_keys:
+                if key not in active:
+                    resolved[key] = self._defaults[key]
+                    continue
+                template_id, version = active[key]
+                cached = self._compiled.get((tenant, template_id, version))
+                if cached is None:
+                    missing[key] = (template_id, version)
+                else:
+                    self._compiled.move_to_end((tenant, template_id, version))
+                    resolved[key] = cached
+
+        if missing:
+            resolved.update(self._load(db, tenant, missing))
+        return resolved
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+    # ==================== CARGA ====================
+
+    @staticmethod
+    def _active_versions(db: Session, tenant_id: str, template_keys: Iterable[str]) -> Dict[str, Tuple[Any, int]]:
+        """Template ativo mais recente de cada tipo (apenas id e versão)"""
+        rows = db.query(
+            NotificationTemplate.id,
+            NotificationTemplate.notification_type,
+            NotificationTemplate.version
+        ).filter(
+            NotificationTemplate.tenant_id == tenant_id,
+            NotificationTemplate.is_active == True,
+            NotificationTemplate.notification_type.in_(list(template_keys))
+        ).order_by(
+            NotificationTemplate.updated_at.desc().nullslast(),
+            NotificationTemplate.created_at.desc()
+        ).all()
+
+        active: Dict[str, Tuple[Any, int]] = {}
+        for row in rows:
+            active.setdefault(row.notification_type, (row.id, row.version))
+        return active
+
+    def _load(self, db: Session, tenant_id: str, missing: Dict[str, Tuple[Any, int]]) -> Dict[str, TemplatePair]:
+        rows = db.query(
+            NotificationTemplate.id,
+            NotificationTemplate.title_template,
+            NotificationTemplate.message_template
+        ).filter(
+            NotificationTemplate.id.in_([template_id for template_id, _ in missing.values()])
+        ).all()
+        sources = {row.id: (row.title_template, row.message_template) for row in rows}
+
+        loaded: Dict[str, TemplatePair] = {}
+        for key, (template_id, version) in missing.items():
+            pair = self._defaults[key]
+            if template_id in sources:
+                title_source, message_source = sources[template_id]
+                try:
+                    pair = (CompiledTemplate(title_source), CompiledTemplate(message_source))
+                except ValueError as e:
+                    logger.warning(f"Template de notificação {template_id} inválido, usando o padrão: {e}")
+            loaded[key] = pair
+
+            with self._lock:
+                self._compiled[(tenant_id, template_id, version)] = pair
+                self._compiled.move_to_end((tenant_id, template_id, version))
+                while len(self._compiled) > self.max_size:
+                    self._compiled.popitem(last=False)
+        return loaded
+
+
+notification_templates = NotificationTemplateCache()
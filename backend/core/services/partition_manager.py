@@ -0,0 +1,220 @@
+"""
+Manutenção das tabelas particionadas por mês.
+
+``process_notifications``, ``audit_logs`` e ``data_access_logs`` são
+particionadas por RANGE em ``created_at`` (uma partição por mês, nomeada
+``<tabela>_pAAAAMM``, mais a partição DEFAULT). Este módulo:
+
+- cria antecipadamente as partições do mês corrente e dos próximos meses,
+  movendo para elas linhas que tenham caído na DEFAULT;
+- aplica a retenção removendo partições inteiras (DROP) ou desanexando-as
+  para o schema de arquivo (DETACH + SET SCHEMA), sem DELETE em massa;
+- limpa as tabelas auxiliares (chaves de deduplicação, outbox entregue e
+  exclusões da sincronização mobile).
+
+É executado diariamente pelo agendador de prazos (evento ``partitions``).
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DROP = "drop"
+ARCHIVE = "archive"
+
+DEDUP_KEY_RETENTION_DAYS = 90
+OUTBOX_RETENTION_DAYS = 30
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass
+class PartitionedTable:
+    name: str
+    retention_months: int
+    retention_mode: str = DROP
+
+
+def default_tables() -> List[PartitionedTable]:
+    return [
+        PartitionedTable("process_notifications", settings.NOTIFICATION_RETENTION_MONTHS, settings.NOTIFICATION_RETENTION_MODE),
+        PartitionedTable("audit_logs", settings.AUDIT_RETENTION_MONTHS, settings.AUDIT_RETENTION_MODE),
+        PartitionedTable("data_access_logs", settings.AUDIT_RETENTION_MONTHS, settings.AUDIT_RETENTION_MODE),
+    ]
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, start: date) -> str:
+    return f"{table}_p{start.year:04d}{start.month:02d}"
+
+
+class PartitionManager:
+    """Cria partições futuras e aplica a retenção por partição"""
+
+    def __init__(
+        self,
+        tables: Optional[List[PartitionedTable]] = None,
+        months_ahead: int = 2,
+        archive_schema: str = "archive",
+    ):
+        self.tables = tables
+        self.months_ahead = months_ahead
+        self.archive_schema = archive_schema
+
+    # ==================== API PÚBLICA ====================
+
+    def run(self, db: Session, today: Optional[date] = None) -> Dict[str, List[str]]:
+        """Executa toda a manutenção (uma transação por tabela)"""
+        today = today or datetime.now().date()
+        summary: Dict[str, List[str]] = {"created": [], "dropped": [], "archived": []}
+
+        for table in self._tables():
+            summary["created"] += self.ensure_partitions(db, table.name, today)
+            retained = self.apply_retention(db, table, today)
+            summary["dropped"] += retained[DROP]
+            summary["archived"] += retained[ARCHIVE]
+
+        self.purge_auxiliary(db, today)
+        return summary
+
+    def ensure_partitions(self, db: Session, table: str, today: date) -> List[str]:
+        """Garante as partições do mês corrente até ``months_ahead`` meses à frente"""
+        created = []
+        current = month_start(today)
+        for offset in range(self.months_ahead + 1):
+            start = add_months(current, offset)
+            if self._create_month(db, table, start):
+                created.append(partition_name(table, start))
+        db.commit()
+        if created:
+            logger.info(f"Partições criadas: {', '.join(created)}")
+        return created
+
+    def apply_retention(self, db: Session, table: PartitionedTable, today: date) -> Dict[str, List[str]]:
+        """Remove ou arquiva as partições inteiramente anteriores ao limite de retenção"""
+        result: Dict[str, List[str]] = {DROP: [], ARCHIVE: []}
+        if table.retention_months <= 0:
+            return result
+
+        cutoff = add_months(month_start(today), -table.retention_months)
+        for name, start in self.list_partitions(db, table.name):
+            if add_months(start, 1) > cutoff:
+                continue
+            db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            if table.retention_mode == ARCHIVE:
+                db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{self.archive_schema}"'))
+                db.execute(text(f'ALTER TABLE {table.name} DETACH PARTITION {name}'))
+                db.execute(text(f'ALTER TABLE {name} SET SCHEMA "{self.archive_schema}"'))
+                result[ARCHIVE].append(name)
+            else:
+                db.execute(text(f'DROP TABLE {name}'))
+                result[DROP].append(name)
+            db.commit()
+
+        # Linhas antigas que ficaram na DEFAULT (raro: partição criada depois)
+        db.execute(
+            text(f"DELETE FROM {table.name}_default WHERE created_at < :cutoff"),
+            {"cutoff": cutoff}
+        )
+        db.commit()
+
+        if result[DROP] or result[ARCHIVE]:
+            logger.info(f"Retenção de {table.name}: removidas {result[DROP]}, arquivadas {result[ARCHIVE]}")
+        return result
+
+    def purge_auxiliary(self, db: Session, today: date):
+        """Limpa chaves de deduplicação, entregas finalizadas do outbox e exclusões já sincronizadas"""
+        db.execute(
+            text("DELETE FROM notification_dedup_keys WHERE created_at < :cutoff"),
+            {"cutoff": today - timedelta(days=DEDUP_KEY_RETENTION_DAYS)}
+        )
+        db.execute(
+            text("DELETE FROM notification_outbox WHERE status IN ('sent', 'dead') AND created_at < :cutoff"),
+            {"cutoff": today - timedelta(days=OUTBOX_RETENTION_DAYS)}
+        )
+        db.execute(
+            text("DELETE FROM sync_tombstones WHERE deleted_at < :cutoff"),
+            {"cutoff": today - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)}
+        )
+        db.commit()
+
+    @staticmethod
+    def list_partitions(db: Session, table: str) -> List[tuple]:
+        """Partições mensais anexadas à tabela: [(nome, início do mês)]"""
+        rows = db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+            WHERE parent.relname = :table AND ns.nspname = current_schema()
+            ORDER BY child.relname
+        """), {"table": table}).scalars().all()
+
+        partitions = []
+        for name in rows:
+            match = _PARTITION_NAME.search(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return partitions
+
+    # ==================== INTERNOS ====================
+
+    def _tables(self) -> List[PartitionedTable]:
+        return self.tables if self.tables is not None else default_tables()
+
+    @staticmethod
+    def _create_month(db: Session, table: str, start: date) -> bool:
+        name = partition_name(table, start)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return False
+
+        end = add_months(start, 1)
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        params = {"start": start, "end": end}
+
+        has_rows = db.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE created_at >= :start AND created_at < :end)"
+        ), params).scalar()
+
+        if not has_rows:
+            db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+            return True
+
+        # A DEFAULT já tem linhas do mês: cria a partição fora da árvore,
+        # move as linhas e só então anexa (evita violar a restrição da DEFAULT)
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        db.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), params)
+        db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+        return True
+
+
+def run_partition_maintenance(db: Session, today: Optional[date] = None) -> Dict[str, List[str]]:
+    """Manutenção completa com a configuração padrão (usada pelo agendador)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return {"created": [], "dropped": [], "archived": []}
+    manager = PartitionManager(
+        months_ahead=settings.PARTITION_MONTHS_AHEAD,
+        archive_schema=settings.PARTITION_ARCHIVE_SCHEMA
+    )
+    return manager.run(db, today)
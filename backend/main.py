@@ -1,12 +1,28 @@
 from fastapi import FastAPI, Depends
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
 import uvicorn
 
 # Importações dos módulos
-from core.database import engine, Base
+from core.database import engine, async_engine
+from core.schema_version import check_schema_version
+from core.serialization import ORJSONResponse
 from core.middleware.tenant_isolation import TenantIsolationMiddleware
+from core.middleware.read_your_writes import ReadYourWritesMiddleware
+from core.middleware.sql_instrumentation import SQLInstrumentationMiddleware
+from core.middleware.compression import CompressionMiddleware
+from core.replicas import replica_router
+from core.services.notification_hub import notification_hub
+from core.services.deadline_scheduler import deadline_scheduler
+from core.services.notification_delivery import notification_delivery
+import core.services.metrics_rollup  # noqa: F401 - registra a atualização incremental dos agregados diários
+from core.monitoring import CRITICAL, resource_sampler, overall_status, service_statuses, install_sql_instrumentation
+from core.config import settings
 
 # Rotas Super Admin
 from apps.superadmin.routes import router as superadmin_router
@@ -34,20 +50,49 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Iniciando SaaS Jurídico...")
     
-    # Cria tabelas se não existirem
-    Base.metadata.create_all(bind=engine)
+    # Schema vem das migrações (alembic upgrade head no deploy); aqui só confere a revisão
+    await asyncio.to_thread(check_schema_version, engine)
+    
+    # Hub de notificações em tempo real (SSE/WebSocket)
+    await notification_hub.start()
+    
+    # Agendador de prazos (apenas um worker assume a liderança)
+    if settings.SCHEDULER_ENABLED:
+        await deadline_scheduler.start()
+    
+    # Entrega de notificações por email/push/SMS (outbox)
+    if settings.DELIVERY_ENABLED:
+        await notification_delivery.start()
+    
+    # Amostragem de CPU, memória, event loop e pool do banco (por worker)
+    if settings.MONITORING_ENABLED:
+        await resource_sampler.start()
+    
+    # Medição do atraso das réplicas de leitura (sem réplicas não faz nada)
+    await replica_router.start()
     
     yield
     
     # Shutdown
     print("🛑 Encerrando SaaS Jurídico...")
+    await replica_router.stop()
+    if settings.MONITORING_ENABLED:
+        await resource_sampler.stop()
+    if settings.DELIVERY_ENABLED:
+        await notification_delivery.stop()
+    if settings.SCHEDULER_ENABLED:
+        await deadline_scheduler.stop()
+    await notification_hub.stop()
+    await async_engine.dispose()
 
 # Criação da aplicação
 app = FastAPI(
     title="SaaS Jurídico",
     description="Sistema multi-tenant para escritórios de advocacia",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Default(...): rotas com response_model mantêm a serialização direta do Pydantic
+    default_response_class=Default(ORJSONResponse)
 )
 
 # Middlewares
@@ -66,6 +111,16 @@ app.add_middleware(
 
 app.add_middleware(TenantIsolationMiddleware)
 
+# Leituras no primário logo após as escritas do próprio cliente (réplicas de leitura)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Contagem de consultas, tempo no banco e N+1 por request (Server-Timing)
+install_sql_instrumentation()
+app.add_middleware(SQLInstrumentationMiddleware)
+
+# Compressão das respostas (brotli quando disponível; streams SSE não são comprimidos)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
 # Rotas Super Admin (Portal de Gestão do SaaS)
 app.include_router(
     superadmin_router,
@@ -166,18 +221,24 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check detalhado"""
-    return {
-        "status": "healthy",
-        "timestamp": "2024-01-01T00:00:00Z",
-        "services": {
-            "database": "connected",
-            "redis": "connected",
-            "elasticsearch": "connected"
+    """Health check detalhado (a partir da última amostra de recursos)"""
+    sample = await asyncio.to_thread(resource_sampler.current)
+    services = service_statuses(sample)
+    status = overall_status(services)
+    return JSONResponse(
+        status_code=503 if status == CRITICAL else 200,
+        content={
+            "status": status,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "uptime_seconds": resource_sampler.uptime_seconds(),
+            "services": services,
+            "resources": sample.to_dict(),
+            "replicas": replica_router.status()
         }
-    }
+    )
 
 if __name__ == "__main__":
+    # Desenvolvimento (reload, processo único); produção: python serve.py
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
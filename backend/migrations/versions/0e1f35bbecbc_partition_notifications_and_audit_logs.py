@@ -0,0 +1,116 @@
+"""Partition notifications and audit logs by month
+
+Requer janela de manutenção: cada tabela é renomeada, copiada para a nova
+tabela particionada e removida na mesma transação, com ACCESS EXCLUSIVE em
+process_notifications, audit_logs e data_access_logs até o commit. Leituras
+e escritas nessas tabelas (notificações, auditoria, login) ficam bloqueadas
+durante a cópia, cujo tempo cresce com o volume de linhas; pare a API, o
+agendador e o worker de entregas antes de rodar. Copiar em lotes não
+reduziria a janela: os lotes rodariam na mesma transação e os bloqueios só
+são liberados no commit. O lock_timeout faz a migração falhar logo, sem
+enfileirar o tráfego atrás do RENAME, se alguma conexão ainda usar as tabelas.
+
+Revision ID: 0e1f35bbecbc
+Revises: 2bf688fb9457
+Create Date: 2026-10-19 14:10:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e1f35bbecbc'
+down_revision: Union[str, Sequence[str], None] = '2bf688fb9457'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+# Espera máxima pelo ACCESS EXCLUSIVE de cada tabela
+LOCK_TIMEOUT = '10s'
+
+# tabela -> (chaves estrangeiras, índices compostos com created_at)
+TABLES = {
+    'process_notifications': (
+        [('tenant_id', 'tenants'), ('process_id', 'processes'), ('user_id', 'users')],
+        [('ix_process_notifications_user_created', 'user_id'), ('ix_process_notifications_tenant_created', 'tenant_id')],
+    ),
+    'audit_logs': (
+        [('user_id', 'users')],
+        [('ix_audit_logs_tenant_created', 'tenant_id'), ('ix_audit_logs_user_created', 'user_id')],
+    ),
+    'data_access_logs': (
+        [('user_id', 'users')],
+        [('ix_data_access_logs_tenant_created', 'tenant_id'), ('ix_data_access_logs_user_created', 'user_id')],
+    ),
+}
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_range(first: date, last: date):
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    today = date.today()
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+
+    for table, (foreign_keys, indexes) in TABLES.items():
+        legacy = f'{table}_legacy'
+        op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        op.execute(f'UPDATE {legacy} SET created_at = now() WHERE created_at IS NULL')
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now()')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL')
+
+        # Uma partição por mês com dados, mais as próximas e a DEFAULT
+        oldest = bind.execute(sa.text(f'SELECT min(created_at) FROM {legacy}')).scalar()
+        first = oldest.date() if oldest is not None else today
+        for month in _month_range(first, _add_months(today, MONTHS_AHEAD)):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+        op.execute(f'DROP TABLE {legacy} CASCADE')
+
+        # Restrições e índices no pai são propagados para cada partição
+        op.create_primary_key(f'{table}_pkey', table, ['id', 'created_at'])
+        for column, referred in foreign_keys:
+            op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'])
+        for name, column in indexes:
+            op.create_index(name, table, [column, 'created_at'], unique=False)
+
+    op.execute('RESET lock_timeout')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (foreign_keys, indexes) in TABLES.items():
+        partitioned = f'{table}_partitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+        op.execute(f'CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+        op.execute(f'DROP TABLE {partitioned} CASCADE')
+
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+        for column, referred in foreign_keys:
+            op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'])
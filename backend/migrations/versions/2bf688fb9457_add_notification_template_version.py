@@ -0,0 +1,30 @@
+"""Add notification template version
+
+Revision ID: 2bf688fb9457
+Revises: 67d7b58ebc53
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2bf688fb9457'
+down_revision: Union[str, Sequence[str], None] = '67d7b58ebc53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification_templates', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_notification_templates_tenant_type', 'notification_templates', ['tenant_id', 'notification_type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_templates_tenant_type', table_name='notification_templates')
+    op.drop_column('notification_templates', 'version')
@@ -0,0 +1,119 @@
+"""Add tenant daily metrics rollups
+
+Revision ID: 3047b9572cb8
+Revises: 0e1f35bbecbc
+Create Date: 2026-10-19 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3047b9572cb8'
+down_revision: Union[str, Sequence[str], None] = '0e1f35bbecbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('processes', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    # Melhor aproximação disponível para processos já encerrados
+    op.execute("UPDATE processes SET closed_at = COALESCE(updated_at, created_at) WHERE status = 'closed'")
+
+    op.create_table('tenant_daily_metrics',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('processes_opened', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('processes_closed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('clients_added', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('documents_uploaded', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('expenses', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id', 'day')
+    )
+    op.create_table('tenant_specialty_daily_metrics',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('specialty_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('processes_opened', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('processes_closed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id', 'day', 'specialty_id')
+    )
+
+    # Carga inicial com todo o histórico. Mesma lógica da reconciliação de
+    # core/services/metrics_rollup.py nesta revisão, copiada aqui para que a
+    # migração não mude quando aquele módulo mudar.
+    op.execute("""
+        INSERT INTO tenant_daily_metrics (
+            tenant_id, day, processes_opened, processes_closed, clients_added,
+            documents_uploaded, revenue, expenses, updated_at
+        )
+        SELECT tenant_id, day,
+               SUM(processes_opened), SUM(processes_closed), SUM(clients_added),
+               SUM(documents_uploaded), SUM(revenue), SUM(expenses), now()
+        FROM (
+            SELECT tenant_id, CAST(created_at AS date) AS day,
+                   1 AS processes_opened, 0 AS processes_closed, 0 AS clients_added,
+                   0 AS documents_uploaded, 0 AS revenue, 0 AS expenses
+            FROM processes
+            WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT tenant_id, CAST(closed_at AS date), 0, 1, 0, 0, 0, 0
+            FROM processes
+            WHERE status = 'closed' AND closed_at IS NOT NULL
+            UNION ALL
+            SELECT tenant_id, CAST(created_at AS date), 0, 0, 1, 0, 0, 0
+            FROM clients
+            WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT tenant_id, CAST(created_at AS date), 0, 0, 0, 1, 0, 0
+            FROM documents
+            WHERE created_at IS NOT NULL
+            UNION ALL
+            SELECT tenant_id, CAST(paid_date AS date), 0, 0, 0, 0,
+                   CASE WHEN record_type IN ('income') THEN amount ELSE 0 END,
+                   CASE WHEN record_type IN ('expense', 'cost') THEN amount ELSE 0 END
+            FROM financial_records
+            WHERE paid_date IS NOT NULL
+        ) AS events
+        GROUP BY tenant_id, day
+    """)
+    op.execute("""
+        INSERT INTO tenant_specialty_daily_metrics (
+            tenant_id, day, specialty_id, processes_opened, processes_closed, revenue, updated_at
+        )
+        SELECT tenant_id, day, specialty_id,
+               SUM(processes_opened), SUM(processes_closed), SUM(revenue), now()
+        FROM (
+            SELECT tenant_id, CAST(created_at AS date) AS day, specialty_id,
+                   1 AS processes_opened, 0 AS processes_closed, 0 AS revenue
+            FROM processes
+            WHERE specialty_id IS NOT NULL AND created_at IS NOT NULL
+            UNION ALL
+            SELECT tenant_id, CAST(closed_at AS date), specialty_id, 0, 1, 0
+            FROM processes
+            WHERE specialty_id IS NOT NULL AND status = 'closed' AND closed_at IS NOT NULL
+            UNION ALL
+            SELECT fr.tenant_id, CAST(fr.paid_date AS date), p.specialty_id, 0, 0, fr.amount
+            FROM financial_records fr
+            JOIN processes p ON p.id = fr.process_id
+            WHERE p.specialty_id IS NOT NULL AND fr.record_type IN ('income')
+              AND fr.paid_date IS NOT NULL
+        ) AS events
+        GROUP BY tenant_id, day, specialty_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tenant_specialty_daily_metrics')
+    op.drop_table('tenant_daily_metrics')
+    op.drop_column('processes', 'closed_at')
@@ -0,0 +1,37 @@
+"""Add notification stream tickets
+
+Revision ID: 5c2e8d7a41f6
+Revises: f3b9d1c7a5e2
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8d7a41f6'
+down_revision: Union[str, Sequence[str], None] = 'f3b9d1c7a5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_stream_tickets',
+    sa.Column('ticket_hash', sa.String(length=64), nullable=False),
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('ticket_hash')
+    )
+    op.create_index(op.f('ix_notification_stream_tickets_expires_at'), 'notification_stream_tickets', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notification_stream_tickets_expires_at'), table_name='notification_stream_tickets')
+    op.drop_table('notification_stream_tickets')
@@ -0,0 +1,50 @@
+"""Add notification outbox
+
+Revision ID: 67d7b58ebc53
+Revises: cab4ce76c650
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '67d7b58ebc53'
+down_revision: Union[str, Sequence[str], None] = 'cab4ce76c650'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_outbox',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('notification_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notification_outbox_notification_id'), 'notification_outbox', ['notification_id'], unique=False)
+    op.create_index('ix_notification_outbox_queue', 'notification_outbox', ['channel', 'next_attempt_at'], unique=False, postgresql_where=sa.text("status IN ('pending', 'retry', 'sending')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_outbox_queue', table_name='notification_outbox', postgresql_where=sa.text("status IN ('pending', 'retry', 'sending')"))
+    op.drop_index(op.f('ix_notification_outbox_notification_id'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
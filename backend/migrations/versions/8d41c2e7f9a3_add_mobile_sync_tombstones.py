@@ -0,0 +1,41 @@
+"""Add mobile sync tombstones
+
+Revision ID: 8d41c2e7f9a3
+Revises: 3047b9572cb8
+Create Date: 2026-10-19 18:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c2e7f9a3'
+down_revision: Union[str, Sequence[str], None] = '3047b9572cb8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sync_tombstones',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_tenant_deleted', 'sync_tombstones', ['tenant_id', 'deleted_at'], unique=False)
+    op.add_column('process_timeline', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('process_timeline', 'updated_at')
+    op.drop_index('ix_sync_tombstones_tenant_deleted', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,71 @@
+"""Add superadmin tenant stats materialized view
+
+Revision ID: b6e0a9d35c12
+Revises: 8d41c2e7f9a3
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e0a9d35c12'
+down_revision: Union[str, Sequence[str], None] = '8d41c2e7f9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cópia da definição em core.models.metrics no momento desta revisão
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS superadmin_tenant_stats AS
+        SELECT t.id AS tenant_id, t.name, t.slug, t.plan_type, t.is_active, t.is_suspended, t.created_at,
+               COALESCE(u.users, 0) AS users,
+               COALESCE(u.active_users, 0) AS active_users,
+               COALESCE(p.processes, 0) AS processes,
+               COALESCE(p.active_processes, 0) AS active_processes,
+               COALESCE(c.clients, 0) AS clients,
+               COALESCE(d.documents, 0) AS documents,
+               COALESCE(d.storage_bytes, 0) AS storage_bytes,
+               COALESCE(a.activity_30d, 0) AS activity_30d,
+               a.last_activity_at,
+               LOCALTIMESTAMP AS refreshed_at
+        FROM tenants t
+        LEFT JOIN (
+            SELECT tenant_id, count(*) AS users, count(*) FILTER (WHERE is_active) AS active_users
+            FROM tenant_users GROUP BY tenant_id
+        ) u ON u.tenant_id = t.id
+        LEFT JOIN (
+            SELECT tenant_id, count(*) AS processes,
+                   count(*) FILTER (WHERE status IN ('active', 'pending')) AS active_processes
+            FROM processes GROUP BY tenant_id
+        ) p ON p.tenant_id = t.id
+        LEFT JOIN (
+            SELECT tenant_id, count(*) AS clients FROM clients GROUP BY tenant_id
+        ) c ON c.tenant_id = t.id
+        LEFT JOIN (
+            SELECT tenant_id, count(*) AS documents, sum(file_size) AS storage_bytes
+            FROM documents GROUP BY tenant_id
+        ) d ON d.tenant_id = t.id
+        LEFT JOIN (
+            SELECT tenant_id, count(*) AS activity_30d, max(created_at) AS last_activity_at
+            FROM audit_logs
+            WHERE tenant_id IS NOT NULL AND created_at >= LOCALTIMESTAMP - interval '30 days'
+            GROUP BY tenant_id
+        ) a ON a.tenant_id = t.id
+    """)
+    # Índice único: exigido pelo REFRESH ... CONCURRENTLY
+    op.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_superadmin_tenant_stats_tenant ON superadmin_tenant_stats (tenant_id)')
+    # Índices usados pelas séries de crescimento
+    op.create_index('ix_tenants_created_at', 'tenants', ['created_at'], unique=False)
+    op.create_index('ix_tenant_users_created_at', 'tenant_users', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tenant_users_created_at', table_name='tenant_users')
+    op.drop_index('ix_tenants_created_at', table_name='tenants')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS superadmin_tenant_stats')
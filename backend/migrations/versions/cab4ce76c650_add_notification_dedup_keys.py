@@ -0,0 +1,35 @@
+"""Add notification dedup keys
+
+Revision ID: cab4ce76c650
+Revises: 73847782f304, ac82a1274703
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cab4ce76c650'
+down_revision: Union[str, Sequence[str], None] = ('73847782f304', 'ac82a1274703')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_dedup_keys',
+    sa.Column('dedup_key', sa.String(length=255), nullable=False),
+    sa.Column('notification_type', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('dedup_key')
+    )
+    op.create_index(op.f('ix_notification_dedup_keys_created_at'), 'notification_dedup_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notification_dedup_keys_created_at'), table_name='notification_dedup_keys')
+    op.drop_table('notification_dedup_keys')
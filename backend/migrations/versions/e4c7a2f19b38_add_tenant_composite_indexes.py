@@ -0,0 +1,100 @@
+"""Add tenant-aware composite indexes
+
+Revision ID: e4c7a2f19b38
+Revises: b6e0a9d35c12
+Create Date: 2026-10-19 21:00:00.000000
+
+Os índices são criados com CREATE INDEX CONCURRENTLY (fora da transação da
+migração) para não bloquear escritas em tabelas grandes. Um índice que ficou
+inválido após uma execução interrompida é removido e recriado.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c7a2f19b38'
+down_revision: Union[str, Sequence[str], None] = 'b6e0a9d35c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, condição do índice parcial)
+INDEXES = [
+    ('ix_clients_tenant_active', 'clients', 'tenant_id, is_active', None),
+    ('ix_clients_tenant_name', 'clients', 'tenant_id, name', None),
+    ('ix_clients_tenant_created', 'clients', 'tenant_id, created_at DESC', None),
+    ('ix_processes_tenant_status', 'processes', 'tenant_id, status', None),
+    ('ix_processes_tenant_updated', 'processes', 'tenant_id, updated_at DESC', None),
+    ('ix_processes_client', 'processes', 'client_id', None),
+    ('ix_process_lawyers_lawyer_process', 'process_lawyers', 'lawyer_id, process_id', None),
+    ('ix_process_lawyers_process', 'process_lawyers', 'process_id', None),
+    ('ix_process_timeline_process_date', 'process_timeline', 'process_id, date DESC', None),
+    ('ix_process_deadlines_process_due', 'process_deadlines', 'process_id, due_date', None),
+    ('ix_process_deadlines_pending_due', 'process_deadlines', 'due_date', "status = 'pending'"),
+    ('ix_process_specialties_process', 'process_specialties', 'process_id', None),
+    ('ix_process_specialties_specialty', 'process_specialties', 'specialty_id', None),
+    ('ix_documents_process_tenant', 'documents', 'process_id, tenant_id', None),
+    ('ix_financial_records_tenant_status_due', 'financial_records', 'tenant_id, status, due_date', None),
+    ('ix_tenant_users_user', 'tenant_users', 'user_id', None),
+    ('ix_specialties_tenant_active', 'specialties', 'tenant_id, is_active', None),
+    ('ix_user_specialties_specialty', 'user_specialties', 'specialty_id', None),
+    ('ix_notification_preferences_user_tenant', 'notification_preferences', 'user_id, tenant_id', None),
+]
+
+# Tabelas particionadas não aceitam CONCURRENTLY: índice no pai (ON ONLY) e
+# um índice concorrente por partição, anexado em seguida
+PARTITIONED_INDEXES = [
+    ('ix_process_notifications_user_tenant_read', 'process_notifications', 'user_id, tenant_id, is_read'),
+]
+
+
+def _drop_if_invalid(bind, name: str):
+    # to_regclass resolve o nome pelo search_path, como o DROP INDEX abaixo:
+    # um índice homônimo em outro schema (ex.: archive) não é considerado
+    invalid = bind.execute(sa.text(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def _partitions(bind, table: str):
+    return bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+    ), {'table': table}).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            _drop_if_invalid(bind, name)
+            condition = f' WHERE {where}' if where else ''
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){condition}')
+
+        for name, table, columns in PARTITIONED_INDEXES:
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns})')
+            for partition in _partitions(bind, table):
+                child = f'{partition}_{name[len("ix_" + table) + 1:]}_idx'
+                _drop_if_invalid(bind, child)
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} ({columns})')
+                attached = bind.execute(sa.text(
+                    "SELECT 1 FROM pg_inherits WHERE inhrelid = CAST(:child AS regclass)"
+                ), {'child': child}).scalar()
+                if not attached:
+                    op.execute(f'ALTER INDEX {name} ATTACH PARTITION {child}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in PARTITIONED_INDEXES:
+            # Remove também os índices anexados às partições
+            op.execute(f'DROP INDEX IF EXISTS {name}')
+        for name, table, columns, where in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -0,0 +1,108 @@
+"""Add normalized client document/email columns and search indexes
+
+Revision ID: f3b9d1c7a5e2
+Revises: e4c7a2f19b38
+Create Date: 2026-10-19 23:30:00.000000
+
+``cpf_cnpj_normalized`` (só dígitos) e ``email_normalized`` (minúsculas) são
+colunas geradas pelo banco: valem também para escritas fora do ORM. A
+unicidade por tenant passa a ser garantida por índices únicos parciais e a
+busca usa índices de trigramas (pg_trgm) em nome, razão social, email e
+documento.
+
+Adicionar colunas geradas reescreve a tabela ``clients`` (lock exclusivo
+durante a reescrita); os índices são criados com CREATE INDEX CONCURRENTLY.
+Duplicatas já existentes impedem a criação dos índices únicos: a migração
+lista os casos e para antes de criá-los.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d1c7a5e2'
+down_revision: Union[str, Sequence[str], None] = 'e4c7a2f19b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CPF_CNPJ_NORMALIZED = "NULLIF(regexp_replace(cpf_cnpj, '[^0-9]', '', 'g'), '')"
+EMAIL_NORMALIZED = "NULLIF(lower(btrim(email)), '')"
+
+# (nome, colunas)
+UNIQUE_INDEXES = [
+    ('ix_clients_tenant_cpf_cnpj', 'tenant_id, cpf_cnpj_normalized'),
+    ('ix_clients_tenant_email', 'tenant_id, email_normalized'),
+]
+
+# (nome, coluna)
+TRIGRAM_INDEXES = [
+    ('ix_clients_name_trgm', 'name'),
+    ('ix_clients_company_name_trgm', 'company_name'),
+    ('ix_clients_email_trgm', 'email_normalized'),
+    ('ix_clients_cpf_cnpj_trgm', 'cpf_cnpj_normalized'),
+]
+
+
+def _drop_if_invalid(bind, name: str):
+    # Mesma verificação de e4c7a2f19b38 (índice resolvido pelo search_path)
+    invalid = bind.execute(sa.text(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def _check_duplicates(bind):
+    """Falha com a lista de duplicatas por tenant (resolver antes de repetir a migração)"""
+    problems = []
+    for column in ('cpf_cnpj_normalized', 'email_normalized'):
+        rows = bind.execute(sa.text(
+            f"SELECT tenant_id, {column} AS value, count(*) AS total FROM clients "
+            f"WHERE {column} IS NOT NULL GROUP BY tenant_id, {column} HAVING count(*) > 1 "
+            f"ORDER BY total DESC LIMIT 20"
+        )).all()
+        problems += [f"{column}={row.value} (tenant {row.tenant_id}): {row.total} clientes" for row in rows]
+    if problems:
+        raise RuntimeError("Clientes duplicados impedem os índices únicos:\n  " + "\n  ".join(problems))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: as colunas já estão gravadas se uma execução anterior parou nas duplicatas
+    op.execute(
+        f'ALTER TABLE clients ADD COLUMN IF NOT EXISTS cpf_cnpj_normalized VARCHAR(18) '
+        f'GENERATED ALWAYS AS ({CPF_CNPJ_NORMALIZED}) STORED'
+    )
+    op.execute(
+        f'ALTER TABLE clients ADD COLUMN IF NOT EXISTS email_normalized VARCHAR(255) '
+        f'GENERATED ALWAYS AS ({EMAIL_NORMALIZED}) STORED'
+    )
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        _check_duplicates(bind)
+        for name, columns in UNIQUE_INDEXES:
+            _drop_if_invalid(bind, name)
+            last_column = columns.split(', ')[-1]
+            op.execute(
+                f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {name} ON clients ({columns}) '
+                f'WHERE {last_column} IS NOT NULL'
+            )
+        for name, column in TRIGRAM_INDEXES:
+            _drop_if_invalid(bind, name)
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON clients USING gin ({column} gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, column in reversed(TRIGRAM_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+        for name, columns in reversed(UNIQUE_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.drop_column('clients', 'email_normalized')
+    op.drop_column('clients', 'cpf_cnpj_normalized')
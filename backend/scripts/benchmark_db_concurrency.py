@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compara a concorrência da camada de serviços com Session síncrona e AsyncSession.
+
+Cada "request" usa a própria sessão, executa uma consulta lenta simulada
+(``pg_sleep``) e lista os clientes de um tenant via ``ClientService``, todas
+disparadas ao mesmo tempo no mesmo event loop (como num worker do uvicorn).
+Um batimento a cada 10 ms mede o atraso máximo do event loop.
+
+Uso:
+    python scripts/benchmark_db_concurrency.py --tenant <uuid>
+    python scripts/benchmark_db_concurrency.py --tenant <uuid> --requests 200 --concurrency 40 --delay 0.05
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from core.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from apps.clients.services import ClientService
+
+
+async def _request(mode: str, tenant_id: str, delay: float, latencies: list):
+    started = time.perf_counter()
+    if mode == "sync":
+        db = SessionLocal()
+        try:
+            service = ClientService(db)
+            await service.db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+            await service.list_clients(tenant_id, limit=20)
+        finally:
+            db.close()
+    else:
+        async with AsyncSessionLocal() as db:
+            service = ClientService(db)
+            await service.db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+            await service.list_clients(tenant_id, limit=20)
+    latencies.append(time.perf_counter() - started)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0))
+
+
+async def run(mode: str, tenant_id: str, requests: int, concurrency: int, delay: float) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+
+    async def limited():
+        async with semaphore:
+            await _request(mode, tenant_id, delay, latencies)
+
+    # Aquecimento do pool
+    await asyncio.gather(*[_request(mode, tenant_id, 0, []) for _ in range(min(concurrency, 5))])
+
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*[limited() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_loop_lag_ms": max(lags, default=0) * 1000
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência Session x AsyncSession")
+    parser.add_argument("--tenant", required=True, help="tenant usado na listagem de clientes")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=40, help="deve caber no pool (pool_size + max_overflow)")
+    parser.add_argument("--delay", type=float, default=0.05, help="duração da consulta lenta simulada (s)")
+    args = parser.parse_args()
+
+    engine.echo = False
+    async_engine.echo = False
+
+    results = []
+    for mode in ("sync", "async"):
+        results.append(await run(mode, args.tenant, args.requests, args.concurrency, args.delay))
+    await async_engine.dispose()
+
+    print(f"{args.requests} requests, concorrência {args.concurrency}, consulta lenta de {args.delay * 1000:.0f} ms")
+    print(f"{'modo':<6} {'tempo (s)':>10} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'lag máx. loop (ms)':>19}")
+    for result in results:
+        print(
+            f"{result['mode']:<6} {result['elapsed_s']:>10.2f} {result['throughput_rps']:>8.1f} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['max_loop_lag_ms']:>19.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Custo de serialização das listagens por 1.000 linhas (sem banco).
+
+Compara, para instâncias em memória de Client, ProcessNotification e
+ProcessTimeline:
+
+- pydantic: ``to_dict()`` (str/isoformat por campo) + validação do schema de
+  resposta + JSON pelo Pydantic (caminho anterior das rotas com response_model);
+- stdlib: ``jsonable_encoder`` + ``json.dumps`` (rotas sem response_model);
+- orjson: ``RowSerializer`` + ``core.serialization.dumps`` (caminho atual).
+
+Uso:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --rows 5000 --repeat 20
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from apps.clients.routes import CLIENT_ROWS
+from apps.clients.schemas import ClientResponse
+from apps.notifications.routes import NOTIFICATION_ROWS
+from apps.notifications.schemas import NotificationResponse
+from apps.processes.services import TIMELINE_ROWS
+from core.models import Client
+from core.models.notification import ProcessNotification
+from core.models.process import ProcessTimeline
+from core.serialization import dumps
+
+
+def _clients(count: int, tenant_id: uuid.UUID):
+    now = datetime.now()
+    return [
+        Client(
+            id=uuid.uuid4(), tenant_id=tenant_id, name=f"Cliente {index}", email=f"cliente{index}@exemplo.com",
+            phone="(11) 99999-0000", cpf_cnpj="52998224725", person_type="PF",
+            address={"city": "São Paulo", "state": "SP"}, birth_date=date(1980, 1, 1) + timedelta(days=index),
+            is_active=True, is_vip=index % 10 == 0, notes=None, tags=["trabalhista"],
+            created_at=now - timedelta(days=index), updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def _notifications(count: int, tenant_id: uuid.UUID):
+    now = datetime.now()
+    user_id, process_id = uuid.uuid4(), uuid.uuid4()
+    return [
+        ProcessNotification(
+            id=uuid.uuid4(), tenant_id=tenant_id, process_id=process_id, user_id=user_id,
+            notification_type="deadline", priority="high", title=f"Prazo {index}",
+            message="Prazo vence amanhã", is_read=False, is_archived=False, should_email=True,
+            should_push=True, should_sms=False, notification_data={"deadline_id": str(uuid.uuid4())},
+            created_at=now - timedelta(minutes=index), read_at=None, archived_at=None,
+        )
+        for index in range(count)
+    ]
+
+
+def _timeline(count: int):
+    now = datetime.now()
+    process_id = uuid.uuid4()
+    return [
+        ProcessTimeline(
+            id=uuid.uuid4(), process_id=process_id, date=now - timedelta(days=index), type="petição",
+            description="Juntada de petição", court_decision=None, documents=[], created_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de serialização das listagens")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10, help="execuções por medição (vale a melhor)")
+    args = parser.parse_args()
+
+    tenant_id = uuid.uuid4()
+    clients = _clients(args.rows, tenant_id)
+    notifications = _notifications(args.rows, tenant_id)
+    timeline = _timeline(args.rows)
+
+    client_list = TypeAdapter(list[ClientResponse])
+    notification_list = TypeAdapter(list[NotificationResponse])
+
+    cases = [
+        ("clientes", {
+            "pydantic": lambda: client_list.dump_json(client_list.validate_python([c.to_dict() for c in clients])),
+            "stdlib": lambda: json.dumps(jsonable_encoder([c.to_dict() for c in clients])).encode(),
+            "orjson": lambda: dumps(CLIENT_ROWS.rows(clients)),
+        }),
+        ("notificações", {
+            "pydantic": lambda: notification_list.dump_json(notification_list.validate_python([n.to_dict() for n in notifications])),
+            "stdlib": lambda: json.dumps(jsonable_encoder([n.to_dict() for n in notifications])).encode(),
+            "orjson": lambda: dumps(NOTIFICATION_ROWS.rows(notifications)),
+        }),
+        ("andamentos", {
+            "stdlib": lambda: json.dumps(jsonable_encoder(TIMELINE_ROWS.rows(timeline))).encode(),
+            "orjson": lambda: dumps(TIMELINE_ROWS.rows(timeline)),
+        }),
+    ]
+
+    scale = 1000 / args.rows
+    print(f"⏱️ Serialização ({args.rows} linhas, melhor de {args.repeat}) - ms por 1.000 linhas")
+    for name, strategies in cases:
+        results = {strategy: _timed(fn, args.repeat) * scale for strategy, fn in strategies.items()}
+        previous = next(iter(results))  # caminho usado antes pela rota
+        line = " | ".join(f"{strategy}: {ms:7.2f} ms" for strategy, ms in results.items())
+        print(f"   {name:<13} {line} | orjson {results[previous] / results['orjson']:.1f}x mais rápido que {previous}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Importa clientes de um CSV para um tenant (migração da base de um escritório).
+
+Mesmo fluxo de ``POST /api/v1/company/clients/import`` (validação de CPF/CNPJ,
+deduplicação no arquivo e contra o banco, INSERT em lote), sem o limite de
+linhas por arquivo da API.
+
+Colunas reconhecidas: name/nome, email, phone/telefone, cpf_cnpj/cpf/cnpj,
+person_type/tipo, birth_date/data_nascimento (dd/mm/aaaa ou ISO),
+occupation/profissao, company_name/razao_social, company_role/cargo,
+is_vip/vip, notes/observacoes. Separador ``,`` ``;`` ou tab.
+
+Uso:
+    python scripts/import_clients.py --tenant demo-empresa clientes.csv --dry-run
+    python scripts/import_clients.py --tenant <uuid> clientes.csv --errors erros.csv
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import csv
+import time
+import uuid
+
+from core.database import SessionLocal
+from core.models.tenant import Tenant
+from apps.clients.importer import ClientImportService, decode_csv, read_clients_csv
+
+
+def find_tenant(db, value: str):
+    """Tenant pelo id ou pelo slug"""
+    try:
+        return db.query(Tenant).filter(Tenant.id == uuid.UUID(value)).first()
+    except ValueError:
+        return db.query(Tenant).filter(Tenant.slug == value).first()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa clientes de um CSV")
+    parser.add_argument("file", help="arquivo CSV (UTF-8 ou cp1252)")
+    parser.add_argument("--tenant", required=True, help="id ou slug da empresa")
+    parser.add_argument("--dry-run", action="store_true", help="apenas valida e mostra o relatório")
+    parser.add_argument("--errors", help="grava as linhas rejeitadas neste CSV (linha;mensagem)")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as source:
+        rows = read_clients_csv(decode_csv(source.read()))
+
+    db = SessionLocal()
+    try:
+        tenant = find_tenant(db, args.tenant)
+        if not tenant:
+            print(f"❌ Empresa não encontrada: {args.tenant}")
+            sys.exit(1)
+        tenant_name = tenant.name
+
+        started = time.perf_counter()
+        report = asyncio.run(ClientImportService(db).import_clients(rows, str(tenant.id), dry_run=args.dry_run))
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    action = "validados (dry-run)" if args.dry_run else "importados"
+    print(f"✅ {report['imported']} de {report['total']} clientes {action} em {elapsed:.1f}s para {tenant_name}")
+    if report["errors"]:
+        print(f"⚠️ {report['failed']} linhas rejeitadas:")
+        for error in report["errors"][:20]:
+            print(f"   linha {error['row']}: {error['message']}")
+        if report["failed"] > 20:
+            print(f"   ... e mais {report['failed'] - 20}")
+
+    if args.errors and report["errors"]:
+        with open(args.errors, "w", newline="", encoding="utf-8") as target:
+            writer = csv.writer(target, delimiter=";")
+            writer.writerow(["linha", "mensagem"])
+            writer.writerows((error["row"], error["message"]) for error in report["errors"])
+        print(f"📄 Relatório de erros: {args.errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Relatório de índices ausentes, não usados e inválidos.
+
+Uso:
+    python scripts/index_advisor.py
+    python scripts/index_advisor.py --min-rows 10000 --min-index-size 1048576
+    python scripts/index_advisor.py --json > index_report.json
+
+As consultas mais caras vêm de ``pg_stat_statements``; sem a extensão
+(``shared_preload_libraries = 'pg_stat_statements'`` e
+``CREATE EXTENSION pg_stat_statements``) essa seção fica vazia.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+
+from core.database import SessionLocal, engine
+from core.services.index_advisor import IndexAdvisor
+
+
+def _size(value: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def print_report(report: dict):
+    print(f"Estatísticas desde: {report['stats_reset'] or 'início do servidor'}")
+
+    print(f"\n❌ Índices inválidos ({len(report['invalid_indexes'])})")
+    for row in report["invalid_indexes"]:
+        print(f"   {row['table_name']}.{row['index_name']} -> DROP INDEX CONCURRENTLY {row['index_name']}; e recrie")
+
+    print(f"\n🔑 Chaves estrangeiras sem índice ({len(report['unindexed_foreign_keys'])})")
+    for row in report["unindexed_foreign_keys"]:
+        print(f"   {row['table_name']} ({', '.join(row['columns'])}) [{row['constraint_name']}]")
+
+    print(f"\n🐢 Tabelas com mais leituras sequenciais que por índice ({len(report['seq_scan_tables'])})")
+    for row in report["seq_scan_tables"]:
+        print(
+            f"   {row['table_name']}: {row['seq_scan']} seq scans x {row['idx_scan']} index scans, "
+            f"{row['rows_per_seq_scan']} linhas por scan ({row['live_rows']} linhas)"
+        )
+
+    if report["pg_stat_statements"]:
+        print(f"\n⏱️ Consultas mais caras ({len(report['top_statements'])})")
+        for row in report["top_statements"]:
+            query = " ".join(row["query"].split())[:160]
+            tables = f" [seq scan: {', '.join(row['seq_scan_tables'])}]" if row["seq_scan_tables"] else ""
+            print(f"   {row['total_ms']:>10.1f} ms total | {row['calls']:>7} chamadas | {row['mean_ms']:>8.2f} ms{tables}")
+            print(f"      {query}")
+    else:
+        print("\n⏱️ pg_stat_statements não instalado: consultas mais caras indisponíveis")
+
+    print(f"\n🗑️ Índices não usados ({len(report['unused_indexes'])})")
+    for row in report["unused_indexes"]:
+        print(f"   {row['table_name']}.{row['index_name']} ({_size(row['size_bytes'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de índices ausentes, não usados e inválidos")
+    parser.add_argument("--min-rows", type=int, default=1000, help="ignora tabelas menores nas leituras sequenciais")
+    parser.add_argument("--min-index-size", type=int, default=0, help="tamanho mínimo (bytes) dos índices não usados")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        report = IndexAdvisor(db).report(
+            min_rows=args.min_rows, min_index_size_bytes=args.min_index_size, limit=args.limit
+        )
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Recalcula os agregados diários por tenant (tenant_daily_metrics e
+tenant_specialty_daily_metrics) a partir das tabelas de origem.
+
+Uso:
+    python scripts/rebuild_tenant_metrics.py                  # últimos METRICS_RECONCILE_DAYS dias
+    python scripts/rebuild_tenant_metrics.py --days 365       # último ano
+    python scripts/rebuild_tenant_metrics.py --all --tenant <uuid>
+
+Útil após cargas ou correções feitas diretamente no banco, que não passam
+pela atualização incremental.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from core.config import settings
+from core.database import SessionLocal
+from core.services.metrics_rollup import MetricsRollupService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula os agregados diários por tenant")
+    parser.add_argument("--days", type=int, default=settings.METRICS_RECONCILE_DAYS, help="quantidade de dias a recalcular")
+    parser.add_argument("--all", action="store_true", help="recalcula todo o histórico")
+    parser.add_argument("--tenant", help="limita a um tenant")
+    args = parser.parse_args()
+
+    end = datetime.now().date() + timedelta(days=1)
+    start = date(1900, 1, 1) if args.all else end - timedelta(days=args.days)
+
+    db = SessionLocal()
+    try:
+        rows = MetricsRollupService(db).reconcile(start, end, tenant_id=args.tenant)
+        print(f"✅ {rows} agregados diários recalculados ({start.isoformat()} a {end.isoformat()})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
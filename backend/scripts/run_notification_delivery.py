@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Worker de entrega de notificações (email, push e SMS) fora da API.
+
+Uso:
+    python scripts/run_notification_delivery.py           # roda continuamente
+    python scripts/run_notification_delivery.py --once    # processa a fila uma vez e sai
+
+Para testes locais use DELIVERY_SINK_DIR=/tmp/entregas (arquivos JSONL) ou
+SMTP_HOST=localhost SMTP_PORT=1025 (MailHog do docker-compose).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import logging
+import time
+
+from core.config import settings
+from core.services.notification_delivery import NotificationDeliveryService
+
+
+def drain(service: NotificationDeliveryService) -> int:
+    """Processa lotes até esvaziar a fila de todos os canais"""
+    batches = 0
+    for worker in service.workers:
+        while worker.run_once():
+            batches += 1
+            time.sleep(worker.bucket.wait_time())
+        batches += 1
+    return batches
+
+
+async def run_forever(service: NotificationDeliveryService):
+    await service.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrega de notificações pendentes no outbox")
+    parser.add_argument("--once", action="store_true", help="processa a fila uma vez e sai")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # O script existe justamente para entregar: entrega mesmo que a API esteja com ela desligada
+    service = NotificationDeliveryService(poll_seconds=settings.DELIVERY_POLL_SECONDS, enabled=True)
+
+    if args.once:
+        service.workers = service.build_workers()
+        if not service.workers:
+            print("⚠️ Nenhum canal configurado (SMTP_HOST, PUSH_ENDPOINT_URL, SMS_ENDPOINT_URL ou DELIVERY_SINK_DIR)")
+            return
+        drain(service)
+        print(f"✅ Fila processada ({', '.join(w.channel for w in service.workers)})")
+        return
+
+    print("📬 Worker de entrega iniciado (Ctrl+C para sair)")
+    try:
+        asyncio.run(run_forever(service))
+    except KeyboardInterrupt:
+        print("🛑 Worker de entrega encerrado")
+
+
+if __name__ == "__main__":
+    main()
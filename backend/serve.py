@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Servidor de produção: gunicorn (pré-fork) com workers uvicorn.
+
+- a aplicação é importada uma única vez no processo mestre (preload) e os
+  workers são criados por fork, compartilhando as páginas já carregadas;
+- o pool de conexões de cada worker é derivado de ``DB_CONNECTION_BUDGET``
+  (``core.database.pool_sizes``): N workers juntos não passam do orçamento;
+- cada worker é reciclado após ``WORKER_MAX_REQUESTS`` (+ jitter, para não
+  reiniciarem todos juntos), terminando os requests em andamento antes de
+  sair, o que limita o crescimento de memória.
+
+Uso:
+    python serve.py
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+    WEB_CONCURRENCY=8 DB_CONNECTION_BUDGET=180 python serve.py
+
+Em desenvolvimento continue usando ``python main.py`` (reload).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+
+def post_fork(server, worker):
+    from core.database import dispose_inherited_pools
+
+    dispose_inherited_pools()
+
+
+def build_application(options: dict):
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+    return ProductionApplication()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de produção (gunicorn + uvicorn workers)")
+    parser.add_argument("--bind", default=os.getenv("BIND", "0.0.0.0:8000"))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count())))
+    args = parser.parse_args()
+
+    # Antes de importar core.config: o número de workers dimensiona os pools
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    from core.config import settings
+    from core.database import pool_sizes, ENGINES_PER_WORKER
+
+    pool_size, max_overflow = pool_sizes(
+        settings.DB_CONNECTION_BUDGET, args.workers, settings.DB_RESERVED_CONNECTIONS_PER_WORKER
+    )
+    per_worker = ENGINES_PER_WORKER * (pool_size + max_overflow) + settings.DB_RESERVED_CONNECTIONS_PER_WORKER
+    total = per_worker * args.workers
+    print(
+        f"🚀 {args.workers} workers em {args.bind} | pool por engine: {pool_size} + {max_overflow} overflow | "
+        f"até {total} conexões (orçamento: {settings.DB_CONNECTION_BUDGET})"
+    )
+    if total > settings.DB_CONNECTION_BUDGET:
+        print(f"❌ Orçamento de conexões insuficiente para {args.workers} workers: reduza --workers ou aumente DB_CONNECTION_BUDGET")
+        sys.exit(1)
+
+    build_application({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.WORKER_GRACEFUL_TIMEOUT,
+        "accesslog": "-",
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
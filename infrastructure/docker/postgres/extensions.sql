@@ -0,0 +1,2 @@
+-- Estatísticas por consulta usadas por scripts/index_advisor.py
+CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import requests
+import time
+
+# Configurações
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+IMPORT_URL = f"{BASE_URL}/api/v1/company/clients/import"
+
+def cpf(base):
+    """CPF válido (com dígitos verificadores) a partir de 9 dígitos"""
+    digits = [int(d) for d in f"{base:09d}"]
+    for weight in (10, 11):
+        remainder = sum(d * w for d, w in zip(digits, range(weight, 1, -1))) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+def build_csv(seed, count):
+    """CSV com separador ';' (como o Excel exporta) e 4 linhas inválidas no final"""
+    lines = ["Nome;E-mail;CPF;Telefone;Data Nascimento"]
+    for index in range(count):
+        lines.append(f"Cliente Importado {seed}-{index};import{seed}_{index}@teste.com;{cpf(seed * 10000 + index)};11999990000;01/02/1980")
+    lines.append(f"Email repetido;IMPORT{seed}_0@teste.com;;;")     # repetido no arquivo
+    lines.append(f"CPF inválido;invalido{seed}@teste.com;52998224724;;")  # dígito verificador
+    lines.append(f";semnome{seed}@teste.com;;;")                    # nome obrigatório
+    lines.append(f"Telefone longo;fone{seed}@teste.com;;{'9' * 25};")  # maior que a coluna (20)
+    return "\n".join(lines).encode("utf-8")
+
+def test_client_import():
+    print("🧪 Testando importação em lote de clientes")
+    print("=" * 50)
+
+    # 1. Fazer login como empresa
+    print("1. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"✅ Login realizado com sucesso!")
+
+        seed = int(time.time()) % 10000
+        count = 2000
+        content = build_csv(seed, count)
+
+        # 2. Dry-run: só valida
+        print(f"\n2. Validando {count + 4} linhas (dry_run)...")
+        response = requests.post(IMPORT_URL, params={"dry_run": True}, files={"file": ("clientes.csv", content, "text/csv")}, headers=headers)
+        report = response.json()
+        print(f"Status: {response.status_code} | {report.get('imported')} válidos, {report.get('failed')} rejeitados")
+        if response.status_code == 200 and report["imported"] == count and report["failed"] == 4:
+            print("✅ Validação e deduplicação no arquivo")
+        else:
+            print(f"❌ Relatório inesperado: {report}")
+        for error in report.get("errors", []):
+            print(f"   linha {error['row']}: {error['message']}")
+
+        # 3. Importação
+        print("\n3. Importando...")
+        started = time.time()
+        response = requests.post(IMPORT_URL, files={"file": ("clientes.csv", content, "text/csv")}, headers=headers)
+        report = response.json()
+        print(f"Status: {response.status_code} | {report.get('imported')} importados em {time.time() - started:.1f}s")
+        if response.status_code == 200 and report["imported"] == count:
+            print("✅ Clientes importados")
+        else:
+            print(f"❌ Importação falhou: {report}")
+
+        # 4. Reimportar: todos já cadastrados
+        print("\n4. Reimportando o mesmo arquivo...")
+        response = requests.post(IMPORT_URL, files={"file": ("clientes.csv", content, "text/csv")}, headers=headers)
+        report = response.json()
+        if response.status_code == 200 and report["imported"] == 0 and report["failed"] == count + 4:
+            print("✅ Duplicatas com a base detectadas (nada importado)")
+        else:
+            print(f"❌ Esperado 0 importados: {report.get('imported')}")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
+if __name__ == "__main__":
+    test_client_import()
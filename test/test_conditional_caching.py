@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import requests
+
+# Configurações
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+ME_URL = f"{BASE_URL}/api/v1/auth/me"
+SPECIALTIES_URL = f"{BASE_URL}/api/v1/company/specialties/"
+PROCESSES_URL = f"{BASE_URL}/api/v1/company/processes/"
+
+def check_revalidation(name, url, headers):
+    """200 com validadores; 304 com If-None-Match e com If-Modified-Since"""
+    response = requests.get(url, headers=headers)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    print(f"   {name}: {response.status_code} | ETag: {etag} | Last-Modified: {last_modified} | Cache-Control: {response.headers.get('Cache-Control')}")
+    if response.status_code != 200 or not etag or not last_modified:
+        print(f"❌ {name}: validadores ausentes")
+        return None
+
+    response = requests.get(url, headers={**headers, "If-None-Match": etag})
+    if response.status_code == 304 and not response.content:
+        print(f"✅ {name}: 304 com If-None-Match")
+    else:
+        print(f"❌ {name}: esperado 304 com If-None-Match, recebido {response.status_code}")
+
+    response = requests.get(url, headers={**headers, "If-Modified-Since": last_modified})
+    if response.status_code == 304:
+        print(f"✅ {name}: 304 com If-Modified-Since")
+    else:
+        print(f"❌ {name}: esperado 304 com If-Modified-Since, recebido {response.status_code}")
+
+    # If-None-Match tem precedência sobre If-Modified-Since
+    response = requests.get(url, headers={**headers, "If-None-Match": 'W/"desatualizado"', "If-Modified-Since": last_modified})
+    if response.status_code == 200:
+        print(f"✅ {name}: ETag desatualizado retorna os dados")
+    else:
+        print(f"❌ {name}: esperado 200 com ETag desatualizado, recebido {response.status_code}")
+    return etag
+
+def test_conditional_caching():
+    print("🧪 Testando cache condicional (ETag/Last-Modified)")
+    print("=" * 50)
+
+    # 1. Fazer login como empresa
+    print("1. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"✅ Login realizado com sucesso!")
+
+        # 2. Especialidades (dados de referência: max-age)
+        print("\n2. Revalidando especialidades...")
+        etag = check_revalidation("Especialidades", SPECIALTIES_URL, headers)
+
+        # 3. Alteração invalida o ETag da lista
+        print("\n3. Criando especialidade e revalidando a lista...")
+        create_response = requests.post(SPECIALTIES_URL, json={"name": "Especialidade Cache Teste"}, headers=headers)
+        if create_response.status_code == 200:
+            specialty_id = create_response.json()["id"]
+            response = requests.get(SPECIALTIES_URL, headers={**headers, "If-None-Match": etag or ""})
+            if response.status_code == 200:
+                print("✅ Lista alterada retornada com novo ETag")
+            else:
+                print(f"❌ Esperado 200 após alteração, recebido {response.status_code}")
+            check_revalidation("Especialidade", f"{SPECIALTIES_URL}{specialty_id}", headers)
+            requests.delete(f"{SPECIALTIES_URL}{specialty_id}", headers=headers)
+        else:
+            print(f"❌ Erro ao criar especialidade: {create_response.text}")
+
+        # 4. Processo individual
+        print("\n4. Revalidando processo...")
+        processes = requests.get(PROCESSES_URL, params={"fields": "id"}, headers=headers).json()
+        if processes:
+            check_revalidation("Processo", f"{PROCESSES_URL}{processes[0]['id']}", headers)
+        else:
+            print("⚠️ Nenhum processo cadastrado")
+
+        # 5. Usuário atual (configurações e identidade visual da empresa)
+        print("\n5. Revalidando /auth/me...")
+        check_revalidation("Usuário atual", ME_URL, headers)
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
+if __name__ == "__main__":
+    test_conditional_caching()
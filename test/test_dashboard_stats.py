@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import requests
+import json
+
+# Configurações
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+STATS_URL = f"{BASE_URL}/api/v1/company/dashboard/stats"
+CLIENTS_ANALYTICS_URL = f"{BASE_URL}/api/v1/company/dashboard/clients/analytics"
+CLIENTS_URL = f"{BASE_URL}/api/v1/company/clients/"
+
+def test_dashboard_stats():
+    print("🧪 Testando estatísticas do dashboard (cache + ETag)")
+    print("=" * 50)
+
+    # 1. Fazer login como empresa
+    print("1. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"✅ Login realizado com sucesso!")
+
+        # 2. Primeira requisição: dados completos + ETag
+        print("\n2. Buscando estatísticas...")
+        response = requests.get(STATS_URL, headers=headers)
+        print(f"Status: {response.status_code}")
+
+        if response.status_code != 200:
+            print(f"❌ Erro ao buscar estatísticas: {response.text}")
+            return
+
+        stats = response.json()
+        etag = response.headers.get("ETag")
+        print(f"Estatísticas: {json.dumps(stats, indent=2)}")
+        print(f"ETag: {etag}")
+
+        expected = {"total_clients", "active_clients", "total_processes", "active_processes", "monthly_revenue", "new_clients_month"}
+        if expected.issubset(stats.keys()) and etag:
+            print("✅ Estatísticas e ETag retornados")
+        else:
+            print("❌ Resposta incompleta")
+
+        # 3. Revalidação com If-None-Match deve retornar 304 sem corpo
+        print("\n3. Revalidando com If-None-Match...")
+        response = requests.get(STATS_URL, headers={**headers, "If-None-Match": etag})
+        print(f"Status: {response.status_code}")
+        if response.status_code == 304 and not response.content:
+            print("✅ 304 Not Modified")
+        else:
+            print(f"❌ Esperado 304: {response.status_code}")
+
+        # 4. ETag diferente deve retornar os dados
+        print("\n4. Revalidando com ETag desatualizado...")
+        response = requests.get(STATS_URL, headers={**headers, "If-None-Match": 'W/"desatualizado"'})
+        print(f"Status: {response.status_code}")
+        if response.status_code == 200:
+            print("✅ Dados retornados novamente")
+        else:
+            print(f"❌ Esperado 200: {response.text}")
+
+        # 5. Total de clientes acompanha cadastro e exclusão
+        print("\n5. Total de clientes após criar e excluir um cliente...")
+        total = requests.get(CLIENTS_ANALYTICS_URL, headers=headers).json()["total"]
+        response = requests.post(CLIENTS_URL, json={"name": "Cliente Total Dashboard", "person_type": "PF"}, headers=headers)
+        if response.status_code != 200:
+            print(f"❌ Erro ao criar cliente: {response.text}")
+            return
+        client_id = response.json()["id"]
+        after_create = requests.get(CLIENTS_ANALYTICS_URL, headers=headers).json()["total"]
+        requests.delete(f"{CLIENTS_URL}{client_id}", headers=headers)
+        after_delete = requests.get(CLIENTS_ANALYTICS_URL, headers=headers).json()["total"]
+        print(f"Total: {total} -> {after_create} -> {after_delete}")
+        if after_create == total + 1 and after_delete == total:
+            print("✅ Exclusão reduz o total de clientes")
+        else:
+            print("❌ Total de clientes não acompanhou a exclusão")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
+if __name__ == "__main__":
+    test_dashboard_stats()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import os
+import sys
+from datetime import date
+
+# Configurações (executar a partir da raiz do repositório; não precisa da API nem do banco)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from core.services.legal_calendar import LegalCalendar, easter_sunday, holidays_for
+
+def test_holidays():
+    print("🧪 Testando os feriados do calendário forense")
+    print("=" * 50)
+
+    assert easter_sunday(2024) == date(2024, 3, 31)
+    assert easter_sunday(2026) == date(2026, 4, 5)
+    print("1. Páscoa calculada ✅")
+
+    holidays = holidays_for("nacional", 2026)
+    assert date(2026, 4, 3) in holidays    # Sexta-feira Santa
+    assert date(2026, 2, 16) in holidays   # Segunda de Carnaval
+    assert date(2026, 2, 17) in holidays   # Terça de Carnaval
+    assert date(2026, 6, 4) in holidays    # Corpus Christi
+    assert date(2026, 11, 20) in holidays  # Consciência Negra
+    assert date(2023, 11, 20) not in holidays_for("nacional", 2023)
+    print("2. Feriados nacionais e forenses ✅")
+
+    assert date(2026, 1, 20) in holidays and date(2026, 1, 21) not in holidays
+    assert date(2026, 12, 20) in holidays and date(2026, 12, 19) not in holidays
+    print("3. Recesso de 20/12 a 20/01 ✅")
+
+    assert date(2026, 7, 9) in holidays_for("tjsp", 2026)
+    assert date(2026, 7, 9) not in holidays_for("tjrj", 2026)
+    assert date(2026, 12, 8) in holidays_for("trf3", 2026)
+    assert date(2026, 12, 8) not in holidays_for("tjsp", 2026)
+    print("4. Feriados estaduais e da Justiça da União ✅")
+
+def test_business_days():
+    print("🧪 Testando a contagem de prazos em dias úteis")
+    print("=" * 50)
+    calendar = LegalCalendar()
+
+    # Exclui o dia do começo e inclui o do vencimento
+    assert calendar.add_business_days(date(2026, 10, 19), 5) == date(2026, 10, 26)
+    assert calendar.business_days_between(date(2026, 10, 19), date(2026, 10, 26)) == 5
+    print("1. Prazo simples ✅")
+
+    # Intimação no sábado: considerada feita na segunda-feira
+    assert calendar.add_business_days(date(2026, 10, 17), 1) == date(2026, 10, 20)
+    # Feriado no meio do prazo
+    assert calendar.add_business_days(date(2026, 11, 19), 1) == date(2026, 11, 23)
+    # Prazo suspenso no recesso
+    assert calendar.add_business_days(date(2026, 12, 18), 1, "tjsp") == date(2027, 1, 21)
+    print("2. Fins de semana, feriados e recesso ✅")
+
+    assert not calendar.is_business_day(date(2026, 7, 9), "tjsp")
+    assert calendar.is_business_day(date(2026, 7, 9), "tjrj")
+    print("3. Calendário por tribunal ✅")
+
+    due_dates = calendar.compute_due_dates([
+        {"start_date": date(2026, 7, 8), "business_days": 1, "tribunal": "tjsp"},
+        {"start_date": date(2026, 7, 8), "business_days": 1, "tribunal": "tjrj"},
+        {"start_date": date(2026, 10, 19), "business_days": 5},
+    ])
+    assert due_dates == [date(2026, 7, 10), date(2026, 7, 9), date(2026, 10, 26)]
+    print("4. Cálculo em lote com tribunais diferentes ✅")
+
+    calendar.register_holidays("tjrj", [date(2026, 7, 9)])
+    assert not calendar.is_business_day(date(2026, 7, 9), "tjrj")
+    print("5. Suspensão de expediente registrada ✅")
+
+def test_out_of_range_dates():
+    print("🧪 Testando datas fora do intervalo suportado")
+    print("=" * 50)
+    calendar = LegalCalendar()
+
+    for start in (date(1, 1, 1), date(9999, 12, 20)):
+        try:
+            calendar.add_business_days(start, 5)
+        except ValueError as e:
+            print(f"1. {start.isoformat()} rejeitada: {e} ✅")
+        else:
+            raise AssertionError(f"❌ {start.isoformat()} deveria ser rejeitada")
+
+    # A data inválida não altera a faixa de anos dos próximos cálculos
+    assert calendar.add_business_days(date(2026, 10, 19), 5) == date(2026, 10, 26)
+    print("2. Calendário continua válido ✅")
+
+if __name__ == "__main__":
+    try:
+        test_holidays()
+        test_business_days()
+        test_out_of_range_dates()
+        print("\n🎉 Calendário forense OK!")
+    except AssertionError as e:
+        print(f"\n❌ Falha: {e}")
+        sys.exit(1)
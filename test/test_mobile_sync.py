@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import requests
+import json
+
+# Configurações
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+SYNC_URL = f"{BASE_URL}/api/v1/company/dashboard/mobile/sync"
+
+def test_mobile_sync():
+    print("🧪 Testando sincronização incremental do dashboard mobile")
+    print("=" * 50)
+
+    # 1. Fazer login como empresa
+    print("1. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+        print(f"✅ Login realizado com sucesso!")
+
+        # 2. Sem token: sincronização completa
+        print("\n2. Sincronização completa...")
+        response = requests.get(SYNC_URL, headers=headers)
+        print(f"Status: {response.status_code}")
+
+        if response.status_code != 200:
+            print(f"❌ Erro na sincronização: {response.text}")
+            return
+
+        full = response.json()
+        print(f"Processos: {len(full['p'])} | Prazos: {len(full['d'])} | Andamentos: {len(full['tl'])} | Notificações: {len(full['n'])}")
+        print(f"Compressão: {response.headers.get('Content-Encoding')} | Tamanho: {len(response.content)} bytes (JSON: {len(json.dumps(full))})")
+
+        if full.get("f") == 1 and full.get("t"):
+            print("✅ Sincronização completa com token")
+        else:
+            print("❌ Resposta sem token ou sem indicação de sincronização completa")
+
+        # 3. Com o token: apenas alterações (nada mudou, resposta mínima)
+        print("\n3. Sincronização incremental...")
+        response = requests.get(SYNC_URL, headers=headers, params={"token": full["t"]})
+        print(f"Status: {response.status_code}")
+
+        delta = response.json()
+        print(f"Resposta: {json.dumps(delta)[:300]}")
+        if response.status_code == 200 and delta.get("f") == 0 and delta.get("t"):
+            print(f"✅ Delta recebido ({len(json.dumps(delta))} bytes)")
+        else:
+            print("❌ Esperado delta incremental")
+
+        # 4. Token inválido: volta para sincronização completa
+        print("\n4. Token inválido...")
+        response = requests.get(SYNC_URL, headers=headers, params={"token": "invalido"})
+        if response.status_code == 200 and response.json().get("f") == 1:
+            print("✅ Sincronização completa para token inválido")
+        else:
+            print(f"❌ Esperado sincronização completa: {response.text}")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
+if __name__ == "__main__":
+    test_mobile_sync()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import requests
+import json
+
+# Configurações
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+NOTIFICATIONS_URL = f"{BASE_URL}/api/v1/company/notifications"
+
+def test_notifications_stream():
+    print("🧪 Testando stream de notificações (SSE)")
+    print("=" * 50)
+
+    # 1. Fazer login como empresa
+    print("1. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        print(f"✅ Login realizado com sucesso!")
+
+        # 2. Stream sem token deve ser recusado
+        print("\n2. Testando stream sem token...")
+        response = requests.get(f"{NOTIFICATIONS_URL}/stream", timeout=5)
+        print(f"Status: {response.status_code}")
+        if response.status_code == 401:
+            print("✅ Stream sem token recusado")
+        else:
+            print(f"❌ Esperado 401: {response.text}")
+
+        # 3. Contagem de não lidas (referência para o snapshot)
+        print("\n3. Buscando contagem de não lidas...")
+        headers = {"Authorization": f"Bearer {token}"}
+        count_response = requests.get(f"{NOTIFICATIONS_URL}/unread-count", headers=headers)
+        unread_count = count_response.json().get("unread_count")
+        print(f"Não lidas: {unread_count}")
+
+        # 4. Emitir ticket de conexão (o JWT não vai na URL)
+        print("\n4. Emitindo ticket do stream...")
+        ticket_response = requests.post(f"{NOTIFICATIONS_URL}/stream/ticket", headers=headers)
+        print(f"Status: {ticket_response.status_code}")
+        if ticket_response.status_code != 200:
+            print(f"❌ Erro ao emitir ticket: {ticket_response.text}")
+            return
+        ticket = ticket_response.json().get("ticket")
+        print(f"✅ Ticket emitido (expira em {ticket_response.json().get('expires_in')}s)")
+
+        # 5. Conectar ao stream e ler o snapshot inicial
+        print("\n5. Conectando ao stream...")
+        with requests.get(
+            f"{NOTIFICATIONS_URL}/stream",
+            params={"ticket": ticket},
+            stream=True,
+            timeout=10
+        ) as stream_response:
+            print(f"Status: {stream_response.status_code}")
+            print(f"Content-Type: {stream_response.headers.get('content-type')}")
+
+            if stream_response.status_code != 200:
+                print(f"❌ Erro ao conectar: {stream_response.text}")
+                return
+
+            for line in stream_response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    snapshot = json.loads(line[len("data: "):])
+                    print(f"Snapshot: {snapshot}")
+
+                    if snapshot.get("type") == "snapshot" and snapshot.get("unread_count") == unread_count:
+                        print("✅ Snapshot inicial consistente com /unread-count")
+                    else:
+                        print("❌ Snapshot inesperado")
+                    break
+
+        # 6. O ticket vale uma única conexão
+        print("\n6. Reutilizando o ticket...")
+        response = requests.get(f"{NOTIFICATIONS_URL}/stream", params={"ticket": ticket}, timeout=5)
+        print(f"Status: {response.status_code}")
+        if response.status_code == 401:
+            print("✅ Ticket reutilizado recusado")
+        else:
+            print(f"❌ Esperado 401: {response.text}")
+
+    except Exception as e:
+        print(f"❌ Erro durante o teste: {str(e)}")
+
+if __name__ == "__main__":
+    test_notifications_stream()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import requests
+import time
+
+# Configurações (backend com DATABASE_REPLICA_URLS apontando para postgres-replica)
+BASE_URL = "http://localhost:8000"
+LOGIN_URL = f"{BASE_URL}/api/v1/auth/login"
+CLIENTS_URL = f"{BASE_URL}/api/v1/company/clients/"
+HEALTH_URL = f"{BASE_URL}/health"
+READ_YOUR_WRITES_SECONDS = 5
+
+def test_read_replicas():
+    print("🧪 Testando roteamento de leituras para réplicas (read-your-writes)")
+    print("=" * 50)
+
+    # 1. Réplicas e atraso informados no health check
+    print("1. Consultando réplicas no /health...")
+    replicas = requests.get(HEALTH_URL).json().get("replicas", [])
+    for replica in replicas:
+        print(f"   {replica['name']}: saudável={replica['healthy']} atraso={replica['lag_seconds']}s")
+    if not replicas:
+        print("⚠️ Nenhuma réplica configurada: todas as leituras vão ao primário")
+
+    # 2. Fazer login como empresa (a sessão guarda o cookie rw_until)
+    print("\n2. Fazendo login como empresa...")
+    login_data = {
+        "email": "admin@saasjuridico.com",
+        "password": "123456",
+        "tenant_slug": "demo-empresa"
+    }
+
+    try:
+        session = requests.Session()
+        login_response = requests.post(LOGIN_URL, json=login_data)
+        print(f"Status do login: {login_response.status_code}")
+
+        if login_response.status_code != 200:
+            print(f"❌ Erro no login: {login_response.text}")
+            return
+
+        token = login_response.json().get('access_token')
+        session.headers["Authorization"] = f"Bearer {token}"
+        print(f"✅ Login realizado com sucesso!")
+
+        # 3. Leitura sem escrita recente: réplica saudável (ou primário)
+        print("\n3. Listando clientes...")
+        response = session.get(CLIENTS_URL)
+        print(f"Status: {response.status_code} | X-DB-Target: {response.headers.get('X-DB-Target')}")
+
+        # 4. Escrita define o cookie rw_until
+        print("\n4. Criando cliente...")
+        client_data = {"name": f"Cliente Réplica {int(time.time())}", "person_type": "PF"}
+        response = session.post(CLIENTS_URL, json=client_data)
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Erro ao criar cliente: {response.text}")
+            return
+        client_id = response.json()["id"]
+        print(f"Cookie rw_until: {session.cookies.get('rw_until')}")
+
+        # 5. Leitura logo após a escrita vai ao primário e já enxerga o cliente
+        print("\n5. Listando clientes logo após a escrita...")
+        response = session.get(CLIENTS_URL, params={"search": client_data["name"]})
+        target = response.headers.get("X-DB-Target")
+        found = any(client["id"] == client_id for client in response.json().get("clients", []))
+        print(f"Status: {response.status_code} | X-DB-Target: {target}")
+        if target == "primary" and found:
+            print("✅ Leitura no primário com o cliente recém-criado")
+        else:
+            print(f"❌ Esperado primário com o cliente: target={target}, encontrado={found}")
+
+        # 6. Cliente sem cookies (app mobile/integração): só o token Bearer
+        print("\n6. Escrita e leitura só com o token Bearer (sem cookies)...")
+        bearer = {"Authorization": f"Bearer {token}"}
+        if replicas:
+            time.sleep(READ_YOUR_WRITES_SECONDS + 1)
+        bearer_data = {"name": f"Cliente Réplica Bearer {int(time.time())}", "person_type": "PF"}
+        response = requests.post(CLIENTS_URL, json=bearer_data, headers=bearer)
+        if response.status_code != 200:
+            print(f"❌ Erro ao criar cliente: {response.text}")
+            return
+        bearer_client_id = response.json()["id"]
+        until = response.headers.get("X-Read-Your-Writes-Until")
+        print(f"X-Read-Your-Writes-Until: {until}")
+        response = requests.get(CLIENTS_URL, params={"search": bearer_data["name"]}, headers=bearer)
+        target = response.headers.get("X-DB-Target")
+        found = any(client["id"] == bearer_client_id for client in response.json().get("clients", []))
+        print(f"Status: {response.status_code} | X-DB-Target: {target}")
+        if target == "primary" and found:
+            print("✅ Janela aplicada ao usuário do token, sem cookie")
+        else:
+            print(f"❌ Esperado primário com o cliente: target={target}, encontrado={found}")
+
+        # Com vários workers a janela do token é por processo: o header reenviado vale em qualquer worker
+        response = requests.get(CLIENTS_URL, headers={**bearer, "X-Read-Your-Writes-Until": until or ""})
+        if response.headers.get("X-DB-Target") == "primary":
+            print("✅ Header X-Read-Your-Writes-Until reenviado mantém a leitura no primário")
+        else:
+            print(f"❌ Esperado primário com o header reenviado: {response.headers.get('X-DB-Target')}")
+        requests.delete(f"{CLIENTS_URL}{bearer_client_id}", headers=bearer)
+
+        # 7. Após a janela, as leituras voltam às réplicas
+        if replicas:
+            print(f"\n7. Aguardando {READ_YOUR_WRITES_SECONDS}s...")
+            time.sleep(READ_YOUR_WRITES_SECONDS + 1)
+            response = session.get(CLIENTS_URL)
+            target = response.headers.get("X-DB-Target")
+            print(f"Status: {response.status_code} | X-DB-Target: {target}")
+            if target and target.startswith("replica"):
+                print("✅ Leitura voltou para a réplica")
+            else:
+                print(f"⚠️ Leitura no primário (réplica atrasada ou indisponível?): {target}")
+
+        session.delete(f"{CLIENTS_URL}{client_id}")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
+if __name__ == "__main__":
+    test_read_replicas()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import os
+import re
+import subprocess
+import sys
+
+# Configurações (executar a partir da raiz do repositório, com DATABASE_URL definido)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2500"))
+# Dependências pesadas que só devem ser importadas no primeiro uso
+LAZY_MODULES = ["requests", "boto3", "numpy", "PyPDF2", "alembic"]
+
+CHECK_SCRIPT = (
+    "import sys, main; "
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+)
+
+def test_startup_import_budget():
+    print("🧪 Testando o tempo de importação da aplicação (python -X importtime)")
+    print("=" * 50)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, f"❌ Falha ao importar main: {result.stderr[-2000:]}"
+
+    # Linhas do importtime: "import time: self [us] | cumulative | módulo"
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| main$", line)
+        if match:
+            cumulative = int(match.group(1)) / 1000
+    assert cumulative is not None, "❌ Tempo de importação de main não encontrado"
+
+    print(f"1. Importação de main: {cumulative:.0f} ms (orçamento: {IMPORT_BUDGET_MS} ms)")
+    assert cumulative <= IMPORT_BUDGET_MS, f"❌ Inicialização regrediu: {cumulative:.0f} ms > {IMPORT_BUDGET_MS} ms"
+
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    print(f"2. Dependências pesadas carregadas no boot: {loaded or 'nenhuma'}")
+    assert not loaded, f"❌ Importadas na inicialização (deveriam ser sob demanda): {loaded}"
+
+    print("✅ Inicialização dentro do orçamento")
+
+if __name__ == "__main__":
+    test_startup_import_budget()